@@ -16,6 +16,13 @@ sys.path.insert(0, str(src_path))
 pytest_plugins = []
 
 
+# The models are mutable in production for construction speed; freeze them
+# here so a test fails if code edits a shared (cached) instance in place
+from models import freeze_models
+
+freeze_models()
+
+
 @pytest.fixture(scope="session")
 def project_root():
     """Return the project root directory."""
@@ -74,4 +81,47 @@ def sample_cycle_data():
         'sell_price': None,
         'created_at': datetime.now(),
         'updated_at': datetime.now()
-    } 
\ No newline at end of file
+    } 
+
+
+@pytest.fixture
+def make_asset():
+    """Factory for DcaAsset instances: 2% safety deviation, 1% take-profit, TTP off; keyword overrides."""
+    from decimal import Decimal
+    from datetime import datetime
+    from models.asset_config import DcaAsset
+    
+    def factory(**overrides):
+        values = dict(
+            id=1, asset_symbol='BTC/USD', is_enabled=True,
+            base_order_amount=Decimal('100'), safety_order_amount=Decimal('200'),
+            max_safety_orders=3, safety_order_deviation=Decimal('2.0'),
+            take_profit_percent=Decimal('1.0'), ttp_enabled=False, ttp_deviation_percent=None,
+            cooldown_period=300, buy_order_price_deviation_percent=Decimal('0'),
+            last_sell_price=None, created_at=datetime.now(), updated_at=datetime.now()
+        )
+        values.update(overrides)
+        return DcaAsset(**values)
+    
+    return factory
+
+
+@pytest.fixture
+def make_cycle():
+    """Factory for DcaCycle instances: watching, holding 1 unit bought at 100; keyword overrides."""
+    from decimal import Decimal
+    from datetime import datetime
+    from models.cycle_data import DcaCycle
+    
+    def factory(**overrides):
+        values = dict(
+            id=10, asset_id=1, status='watching', quantity=Decimal('1'),
+            average_purchase_price=Decimal('100'), safety_orders=0,
+            latest_order_id=None, latest_order_created_at=None,
+            last_order_fill_price=Decimal('100'), highest_trailing_price=None,
+            completed_at=None, created_at=datetime.now(), updated_at=datetime.now()
+        )
+        values.update(overrides)
+        return DcaCycle(**values)
+    
+    return factory
@@ -119,6 +119,7 @@ def main():
         print("  integration  - Run integration tests")
         print("  fast         - Run tests without coverage")
         print("  verbose      - Run tests with verbose output")
+        print("  benchmark    - Run microbenchmarks and compare with the last saved run")
         return 1
 
     # Set up test logging
@@ -167,6 +168,9 @@ def main():
     elif command == "verbose":
         return run_command(base_cmd + ["-vv", "--tb=long"], logger)
     
+    elif command == "benchmark":
+        return run_command([sys.executable, "scripts/benchmark.py"] + sys.argv[2:], logger)
+    
     else:
         print(f"Unknown command: {command}")
         logger.error(f"Unknown command: {command}")
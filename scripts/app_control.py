@@ -9,6 +9,7 @@ Commands:
     stop        - Stop the main app and enable maintenance mode
     start       - Start the main app and disable maintenance mode
     restart     - Stop then start (useful for applying asset changes)
+    reload      - Re-read .env in the running app (SIGHUP) without restarting
     status      - Show current status of app and maintenance mode
     maintenance - Toggle maintenance mode (on/off)
 
@@ -16,6 +17,7 @@ Usage:
     python scripts/app_control.py stop
     python scripts/app_control.py start
     python scripts/app_control.py restart
+    python scripts/app_control.py reload
     python scripts/app_control.py status
     python scripts/app_control.py maintenance on
     python scripts/app_control.py maintenance off
@@ -392,6 +394,27 @@ def cmd_restart() -> int:
     return 0
 
 
+def cmd_reload() -> int:
+    """Reload command: Ask the running app to re-read its configuration."""
+    logger.info("="*60)
+    logger.info("RELOADING MAIN APP CONFIGURATION")
+    logger.info("="*60)
+    
+    is_running, pid, _ = get_app_status()
+    if not is_running:
+        logger.error("❌ Main app is not running")
+        return 1
+    
+    try:
+        os.kill(pid, signal.SIGHUP)
+    except (ProcessLookupError, PermissionError) as e:
+        logger.error(f"❌ Failed to signal main app (PID: {pid}): {e}")
+        return 1
+    
+    logger.info(f"📤 Sent SIGHUP to main app (PID: {pid}); see logs/main.log for the changed settings")
+    return 0
+
+
 def cmd_status() -> int:
     """Status command: Show current status."""
     logger.info("="*60)
@@ -479,6 +502,7 @@ Commands:
   stop                    Stop the main app and enable maintenance mode
   start                   Start the main app and disable maintenance mode
   restart                 Stop then start (useful for applying asset changes)
+  reload                  Re-read .env in the running app without restarting
   status                  Show current status of app and maintenance mode
   maintenance on|off      Toggle maintenance mode
 
@@ -486,6 +510,7 @@ Examples:
   python scripts/app_control.py stop
   python scripts/app_control.py start
   python scripts/app_control.py restart
+  python scripts/app_control.py reload
   python scripts/app_control.py status
   python scripts/app_control.py maintenance on
   python scripts/app_control.py maintenance off
@@ -507,6 +532,9 @@ Maintenance Mode:
     # Restart command
     subparsers.add_parser('restart', help='Stop then start the main app')
     
+    # Reload command
+    subparsers.add_parser('reload', help='Re-read .env in the running app (SIGHUP)')
+    
     # Status command
     subparsers.add_parser('status', help='Show current status')
     
@@ -528,6 +556,8 @@ Maintenance Mode:
             return cmd_start()
         elif args.command == 'restart':
             return cmd_restart()
+        elif args.command == 'reload':
+            return cmd_reload()
         elif args.command == 'status':
             return cmd_status()
         elif args.command == 'maintenance':
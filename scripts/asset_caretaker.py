@@ -21,11 +21,16 @@ sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from utils.db_utils import execute_query
 from utils.logging_config import setup_caretaker_logging
+from utils.cycle_journal import start_cycle_journal, stop_cycle_journal
+from utils.run_lock import acquire_run_lock
 from models.asset_config import get_all_enabled_assets
 from models.cycle_data import get_latest_cycle, create_cycle
+from config import get_config
 from decimal import Decimal
 import logging
 
+config = get_config()
+
 # Setup logging
 setup_caretaker_logging("asset_caretaker")
 logger = logging.getLogger(__name__)
@@ -210,4 +215,13 @@ Examples:
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    # Exit if the previous cron run is still going
+    run_lock = acquire_run_lock('asset_caretaker', config.log_dir)
+    if run_lock is None:
+        sys.exit(0)
+    if config.cycle_journal_enabled:
+        start_cycle_journal(config.cycle_journal_flush_seconds)
+    try:
+        main()
+    finally:
+        stop_cycle_journal() 
\ No newline at end of file
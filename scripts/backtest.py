@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Backtest Script
+
+Replays historical quotes or bars for one asset through the bot's base,
+safety, take-profit and TTP rules and prints per-cycle P/L, so DcaAsset
+settings can be compared before they are enabled live.
+
+Settings come from the asset's dca_assets row (--from-db) or the column
+defaults, and any option below overrides them.
+
+Usage:
+    python scripts/backtest.py data/BTCUSD_1m.csv --symbol BTC/USD
+    python scripts/backtest.py data/BTCUSD_1m.csv --symbol BTC/USD --from-db --take-profit 1.5
+    python scripts/backtest.py data/ETHUSD_1m.csv --symbol ETH/USD --no-ttp --spread 0.05 --fee 0.25
+    python scripts/backtest.py data/quotes --symbol BTC/USD
+"""
+
+import argparse
+import dataclasses
+import sys
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from utils.backtest import default_asset_config, load_price_file, run_backtest
+from utils.formatting import format_price
+
+
+def build_asset_config(args: argparse.Namespace):
+    """
+    Build the DcaAsset to test from the database or defaults plus overrides.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        DcaAsset, or None if --from-db found no row
+    """
+    if args.from_db:
+        from models.asset_config import get_asset_config
+        asset = get_asset_config(args.symbol)
+        if asset is None:
+            return None
+    else:
+        asset = default_asset_config(args.symbol)
+
+    overrides = {}
+    for option, field_name, convert in (
+        ('base_amount', 'base_order_amount', Decimal),
+        ('safety_amount', 'safety_order_amount', Decimal),
+        ('max_safety_orders', 'max_safety_orders', int),
+        ('safety_deviation', 'safety_order_deviation', Decimal),
+        ('take_profit', 'take_profit_percent', Decimal),
+        ('ttp_deviation', 'ttp_deviation_percent', Decimal),
+        ('cooldown', 'cooldown_period', int),
+    ):
+        value = getattr(args, option)
+        if value is not None:
+            overrides[field_name] = convert(value)
+    if args.ttp is not None:
+        overrides['ttp_enabled'] = args.ttp
+    return dataclasses.replace(asset, **overrides) if overrides else asset
+
+
+def format_time(timestamp) -> str:
+    """Format an epoch timestamp as UTC."""
+    if timestamp is None:
+        return '-'
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d %H:%M')
+
+
+def print_result(asset, result, show_cycles: bool) -> None:
+    """Print the settings, per-cycle rows and totals."""
+    summary = result.summary()
+    print(f"\n=== BACKTEST {asset.asset_symbol} ===")
+    print(f"Settings: base=${asset.base_order_amount} safety=${asset.safety_order_amount} "
+          f"max_safety={asset.max_safety_orders} deviation={asset.safety_order_deviation}% "
+          f"take_profit={asset.take_profit_percent}% ttp={'on' if asset.ttp_enabled else 'off'}"
+          f"{f' ({asset.ttp_deviation_percent}%)' if asset.ttp_enabled else ''} cooldown={asset.cooldown_period}s")
+    print(f"Quotes: {result.quotes:,} in {result.elapsed_seconds * 1000:.1f}ms | Actions: "
+          + ", ".join(f"{name}={count}" for name, count in sorted(result.actions.items())))
+
+    if show_cycles and result.cycles:
+        print(f"\n{'#':>4}  {'Opened':16}  {'Closed':16}  {'SO':>3}  {'Avg Price':>14}  {'Sell Price':>14}  {'Exit':11}  {'P/L ($)':>10}  {'P/L (%)':>8}")
+        for cycle in result.cycles:
+            print(f"{cycle.number:>4}  {format_time(cycle.opened_at):16}  {format_time(cycle.closed_at):16}  "
+                  f"{cycle.safety_orders:>3}  {format_price(cycle.average_purchase_price):>14}  "
+                  f"{format_price(cycle.sell_price):>14}  {cycle.exit_reason:11}  "
+                  f"{float(cycle.realized_pl):>10.2f}  {float(cycle.pl_percent):>+7.2f}%")
+
+    print(f"\n📋 Completed Cycles: {summary['total_cycles']} ({summary['safety_orders']} safety orders)")
+    print(f"💰 Total Amount Invested: ${float(summary['total_invested']):,.2f}")
+    print(f"💵 Total Realized P/L: ${float(summary['total_realized_pl']):,.2f} (fees ${float(summary['total_fees']):,.2f})")
+    print(f"📈 ROI: {float(summary['roi_percent']):+.2f}%")
+    if result.open_cycle is not None:
+        print(f"⏳ Open Cycle: {result.open_cycle.quantity} @ {format_price(result.open_cycle.average_purchase_price)}, "
+              f"unrealized ${float(summary['open_unrealized_pl']):,.2f}")
+
+
+def main():
+    """Main function to parse arguments and run the backtest."""
+    parser = argparse.ArgumentParser(
+        description="Backtest DCA settings on historical quotes or bars",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+CSV layouts (header row required):
+  timestamp,bid,ask                  quotes
+  timestamp,open,high,low,close      bars (4 quotes per bar)
+  timestamp,price                    single prices
+Timestamps are epoch seconds or ISO 8601 (UTC if no offset).
+
+A quote recorder directory (QUOTE_RECORDER_DIR) or one of its .quotes or
+.quotes.gz files can be given instead of a CSV file.
+        """
+    )
+    parser.add_argument('csv', help='Price data CSV file or quote recorder directory')
+    parser.add_argument('--symbol', required=True, help='Asset symbol (e.g., BTC/USD)')
+    parser.add_argument('--from-db', action='store_true', help="Start from the asset's dca_assets settings")
+    parser.add_argument('--base-amount', help='Base order amount in USD')
+    parser.add_argument('--safety-amount', help='Safety order amount in USD')
+    parser.add_argument('--max-safety-orders', help='Maximum safety orders per cycle')
+    parser.add_argument('--safety-deviation', help='Safety order deviation percent')
+    parser.add_argument('--take-profit', help='Take-profit percent')
+    parser.add_argument('--ttp', dest='ttp', action='store_true', default=None, help='Enable trailing take-profit')
+    parser.add_argument('--no-ttp', dest='ttp', action='store_false', help='Disable trailing take-profit')
+    parser.add_argument('--ttp-deviation', help='Trailing take-profit deviation percent')
+    parser.add_argument('--cooldown', help='Cooldown period in seconds')
+    parser.add_argument('--spread', type=float, default=0.0, help='Bid/ask spread percent for data without bid/ask')
+    parser.add_argument('--fee', default='0', help='Fee percent charged on each fill')
+    parser.add_argument('--no-cycles', action='store_true', help='Only print totals')
+    args = parser.parse_args()
+
+    asset = build_asset_config(args)
+    if asset is None:
+        print(f"❌ No dca_assets row for {args.symbol}")
+        sys.exit(1)
+
+    try:
+        prices = load_price_file(args.csv, spread_percent=args.spread, symbol=args.symbol)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not load {args.csv}: {e}")
+        sys.exit(1)
+
+    result = run_backtest(asset, prices, fee_percent=Decimal(args.fee))
+    print_result(asset, result, show_cycles=not args.no_cycles)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Benchmark Script
+
+Times the trading hot paths: model row conversion, price formatting, the
+base/safety/take-profit order checks, trade-update handling and
+execute_query round-trips. Order checks and trade updates run main_app's
+real code against the replay harness's simulated broker and in-memory
+database, so no network or MySQL server is involved; --mysql times the
+query round-trips against the configured database instead.
+
+Runs can be appended to a history file and compared with the latest run
+from the same machine (or a labelled release), flagging cases that got
+slower than a threshold.
+
+Usage:
+    python scripts/benchmark.py
+    python scripts/benchmark.py --filter main_app --filter db
+    python scripts/benchmark.py --save --label v1.4.0
+    python scripts/benchmark.py --baseline v1.3.0 --check
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterator
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from utils.benchmark import (
+    BenchmarkSuite, compare, find_baseline, format_duration, load_history, save_run
+)
+
+DEFAULT_HISTORY = Path(__file__).parent.parent / 'benchmarks' / 'history.jsonl'
+SYMBOL = 'BTC/USD'
+# 2025-06-01 00:00:00 UTC
+REPLAY_START = 1748736000.0
+
+suite = BenchmarkSuite()
+
+# Set from --mysql: time execute_query against the configured database
+use_mysql = False
+
+ASSET_ROW = {
+    'id': 1, 'asset_symbol': SYMBOL, 'is_enabled': 1, 'base_order_amount': Decimal('100.0000000000'),
+    'safety_order_amount': Decimal('50.0000000000'), 'max_safety_orders': 5,
+    'safety_order_deviation': Decimal('2.0000'), 'take_profit_percent': Decimal('1.5000'), 'ttp_enabled': 1,
+    'ttp_deviation_percent': Decimal('0.5000'), 'cooldown_period': 300,
+    'buy_order_price_deviation_percent': Decimal('3.0000'), 'last_sell_price': Decimal('50000.0000000000'),
+    'created_at': datetime(2025, 6, 1), 'updated_at': datetime(2025, 6, 1),
+}
+CYCLE_ROW = {
+    'id': 1, 'asset_id': 1, 'status': 'watching', 'quantity': Decimal('0.012345678900000'),
+    'average_purchase_price': Decimal('48000.0000000000'), 'safety_orders': 2,
+    'latest_order_id': None, 'latest_order_created_at': None,
+    'last_order_fill_price': Decimal('47000.0000000000'), 'highest_trailing_price': None,
+    'completed_at': None, 'created_at': datetime(2025, 6, 1), 'updated_at': datetime(2025, 6, 1),
+    'sell_price': None,
+}
+
+
+@contextmanager
+def stubbed_main_app(cycle: dict, **asset_overrides) -> Iterator[tuple]:
+    """
+    main_app wired to a simulated broker and in-memory database, with
+    INFO/WARNING logging off so the timings are the decision code itself.
+
+    Yields:
+        (main_app module, ReplayHarness)
+    """
+    from utils.backtest import default_asset_config
+    from utils.replay import ReplayHarness
+
+    asset = default_asset_config(SYMBOL, **asset_overrides)
+    harness = ReplayHarness([asset], [dict(cycle, asset_symbol=SYMBOL)])
+    previous_disable = logging.root.manager.disable
+    logging.disable(logging.WARNING)
+    try:
+        with harness.session(REPLAY_START) as main_app:
+            yield main_app, harness
+    finally:
+        logging.disable(previous_disable)
+        harness.database.close()
+
+
+def quote(bid: float, ask: float):
+    """Quote for SYMBOL at the replay start time."""
+    from utils.replay import ReplayQuote
+    return ReplayQuote(SYMBOL, REPLAY_START, bid, ask)
+
+
+def snapshot(main_app):
+    """QuoteSnapshot of the seeded asset and cycle, as evaluate_quote() takes it."""
+    from models.asset_config import get_asset_config
+    from models.cycle_data import get_latest_cycle
+    asset = get_asset_config(SYMBOL)
+    return main_app.QuoteSnapshot(asset, get_latest_cycle(asset.id), main_app.datetime.now())
+
+
+HOLDING = {'status': 'watching', 'quantity': Decimal('0.5'), 'average_purchase_price': Decimal('100'),
+           'safety_orders': 1, 'last_order_fill_price': Decimal('100')}
+
+
+# Models
+
+@suite.case('models.DcaCycle.from_dict', group='models')
+def bench_cycle_from_dict():
+    """Convert a dca_cycles row to a DcaCycle"""
+    from models.cycle_data import DcaCycle
+    yield lambda: DcaCycle.from_dict(CYCLE_ROW)
+
+
+@suite.case('models.DcaAsset.from_dict', group='models')
+def bench_asset_from_dict():
+    """Convert a dca_assets row to a DcaAsset"""
+    from models.asset_config import DcaAsset
+    yield lambda: DcaAsset.from_dict(ASSET_ROW)
+
+
+@suite.case('models.DcaCycle.from_row', group='models')
+def bench_cycle_from_row():
+    """Convert a dca_cycles tuple row to a DcaCycle"""
+    from models.cycle_data import CYCLE_COLUMNS, DcaCycle
+    row = tuple(CYCLE_ROW[column] for column in CYCLE_COLUMNS)
+    yield lambda: DcaCycle.from_row(row)
+
+
+@suite.case('models.DcaAsset.from_row', group='models')
+def bench_asset_from_row():
+    """Convert a dca_assets tuple row to a DcaAsset"""
+    from models.asset_config import ASSET_COLUMNS, DcaAsset
+    row = tuple(ASSET_ROW[column] for column in ASSET_COLUMNS)
+    yield lambda: DcaAsset.from_row(row)
+
+
+# Formatting
+
+@suite.case('formatting.format_price', group='formatting')
+def bench_format_price():
+    """Format a Decimal price"""
+    from utils.formatting import format_price
+    price = Decimal('43210.123456789')
+    yield lambda: format_price(price)
+
+
+@suite.case('formatting.format_quantity', group='formatting')
+def bench_format_quantity():
+    """Format a float quantity"""
+    from utils.formatting import format_quantity
+    yield lambda: format_quantity(0.00231456789)
+
+
+# Order checks (stubbed broker and database)
+
+@suite.case('main_app.check_and_place_base_order', group='main_app')
+def bench_base_order():
+    """Base order placed from a watching cycle with no position"""
+    cycle = {'status': 'watching', 'quantity': Decimal('0'), 'average_purchase_price': Decimal('0'), 'safety_orders': 0}
+    with stubbed_main_app(cycle) as (main_app, _):
+        state, tick = snapshot(main_app), quote(100.0, 100.1)
+        yield (lambda: main_app.check_and_place_base_order(tick, state)), main_app.recent_orders.clear
+
+
+@suite.case('main_app.check_and_place_safety_order', group='main_app')
+def bench_safety_order():
+    """Safety order placed after the price fell past the deviation"""
+    with stubbed_main_app(HOLDING) as (main_app, _):
+        state, tick = snapshot(main_app), quote(98.0, 98.1)
+        yield (lambda: main_app.check_and_place_safety_order(tick, state)), main_app.recent_orders.clear
+
+
+@suite.case('main_app.check_and_place_take_profit_order', group='main_app')
+def bench_take_profit_order():
+    """Market sell placed at the take-profit level (TTP off)"""
+    with stubbed_main_app(HOLDING, ttp_enabled=False) as (main_app, _):
+        state, tick = snapshot(main_app), quote(103.0, 103.1)
+        yield (lambda: main_app.check_and_place_take_profit_order(tick, state)), main_app.recent_orders.clear
+
+
+@suite.case('main_app.check_and_place_take_profit_order.ttp_peak', group='main_app')
+def bench_ttp_peak():
+    """New trailing peak written while TTP is active"""
+    cycle = dict(HOLDING, status='trailing', highest_trailing_price=Decimal('102'))
+    with stubbed_main_app(cycle) as (main_app, _):
+        state, tick = snapshot(main_app), quote(103.0, 103.1)
+        yield lambda: main_app.check_and_place_take_profit_order(tick, state)
+
+
+@suite.case('main_app.check_and_place_safety_order.hold', group='main_app')
+def bench_safety_hold():
+    """Safety check on a quote that triggers nothing (the common case)"""
+    with stubbed_main_app(HOLDING) as (main_app, _):
+        state, tick = snapshot(main_app), quote(100.5, 100.6)
+        yield lambda: main_app.check_and_place_safety_order(tick, state)
+
+
+# Trade updates
+
+@contextmanager
+def open_buy_order(cycle: dict) -> Iterator[tuple]:
+    """
+    Stubbed main_app with one resting limit buy that the cycle is waiting on.
+
+    Yields:
+        (main_app, order, event loop, reset) where reset() puts the cycle back to 'buying'
+    """
+    from alpaca.trading.requests import LimitOrderRequest
+    from models.cycle_data import update_cycle
+
+    with stubbed_main_app(cycle) as (main_app, harness):
+        order = harness.broker.submit_order(LimitOrderRequest(
+            symbol=SYMBOL, qty=0.2, side='buy', time_in_force='gtc', limit_price=99.0))
+        cycle_id = harness.database.cycles()[-1].id
+        state = {'status': 'buying', 'latest_order_id': str(order.id), 'quantity': cycle['quantity'],
+                 'average_purchase_price': cycle['average_purchase_price'],
+                 'safety_orders': cycle['safety_orders'], 'last_order_fill_price': cycle.get('last_order_fill_price')}
+        loop = asyncio.new_event_loop()
+        try:
+            yield main_app, order, loop, lambda: update_cycle(cycle_id, state)
+        finally:
+            loop.close()
+
+
+@suite.case('main_app.on_trade_update.fill', group='main_app')
+def bench_trade_update_fill():
+    """Safety order fill: cycle averaged, position checked, notification sent"""
+    from utils.replay import ReplayTradeUpdate
+
+    with open_buy_order(HOLDING) as (main_app, order, loop, reset):
+        order.status, order.filled_qty, order.filled_avg_price = 'filled', order.qty, Decimal('99')
+        update = ReplayTradeUpdate('fill', order, REPLAY_START, qty=order.qty, price=Decimal('99'),
+                                   position_qty=Decimal('0.7'), execution_id='bench-fill')
+        yield (lambda: loop.run_until_complete(main_app.on_trade_update(update))), reset
+
+
+@suite.case('main_app.on_trade_update.cancel', group='main_app')
+def bench_trade_update_cancel():
+    """Canceled buy: cycle returned to watching"""
+    from utils.replay import ReplayTradeUpdate
+
+    with open_buy_order(HOLDING) as (main_app, order, loop, reset):
+        order.status, order.filled_qty = 'canceled', Decimal('0')
+        update = ReplayTradeUpdate('canceled', order, REPLAY_START)
+        yield (lambda: loop.run_until_complete(main_app.on_trade_update(update))), reset
+
+
+# Database
+
+@contextmanager
+def query_database() -> Iterator[int]:
+    """
+    The database execute_query() talks to: the in-memory stand-in, or the
+    configured MySQL database with --mysql.
+
+    Yields:
+        An asset id to query by
+    """
+    if use_mysql:
+        yield 1
+        return
+    with stubbed_main_app(HOLDING) as (_, harness):
+        yield harness.database.asset_ids()[SYMBOL]
+
+
+@suite.case('db.execute_query.select', group='db')
+def bench_query_select():
+    """Latest-cycle SELECT (the query get_latest_cycle() runs)"""
+    from utils.db_utils import execute_query
+    query = """
+    SELECT id, asset_id, status, quantity, average_purchase_price, safety_orders, latest_order_id,
+           latest_order_created_at, last_order_fill_price, highest_trailing_price, completed_at,
+           created_at, updated_at, sell_price
+    FROM dca_cycles WHERE asset_id = %s ORDER BY id DESC LIMIT 1
+    """
+    with query_database() as asset_id:
+        yield lambda: execute_query(query, (asset_id,), fetch_one=True)
+
+
+@suite.case('db.execute_query.update', group='db')
+def bench_query_update():
+    """Single-row UPDATE and commit (matches no row, so it is safe on a real database)"""
+    from utils.db_utils import execute_query
+    query = "UPDATE dca_cycles SET highest_trailing_price = %s WHERE id = %s"
+    with query_database():
+        yield lambda: execute_query(query, (Decimal('103.25'), 0), commit=True)
+
+
+def print_results(results, comparisons) -> None:
+    """Print the timings with the change against the baseline."""
+    print(f"\n{'Benchmark':52}  {'Best':>10}  {'Median':>10}  {'± Stdev':>9}  {'Ops/s':>11}  {'vs base':>8}")
+    for result, comparison in zip(results, comparisons):
+        change = comparison.change_percent
+        flag = ' ⚠️' if comparison.regressed else ''
+        print(f"{result.name:52}  {format_duration(result.best_ns):>10}  {format_duration(result.median_ns):>10}  "
+              f"{format_duration(result.stdev_ns):>9}  {result.ops_per_second:>11,.0f}  "
+              f"{'new' if change is None else f'{change:+.1f}%':>8}{flag}")
+
+
+def main():
+    """Main function to parse arguments and run the benchmarks."""
+    global use_mysql
+
+    parser = argparse.ArgumentParser(
+        description="Microbenchmarks for the trading hot paths",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Each case is timed over several rounds after a calibration run; the best
+round is compared with the baseline, since it is the least affected by
+other load. The baseline is the latest saved run from this machine, or
+the latest run with --baseline's label.
+
+Save a labelled run at each release (and commit the history file) so the
+next release has something to compare against.
+        """
+    )
+    parser.add_argument('--filter', action='append', default=[], help='Only cases whose name contains this, or this group (repeatable)')
+    parser.add_argument('--list', action='store_true', help='List cases and exit')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Target seconds per round (default: 0.2)')
+    parser.add_argument('--rounds', type=int, default=5, help='Timed rounds per case (default: 5)')
+    parser.add_argument('--history', default=str(DEFAULT_HISTORY), help='History file (default: benchmarks/history.jsonl)')
+    parser.add_argument('--save', action='store_true', help='Append this run to the history file')
+    parser.add_argument('--label', help='Label for the saved run (e.g. a release tag)')
+    parser.add_argument('--baseline', help='Compare with the latest run with this label')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Slowdown percent reported as a regression (default: 10)')
+    parser.add_argument('--check', action='store_true', help='Exit with status 1 if any case regressed')
+    parser.add_argument('--mysql', action='store_true', help='Time execute_query against the configured database')
+    parser.add_argument('--log-dir', default='logs/benchmark', help='Directory for main_app logging (default: logs/benchmark)')
+    args = parser.parse_args()
+
+    names = suite.names(args.filter)
+    if args.list:
+        for name in names:
+            print(f"{name:52}  {suite.describe(name)}")
+        return
+    if not names:
+        print(f"❌ No benchmarks match {args.filter}")
+        sys.exit(1)
+
+    # Must be set before main_app configures logging
+    Path(args.log_dir).mkdir(parents=True, exist_ok=True)
+    os.environ['LOG_DIR'] = args.log_dir
+    use_mysql = args.mysql
+
+    print(f"Running {len(names)} benchmarks ({args.rounds} rounds of ~{args.min_time}s)...")
+    results = suite.run(names, min_time=args.min_time, rounds=args.rounds,
+                        progress=lambda result: print(f"  {result.name}: {format_duration(result.best_ns)}"))
+
+    history = load_history(args.history)
+    baseline = find_baseline(history, label=args.baseline)
+    comparisons = compare(results, baseline, threshold_percent=args.threshold)
+    print_results(results, comparisons)
+    if baseline:
+        print(f"\nBaseline: {baseline.get('label') or 'unlabelled'} run of {baseline['ts']} "
+              f"(commit {baseline.get('commit') or 'unknown'})")
+    else:
+        print("\nNo baseline run to compare with" + (f" labelled {args.baseline}" if args.baseline else " from this machine"))
+
+    if args.save:
+        run = save_run(args.history, results, label=args.label)
+        print(f"💾 Saved run {run['ts']} to {args.history}")
+
+    regressed = [comparison.name for comparison in comparisons if comparison.regressed]
+    if regressed:
+        print(f"⚠️ {len(regressed)} regressed by more than {args.threshold}%: {', '.join(regressed)}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
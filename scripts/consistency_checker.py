@@ -25,8 +25,13 @@ import mysql.connector
 from mysql.connector import Error
 
 from utils.logging_config import setup_caretaker_logging
-from utils.db_utils import execute_query, check_connection
-from utils.alpaca_client_rest import get_trading_client, get_order, get_positions
+from utils.db_utils import execute_query, check_connection, init_connection_pool_from_config, close_connection_pool
+from utils.cycle_journal import start_cycle_journal, stop_cycle_journal
+from utils.run_lock import acquire_run_lock
+from utils.alpaca_client_rest import (
+    get_trading_client, get_order, get_positions,
+    RequestPriority, scheduled_request, configure_request_scheduler
+)
 from models.cycle_data import get_all_cycles, update_cycle, DcaCycle, create_cycle
 from models.asset_config import get_asset_config_by_id
 from alpaca.trading.client import TradingClient
@@ -167,7 +172,7 @@ def is_order_stale_or_terminal(client: TradingClient, order_id: str, current_tim
         bool: True if order should be considered inactive, False otherwise
     """
     try:
-        order = client.get_order_by_id(order_id)
+        order = scheduled_request(RequestPriority.READ, client.get_order_by_id, order_id)
         
         # Check if order is in terminal state
         terminal_states = ['filled', 'canceled', 'expired', 'rejected']
@@ -264,17 +269,41 @@ def process_stuck_buying_cycle(client: TradingClient, cycle: DcaCycle, current_t
         return False
 
 
-def get_alpaca_position_by_symbol(client: TradingClient, symbol: str) -> Optional:
+def fetch_alpaca_positions(client: TradingClient) -> Optional[Dict[str, Any]]:
+    """
+    Fetch every Alpaca position with one request, for the whole run.
+    
+    Args:
+        client: Initialized TradingClient
+    
+    Returns:
+        Dict of Alpaca symbol (e.g. 'BTCUSD') -> Position for non-zero positions,
+        or None if the positions could not be fetched
+    """
+    try:
+        positions = scheduled_request(RequestPriority.READ, client.get_all_positions)
+    except Exception as e:
+        logger.error(f"Error fetching Alpaca positions: {e}")
+        return None
+    return {position.symbol: position for position in positions if float(position.qty) != 0}
+
+
+def get_alpaca_position_by_symbol(client: TradingClient, symbol: str,
+                                  positions: Optional[Dict[str, Any]] = None) -> Optional:
     """
     Get a specific position by symbol from Alpaca.
     
     Args:
         client: Initialized TradingClient
         symbol: Asset symbol (e.g., 'BTC/USD')
+        positions: Positions from fetch_alpaca_positions(); fetched from Alpaca if None
         
     Returns:
         Position object if found, None if no position or error
     """
+    if positions is not None:
+        return positions.get(symbol.replace('/', ''))
+    
     try:
         # Import get_positions from alpaca_client_rest
         from utils.alpaca_client_rest import get_positions
@@ -310,7 +339,7 @@ def has_alpaca_position(client: TradingClient, symbol: str) -> bool:
     try:
         # Convert symbol format for Alpaca API (UNI/USD -> UNIUSD)
         alpaca_symbol = symbol.replace('/', '')
-        position = client.get_open_position(alpaca_symbol)
+        position = scheduled_request(RequestPriority.READ, client.get_open_position, alpaca_symbol)
         
         # Check if position has meaningful quantity
         if position and position.qty and abs(float(position.qty)) > 0.0001:
@@ -332,7 +361,8 @@ def has_alpaca_position(client: TradingClient, symbol: str) -> bool:
         return False
 
 
-def process_watching_cycle_with_position_sync(client: TradingClient, cycle: DcaCycle, current_time: datetime) -> bool:
+def process_watching_cycle_with_position_sync(client: TradingClient, cycle: DcaCycle, current_time: datetime,
+                                              positions: Optional[Dict[str, Any]] = None) -> bool:
     """
     Process a 'watching' cycle with enhanced position synchronization.
     
@@ -345,6 +375,7 @@ def process_watching_cycle_with_position_sync(client: TradingClient, cycle: DcaC
         client: Alpaca trading client
         cycle: The watching cycle to process
         current_time: Current UTC time
+        positions: Positions from fetch_alpaca_positions(); fetched per cycle if None
     
     Returns:
         bool: True if cycle was updated/processed, False otherwise
@@ -361,7 +392,7 @@ def process_watching_cycle_with_position_sync(client: TradingClient, cycle: DcaC
         logger.info(f"Checking Alpaca position for {asset_config.asset_symbol}")
         
         # Get current Alpaca position
-        alpaca_position = get_alpaca_position_by_symbol(client, asset_config.asset_symbol)
+        alpaca_position = get_alpaca_position_by_symbol(client, asset_config.asset_symbol, positions)
         
         if alpaca_position:
             # Position exists on Alpaca - check for synchronization needs
@@ -585,11 +616,19 @@ def main():
         watching_processed = 0
         watching_updated = 0
         
-        for cycle in all_watching_cycles:
+        # One positions request for the run rather than one per cycle; without it
+        # every cycle would look like it has no position, so skip the scenario
+        positions = fetch_alpaca_positions(client) if all_watching_cycles else {}
+        cycles_to_sync = all_watching_cycles
+        if positions is None:
+            logger.error("❌ Could not fetch Alpaca positions; skipping watching cycle synchronization")
+            cycles_to_sync = []
+        
+        for cycle in cycles_to_sync:
             watching_processed += 1
             logger.info(f"📋 Processing watching cycle {watching_processed}/{len(all_watching_cycles)}: {cycle.id}")
             
-            if process_watching_cycle_with_position_sync(client, cycle, current_time):
+            if process_watching_cycle_with_position_sync(client, cycle, current_time, positions):
                 watching_updated += 1
         
         # Step 6: Summary
@@ -618,5 +657,19 @@ def main():
 
 
 if __name__ == '__main__':
-    success = main()
+    # Exit if the previous cron run is still going
+    run_lock = acquire_run_lock('consistency_checker', config.log_dir)
+    if run_lock is None:
+        sys.exit(0)
+    # Reuse one connection across this run's queries
+    init_connection_pool_from_config(config)
+    configure_request_scheduler(config.alpaca_caretaker_rate_limit_per_minute, config.alpaca_rate_limit_burst)
+    if config.cycle_journal_enabled:
+        start_cycle_journal(config.cycle_journal_flush_seconds)
+    try:
+        success = main()
+    finally:
+        # Insert journaled cycle events while the connection pool is still open
+        stop_cycle_journal()
+        close_connection_pool()
     sys.exit(0 if success else 1) 
\ No newline at end of file
@@ -28,8 +28,10 @@ from typing import List, Optional
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
 
 # Import our utilities and models
-from utils.db_utils import get_db_connection, execute_query, check_connection
+from utils.db_utils import get_db_connection, execute_query, check_connection, init_connection_pool_from_config, close_connection_pool
 from utils.logging_config import setup_caretaker_logging
+from utils.cycle_journal import start_cycle_journal, stop_cycle_journal
+from utils.run_lock import acquire_run_lock
 from models.cycle_data import DcaCycle, get_cycle_by_id, update_cycle
 from models.asset_config import DcaAsset, get_asset_config, get_asset_config_by_id
 
@@ -283,5 +285,18 @@ def main():
 
 
 if __name__ == '__main__':
-    success = main()
+    # Exit if the previous cron run is still going
+    run_lock = acquire_run_lock('cooldown_manager', config.log_dir)
+    if run_lock is None:
+        sys.exit(0)
+    # Reuse one connection across this run's queries
+    init_connection_pool_from_config(config)
+    if config.cycle_journal_enabled:
+        start_cycle_journal(config.cycle_journal_flush_seconds)
+    try:
+        success = main()
+    finally:
+        # Insert journaled cycle events while the connection pool is still open
+        stop_cycle_journal()
+        close_connection_pool()
     sys.exit(0 if success else 1) 
\ No newline at end of file
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Cycle History Script
+
+Prints a cycle's journaled events from the cycle_events table in order,
+and the cycle's state rebuilt from its latest snapshot plus the events
+after it. With --verify, compares the rebuilt state with the dca_cycles row
+and exits with status 1 if they disagree.
+
+Needs main_app to run with CYCLE_JOURNAL_ENABLED=true.
+
+Usage:
+    python scripts/cycle_history.py 42
+    python scripts/cycle_history.py 42 --verify
+"""
+
+import argparse
+import sys
+from dataclasses import fields
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from models.cycle_data import DcaCycle, get_cycle_by_id
+from models.cycle_events import apply_cycle_events, cycle_differences, get_cycle_events, get_replay_events
+
+
+def format_values(values: dict) -> str:
+    """Render a changes or details dict as 'key=value' pairs."""
+    return ', '.join(f"{key}={value}" for key, value in values.items() if key != 'id')
+
+
+def main():
+    """Main function to print and optionally verify a cycle's history."""
+    parser = argparse.ArgumentParser(
+        description="Show a cycle's journaled events and its state rebuilt from them",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python scripts/cycle_history.py 42
+  python scripts/cycle_history.py 42 --verify
+        """
+    )
+    parser.add_argument('cycle_id', type=int, help='Cycle ID (dca_cycles.id)')
+    parser.add_argument('--verify', action='store_true',
+                        help='Compare the rebuilt state with dca_cycles; exit 1 on a mismatch')
+    args = parser.parse_args()
+
+    events = get_cycle_events(args.cycle_id)
+    if not events:
+        print(f"No journaled events for cycle {args.cycle_id}")
+        sys.exit(1)
+
+    print(f"Cycle {args.cycle_id}: {len(events)} events")
+    for event in events:
+        values = {**event.changes, **event.details}
+        print(f"  {event.event_time}  #{event.id:<8} {event.event_type:<13} {format_values(values)}")
+
+    replay = get_replay_events(args.cycle_id)
+    rebuilt = apply_cycle_events(replay)
+    if rebuilt is None:
+        print("\nNo snapshot journaled for this cycle; its state cannot be rebuilt")
+        sys.exit(1)
+
+    print(f"\nRebuilt from event #{replay[0].id} and {len(replay) - 1} later events:")
+    for f in fields(DcaCycle):
+        if f.name != 'asset_symbol':
+            print(f"  {f.name:<24} {getattr(rebuilt, f.name)}")
+
+    if args.verify:
+        current = get_cycle_by_id(args.cycle_id)
+        if current is None:
+            print(f"\n❌ Cycle {args.cycle_id} not found in dca_cycles")
+            sys.exit(1)
+        differences = cycle_differences(rebuilt, current)
+        if differences:
+            print(f"\n❌ Journal and dca_cycles disagree on {len(differences)} fields:")
+            for difference in differences:
+                print(f"  {difference}")
+            sys.exit(1)
+        print("\n✅ Journal matches dca_cycles")
+
+
+if __name__ == "__main__":
+    main()
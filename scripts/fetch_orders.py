@@ -18,9 +18,11 @@ from typing import List, Optional, Any
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from utils.alpaca_client_rest import get_trading_client
+from utils.alpaca_client_rest import get_trading_client, RequestPriority, scheduled_request, configure_request_scheduler
 from utils.db_utils import get_db_connection
 from utils.logging_config import setup_caretaker_logging
+from utils.run_lock import acquire_run_lock
+from config import get_config
 
 # Configuration
 FETCH_LIMIT = 100  # Fetch most recent 100 orders
@@ -169,7 +171,7 @@ def fetch_recent_orders(client) -> List:
             limit=FETCH_LIMIT
         )
         
-        orders = client.get_orders(filter=request)
+        orders = scheduled_request(RequestPriority.READ, client.get_orders, filter=request)
         logger.info(f"Fetched {len(orders)} orders from Alpaca API")
         return orders
         
@@ -225,4 +227,10 @@ def main():
         connection.close()
 
 if __name__ == "__main__":
+    config = get_config()
+    # Exit if the previous cron run is still going
+    run_lock = acquire_run_lock('fetch_orders', config.log_dir)
+    if run_lock is None:
+        sys.exit(0)
+    configure_request_scheduler(config.alpaca_caretaker_rate_limit_per_minute, config.alpaca_rate_limit_burst)
     main() 
\ No newline at end of file
@@ -33,9 +33,11 @@ from decimal import Decimal
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
 
 # Import our utilities and models
-from utils.db_utils import get_db_connection, execute_query, check_connection
+from utils.db_utils import get_db_connection, execute_query, check_connection, init_connection_pool_from_config, close_connection_pool
 from utils.logging_config import setup_caretaker_logging
-from utils.alpaca_client_rest import get_trading_client, get_open_orders, cancel_order, get_order
+from utils.cycle_journal import start_cycle_journal, stop_cycle_journal
+from utils.run_lock import acquire_run_lock
+from utils.alpaca_client_rest import get_trading_client, get_open_orders, cancel_order, get_order, configure_request_scheduler
 from models.cycle_data import DcaCycle, get_all_cycles, update_cycle
 
 # Setup logging
@@ -535,5 +537,19 @@ def main():
 
 
 if __name__ == '__main__':
-    success = main()
+    # Exit if the previous cron run is still going
+    run_lock = acquire_run_lock('order_manager', config.log_dir)
+    if run_lock is None:
+        sys.exit(0)
+    # Reuse one connection across this run's queries
+    init_connection_pool_from_config(config)
+    configure_request_scheduler(config.alpaca_caretaker_rate_limit_per_minute, config.alpaca_rate_limit_burst)
+    if config.cycle_journal_enabled:
+        start_cycle_journal(config.cycle_journal_flush_seconds)
+    try:
+        success = main()
+    finally:
+        # Insert journaled cycle events while the connection pool is still open
+        stop_cycle_journal()
+        close_connection_pool()
     sys.exit(0 if success else 1) 
\ No newline at end of file
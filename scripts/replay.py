@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Replay Script
+
+Runs recorded quotes (and optionally recorded trade updates) through
+main_app's own quote and trade-update handlers at full speed, against a
+simulated Alpaca account and an in-memory copy of the DCA tables, and
+prints what the bot did and how fast it decided.
+
+Use it to check a handler change against a recorded day before deploying,
+or to reproduce an incident from the quote recorder files and the
+lifecycle event log.
+
+Usage:
+    python scripts/replay.py data/quotes --symbol BTC/USD --symbol ETH/USD
+    python scripts/replay.py data/quotes --symbol BTC/USD --from-db --cooldown 60
+    python scripts/replay.py data/BTCUSD_1m.csv --symbol BTC/USD --spread 0.05
+    python scripts/replay.py data/quotes --symbol BTC/USD --trade-updates logs/events.jsonl --no-simulate-fills
+"""
+
+import argparse
+import dataclasses
+import os
+import sys
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from utils.backtest import default_asset_config
+from utils.formatting import format_price
+
+
+def build_assets(args: argparse.Namespace) -> list:
+    """
+    Build the DcaAsset for each symbol from the database or defaults.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        List of DcaAsset
+    """
+    assets = []
+    for symbol in args.symbol:
+        if args.from_db:
+            from models.asset_config import get_asset_config
+            asset = get_asset_config(symbol)
+            if asset is None:
+                raise ValueError(f"no dca_assets row for {symbol}")
+        else:
+            asset = default_asset_config(symbol)
+        if args.cooldown is not None:
+            asset = dataclasses.replace(asset, cooldown_period=args.cooldown)
+        assets.append(asset)
+    return assets
+
+
+def print_report(report, show_orders: bool) -> None:
+    """Print throughput, DB usage, orders and cycles."""
+    summary = report.summary()
+    print("\n=== REPLAY ===")
+    print(f"Quotes: {report.quotes:,} ({report.replay_seconds / 3600:.1f}h of market time) in {report.wall_seconds:.2f}s "
+          f"| {report.quotes_per_second:,.0f} quotes/s, {report.evaluations_per_second:,.0f} decisions/s, "
+          f"{report.speedup:,.0f}x real time")
+    print(f"Decisions: {report.evaluations:,} | Trade updates: "
+          + (", ".join(f"{event}={count}" for event, count in sorted(report.trade_updates.items())) or 'none'))
+    if report.unmatched_trade_updates:
+        print(f"⚠️ Recorded trade updates with no matching replay order: {report.unmatched_trade_updates:,}")
+    print(f"DB queries: {report.db_queries_per_quote:.3f} per quote, {report.update_db_queries:,} for trade updates, "
+          f"{report.background_db_queries:,} background")
+
+    if show_orders and report.orders:
+        print(f"\n{'Side':5}  {'Type':7}  {'Qty':>16}  {'Limit':>14}  {'Fill':>14}  Status")
+        for order in report.orders:
+            print(f"{order.side:5}  {order.order_type:7}  {order.qty!s:>16}  {format_price(order.limit_price):>14}  "
+                  f"{format_price(order.filled_avg_price):>14}  {order.status}")
+
+    print(f"\n{'Cycle':>6}  {'Symbol':10}  {'Status':10}  {'SO':>3}  {'Quantity':>20}  {'Avg Price':>14}  {'Sell Price':>14}")
+    for cycle in report.cycles:
+        print(f"{cycle.id:>6}  {cycle.asset_symbol:10}  {cycle.status:10}  {cycle.safety_orders:>3}  "
+              f"{cycle.quantity!s:>20}  {format_price(cycle.average_purchase_price):>14}  {format_price(cycle.sell_price):>14}")
+
+    print(f"\n📋 Completed Cycles: {summary['completed_cycles']}")
+    print(f"💵 Realized P/L: ${float(summary['realized_pl']):,.2f}")
+    print(f"🔔 Notifications suppressed: {summary['notifications']}")
+    if report.error_count:
+        print(f"❌ Errors logged: {report.error_count}")
+        for message in report.errors[:20]:
+            print(f"   {message}")
+    print(f"🔑 Fingerprint: {report.fingerprint()}")
+
+
+def main():
+    """Main function to parse arguments and run the replay."""
+    parser = argparse.ArgumentParser(
+        description="Replay recorded market data through main_app's handlers",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Quotes come from a quote recorder directory (QUOTE_RECORDER_DIR), or from a
+CSV/.quotes file for a single --symbol (same layouts as backtest.py).
+
+Trade updates come from the lifecycle event file (EVENT_LOG_FILE). Replaying
+them with --no-simulate-fills reproduces what the bot saw: each recorded
+order is matched to the order the replay placed in the same position for
+its symbol and side. Updates for orders placed before the recording starts,
+or that the replay never placed, match nothing and are counted.
+
+The bot's own logging goes to <log-dir>/main.log, never to the live log.
+        """
+    )
+    parser.add_argument('source', help='Quote recorder directory or price file')
+    parser.add_argument('--symbol', action='append', required=True, help='Asset symbol (repeatable)')
+    parser.add_argument('--from-db', action='store_true', help="Use the assets' dca_assets settings")
+    parser.add_argument('--cooldown', type=int, help='Cooldown period in seconds')
+    parser.add_argument('--spread', type=float, default=0.0, help='Bid/ask spread percent for data without bid/ask')
+    parser.add_argument('--trade-updates', help='Lifecycle event file to replay trade updates from')
+    parser.add_argument('--no-simulate-fills', action='store_true', help='Do not fill orders from quotes')
+    parser.add_argument('--fill-delay', type=float, default=0.0, help='Seconds an order rests before it can fill')
+    parser.add_argument('--no-state-cache', action='store_true', help='Read state from the database on every quote')
+    parser.add_argument('--log-dir', default='logs/replay', help='Directory for the replayed bot log (default: logs/replay)')
+    parser.add_argument('--verbose', action='store_true', help='Keep INFO logging from the handlers')
+    parser.add_argument('--no-orders', action='store_true', help='Do not list orders')
+    args = parser.parse_args()
+
+    # Must be set before main_app configures logging
+    Path(args.log_dir).mkdir(parents=True, exist_ok=True)
+    os.environ['LOG_DIR'] = args.log_dir
+
+    from utils.replay import ReplayHarness, load_replay_quotes, load_trade_updates
+
+    try:
+        assets = build_assets(args)
+        quotes = load_replay_quotes(args.source, args.symbol, spread_percent=args.spread)
+        trade_updates = load_trade_updates(args.trade_updates, args.symbol) if args.trade_updates else []
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not load replay input: {e}")
+        sys.exit(1)
+
+    harness = ReplayHarness(
+        assets,
+        simulate_fills=not args.no_simulate_fills,
+        fill_delay_seconds=args.fill_delay,
+        state_cache=not args.no_state_cache,
+        quiet=not args.verbose,
+    )
+    try:
+        report = harness.run(quotes, trade_updates)
+    except (OSError, ValueError) as e:
+        print(f"❌ Replay failed: {e}")
+        sys.exit(1)
+    print_report(report, show_orders=not args.no_orders)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Parameter Sweep Script
+
+Backtests many combinations of DcaAsset settings for one symbol across all
+CPU cores, streams every result to a CSV file and prints the best sets.
+
+Each --param takes a field name and comma-separated candidate values; the
+sweep runs every combination, or --random N of them.
+
+Usage:
+    python scripts/sweep.py data/BTCUSD_1m.csv --symbol BTC/USD \\
+        --param take_profit_percent=1,1.5,2,3 --param safety_order_deviation=0.5,0.9,1.5 \\
+        --param ttp_enabled=true,false
+    python scripts/sweep.py data/BTCUSD_1m.csv --symbol BTC/USD --from-db --random 2000 --seed 7 \\
+        --param take_profit_percent=0.5,1,1.5,2,2.5,3 --param ttp_deviation_percent=0.2,0.5,1,2 \\
+        --param max_safety_orders=3,5,10,15 --rank capital
+    python scripts/sweep.py data/BTCUSD_1m.csv --symbol BTC/USD --scaling \
+        --param take_profit_percent=1,1.5,2,3 --param ttp_deviation_percent=none,0.5,1
+"""
+
+import argparse
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from utils.backtest import default_asset_config, load_price_file
+from utils.sweep import (
+    RANKINGS, SWEEP_FIELDS, measure_scaling, parameter_grid, random_parameters, rank_results, run_sweep
+)
+
+
+def parse_param(text: str):
+    """Parse 'field=v1,v2,...' into (field, [values])."""
+    name, separator, values = text.partition('=')
+    if not separator or not values:
+        raise argparse.ArgumentTypeError(f"expected field=value1,value2,... got {text!r}")
+    if name not in SWEEP_FIELDS:
+        raise argparse.ArgumentTypeError(f"{name} is not sweepable; choose from {', '.join(sorted(SWEEP_FIELDS))}")
+    return name, [value.strip() for value in values.split(',') if value.strip()]
+
+
+def main():
+    """Main function to parse arguments and run the sweep."""
+    parser = argparse.ArgumentParser(
+        description="Sweep DCA settings over historical quotes on all CPU cores",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"Sweepable fields: {', '.join(sorted(SWEEP_FIELDS))}"
+    )
+    parser.add_argument('csv', help='Price data CSV file or quote recorder directory (same as backtest.py)')
+    parser.add_argument('--symbol', required=True, help='Asset symbol (e.g., BTC/USD)')
+    parser.add_argument('--from-db', action='store_true', help="Start from the asset's dca_assets settings")
+    parser.add_argument('--param', type=parse_param, action='append', required=True,
+                        help='Field and candidate values, e.g. take_profit_percent=1,1.5,2 (repeatable); '
+                             'none leaves ttp_deviation_percent unset')
+    parser.add_argument('--random', type=int, help='Sample this many combinations instead of the full grid')
+    parser.add_argument('--seed', type=int, help='Random seed for --random')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--output', help='Results CSV (default: logs/sweep_<symbol>_<time>.csv)')
+    parser.add_argument('--rank', choices=sorted(RANKINGS), default='pl', help='Ranking for the printed table')
+    parser.add_argument('--top', type=int, default=20, help='Rows to print (default: 20)')
+    parser.add_argument('--spread', type=float, default=0.0, help='Bid/ask spread percent for data without bid/ask')
+    parser.add_argument('--fee', default='0', help='Fee percent charged on each fill')
+    parser.add_argument('--scaling', action='store_true',
+                        help='Time the sweep at 1, 2, 4, ... workers up to --workers (or the CPU count) instead of ranking')
+    args = parser.parse_args()
+
+    space = dict(args.param)
+    if args.from_db:
+        from models.asset_config import get_asset_config
+        base_asset = get_asset_config(args.symbol)
+        if base_asset is None:
+            print(f"❌ No dca_assets row for {args.symbol}")
+            sys.exit(1)
+    else:
+        base_asset = default_asset_config(args.symbol)
+
+    try:
+        prices = load_price_file(args.csv, spread_percent=args.spread, symbol=args.symbol)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not load {args.csv}: {e}")
+        sys.exit(1)
+
+    parameter_sets = random_parameters(space, args.random, args.seed) if args.random else parameter_grid(space)
+    output = args.output or f"logs/sweep_{args.symbol.replace('/', '')}_{time.strftime('%Y%m%d_%H%M%S')}.csv"
+
+    if args.scaling:
+        print(f"📏 Timing {len(parameter_sets):,} parameter sets over {len(prices):,} quotes at each worker count")
+        print(f"{'Workers':>7}  {'Seconds':>8}  {'Speedup':>7}  {'Efficiency':>10}")
+        for point in measure_scaling(base_asset, prices, parameter_sets, args.workers, fee_percent=Decimal(args.fee)):
+            print(f"{point.workers:>7}  {point.seconds:>8.2f}  {point.speedup:>6.2f}x  {point.efficiency:>9.0%}")
+        return
+
+    print(f"🔬 Sweeping {len(parameter_sets):,} parameter sets over {len(prices):,} quotes for {args.symbol}")
+
+    def progress(done: int, total: int) -> None:
+        print(f"\r   {done:,}/{total:,} done", end='', flush=True)
+
+    started = time.perf_counter()
+    results = run_sweep(base_asset, prices, parameter_sets, output_path=output, workers=args.workers,
+                        fee_percent=Decimal(args.fee), progress=progress)
+    print(f"\n✅ Finished in {time.perf_counter() - started:.1f}s, results in {output}")
+
+    names = list(space)
+    print(f"\nTop {args.top} by {args.rank}:")
+    print("  ".join(f"{name:>22}" for name in names)
+          + f"  {'Cycles':>6}  {'P/L ($)':>10}  {'ROI':>7}  {'Max Capital':>11}  {'Avg Cycle (h)':>13}")
+    for result in rank_results(results, by=args.rank)[:args.top]:
+        print("  ".join(f"{str(result.params[name]):>22}" for name in names)
+              + f"  {result.cycles:>6}  {result.total_pl:>10.2f}  {result.roi_percent:>+6.2f}%"
+              f"  {result.max_capital:>11.2f}  {result.avg_cycle_seconds / 3600:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,16 +12,27 @@ Features:
 - Sensible defaults for optional settings
 - Clear error messages for missing configuration
 - Support for different environments (paper/live trading)
+- Immutable snapshot of every setting for hot paths, swapped atomically on reload
+
+Hot paths read get_settings(), a frozen ConfigSnapshot resolved once, instead
+of Config's properties (which parse the environment on every access).
+reload_settings() re-reads the .env file and swaps in a new, validated
+snapshot; main_app calls it on SIGHUP.
 """
 
 import os
 import logging
-from typing import Optional, Union
+from dataclasses import fields, make_dataclass
+from typing import Any, Dict, List, Optional, Union
 from pathlib import Path
-from dotenv import load_dotenv
+from dotenv import dotenv_values, find_dotenv, load_dotenv
+
+# Variables set by the process environment take precedence over the .env file, on reload as well
+_PROCESS_ENV_KEYS = frozenset(os.environ)
+_DOTENV_PATH = find_dotenv()
 
 # Load environment variables from .env file
-load_dotenv()
+load_dotenv(_DOTENV_PATH)
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +50,19 @@ class Config:
         self._validate_required_settings()
         self._log_configuration_summary()
     
+    def snapshot(self) -> 'ConfigSnapshot':
+        """
+        Resolve every setting once into an immutable snapshot.
+        
+        Returns:
+            ConfigSnapshot with one attribute per Config property
+            
+        Raises:
+            ConfigurationError: If required settings are missing
+        """
+        self._validate_required_settings()
+        return ConfigSnapshot(**{field.name: getattr(self, field.name) for field in fields(ConfigSnapshot)})
+    
     # =============================================================================
     # ALPACA API CONFIGURATION
     # =============================================================================
@@ -92,6 +116,31 @@ class Config:
         """Database port."""
         return self._get_int_env('DB_PORT', 3306)
     
+    @property
+    def db_pool_enabled(self) -> bool:
+        """True to reuse pooled database connections instead of connecting per query."""
+        return self._get_bool_env('DB_POOL_ENABLED', True)
+    
+    @property
+    def db_pool_size(self) -> int:
+        """Maximum number of pooled database connections per process."""
+        return self._get_int_env('DB_POOL_SIZE', 5)
+    
+    @property
+    def db_pool_max_lifetime_seconds(self) -> int:
+        """Seconds after which a pooled connection is closed and replaced."""
+        return self._get_int_env('DB_POOL_MAX_LIFETIME_SECONDS', 3600)
+    
+    @property
+    def db_pool_pre_ping_seconds(self) -> int:
+        """Idle seconds after which a pooled connection is pinged before reuse."""
+        return self._get_int_env('DB_POOL_PRE_PING_SECONDS', 30)
+    
+    @property
+    def db_pool_timeout_seconds(self) -> int:
+        """Maximum seconds to wait for a free pooled connection."""
+        return self._get_int_env('DB_POOL_TIMEOUT_SECONDS', 10)
+    
     # =============================================================================
     # ORDER MANAGEMENT CONFIGURATION
     # =============================================================================
@@ -116,6 +165,105 @@ class Config:
         """Enable dry run mode (no actual orders placed)."""
         return self._get_bool_env('DRY_RUN', False)
     
+    # =============================================================================
+    # MAIN APP RUNTIME CONFIGURATION
+    # =============================================================================
+    
+    @property
+    def state_cache_enabled(self) -> bool:
+        """Serve asset configs and latest cycles from memory in main_app."""
+        return self._get_bool_env('STATE_CACHE_ENABLED', True)
+    
+    @property
+    def state_cache_refresh_seconds(self) -> int:
+        """Seconds between state cache reloads that pick up external DB changes."""
+        return self._get_int_env('STATE_CACHE_REFRESH_SECONDS', 5)
+    
+    @property
+    def ttp_peak_flush_seconds(self) -> int:
+        """Seconds between writes of TTP peaks held in memory (0 writes every new peak at once)."""
+        return self._get_int_env('TTP_PEAK_FLUSH_SECONDS', 5)
+    
+    @property
+    def quote_skip_unchanged(self) -> bool:
+        """Skip quotes whose bid/ask match the last quote accepted for the symbol."""
+        return self._get_bool_env('QUOTE_SKIP_UNCHANGED', True)
+    
+    @property
+    def stream_symbols_per_connection(self) -> int:
+        """Symbols subscribed on each market data WebSocket connection (Alpaca allows 30)."""
+        return self._get_int_env('STREAM_SYMBOLS_PER_CONNECTION', 30)
+    
+    @property
+    def stream_max_connections(self) -> int:
+        """Market data WebSocket connections main_app may open; extra symbols are not subscribed."""
+        return self._get_int_env('STREAM_MAX_CONNECTIONS', 1)
+    
+    @property
+    def subscription_sync_seconds(self) -> int:
+        """Seconds between checks of dca_assets for symbols to subscribe or unsubscribe, 0 to disable."""
+        return self._get_int_env('SUBSCRIPTION_SYNC_SECONDS', 30)
+    
+    @property
+    def position_book_enabled(self) -> bool:
+        """True to serve Alpaca position lookups from the stream-fed local position book."""
+        return self._get_bool_env('POSITION_BOOK_ENABLED', True)
+    
+    @property
+    def position_reconcile_seconds(self) -> int:
+        """Seconds between position book reconciliations against Alpaca REST."""
+        return self._get_int_env('POSITION_RECONCILE_SECONDS', 60)
+    
+    @property
+    def metrics_enabled(self) -> bool:
+        """True if main_app should serve counters and gauges over HTTP."""
+        return self._get_bool_env('METRICS_ENABLED', False)
+    
+    @property
+    def metrics_host(self) -> str:
+        """Interface the metrics endpoint binds to."""
+        return os.getenv('METRICS_HOST', '127.0.0.1')
+    
+    @property
+    def metrics_port(self) -> int:
+        """Port of the metrics endpoint."""
+        return self._get_int_env('METRICS_PORT', 9108)
+    
+    @property
+    def latency_tracking_enabled(self) -> bool:
+        """True if main_app should record per-stage latency histograms."""
+        return self._get_bool_env('LATENCY_TRACKING_ENABLED', True)
+    
+    @property
+    def latency_report_seconds(self) -> int:
+        """Seconds between latency summaries in the log (0 logs only at shutdown)."""
+        return self._get_int_env('LATENCY_REPORT_SECONDS', 300)
+    
+    @property
+    def alpaca_rate_limit_per_minute(self) -> int:
+        """Alpaca REST requests per minute budgeted to main_app."""
+        return self._get_int_env('ALPACA_RATE_LIMIT_PER_MINUTE', 110)
+    
+    @property
+    def alpaca_caretaker_rate_limit_per_minute(self) -> int:
+        """Alpaca REST requests per minute budgeted to each caretaker run."""
+        return self._get_int_env('ALPACA_CARETAKER_RATE_LIMIT_PER_MINUTE', 15)
+    
+    @property
+    def alpaca_rate_limit_burst(self) -> int:
+        """Alpaca REST requests that may be sent back to back before rate limiting."""
+        return self._get_int_env('ALPACA_RATE_LIMIT_BURST', 10)
+    
+    @property
+    def alpaca_http_pool_size(self) -> int:
+        """Maximum pooled HTTPS connections per shared Alpaca REST client."""
+        return self._get_int_env('ALPACA_HTTP_POOL_SIZE', 10)
+    
+    @property
+    def alpaca_keepalive_seconds(self) -> int:
+        """Seconds between keep-alive requests on the shared TradingClient (0 disables)."""
+        return self._get_int_env('ALPACA_KEEPALIVE_SECONDS', 30)
+    
     # =============================================================================
     # EMAIL ALERT CONFIGURATION
     # =============================================================================
@@ -166,6 +314,21 @@ class Config:
         """True if trading alerts should be sent (separate from system alerts)."""
         return self._get_bool_env('TRADING_ALERTS_ENABLED', True)
     
+    @property
+    def email_dispatcher_enabled(self) -> bool:
+        """True if main_app should send email alerts from a background thread."""
+        return self._get_bool_env('EMAIL_DISPATCHER_ENABLED', True)
+    
+    @property
+    def email_queue_size(self) -> int:
+        """Maximum high/critical email alerts waiting to be sent before new ones are dropped."""
+        return self._get_int_env('EMAIL_QUEUE_SIZE', 100)
+    
+    @property
+    def email_digest_seconds(self) -> int:
+        """Seconds between digest emails of low/normal alerts (0 sends every alert immediately)."""
+        return self._get_int_env('EMAIL_DIGEST_SECONDS', 300)
+    
     # =============================================================================
     # DISCORD WEBHOOK CONFIGURATION
     # =============================================================================
@@ -190,6 +353,26 @@ class Config:
         """True if Discord trading alerts should be sent (separate from system alerts)."""
         return self.discord_notifications_enabled and self._get_bool_env('DISCORD_TRADING_ALERTS_ENABLED', True)
     
+    @property
+    def discord_dispatcher_enabled(self) -> bool:
+        """True if main_app should send Discord notifications from a background thread."""
+        return self._get_bool_env('DISCORD_DISPATCHER_ENABLED', True)
+    
+    @property
+    def discord_queue_size(self) -> int:
+        """Maximum Discord notifications waiting to be sent before new ones are dropped."""
+        return self._get_int_env('DISCORD_QUEUE_SIZE', 100)
+    
+    @property
+    def discord_batch_window_seconds(self) -> int:
+        """Seconds to collect notifications into one webhook call."""
+        return self._get_int_env('DISCORD_BATCH_WINDOW_SECONDS', 1)
+    
+    @property
+    def discord_max_retries(self) -> int:
+        """Retries per Discord webhook call after rate limits or transient errors."""
+        return self._get_int_env('DISCORD_MAX_RETRIES', 3)
+    
     # =============================================================================
     # LOGGING CONFIGURATION
     # =============================================================================
@@ -216,6 +399,66 @@ class Config:
         """Number of backup log files to keep."""
         return self._get_int_env('LOG_BACKUP_COUNT', 5)
     
+    @property
+    def log_queue_enabled(self) -> bool:
+        """True if main_app should write log files from a background listener thread."""
+        return self._get_bool_env('LOG_QUEUE_ENABLED', True)
+    
+    @property
+    def event_log_enabled(self) -> bool:
+        """True if main_app should write order and cycle events as JSON lines."""
+        return self._get_bool_env('EVENT_LOG_ENABLED', True)
+    
+    @property
+    def event_log_file(self) -> Path:
+        """JSON-lines file for lifecycle events."""
+        return Path(os.getenv('EVENT_LOG_FILE', str(self.log_dir / 'events.jsonl')))
+    
+    @property
+    def event_log_max_bytes(self) -> int:
+        """Size at which the event file is rotated."""
+        return self._get_int_env('EVENT_LOG_MAX_BYTES', 50 * 1024 * 1024)  # 50MB default
+    
+    @property
+    def event_log_backup_count(self) -> int:
+        """Number of rotated event files to keep."""
+        return self._get_int_env('EVENT_LOG_BACKUP_COUNT', 10)
+    
+    @property
+    def quote_recorder_enabled(self) -> bool:
+        """True if main_app should record every received quote to disk."""
+        return self._get_bool_env('QUOTE_RECORDER_ENABLED', False)
+    
+    @property
+    def quote_recorder_dir(self) -> Path:
+        """Root directory for recorded quotes (one subdirectory per UTC day)."""
+        return Path(os.getenv('QUOTE_RECORDER_DIR', 'data/quotes'))
+    
+    @property
+    def quote_recorder_flush_seconds(self) -> int:
+        """Seconds between writes of buffered quotes."""
+        return self._get_int_env('QUOTE_RECORDER_FLUSH_SECONDS', 5)
+    
+    @property
+    def quote_recorder_compress(self) -> bool:
+        """True if finished days of recorded quotes should be gzip-compressed."""
+        return self._get_bool_env('QUOTE_RECORDER_COMPRESS', True)
+    
+    @property
+    def quote_recorder_retention_days(self) -> int:
+        """Days of recorded quotes to keep (0 keeps all)."""
+        return self._get_int_env('QUOTE_RECORDER_RETENTION_DAYS', 90)
+    
+    @property
+    def cycle_journal_enabled(self) -> bool:
+        """True if main_app and the caretaker scripts should append every cycle change to the cycle_events table."""
+        return self._get_bool_env('CYCLE_JOURNAL_ENABLED', False)
+    
+    @property
+    def cycle_journal_flush_seconds(self) -> int:
+        """Seconds between batched inserts of journaled cycle events."""
+        return self._get_int_env('CYCLE_JOURNAL_FLUSH_SECONDS', 1)
+    
     # =============================================================================
     # HELPER METHODS
     # =============================================================================
@@ -277,10 +520,12 @@ class Config:
         logger.info("=== DCA Trading Bot Configuration ===")
         logger.info(f"Trading Mode: {'Paper Trading' if self.is_paper_trading else 'LIVE TRADING'}")
         logger.info(f"Database: {self.db_user}@{self.db_host}:{self.db_port}/{self.db_name}")
+        logger.info(f"DB Pool: {'Enabled' if self.db_pool_enabled else 'Disabled'} (size {self.db_pool_size})")
         logger.info(f"Order Cooldown: {self.order_cooldown_seconds}s")
         logger.info(f"Stale Order Threshold: {self.stale_order_threshold_minutes}m")
         logger.info(f"Testing Mode: {self.testing_mode}")
         logger.info(f"Dry Run Mode: {self.dry_run_mode}")
+        logger.info(f"State Cache: {'Enabled' if self.state_cache_enabled else 'Disabled'} (refresh {self.state_cache_refresh_seconds}s)")
         logger.info(f"Email Alerts: {'Enabled' if self.email_alerts_enabled else 'Disabled'}")
         logger.info(f"Discord Alerts: {'Enabled' if self.discord_notifications_enabled else 'Disabled'}")
         logger.info(f"Log Level: {self.log_level}")
@@ -288,15 +533,120 @@ class Config:
         logger.info("======================================")
 
 
+# Settings that are never logged by value
+SECRET_SETTINGS = frozenset({
+    'alpaca_api_key', 'alpaca_api_secret', 'db_password', 'smtp_password', 'discord_webhook_url',
+})
+
+# Frozen, slotted dataclass with one typed field per Config property
+ConfigSnapshot = make_dataclass(
+    'ConfigSnapshot',
+    [(name, attr.fget.__annotations__.get('return', Any))
+     for name, attr in vars(Config).items() if isinstance(attr, property)],
+    frozen=True,
+    slots=True,
+)
+ConfigSnapshot.__doc__ = """Every Config setting resolved at one point in time; read as plain attributes."""
+
+
 # Global configuration instance
 config = Config()
 
+# Current snapshot; replaced as a whole (a single reference swap) by reload_settings()
+_settings = config.snapshot()
+
 
 def get_config() -> Config:
     """Get the global configuration instance."""
     return config
 
 
+def get_settings() -> ConfigSnapshot:
+    """Get the current configuration snapshot."""
+    return _settings
+
+
+def changed_settings(old: ConfigSnapshot, new: ConfigSnapshot) -> List[str]:
+    """Names of the settings that differ between two snapshots."""
+    return [field.name for field in fields(ConfigSnapshot) if getattr(old, field.name) != getattr(new, field.name)]
+
+
+# Keys the .env file put into os.environ (those the process environment did not already set)
+_dotenv_keys = set(dotenv_values(_DOTENV_PATH)) - _PROCESS_ENV_KEYS if _DOTENV_PATH else set()
+
+
+def _apply_dotenv(path: str) -> Dict[str, Optional[str]]:
+    """
+    Re-read the .env file into os.environ.
+    
+    Keys set by the process environment are left alone, and keys removed
+    from the file since the last load are removed from the environment.
+    
+    Args:
+        path: .env file to read
+        
+    Returns:
+        Previous value (None if unset) of every key that was changed, for undo
+    """
+    values = {key: value for key, value in dotenv_values(path).items()
+              if value is not None and key not in _PROCESS_ENV_KEYS} if path else {}
+    previous = {}
+    for key in _dotenv_keys - set(values):
+        previous[key] = os.environ.pop(key, None)
+    for key, value in values.items():
+        if os.environ.get(key) != value:
+            previous[key] = os.environ.get(key)
+            os.environ[key] = value
+    _dotenv_keys.clear()
+    _dotenv_keys.update(values)
+    return previous
+
+
+def reload_settings(dotenv_path: Optional[str] = None) -> ConfigSnapshot:
+    """
+    Re-read the .env file and swap in a new snapshot.
+    
+    The new snapshot is built and validated before it replaces the current
+    one, so readers see either the old or the new settings, never a mix.
+    Settings that components only read at startup (pool sizes, ports,
+    dispatcher queues) still need a restart.
+    
+    Args:
+        dotenv_path: .env file to read (default: the one loaded at import)
+        
+    Returns:
+        The snapshot now in effect
+        
+    Raises:
+        ConfigurationError: If the new settings are invalid (the current
+            snapshot is kept)
+    """
+    global _settings
+    
+    keys_before = set(_dotenv_keys)
+    previous = _apply_dotenv(dotenv_path or _DOTENV_PATH)
+    try:
+        fresh = config.snapshot()
+    except ConfigurationError:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        _dotenv_keys.clear()
+        _dotenv_keys.update(keys_before)
+        raise
+    
+    changed = changed_settings(_settings, fresh)
+    _settings = fresh
+    if changed:
+        logger.info("Configuration reloaded, changed: " + ", ".join(
+            name if name in SECRET_SETTINGS else f"{name}={getattr(fresh, name)!r}" for name in changed))
+    else:
+        logger.info("Configuration reloaded, no changes")
+    return fresh
+
+
 # Convenience functions for backward compatibility
 def get_alpaca_credentials() -> tuple[str, str, str]:
     """Get Alpaca API credentials (key, secret, base_url)."""
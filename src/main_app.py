@@ -15,7 +15,10 @@ import signal
 import logging
 import os
 import sys
+import threading
+import time
 from typing import Optional
+from dataclasses import dataclass
 from decimal import Decimal
 from datetime import datetime, timedelta, timezone
 import decimal
@@ -31,20 +34,57 @@ from alpaca.common.exceptions import APIError
 import mysql.connector
 
 # Import our configuration and logging
-from config import get_config
-from utils.logging_config import setup_main_app_logging, get_asset_logger, log_asset_lifecycle_event
-from utils.notifications import alert_order_placed, alert_order_filled, alert_system_error, alert_critical_error
+from config import ConfigurationError, get_config, get_settings, reload_settings
+from utils.logging_config import (
+    setup_main_app_logging, get_asset_logger, log_asset_lifecycle_event,
+    enable_queued_logging, stop_queued_logging
+)
+from utils.event_sink import configure_event_sink, close_event_sink, record_event
+from utils.cycle_journal import start_cycle_journal, stop_cycle_journal, record_cycle_event, get_cycle_journal
+from utils.quote_recorder import start_quote_recorder, stop_quote_recorder, record_quote, get_quote_recorder
+from utils.latency import latency_tracker, current_symbol
+from utils.metrics import (
+    MetricFamily, metrics_registry, loop_lag_probe, start_metrics_server, stop_metrics_server
+)
+from utils.notifications import (
+    alert_order_placed, alert_order_filled, alert_system_error, alert_critical_error,
+    start_email_dispatcher, stop_email_dispatcher, get_email_dispatcher
+)
 from utils.discord_notifications import (
     discord_order_placed, discord_order_filled, discord_cycle_completed, 
-    discord_system_error, discord_system_alert
+    discord_system_error, discord_system_alert,
+    start_discord_dispatcher, stop_discord_dispatcher, get_discord_dispatcher
 )
 
 # Import our database models and utilities
-from utils.db_utils import get_db_connection, execute_query
-from models.asset_config import get_asset_config, update_asset_config, get_all_enabled_assets
-from models.cycle_data import get_latest_cycle, update_cycle, create_cycle
-from utils.alpaca_client_rest import get_trading_client, place_limit_buy_order, get_positions, place_market_sell_order
+from utils.db_utils import (
+    get_db_connection, execute_query, init_connection_pool_from_config, close_connection_pool,
+    log_pool_stats, get_pool_stats
+)
+from models.asset_config import (
+    DcaAsset, get_asset_config, update_asset_config, get_all_enabled_assets, get_enabled_asset_symbols,
+    set_asset_cache_enabled, refresh_asset_cache, add_asset_cache_listener
+)
+from models.cycle_data import (
+    DcaCycle, get_latest_cycle, update_cycle, create_cycle, find_cached_cycle_by_order,
+    set_cycle_cache_enabled, refresh_cycle_cache, add_cycle_cache_listener,
+    set_peak_write_behind_enabled, buffer_trailing_peak, flush_trailing_peaks, get_trailing_peak_stats
+)
+from models.cycle_events import checkpoint_cycles
+from utils.alpaca_client_rest import (
+    get_trading_client, place_limit_buy_order, get_positions, place_market_sell_order,
+    set_client_reuse_enabled, keep_alive_clients,
+    RequestPriority, scheduled_request, configure_request_scheduler, get_request_scheduler
+)
 from utils.formatting import format_price, format_quantity, format_percentage
+from utils.quote_mailbox import QuoteMailbox
+from utils.stream_shards import ShardedCryptoStream, stream_loop_name
+from utils.trigger_index import TriggerIndex
+from utils.dca_rules import (
+    BASE, SAFETY, TAKE_PROFIT_ACTIONS, TTP_ACTIVATE, TTP_PEAK, TTP_SELL,
+    decide_quote_action, safety_trigger_price, take_profit_trigger_price, ttp_sell_trigger_price
+)
+from utils.position_book import PositionBook
 
 # Initialize configuration and logging
 config = get_config()
@@ -53,6 +93,14 @@ logger = logging.getLogger(__name__)
 
 # Global flag for graceful shutdown
 shutdown_requested = False
+
+# Seconds SIGINT/SIGTERM allow for the streams to close before forcing an exit
+SHUTDOWN_GRACE_SECONDS = 2.0
+# Seconds allowed for flush_on_shutdown(): the cycle journal (10s), Discord (10s)
+# and email (30s) queues, event sink (5s) and quote recorder (10s), plus slack
+SHUTDOWN_FLUSH_SECONDS = 75.0
+_shutdown_deadline: Optional[float] = None
+_force_exit_thread: Optional[threading.Thread] = None
 # Global stream references for shutdown
 crypto_stream_ref = None
 trading_stream_ref = None
@@ -60,6 +108,23 @@ trading_stream_ref = None
 # Global tracking for recent orders to prevent duplicates
 recent_orders = {}  # symbol -> {'order_id': str, 'timestamp': datetime}
 
+# Latest-wins mailbox between the CryptoDataStream and on_crypto_quote
+quote_mailbox = None
+
+# Precomputed per-symbol trigger prices for rejecting quotes without I/O
+trigger_index = TriggerIndex()
+
+# Local copy of Alpaca positions, kept current from TradingStream fills
+position_book = PositionBook()
+
+# Counters and gauges served by the metrics endpoint (see collect_runtime_metrics for the rest)
+orders_placed_metric = metrics_registry.counter(
+    'dca_orders_placed_total', 'Orders placed by main_app', ('symbol', 'order_type'))
+trade_updates_metric = metrics_registry.counter(
+    'dca_trade_updates_total', 'TradingStream updates processed', ('event', 'side'))
+evaluations_in_flight_metric = metrics_registry.gauge(
+    'dca_quote_evaluations_in_flight', 'Quotes handed to worker threads and not yet evaluated')
+
 # PID file configuration
 PID_FILE_PATH = Path(__file__).parent.parent / 'main_app.pid'
 
@@ -109,6 +174,362 @@ def validate_environment() -> bool:
         return False
 
 
+def enable_state_cache() -> None:
+    """
+    Turn on the in-process asset/cycle cache and load it from the database.
+    
+    Once enabled, get_asset_config() and get_latest_cycle() are served from
+    memory, so a quote that doesn't cross a trigger costs no DB I/O.
+    update_cycle, create_cycle and update_asset_config keep the cache current;
+    refresh_state_cache() picks up changes made by the caretaker scripts.
+    
+    Also enables the trigger index, which is rebuilt from the cache and
+    dropped per symbol whenever a cached asset or cycle changes.
+    """
+    add_asset_cache_listener(trigger_index.invalidate)
+    add_cycle_cache_listener(trigger_index.invalidate_asset)
+    set_asset_cache_enabled(True)
+    set_cycle_cache_enabled(True)
+    refresh_state_cache()
+    trigger_index.set_enabled(True)
+
+
+def refresh_state_cache() -> None:
+    """
+    Reload cached asset configs and latest cycles from the database.
+    """
+    asset_count = refresh_asset_cache()
+    cycle_count = refresh_cycle_cache()
+    logger.debug(f"State cache refreshed: {asset_count} assets, {cycle_count} cycles")
+
+
+async def run_state_cache_refresher():
+    """
+    Periodically refresh the state cache until shutdown is requested.
+    """
+    interval = config.state_cache_refresh_seconds
+    logger.info(f"State cache refresher started (every {interval}s)")
+    
+    while not shutdown_requested:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(refresh_state_cache)
+        except Exception as e:
+            logger.error(f"Error refreshing state cache: {e}")
+
+
+def sync_crypto_subscriptions() -> None:
+    """
+    Subscribe newly enabled assets and unsubscribe disabled ones on the live streams.
+    
+    Lets add_asset.py and manual is_enabled changes take effect without a
+    restart; both WebSockets stay connected. An empty enabled list leaves the
+    subscriptions as they are, as startup falls back to default symbols then.
+    """
+    symbols = get_enabled_asset_symbols()
+    if not symbols:
+        logger.warning("No enabled assets found in database - keeping current subscriptions")
+        return
+    
+    # Load the new assets' configs before their first quote arrives
+    if set(symbols) - set(crypto_stream_ref.symbols):
+        refresh_state_cache()
+    
+    added, removed = crypto_stream_ref.update_symbols(symbols)
+    if added:
+        logger.info(f"Subscribed to newly enabled assets: {', '.join(added)}")
+    if removed:
+        logger.info(f"Unsubscribed from disabled assets: {', '.join(removed)}")
+
+
+async def run_subscription_sync():
+    """
+    Periodically match stream subscriptions to the enabled assets until shutdown is requested.
+    """
+    interval = config.subscription_sync_seconds
+    logger.info(f"Subscription sync started (every {interval}s)")
+    
+    while not shutdown_requested:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(sync_crypto_subscriptions)
+        except Exception as e:
+            logger.error(f"Error syncing stream subscriptions: {e}")
+
+
+def refresh_position_book() -> None:
+    """
+    Seed or reconcile the position book from a full Alpaca REST snapshot.
+    
+    Raises:
+        Exception: If the positions cannot be fetched (the book is left as is)
+    """
+    client = get_trading_client()
+    generations = position_book.generations()
+    positions = scheduled_request(RequestPriority.READ, client.get_all_positions,
+                                  coalesce_key=('positions', id(client)))
+    drifted = position_book.reconcile(positions, generations)
+    logger.debug(f"Position book reconciled: {len(positions)} positions, {len(drifted)} corrected")
+
+
+async def run_position_reconciler():
+    """
+    Periodically reconcile the position book against Alpaca until shutdown is requested.
+    """
+    interval = config.position_reconcile_seconds
+    logger.info(f"Position book reconciler started (every {interval}s)")
+    
+    while not shutdown_requested:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(refresh_position_book)
+        except Exception as e:
+            logger.error(f"Error reconciling position book: {e}")
+
+
+def apply_trade_update_to_position_book(trade_update) -> None:
+    """
+    Apply a fill or partial_fill execution to the position book.
+    
+    Runs before the cycle handlers so they read the post-fill position.
+    
+    Args:
+        trade_update: TradeUpdate object from Alpaca
+    """
+    if not position_book.is_ready or trade_update.event not in ('fill', 'partial_fill'):
+        return
+    
+    order = trade_update.order
+    position_book.apply_fill(
+        symbol=order.symbol,
+        side=order.side,
+        fill_qty=getattr(trade_update, 'qty', None),
+        fill_price=getattr(trade_update, 'price', None),
+        position_qty=getattr(trade_update, 'position_qty', None)
+    )
+
+
+async def run_trailing_peak_flusher():
+    """
+    Periodically write buffered TTP peaks to the database until shutdown is requested.
+    
+    The interval bounds how much of a trailing rally's peak a crash can lose.
+    """
+    interval = config.ttp_peak_flush_seconds
+    logger.info(f"Trailing peak flusher started (every {interval}s)")
+    
+    while not shutdown_requested:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(flush_trailing_peaks)
+        except Exception as e:
+            logger.error(f"Error writing trailing peaks: {e}")
+
+
+async def run_alpaca_keepalive():
+    """
+    Periodically ping Alpaca on the shared TradingClient until shutdown is requested.
+    
+    Keeps the pooled HTTPS connection open so order placement doesn't pay
+    for a new TCP/TLS handshake after a quiet period.
+    """
+    interval = config.alpaca_keepalive_seconds
+    logger.info(f"Alpaca keep-alive started (every {interval}s)")
+    
+    while not shutdown_requested:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(keep_alive_clients)
+        except Exception as e:
+            logger.debug(f"Alpaca keep-alive error: {e}")
+
+
+async def run_latency_reporter():
+    """
+    Periodically log latency percentiles per stage until shutdown is requested.
+    
+    Each summary covers the interval since the previous one.
+    """
+    interval = config.latency_report_seconds
+    logger.info(f"Latency reporter started (every {interval}s)")
+    
+    while not shutdown_requested:
+        await asyncio.sleep(interval)
+        try:
+            latency_tracker.log_summary(reset=True)
+        except Exception as e:
+            logger.error(f"Latency summary error: {e}")
+
+
+def collect_runtime_metrics():
+    """
+    Build metric families from the components' own counters at scrape time.
+    
+    Returns:
+        List of MetricFamily for stream connections, quotes, Alpaca REST, the DB pool,
+        notification queues, the quote recorder, TTP peak write-behind, the cycle journal
+        and latency percentiles
+    """
+    families = []
+    
+    if quote_mailbox:
+        quotes = MetricFamily('dca_quotes_total', 'counter', 'Quotes by symbol and outcome')
+        for symbol, counts in quote_mailbox.get_stats()['symbols'].items():
+            for outcome, value in counts.items():
+                quotes.add(value, symbol=symbol, outcome=outcome)
+        pending = MetricFamily('dca_quotes_pending', 'gauge', 'Symbols with a quote waiting to be evaluated')
+        families += [quotes, pending.add(quote_mailbox.pending_count())]
+    
+    if crypto_stream_ref:
+        shard_symbols = MetricFamily('dca_stream_shard_symbols', 'gauge', 'Symbols subscribed per market data connection')
+        shard_connected = MetricFamily('dca_stream_shard_connected', 'gauge', '1 while the connection is up')
+        shard_messages = MetricFamily('dca_stream_shard_messages_total', 'counter', 'Market data messages per connection')
+        shard_age = MetricFamily('dca_stream_shard_last_message_age_seconds', 'gauge',
+                                 'Seconds since the connection last delivered a message')
+        shard_lag = MetricFamily('dca_stream_shard_lag_seconds', 'gauge',
+                                 'Arrival time minus exchange timestamp of the latest quote')
+        for stats in crypto_stream_ref.get_stats():
+            shard = str(stats['shard'])
+            shard_symbols.add(len(stats['symbols']), shard=shard)
+            shard_connected.add(1 if stats['connected'] else 0, shard=shard)
+            shard_messages.add(stats['quotes'], shard=shard, type='quote')
+            shard_messages.add(stats['trades'], shard=shard, type='trade')
+            if stats['last_message_age_seconds'] is not None:
+                shard_age.add(stats['last_message_age_seconds'], shard=shard)
+            if stats['lag_seconds'] is not None:
+                shard_lag.add(stats['lag_seconds'], shard=shard)
+        changes = MetricFamily('dca_stream_subscription_changes_total', 'counter',
+                               'Symbols subscribed or unsubscribed on the live streams')
+        for action, count in crypto_stream_ref.subscription_changes.items():
+            changes.add(count, action=action)
+        families += [shard_symbols, shard_connected, shard_messages, shard_age, shard_lag, changes]
+    
+    if trigger_index.enabled:
+        triggers = MetricFamily('dca_trigger_index_total', 'counter', 'Trigger index decisions')
+        stats = trigger_index.get_stats()
+        for key in ('fast_rejects', 'evaluated', 'rebuilt', 'invalidated'):
+            triggers.add(stats[key], result=key)
+        families.append(triggers)
+    
+    scheduler = get_request_scheduler()
+    if scheduler:
+        stats = scheduler.get_stats()
+        requests = MetricFamily('dca_alpaca_requests_total', 'counter', 'Alpaca REST calls by priority')
+        coalesced = MetricFamily('dca_alpaca_requests_coalesced_total', 'counter', 'Alpaca reads shared with an in-flight call')
+        rate_limited = MetricFamily('dca_alpaca_rate_limited_total', 'counter', 'Alpaca REST calls answered with 429')
+        wait = MetricFamily('dca_alpaca_wait_seconds_total', 'counter', 'Time Alpaca calls waited for the rate limiter')
+        for priority in RequestPriority:
+            counts = stats[priority.name.lower()]
+            requests.add(counts['requests'], priority=priority.name.lower())
+            coalesced.add(counts['coalesced'], priority=priority.name.lower())
+            rate_limited.add(counts['rate_limited'], priority=priority.name.lower())
+            wait.add(counts['wait_seconds_total'], priority=priority.name.lower())
+        queued = MetricFamily('dca_alpaca_requests_queued', 'gauge', 'Alpaca calls waiting for the rate limiter')
+        families += [requests, coalesced, rate_limited, wait, queued.add(stats['queued'])]
+    
+    pool_stats = get_pool_stats()
+    if pool_stats:
+        pool = MetricFamily('dca_db_pool_connections', 'gauge', 'Database pool connections by state')
+        pool.add(pool_stats['in_use'], state='in_use').add(pool_stats['idle'], state='idle')
+        waits = MetricFamily('dca_db_pool_waits_total', 'counter', 'Pool checkouts that had to wait')
+        families += [pool, waits.add(pool_stats['waits'])]
+    
+    notifications = MetricFamily('dca_notification_queue_depth', 'gauge', 'Notifications waiting to be sent')
+    dropped = MetricFamily('dca_notifications_dropped_total', 'counter', 'Notifications dropped on a full queue')
+    for channel, dispatcher in (('discord', get_discord_dispatcher()), ('email', get_email_dispatcher())):
+        if dispatcher:
+            stats = dispatcher.get_stats()
+            notifications.add(stats['queue_depth'], channel=channel)
+            dropped.add(stats['dropped'], channel=channel)
+    families += [notifications, dropped]
+    
+    recorder = get_quote_recorder()
+    if recorder:
+        stats = recorder.get_stats()
+        recorded = MetricFamily('dca_quotes_recorded_total', 'counter', 'Quotes handled by the quote recorder')
+        recorded.add(stats['written'], result='written').add(stats['dropped'], result='dropped')
+        recorded.add(stats['rejected'], result='rejected')
+        recorder_bytes = MetricFamily('dca_quote_recorder_bytes_total', 'counter', 'Bytes written by the quote recorder')
+        families += [recorded, recorder_bytes.add(stats['bytes_written'])]
+    
+    if config.state_cache_enabled and config.ttp_peak_flush_seconds > 0:
+        peak_stats = get_trailing_peak_stats()
+        peaks = MetricFamily('dca_ttp_peaks_total', 'counter', 'TTP peaks buffered in memory and written to the database')
+        peaks.add(peak_stats['recorded'], result='recorded').add(peak_stats['written'], result='written')
+        peaks_pending = MetricFamily('dca_ttp_peaks_pending', 'gauge', 'Cycles with a TTP peak not yet written')
+        families += [peaks, peaks_pending.add(peak_stats['pending'])]
+    
+    journal = get_cycle_journal()
+    if journal:
+        stats = journal.get_stats()
+        journaled = MetricFamily('dca_cycle_events_total', 'counter', 'Cycle events handled by the cycle journal')
+        journaled.add(stats['written'], result='written').add(stats['dropped'], result='dropped')
+        journal_pending = MetricFamily('dca_cycle_events_pending', 'gauge', 'Cycle events waiting to be written')
+        families += [journaled, journal_pending.add(stats['pending'])]
+    
+    if latency_tracker.enabled:
+        latency = MetricFamily('dca_latency_seconds', 'summary',
+                               'Stage latency since the last latency report')
+        for stage, summary in latency_tracker.snapshot().items():
+            totals = summary['all']
+            for key, quantile in (('p50_ms', '0.5'), ('p90_ms', '0.9'), ('p99_ms', '0.99')):
+                latency.add(totals[key] / 1000.0, stage=stage, quantile=quantile)
+        families.append(latency)
+    
+    return families
+
+
+@dataclass(frozen=True)
+class QuoteSnapshot:
+    """
+    Point-in-time view of the state a quote decision depends on.
+    
+    Taken once per quote so the base, safety and take-profit checks all act
+    on the same asset config and cycle.
+    """
+    asset_config: DcaAsset
+    latest_cycle: DcaCycle
+    taken_at: datetime
+
+
+def take_quote_snapshot(symbol: str) -> Optional[QuoteSnapshot]:
+    """
+    Read the duplicate-order guard, asset configuration and latest cycle for a symbol.
+    
+    Args:
+        symbol: Asset symbol (e.g., 'BTC/USD')
+        
+    Returns:
+        QuoteSnapshot, or None if the symbol has a recent order, is not
+        configured, is disabled or has no cycle
+    """
+    # Check for recent orders to prevent duplicates
+    now = datetime.now()
+    recent_order_cooldown = get_settings().order_cooldown_seconds
+    
+    if symbol in recent_orders:
+        time_since_order = now - recent_orders[symbol]['timestamp']
+        if time_since_order.total_seconds() < recent_order_cooldown:
+            return None
+    
+    # Get asset configuration
+    asset_config = get_asset_config(symbol)
+    if not asset_config:
+        # Asset not configured - skip silently
+        return None
+    
+    if not asset_config.is_enabled:
+        logger.debug(f"Asset {symbol} is disabled, skipping order checks")
+        return None
+    
+    # Get latest cycle for this asset
+    latest_cycle = get_latest_cycle(asset_config.id)
+    if not latest_cycle:
+        return None
+    
+    return QuoteSnapshot(asset_config=asset_config, latest_cycle=latest_cycle, taken_at=now)
+
+
 async def on_crypto_quote(quote):
     """
     Handler for cryptocurrency quote updates.
@@ -117,31 +538,69 @@ async def on_crypto_quote(quote):
     Phase 5: Monitor prices and place safety orders when conditions are met.
     Phase 6: Monitor prices and place take-profit orders when conditions are met.
     
+    All three checks run in a single worker-thread hop via evaluate_quote().
+    Quotes that cross none of the symbol's precomputed trigger prices are
+    rejected here, without a thread hop or any DB/REST I/O.
+    
     Args:
         quote: Quote object from Alpaca containing bid/ask data
     """
+    loop_lag_probe.ensure_started(stream_loop_name.get())
+    record_quote(quote.symbol, quote.timestamp, quote.bid_price, quote.ask_price, quote.bid_size, quote.ask_size)
+    if not trigger_index.should_evaluate(quote.symbol, quote.bid_price, quote.ask_price):
+        return
+    
     logger.debug(f"Quote: {quote.symbol} - Bid: ${quote.bid_price} @ {quote.bid_size}, Ask: ${quote.ask_price} @ {quote.ask_size}")
     
-    # Phase 4: Check if we should place a base order for this asset
     try:
-        await asyncio.to_thread(check_and_place_base_order, quote)
+        latency_tracker.mark_dispatched()
+        evaluations_in_flight_metric.inc()
+        await asyncio.to_thread(evaluate_quote, quote)
     except Exception as e:
-        logger.error(f"Error in base order check for {quote.symbol}: {e}")
+        logger.error(f"Error evaluating quote for {quote.symbol}: {e}")
+    finally:
+        evaluations_in_flight_metric.dec()
+
+
+def evaluate_quote(quote):
+    """
+    Decide base, safety, take-profit and TTP actions for a quote in one pass.
     
-    # Phase 5: Check if we should place a safety order for this asset
-    try:
-        await asyncio.to_thread(check_and_place_safety_order, quote)
-    except Exception as e:
-        logger.error(f"Error in safety order check for {quote.symbol}: {e}")
+    Takes a single QuoteSnapshot, decides with dca_rules.decide_quote_action()
+    and dispatches the action to its check, so every check sees the same
+    config and cycle and at most one order is attempted per quote.
     
-    # Phase 6: Check if we should place a take-profit order for this asset
-    try:
-        await asyncio.to_thread(check_and_place_take_profit_order, quote)
-    except Exception as e:
-        logger.error(f"Error in take-profit check for {quote.symbol}: {e}")
+    Args:
+        quote: Quote object from Alpaca containing bid/ask data
+    """
+    latency_tracker.record_since_dispatch()
+    generation = trigger_index.generation()
+    with latency_tracker.timer('state_read'):
+        snapshot = take_quote_snapshot(quote.symbol)
+    if snapshot is None:
+        return
+    
+    # Rebuild the symbol's trigger prices from the state this decision uses
+    trigger_index.store(quote.symbol, snapshot.asset_config, snapshot.latest_cycle, generation)
+    
+    asset_config = snapshot.asset_config
+    latest_cycle = snapshot.latest_cycle
+    action = decide_quote_action(asset_config, latest_cycle, quote.bid_price, quote.ask_price)
+    
+    if action == BASE:
+        # Phase 4: No position yet - base order
+        check_and_place_base_order(quote, snapshot, action)
+    elif action == SAFETY:
+        # Phase 5: Price dropped to the safety trigger
+        check_and_place_safety_order(quote, snapshot, action)
+    elif action in TAKE_PROFIT_ACTIONS:
+        # Phase 6: Take-profit, or TTP activation, peak or sell
+        check_and_place_take_profit_order(quote, snapshot, action)
+    elif latest_cycle.status == 'trailing' and asset_config.ttp_enabled and asset_config.ttp_deviation_percent is None:
+        logger.error(f"TTP enabled for {quote.symbol} but ttp_deviation_percent is None - cannot calculate sell trigger")
 
 
-def check_and_place_base_order(quote):
+def check_and_place_base_order(quote, snapshot: Optional[QuoteSnapshot] = None, action: Optional[str] = None):
     """
     Check if conditions are met to place a base order and place it if so.
     
@@ -149,6 +608,11 @@ def check_and_place_base_order(quote):
     
     Args:
         quote: Quote object from Alpaca containing bid/ask data
+        snapshot: State taken by evaluate_quote(); read here if not provided
+        action: Decision made by evaluate_quote(); decided here if not provided
+        
+    Returns:
+        True if an order placement was attempted, otherwise None
     """
     global recent_orders
     symbol = quote.symbol
@@ -157,37 +621,22 @@ def check_and_place_base_order(quote):
     
     try:
         # Get asset-specific logger for lifecycle tracking
-        asset_logger = get_asset_logger(symbol)
+        asset_logger = get_asset_logger(symbol, logger)
         
-        # Step 1: Check for recent orders to prevent duplicates
-        now = datetime.now()
-        recent_order_cooldown = config.order_cooldown_seconds
-        
-        if symbol in recent_orders:
-            time_since_order = now - recent_orders[symbol]['timestamp']
-            if time_since_order.total_seconds() < recent_order_cooldown:
+        # Steps 1-3: Duplicate-order guard, asset configuration and latest cycle
+        if snapshot is None:
+            snapshot = take_quote_snapshot(symbol)
+            if snapshot is None:
                 return
         
-        # Step 2: Get asset configuration
-        asset_config = get_asset_config(symbol)
-        if not asset_config:
-            # Asset not configured - skip silently
-            return
-        
-        if not asset_config.is_enabled:
-            logger.debug(f"Asset {symbol} is disabled, skipping base order check")
-            return
-        
-        # Step 3: Get latest cycle for this asset
-        latest_cycle = get_latest_cycle(asset_config.id)
-        if not latest_cycle:
-            return
-        
-        # Step 4: Check if cycle is in 'watching' status with zero quantity
-        if latest_cycle.status != 'watching':
-            return
+        now = snapshot.taken_at
+        asset_config = snapshot.asset_config
+        latest_cycle = snapshot.latest_cycle
         
-        if latest_cycle.quantity != Decimal('0'):
+        # Step 4: Base order rule ('watching' with zero quantity, valid quote and order amount)
+        if action is None:
+            action = decide_quote_action(asset_config, latest_cycle, bid_price, ask_price)
+        if action != BASE:
             return
         
         logger.info(f"Base order conditions met for {symbol} - checking Alpaca positions...")
@@ -200,7 +649,7 @@ def check_and_place_base_order(quote):
         
         # Step 6: Check for existing positions (ignore tiny positions below minimum order size)
         try:
-            positions = get_positions(client)
+            positions = position_book.all_positions() if position_book.is_ready else get_positions(client)
         except APIError as e:
             logger.error(f"Alpaca API error fetching positions for {symbol}: {e}")
             return
@@ -236,19 +685,7 @@ def check_and_place_base_order(quote):
         logger.info(f"No existing position for {symbol} - proceeding with base order placement")
         
         # Step 8: Calculate order size (convert USD to crypto quantity)
-        if not ask_price or ask_price <= 0:
-            logger.error(f"Invalid ask price for {symbol}: {ask_price}")
-            return
-        
-        if not bid_price or bid_price <= 0:
-            logger.error(f"Invalid bid price for {symbol}: {bid_price}")
-            return
-        
         base_order_usd = float(asset_config.base_order_amount)
-        if not base_order_usd or base_order_usd <= 0:
-            logger.error(f"Invalid base order amount for {symbol}: {base_order_usd}")
-            return
-            
         order_quantity = base_order_usd / ask_price
         
         # Validate calculated values before placing order
@@ -267,7 +704,7 @@ def check_and_place_base_order(quote):
         # Step 9: Place the base limit buy order with detailed logging
         
         # For integration testing, use aggressive pricing to ensure fast fills
-        testing_mode = os.getenv('TESTING_MODE', 'false').lower() == 'true'
+        testing_mode = get_settings().testing_mode
         if testing_mode:
             # Use 5% above ask for aggressive fills during testing
             aggressive_price = ask_price * 1.05
@@ -294,6 +731,10 @@ def check_and_place_base_order(quote):
         )
         
         if order:
+            latency_tracker.record_since_quote('quote_to_order', symbol)
+            orders_placed_metric.inc(symbol, 'base')
+            latency_tracker.mark_order_submitted(order.id, symbol)
+            
             # Track this order to prevent duplicates
             recent_orders[symbol] = {
                 'order_id': order.id,
@@ -307,7 +748,7 @@ def check_and_place_base_order(quote):
                     'latest_order_id': str(order.id),  # Convert UUID to string
                     'latest_order_created_at': now
                 }
-                update_success = update_cycle(latest_cycle.id, updates)
+                update_success = update_cycle(latest_cycle.id, updates, event='order_placed')
                 if update_success:
                     logger.info(f"🔄 Updated cycle {latest_cycle.id} to 'buying' status with order {order.id}")
                 else:
@@ -329,6 +770,8 @@ def check_and_place_base_order(quote):
                 quantity=float(order_quantity),
                 price=float(limit_price)
             )
+            record_event('order_placed', symbol, order_id=str(order.id), cycle_id=latest_cycle.id,
+                         side='buy', order_kind='base', qty=order_quantity, limit_price=limit_price)
         else:
             logger.error(f"❌ Failed to place base order for {symbol}")
             
@@ -337,6 +780,8 @@ def check_and_place_base_order(quote):
                 'order_id': 'FAILED',
                 'timestamp': now
             }
+        
+        return True
             
     except Exception as e:
         logger.error(f"Error in check_and_place_base_order for {symbol}: {e}")
@@ -344,7 +789,7 @@ def check_and_place_base_order(quote):
         logger.error(f"Traceback: {traceback.format_exc()}")
 
 
-def check_and_place_safety_order(quote):
+def check_and_place_safety_order(quote, snapshot: Optional[QuoteSnapshot] = None, action: Optional[str] = None):
     """
     Check if conditions are met to place a safety order and place it if so.
     
@@ -356,6 +801,11 @@ def check_and_place_safety_order(quote):
     
     Args:
         quote: Quote object from Alpaca containing bid/ask data
+        snapshot: State taken by evaluate_quote(); read here if not provided
+        action: Decision made by evaluate_quote(); decided here if not provided
+        
+    Returns:
+        True if an order placement was attempted, otherwise None
     """
     global recent_orders
     symbol = quote.symbol
@@ -363,68 +813,28 @@ def check_and_place_safety_order(quote):
     bid_price = quote.bid_price
     
     try:
-        # Step 1: Check for recent orders to prevent duplicates
-        now = datetime.now()
-        recent_order_cooldown = int(os.getenv('ORDER_COOLDOWN_SECONDS', '5'))  # Default 5 seconds
-        
-        if symbol in recent_orders:
-            time_since_order = now - recent_orders[symbol]['timestamp']
-            if time_since_order.total_seconds() < recent_order_cooldown:
+        # Steps 1-3: Duplicate-order guard, asset configuration and latest cycle
+        if snapshot is None:
+            snapshot = take_quote_snapshot(symbol)
+            if snapshot is None:
                 return
         
-        # Step 2: Get asset configuration
-        asset_config = get_asset_config(symbol)
-        if not asset_config:
-            # Asset not configured - skip silently
-            return
-        
-        if not asset_config.is_enabled:
-            logger.debug(f"Asset {symbol} is disabled, skipping safety order check")
-            return
-        
-        # Step 3: Get latest cycle for this asset
-        latest_cycle = get_latest_cycle(asset_config.id)
-        if not latest_cycle:
-            return
-        
-        # Step 4: Check if cycle is in 'watching' status with quantity > 0 (existing position)
-        if latest_cycle.status != 'watching':
-            return
+        now = snapshot.taken_at
+        asset_config = snapshot.asset_config
+        latest_cycle = snapshot.latest_cycle
         
-        if latest_cycle.quantity <= Decimal('0'):
+        # Steps 4-8: Safety order rule ('watching' with a position, safety orders left,
+        # ask at or below the trigger price, valid quote and order amount)
+        if action is None:
+            action = decide_quote_action(asset_config, latest_cycle, bid_price, ask_price)
+        if action != SAFETY:
             return
         
-        # Step 5: Check if we can place more safety orders
-        if latest_cycle.safety_orders >= asset_config.max_safety_orders:
-            logger.debug(f"Asset {symbol} already at max safety orders ({latest_cycle.safety_orders}/{asset_config.max_safety_orders}) - skipping")
-            return
-        
-        # Step 6: Check if we have a last_order_fill_price to calculate trigger from
-        if latest_cycle.last_order_fill_price is None:
-            return
-        
-        # Step 7: Calculate trigger price for safety order
-        safety_deviation_decimal = asset_config.safety_order_deviation / Decimal('100')  # Convert % to decimal
-        trigger_price = latest_cycle.last_order_fill_price * (Decimal('1') - safety_deviation_decimal)
-        
-        # Convert ask_price to Decimal for consistent calculations
+        trigger_price = safety_trigger_price(asset_config, latest_cycle)
         ask_price_decimal = Decimal(str(ask_price))
         
-        # Step 8: Check if current ask price has dropped enough to trigger safety order
-        if ask_price_decimal > trigger_price:
-            return
-        
         logger.info(f"🛡️ Safety order conditions met for {symbol}!")
         
-        # Step 9: Validate market data
-        if not ask_price or ask_price <= 0:
-            logger.error(f"Invalid ask price for safety order {symbol}: {ask_price}")
-            return
-        
-        if not bid_price or bid_price <= 0:
-            logger.error(f"Invalid bid price for safety order {symbol}: {bid_price}")
-            return
-        
         # Step 10: Initialize Alpaca client 
         client = get_trading_client()
         if not client:
@@ -433,10 +843,6 @@ def check_and_place_safety_order(quote):
         
         # Step 11: Calculate safety order size (convert USD to crypto quantity)
         safety_order_usd = float(asset_config.safety_order_amount)
-        if not safety_order_usd or safety_order_usd <= 0:
-            logger.error(f"Invalid safety order amount for {symbol}: {safety_order_usd}")
-            return
-            
         order_quantity = safety_order_usd / ask_price
         
         # Validate calculated values before placing order
@@ -458,7 +864,7 @@ def check_and_place_safety_order(quote):
         # Step 12: Place the safety limit buy order with detailed logging
         
         # For integration testing, use aggressive pricing to ensure fast fills
-        testing_mode = os.getenv('TESTING_MODE', 'false').lower() == 'true'
+        testing_mode = get_settings().testing_mode
         if testing_mode:
             # Use 5% above ask for aggressive fills during testing
             aggressive_price = ask_price * 1.05
@@ -485,6 +891,10 @@ def check_and_place_safety_order(quote):
         )
         
         if order:
+            latency_tracker.record_since_quote('quote_to_order', symbol)
+            orders_placed_metric.inc(symbol, 'safety')
+            latency_tracker.mark_order_submitted(order.id, symbol)
+            
             # Track this order to prevent duplicates
             recent_orders[symbol] = {
                 'order_id': order.id,
@@ -498,7 +908,7 @@ def check_and_place_safety_order(quote):
                     'latest_order_id': str(order.id),  # Convert UUID to string
                     'latest_order_created_at': now
                 }
-                update_success = update_cycle(latest_cycle.id, updates)
+                update_success = update_cycle(latest_cycle.id, updates, event='order_placed')
                 if update_success:
                     logger.info(f"🔄 Updated cycle {latest_cycle.id} to 'buying' status with safety order {order.id}")
                 else:
@@ -523,6 +933,9 @@ def check_and_place_safety_order(quote):
                 quantity=float(order_quantity),
                 price=float(limit_price)
             )
+            record_event('order_placed', symbol, order_id=str(order.id), cycle_id=latest_cycle.id,
+                         side='buy', order_kind='safety', safety_order_number=latest_cycle.safety_orders + 1,
+                         qty=order_quantity, limit_price=limit_price)
         else:
             logger.error(f"❌ Failed to place safety order for {symbol}")
             
@@ -531,6 +944,8 @@ def check_and_place_safety_order(quote):
                 'order_id': 'FAILED',
                 'timestamp': now
             }
+        
+        return True
             
     except APIError as e:
         logger.error(f"Alpaca API error in safety order check for {symbol}: {e}")
@@ -542,7 +957,7 @@ def check_and_place_safety_order(quote):
         logger.error(f"Traceback: {traceback.format_exc()}")
 
 
-def check_and_place_take_profit_order(quote):
+def check_and_place_take_profit_order(quote, snapshot: Optional[QuoteSnapshot] = None, action: Optional[str] = None):
     """
     Check if conditions are met to place a take-profit order and place it if so.
     
@@ -551,9 +966,16 @@ def check_and_place_take_profit_order(quote):
     - Cycle status is 'watching' AND quantity > 0 (position exists)
     - Safety order conditions are NOT met (price hasn't dropped enough)
     - Current bid price >= take-profit trigger price (average_purchase_price * (1 + take_profit_percent/100))
+    With TTP enabled the first such quote activates trailing instead; while
+    trailing, higher bids move the peak and a drop below the TTP sell trigger sells.
     
     Args:
         quote: Quote object from Alpaca containing bid/ask data
+        snapshot: State taken by evaluate_quote(); read here if not provided
+        action: Decision made by evaluate_quote(); decided here if not provided
+        
+    Returns:
+        True if an order placement was attempted, otherwise None
     """
     from decimal import Decimal
     global recent_orders
@@ -562,143 +984,69 @@ def check_and_place_take_profit_order(quote):
     bid_price = quote.bid_price
     
     try:
-        # Step 1: Check for recent orders to prevent duplicates
-        now = datetime.now()
-        recent_order_cooldown = int(os.getenv('ORDER_COOLDOWN_SECONDS', '5'))  # Default 5 seconds
-        
-        if symbol in recent_orders:
-            time_since_order = now - recent_orders[symbol]['timestamp']
-            if time_since_order.total_seconds() < recent_order_cooldown:
+        # Steps 1-3: Duplicate-order guard, asset configuration and latest cycle
+        if snapshot is None:
+            snapshot = take_quote_snapshot(symbol)
+            if snapshot is None:
                 return
         
-        # Step 2: Get asset configuration
-        asset_config = get_asset_config(symbol)
-        if not asset_config:
-            # Asset not configured - skip silently
-            return
-
-        if not asset_config.is_enabled:
-            logger.debug(f"Asset {symbol} is disabled, skipping take-profit check")
-            return
-
-        # Step 3: Get latest cycle for this asset
-        latest_cycle = get_latest_cycle(asset_config.id)
-        if not latest_cycle:
-            return
-
-        # Step 4: Check if cycle is in valid status for take-profit/TTP processing
-        # Valid statuses: 'watching' (standard TP or TTP activation) or 'trailing' (TTP active)
-        if latest_cycle.status not in ['watching', 'trailing']:
-            return
+        now = snapshot.taken_at
+        asset_config = snapshot.asset_config
+        latest_cycle = snapshot.latest_cycle
 
-        if latest_cycle.quantity <= Decimal('0'):
-            return
-        
-        # Step 5: Check if we have valid average_purchase_price for take-profit calculation
-        if latest_cycle.average_purchase_price is None or latest_cycle.average_purchase_price <= Decimal('0'):
-            logger.debug(f"Asset {symbol} has invalid average_purchase_price {latest_cycle.average_purchase_price} - cannot calculate take-profit")
+        # Steps 4-8: Take-profit/TTP rules ('watching' or 'trailing' with a position,
+        # ask above the safety trigger, bid at the take-profit or TTP trigger)
+        if action is None:
+            action = decide_quote_action(asset_config, latest_cycle, bid_price, ask_price)
+        if action not in TAKE_PROFIT_ACTIONS:
             return
         
-        # Step 6: Check safety order conditions are NOT met (we don't want to sell if we should be buying more)
-        # Only check if we have last_order_fill_price and haven't reached max safety orders
-        safety_order_would_trigger = False
+        take_profit_price = take_profit_trigger_price(asset_config, latest_cycle)
+        bid_price_decimal = Decimal(str(bid_price))
         
-        if (latest_cycle.last_order_fill_price is not None and 
-            latest_cycle.safety_orders < asset_config.max_safety_orders):
+        if action == TTP_ACTIVATE:
+            # Activate TTP - update cycle to 'trailing' status and set initial peak
+            logger.info(f"🎯 TTP activated for {symbol}, cycle {latest_cycle.id}. Initial peak: ${bid_price}")
             
-            safety_deviation_decimal = asset_config.safety_order_deviation / Decimal('100')
-            safety_trigger_price = latest_cycle.last_order_fill_price * (Decimal('1') - safety_deviation_decimal)
+            updates = {
+                'status': 'trailing',
+                'highest_trailing_price': bid_price_decimal
+            }
             
-            # Safely convert ask_price to Decimal
-            try:
-                ask_price_decimal = Decimal(str(ask_price))
-            except (ValueError, TypeError, decimal.InvalidOperation) as e:
-                logger.debug(f"Invalid ask_price for {symbol}: {ask_price} (type: {type(ask_price)}) - skipping")
-                return
+            update_success = update_cycle(latest_cycle.id, updates, event='ttp_activate')
+            if update_success:
+                logger.info(f"✅ Cycle {latest_cycle.id} updated to 'trailing' status with peak ${bid_price}")
+            else:
+                logger.error(f"❌ Failed to activate TTP for cycle {latest_cycle.id}")
             
-            if ask_price_decimal <= safety_trigger_price:
-                safety_order_would_trigger = True
-                logger.debug(f"Safety order would trigger for {symbol} (ask ${ask_price} <= trigger {format_price(safety_trigger_price)}) - skipping take-profit")
-                return
-        
-        # Step 7: TTP-aware take-profit logic
-        take_profit_percent_decimal = asset_config.take_profit_percent / Decimal('100')  # Convert % to decimal
-        take_profit_trigger_price = latest_cycle.average_purchase_price * (Decimal('1') + take_profit_percent_decimal)
-        
-        # Convert bid_price to Decimal for consistent calculations
-        bid_price_decimal = Decimal(str(bid_price))
+            return  # Don't place sell order yet, just activated TTP
         
-        # Step 8: TTP Logic Implementation
-        if not asset_config.ttp_enabled:
-            # Standard take-profit logic (TTP disabled)
-            if bid_price_decimal < take_profit_trigger_price:
+        if action == TTP_PEAK:
+            # New peak reached - update highest_trailing_price
+            logger.info(f"🎯 TTP new peak for {symbol}, cycle {latest_cycle.id}: ${bid_price}")
+            
+            # Held in memory and written on the next peak flush or status change
+            if buffer_trailing_peak(latest_cycle.id, bid_price_decimal):
                 return
             
-            logger.info(f"💰 Standard take-profit conditions met for {symbol}!")
+            updates = {
+                'highest_trailing_price': bid_price_decimal
+            }
             
-        else:
-            # TTP logic (TTP enabled)
-            if latest_cycle.status == 'watching':
-                # TTP not yet activated - check if we should activate it
-                if bid_price_decimal >= take_profit_trigger_price:
-                    # Activate TTP - update cycle to 'trailing' status and set initial peak
-                    logger.info(f"🎯 TTP activated for {symbol}, cycle {latest_cycle.id}. Initial peak: ${bid_price}")
-                    
-                    updates = {
-                        'status': 'trailing',
-                        'highest_trailing_price': bid_price_decimal
-                    }
-                    
-                    update_success = update_cycle(latest_cycle.id, updates)
-                    if update_success:
-                        logger.info(f"✅ Cycle {latest_cycle.id} updated to 'trailing' status with peak ${bid_price}")
-                    else:
-                        logger.error(f"❌ Failed to activate TTP for cycle {latest_cycle.id}")
-                    
-                    return  # Don't place sell order yet, just activated TTP
-                else:
-                    return
-                    
-            elif latest_cycle.status == 'trailing':
-                # TTP is active - check for new peak or sell trigger
-                current_peak = latest_cycle.highest_trailing_price or Decimal('0')
-                
-                if bid_price_decimal > current_peak:
-                    # New peak reached - update highest_trailing_price
-                    logger.info(f"🎯 TTP new peak for {symbol}, cycle {latest_cycle.id}: ${bid_price}")
-                    
-                    updates = {
-                        'highest_trailing_price': bid_price_decimal
-                    }
-                    
-                    update_success = update_cycle(latest_cycle.id, updates)
-                    if update_success:
-                        logger.debug(f"Updated highest_trailing_price to ${bid_price} for cycle {latest_cycle.id}")
-                    else:
-                        logger.error(f"❌ Failed to update TTP peak for cycle {latest_cycle.id}")
-                    
-                    return  # Don't sell yet, just updated peak
-                    
-                else:
-                    # Check if price has dropped enough to trigger TTP sell
-                    if asset_config.ttp_deviation_percent is None:
-                        logger.error(f"TTP enabled for {symbol} but ttp_deviation_percent is None - cannot calculate sell trigger")
-                        return
-                    
-                    ttp_deviation_decimal = asset_config.ttp_deviation_percent / Decimal('100')
-                    ttp_sell_trigger_price = current_peak * (Decimal('1') - ttp_deviation_decimal)
-                    
-                    if bid_price_decimal < ttp_sell_trigger_price:
-                        # TTP sell triggered!
-                        logger.info(f"🎯 TTP sell triggered for {symbol}, cycle {latest_cycle.id}. Peak: ${current_peak}, Deviation: {asset_config.ttp_deviation_percent}%, Current Price: ${bid_price}")
-                        logger.info(f"💰 TTP conditions met for {symbol}!")
-                    else:
-                        return
+            update_success = update_cycle(latest_cycle.id, updates, event='ttp_peak')
+            if update_success:
+                logger.debug(f"Updated highest_trailing_price to ${bid_price} for cycle {latest_cycle.id}")
+            else:
+                logger.error(f"❌ Failed to update TTP peak for cycle {latest_cycle.id}")
+            
+            return  # Don't sell yet, just updated peak
         
-        # Step 9: Validate market data
-        if not bid_price or bid_price <= 0:
-            logger.error(f"Invalid bid price for take-profit {symbol}: {bid_price}")
-            return
+        if action == TTP_SELL:
+            current_peak = latest_cycle.highest_trailing_price or Decimal('0')
+            logger.info(f"🎯 TTP sell triggered for {symbol}, cycle {latest_cycle.id}. Peak: ${current_peak}, Deviation: {asset_config.ttp_deviation_percent}%, Current Price: ${bid_price}")
+            logger.info(f"💰 TTP conditions met for {symbol}!")
+        else:
+            logger.info(f"💰 Standard take-profit conditions met for {symbol}!")
         
         # Step 10: Initialize Alpaca client 
         client = get_trading_client()
@@ -752,14 +1100,11 @@ def check_and_place_take_profit_order(quote):
         logger.info(f"📊 {order_type_desc} Analysis for {symbol}:")
         logger.info(f"   Avg Purchase: {format_price(latest_cycle.average_purchase_price)} | Current Bid: {format_price(bid_price)}")
         logger.info(f"   Price Gain: {format_price(price_gain)} ({price_gain_pct:.2f}%)")
-        logger.info(f"   Take-Profit Trigger: {format_price(take_profit_trigger_price)} ({asset_config.take_profit_percent}% gain)")
+        logger.info(f"   Take-Profit Trigger: {format_price(take_profit_price)} ({asset_config.take_profit_percent}% gain)")
         
-        if asset_config.ttp_enabled and latest_cycle.status == 'trailing':
-            current_peak = latest_cycle.highest_trailing_price or Decimal('0')
-            ttp_deviation_decimal = asset_config.ttp_deviation_percent / Decimal('100')
-            ttp_sell_trigger_price = current_peak * (Decimal('1') - ttp_deviation_decimal)
+        if action == TTP_SELL:
             logger.info(f"   TTP Peak: {format_price(current_peak)} | TTP Deviation: {asset_config.ttp_deviation_percent}%")
-            logger.info(f"   TTP Sell Trigger: {format_price(ttp_sell_trigger_price)}")
+            logger.info(f"   TTP Sell Trigger: {format_price(ttp_sell_trigger_price(asset_config, current_peak))}")
         
         logger.info(f"   Position: {latest_cycle.quantity} {symbol.split('/')[0]}")
         logger.info(f"   Est. Proceeds: ${estimated_proceeds:.2f} | Est. Cost: ${estimated_cost:.2f}")
@@ -780,6 +1125,10 @@ def check_and_place_take_profit_order(quote):
         )
         
         if order:
+            latency_tracker.record_since_quote('quote_to_order', symbol)
+            orders_placed_metric.inc(symbol, 'take_profit')
+            latency_tracker.mark_order_submitted(order.id, symbol)
+            
             # Track this order to prevent duplicates
             recent_orders[symbol] = {
                 'order_id': order.id,
@@ -791,6 +1140,9 @@ def check_and_place_take_profit_order(quote):
             logger.info(f"   Quantity: {format_quantity(sell_quantity)}")
             logger.info(f"   Order Type: MARKET")
             logger.info(f"   💰 {order_type_desc} triggered by {price_gain_pct:.2f}% gain")
+            record_event('order_placed', symbol, order_id=str(order.id), cycle_id=latest_cycle.id,
+                         side='sell', order_kind='ttp' if asset_config.ttp_enabled else 'take_profit',
+                         qty=sell_quantity, bid_price=bid_price, gain_percent=price_gain_pct)
             
             # NEW: Immediately update the cycle to reflect that we're actively trying to sell
             from datetime import timezone
@@ -800,7 +1152,7 @@ def check_and_place_take_profit_order(quote):
                 'latest_order_created_at': datetime.now(timezone.utc)
             }
             
-            update_success = update_cycle(latest_cycle.id, updates)
+            update_success = update_cycle(latest_cycle.id, updates, event='order_placed')
             if update_success:
                 logger.info(f"✅ Cycle {latest_cycle.id} status updated to 'selling', latest_order_id set for SELL order {order.id}")
             else:
@@ -815,6 +1167,8 @@ def check_and_place_take_profit_order(quote):
                 'order_id': 'FAILED',
                 'timestamp': now
             }
+        
+        return True
             
     except Exception as e:
         logger.error(f"Error in check_and_place_take_profit_order for {symbol}: {e}")
@@ -854,6 +1208,23 @@ async def on_trade_update(trade_update):
     """
     order = trade_update.order
     event = trade_update.event
+    current_symbol.set(order.symbol)
+    loop_lag_probe.ensure_started('trading_stream')
+    trade_updates_metric.inc(str(event), str(order.side))
+    
+    # Keep the local position book in step with executions
+    try:
+        apply_trade_update_to_position_book(trade_update)
+    except Exception as e:
+        logger.error(f"Error applying trade update to position book: {e}")
+    
+    record_event(
+        f"order_{event}", order.symbol,
+        order_id=str(order.id), side=order.side, order_status=order.status,
+        qty=getattr(trade_update, 'qty', None), price=getattr(trade_update, 'price', None),
+        position_qty=getattr(trade_update, 'position_qty', None),
+        filled_qty=getattr(order, 'filled_qty', None), filled_avg_price=getattr(order, 'filled_avg_price', None)
+    )
     
     logger.info(f"📨 Trade Update: {event.upper()} - {order.symbol}")
     logger.info(f"   Order ID: {order.id}")
@@ -940,11 +1311,23 @@ async def on_trade_update(trade_update):
             except (ValueError, TypeError):
                 logger.info(f"   Total Qty: {order.qty}, Filled Qty: {order.filled_qty}")
         
+        # Journal the fill against its cycle (cache lookup only, no DB read)
+        if get_cycle_journal():
+            partial_cycle = find_cached_cycle_by_order(str(order.id))
+            if partial_cycle:
+                record_cycle_event(partial_cycle.id, 'partial_fill', details={
+                    'order_id': str(order.id), 'side': order.side,
+                    'qty': getattr(trade_update, 'qty', None), 'price': getattr(trade_update, 'price', None),
+                    'filled_qty': getattr(order, 'filled_qty', None),
+                    'filled_avg_price': getattr(order, 'filled_avg_price', None),
+                })
+        
         logger.info("   ℹ️ PARTIAL FILL: No database updates - cycle remains in current status")
         logger.info("   ⏳ Waiting for terminal event (fill/canceled) to update cycle financials")
         
     elif event == 'fill':
         logger.info(f"🎯 ORDER FILLED SUCCESSFULLY for {order.symbol}!")
+        latency_tracker.record_order_filled(order.id)
         
         # Phase 7: Update dca_cycles table on BUY order fills
         if order.side.lower() == 'buy':
@@ -1067,7 +1450,8 @@ async def update_cycle_on_buy_fill(order, trade_update):
             return
         
         # Fetch current Alpaca position to sync quantity and average price
-        alpaca_position = get_alpaca_position_by_symbol(client, symbol)
+        # (over REST: the cycle's take-profit basis must be Alpaca's avg_entry_price)
+        alpaca_position = get_alpaca_position_by_symbol(client, symbol, refresh=True)
         
         # Step 5: Determine if this was a safety order (before position sync)
         current_qty = latest_cycle.quantity
@@ -1127,7 +1511,7 @@ async def update_cycle_on_buy_fill(order, trade_update):
             updates['safety_orders'] = latest_cycle.safety_orders + 1
         
         # Step 7: Update the cycle in database
-        update_success = update_cycle(latest_cycle.id, updates)
+        update_success = update_cycle(latest_cycle.id, updates, event='fill')
         
         if update_success:
             final_safety_orders = latest_cycle.safety_orders + (1 if is_safety_order else 0)
@@ -1168,17 +1552,25 @@ async def update_cycle_on_buy_fill(order, trade_update):
         logger.exception("Full traceback:")
 
 
-def get_alpaca_position_by_symbol(client: TradingClient, symbol: str) -> Optional:
+def get_alpaca_position_by_symbol(client: TradingClient, symbol: str, refresh: bool = False) -> Optional:
     """
     Get a specific position by symbol from Alpaca.
     
+    Served from the local position book once it has been seeded; otherwise
+    fetched over REST. The book's average entry price is a local estimate,
+    so callers that write avg_entry_price into a cycle pass refresh=True.
+    
     Args:
         client: Initialized TradingClient
         symbol: Asset symbol (e.g., 'BTC/USD')
+        refresh: Always fetch over REST, bypassing the position book
         
     Returns:
         Position object if found, None if no position or error
     """
+    if position_book.is_ready and not refresh:
+        return position_book.get(symbol)
+    
     try:
         positions = get_positions(client)
         # Convert symbol format for Alpaca comparison (UNI/USD -> UNIUSD)
@@ -1233,7 +1625,7 @@ def handle_tiny_position(cycle, alpaca_position, symbol: str, current_price: Dec
             'last_order_fill_price': None
         }
         
-        success = update_cycle(cycle.id, updates)
+        success = update_cycle(cycle.id, updates, event='reset')
         
         if success:
             logger.info(f"✅ Cycle {cycle.id} reset to zero - ready for new base orders")
@@ -1339,7 +1731,6 @@ async def update_cycle_on_sell_fill(order, trade_update):
                 logger.info(f"📊 No Alpaca position found for {symbol} (expected after complete sell)")
         
         # Step 4: Update current cycle to 'complete' status
-        from datetime import datetime
         from models.cycle_data import update_cycle
         
         updates_current = {
@@ -1350,7 +1741,7 @@ async def update_cycle_on_sell_fill(order, trade_update):
             'sell_price': avg_fill_price  # Store the sell price for P/L calculations
         }
         
-        update_success = update_cycle(current_cycle.id, updates_current)
+        update_success = update_cycle(current_cycle.id, updates_current, event='complete')
         if not update_success:
             logger.error(f"❌ Failed to mark cycle {current_cycle.id} as complete")
             return
@@ -1409,7 +1800,7 @@ async def update_cycle_on_sell_fill(order, trade_update):
             order_type="Take-Profit",
             order_id=str(order.id),
             fill_price=float(avg_fill_price),
-            quantity=float(filled_qty),
+            quantity=float(order.filled_qty or current_cycle.quantity),
             is_full_fill=True
         )
         
@@ -1485,7 +1876,7 @@ async def update_cycle_on_order_cancellation(order, event):
             client = get_trading_client()
             alpaca_position = None
             if client:
-                alpaca_position = get_alpaca_position_by_symbol(client, symbol)
+                alpaca_position = get_alpaca_position_by_symbol(client, symbol, refresh=True)
             
             # Extract partial fill details if available (STANDARDIZED)
             order_filled_qty = Decimal('0')
@@ -1565,7 +1956,7 @@ async def update_cycle_on_order_cancellation(order, event):
             current_quantity_on_alpaca = cycle.quantity  # Fallback to original quantity
             
             if client:
-                alpaca_position = get_alpaca_position_by_symbol(client, symbol)
+                alpaca_position = get_alpaca_position_by_symbol(client, symbol, refresh=True)
                 if alpaca_position:
                     try:
                         current_quantity_on_alpaca = Decimal(str(alpaca_position.qty))
@@ -1700,7 +2091,8 @@ async def update_cycle_on_order_cancellation(order, event):
                 
                 logger.info(f"✅ SELL order {order_id} for cycle {cycle.id} was {event}, but position is zero. Cycle completed.")
         
-        success = update_cycle(cycle.id, updates)
+        success = update_cycle(cycle.id, updates,
+                               event='complete' if updates.get('status') == 'complete' else 'cancel')
         
         if success:
             if order.side.lower() == 'buy':
@@ -1728,6 +2120,25 @@ async def update_cycle_on_order_cancellation(order, event):
         logger.exception("Full traceback:")
 
 
+def extend_shutdown_deadline(seconds: float) -> None:
+    """Allow shutdown at least `seconds` more before the force-exit timer fires."""
+    global _shutdown_deadline
+    deadline = time.monotonic() + seconds
+    if _shutdown_deadline is None or deadline > _shutdown_deadline:
+        _shutdown_deadline = deadline
+
+
+def _force_exit_after_deadline() -> None:
+    """Exit the process once the shutdown deadline passes (stops if shutdown is withdrawn)."""
+    while shutdown_requested:
+        remaining = _shutdown_deadline - time.monotonic()
+        if remaining <= 0:
+            logger.warning("Forcing immediate exit...")
+            os._exit(0)
+            return
+        time.sleep(min(remaining, 0.5))
+
+
 def setup_signal_handlers():
     """Set up signal handlers for graceful shutdown."""
     def signal_handler(signum, frame):
@@ -1738,12 +2149,9 @@ def setup_signal_handlers():
         # Try to stop the streams immediately using their internal mechanisms
         if crypto_stream_ref:
             try:
-                logger.info("Stopping CryptoDataStream...")
-                # Use the stream's internal stop method if available
-                if hasattr(crypto_stream_ref, '_should_run'):
-                    crypto_stream_ref._should_run = False
-                # Remove direct WebSocket close to avoid RuntimeWarning
-                # The stream will close its WebSocket properly through its async mechanisms
+                logger.info("Stopping CryptoDataStream connections...")
+                # Each stream closes its WebSocket through its own async mechanisms
+                crypto_stream_ref.request_stop()
             except Exception as e:
                 logger.error(f"Error stopping CryptoDataStream: {e}")
         
@@ -1760,28 +2168,61 @@ def setup_signal_handlers():
         
         logger.info("Shutdown signal processed - streams should stop immediately")
         
-        # Reduce force exit timeout since we're being more aggressive
-        import threading
-        def force_exit():
-            import time
-            time.sleep(2)  # Give only 2 seconds for cleanup
-            if shutdown_requested:
-                logger.warning("Forcing immediate exit...")
-                os._exit(0)
-        
-        threading.Thread(target=force_exit, daemon=True).start()
+        # Force an exit if the streams do not close in time; flush_on_shutdown()
+        # pushes the deadline out while buffered state is written
+        extend_shutdown_deadline(SHUTDOWN_GRACE_SECONDS)
+        global _force_exit_thread
+        if _force_exit_thread is None or not _force_exit_thread.is_alive():
+            _force_exit_thread = threading.Thread(target=_force_exit_after_deadline, name='force-exit', daemon=True)
+            _force_exit_thread.start()
+    
+    def reload_handler(signum, frame):
+        # Off the signal handler, which may have interrupted a thread holding the logging lock
+        threading.Thread(target=reload_configuration, name='config-reload', daemon=True).start()
     
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, reload_handler)
+
+
+def reload_configuration() -> bool:
+    """
+    Re-read .env and swap in the new settings snapshot (SIGHUP).
+    
+    Quote handling reads the snapshot on every quote, so settings such as
+    ORDER_COOLDOWN_SECONDS and TESTING_MODE apply from the next quote.
+    An invalid file is rejected and the running settings are kept.
+    
+    Returns:
+        bool: True if the new settings were applied
+    """
+    logger.info("Received SIGHUP, reloading configuration...")
+    try:
+        reload_settings()
+        return True
+    except ConfigurationError as e:
+        logger.error(f"Configuration reload rejected, keeping current settings: {e}")
+        return False
+    except Exception as e:
+        logger.error(f"Configuration reload failed, keeping current settings: {e}")
+        return False
 
 
-def setup_crypto_stream() -> CryptoDataStream:
+def setup_crypto_stream() -> ShardedCryptoStream:
     """
-    Setup and configure the CryptoDataStream for market data.
+    Setup and configure the CryptoDataStream connections for market data.
+    
+    Symbols are spread over as many connections as STREAM_SYMBOLS_PER_CONNECTION
+    requires (up to STREAM_MAX_CONNECTIONS). Quotes from every connection are
+    routed through one QuoteMailbox so only the newest unprocessed quote per
+    symbol is evaluated, no matter how fast the feed is.
     
     Returns:
-        Configured CryptoDataStream instance
+        Configured ShardedCryptoStream instance
     """
+    global quote_mailbox
+    
     api_key = os.getenv('APCA_API_KEY_ID')
     api_secret = os.getenv('APCA_API_SECRET_KEY')
     
@@ -1791,12 +2232,6 @@ def setup_crypto_stream() -> CryptoDataStream:
     
     logger.info(f"Setting up CryptoDataStream (paper={paper})")
     
-    # Initialize crypto stream
-    stream = CryptoDataStream(
-        api_key=api_key,
-        secret_key=api_secret
-    )
-    
     # Check if we're in integration test mode
     if os.getenv('INTEGRATION_TEST_MODE') == 'true':
         logger.info("INTEGRATION_TEST_MODE detected - using hardcoded test assets")
@@ -1845,23 +2280,28 @@ def setup_crypto_stream() -> CryptoDataStream:
                 'XRP/USD'    # Ripple
             ]
     
-    # Check WebSocket subscription limits (30 symbols max for free plan)
-    if len(crypto_symbols) > 30:
-        logger.warning(f"Too many symbols ({len(crypto_symbols)}) for WebSocket limit (30). Using first 30.")
-        crypto_symbols = crypto_symbols[:30]
-    
-    # Subscribe to quotes and trades for selected crypto symbols
-    for symbol in crypto_symbols:
-        stream.subscribe_quotes(on_crypto_quote, symbol)
-        stream.subscribe_trades(on_crypto_trade, symbol)
+    # Conflate quotes per symbol so stale quotes never queue up behind slow evaluations
+    quote_mailbox = QuoteMailbox(on_crypto_quote, skip_unchanged=config.quote_skip_unchanged)
+    
+    # Subscribe to quotes and trades, at most STREAM_SYMBOLS_PER_CONNECTION symbols per connection
+    streams = ShardedCryptoStream(
+        lambda: CryptoDataStream(api_key=api_key, secret_key=api_secret),
+        crypto_symbols,
+        quote_mailbox.submit,
+        on_crypto_trade,
+        symbols_per_connection=config.stream_symbols_per_connection,
+        max_connections=config.stream_max_connections
+    )
     
-    logger.info(f"Subscribed to quotes and trades for {len(crypto_symbols)} crypto pairs:")
-    logger.info(f"Symbols: {', '.join(crypto_symbols)}")
+    logger.info(f"Subscribed to quotes and trades for {len(streams.symbols)} crypto pairs "
+                f"on {len(streams.shards)} connection(s):")
+    for shard in streams.shards:
+        logger.info(f"Shard {shard.index} symbols: {', '.join(shard.symbols)}")
     
     # Optionally subscribe to bars for minute-by-minute data
-    # stream.subscribe_bars(on_crypto_bar, 'BTC/USD')
+    # streams.shards[0].stream.subscribe_bars(on_crypto_bar, 'BTC/USD')
     
-    return stream
+    return streams
 
 
 def setup_trading_stream() -> TradingStream:
@@ -1898,6 +2338,36 @@ def main():
     """Main application entry point."""
     global shutdown_requested, crypto_stream_ref, trading_stream_ref
     
+    # Write log files from a listener thread so log calls don't block on disk I/O
+    if config.log_queue_enabled:
+        enable_queued_logging()
+    
+    # Per-stage latency histograms for the quote -> order -> fill path
+    latency_tracker.set_enabled(config.latency_tracking_enabled)
+    
+    # Local HTTP endpoint with counters and gauges for scraping
+    if config.metrics_enabled:
+        try:
+            start_metrics_server(config.metrics_host, config.metrics_port)
+            metrics_registry.register_collector(collect_runtime_metrics)
+        except OSError as e:
+            logger.error(f"Failed to start metrics endpoint on port {config.metrics_port}: {e}")
+    
+    # Machine-readable order and cycle events, separate from the human log
+    if config.event_log_enabled:
+        try:
+            configure_event_sink(config.event_log_file, config.event_log_max_bytes, config.event_log_backup_count)
+        except OSError as e:
+            logger.error(f"Failed to open lifecycle event file, events not recorded: {e}")
+    
+    # Tick history for backtests and replays, written from a background thread
+    if config.quote_recorder_enabled:
+        try:
+            start_quote_recorder(config.quote_recorder_dir, config.quote_recorder_flush_seconds,
+                                 config.quote_recorder_compress, config.quote_recorder_retention_days)
+        except OSError as e:
+            logger.error(f"Failed to start quote recorder, quotes not recorded: {e}")
+    
     logger.info("="*60)
     logger.info("DCA Trading Bot - Main WebSocket Application Starting")
     logger.info("="*60)
@@ -1916,6 +2386,67 @@ def main():
     # Create logs directory if it doesn't exist
     os.makedirs('logs', exist_ok=True)
     
+    # Keep Alpaca REST calls under the rate limit, serving sells first
+    configure_request_scheduler(config.alpaca_rate_limit_per_minute, config.alpaca_rate_limit_burst)
+    
+    # Share one Alpaca REST client (and its keep-alive HTTP session) across all calls
+    set_client_reuse_enabled(True, http_pool_maxsize=config.alpaca_http_pool_size)
+    try:
+        get_trading_client()
+    except Exception as e:
+        logger.error(f"Failed to create Alpaca trading client at startup: {e}")
+    
+    # Send email alerts from a background thread, digesting routine ones
+    if config.email_alerts_enabled and config.email_dispatcher_enabled:
+        start_email_dispatcher(
+            queue_size=config.email_queue_size,
+            digest_interval_seconds=config.email_digest_seconds
+        )
+    
+    # Send Discord notifications from a background thread so a slow webhook never delays fills
+    if config.discord_notifications_enabled and config.discord_dispatcher_enabled:
+        start_discord_dispatcher(
+            queue_size=config.discord_queue_size,
+            batch_window_seconds=config.discord_batch_window_seconds,
+            max_retries=config.discord_max_retries
+        )
+    
+    # Seed the position book so position checks don't fetch every position over REST
+    if config.position_book_enabled:
+        try:
+            refresh_position_book()
+            logger.info(f"Position book seeded with {position_book.get_stats()['positions']} positions")
+        except Exception as e:
+            logger.error(f"Failed to seed position book, using REST position lookups: {e}")
+    
+    # Reuse database connections instead of connecting for every query
+    try:
+        init_connection_pool_from_config(config)
+    except Exception as e:
+        logger.error(f"Failed to create database connection pool, connecting per query: {e}")
+    
+    # Keep asset configs and latest cycles in memory for the quote hot path
+    if config.state_cache_enabled:
+        try:
+            enable_state_cache()
+            logger.info("State cache enabled for asset configs and latest cycles")
+            # Trailing peaks live in the cache between flushes
+            if config.ttp_peak_flush_seconds > 0:
+                set_peak_write_behind_enabled(True)
+        except Exception as e:
+            logger.error(f"Failed to load state cache, falling back to direct DB reads: {e}")
+            trigger_index.set_enabled(False)
+            set_asset_cache_enabled(False)
+            set_cycle_cache_enabled(False)
+    
+    # Append every cycle change to cycle_events, starting from a snapshot of each latest cycle
+    if config.cycle_journal_enabled:
+        try:
+            start_cycle_journal(config.cycle_journal_flush_seconds)
+            checkpoint_cycles()
+        except Exception as e:
+            logger.error(f"Failed to snapshot cycles for the cycle journal: {e}")
+    
     try:
         # Setup streams
         crypto_stream_ref = setup_crypto_stream()
@@ -1937,7 +2468,7 @@ def main():
         if crypto_stream_ref:
             try:
                 crypto_stream_ref.close()
-                logger.info("CryptoDataStream closed")
+                logger.info("CryptoDataStream connections closed")
             except:
                 pass
         
@@ -1948,10 +2479,56 @@ def main():
             except:
                 pass
         
+        # Report per-connection and quote conflation counters
+        if crypto_stream_ref:
+            crypto_stream_ref.log_summary()
+        if quote_mailbox:
+            quote_mailbox.log_summary()
+        if trigger_index.enabled:
+            trigger_index.log_summary()
+        if latency_tracker.enabled:
+            latency_tracker.log_summary()
+        
+        flush_on_shutdown()
+        
         # Remove PID file on shutdown
         remove_pid_file()
         
         logger.info("DCA Trading Bot - Main WebSocket Application Stopped")
+        stop_queued_logging()
+
+
+def flush_on_shutdown() -> None:
+    """
+    Write out buffered state and stop the background writers (after the streams close).
+    
+    Extends the force-exit deadline by SHUTDOWN_FLUSH_SECONDS first, so a
+    SIGINT/SIGTERM shutdown does not kill the flushes part way.
+    """
+    extend_shutdown_deadline(SHUTDOWN_FLUSH_SECONDS)
+    
+    # Write out buffered TTP peaks and journaled cycle events while the database pool is still open
+    try:
+        set_peak_write_behind_enabled(False)
+    except Exception as e:
+        logger.error(f"Failed to write trailing peaks at shutdown: {e}")
+    stop_cycle_journal()
+    
+    # Report connection pool usage and close pooled connections
+    log_pool_stats()
+    close_connection_pool()
+    
+    # Report Alpaca request scheduling and close shared HTTP sessions
+    if get_request_scheduler():
+        get_request_scheduler().log_summary()
+    set_client_reuse_enabled(False)
+    
+    # Deliver queued Discord notifications and email alerts before exiting
+    stop_discord_dispatcher()
+    stop_email_dispatcher()
+    close_event_sink()
+    stop_quote_recorder()
+    stop_metrics_server()
 
 
 async def run_both_streams(crypto_stream, trading_stream):
@@ -1959,7 +2536,7 @@ async def run_both_streams(crypto_stream, trading_stream):
     Run both crypto data stream and trading stream concurrently.
     
     Args:
-        crypto_stream: CryptoDataStream instance
+        crypto_stream: ShardedCryptoStream instance
         trading_stream: TradingStream instance
     """
     global shutdown_requested
@@ -1970,19 +2547,34 @@ async def run_both_streams(crypto_stream, trading_stream):
     crypto_task = asyncio.create_task(run_crypto_stream_async(crypto_stream))
     trading_task = asyncio.create_task(run_trading_stream_async(trading_stream))
     
+    # Background maintenance tasks (stopped by the shutdown monitor)
+    background_tasks = []
+    if config.state_cache_enabled:
+        background_tasks.append(asyncio.create_task(run_state_cache_refresher()))
+        if config.ttp_peak_flush_seconds > 0:
+            background_tasks.append(asyncio.create_task(run_trailing_peak_flusher()))
+    if config.alpaca_keepalive_seconds > 0:
+        background_tasks.append(asyncio.create_task(run_alpaca_keepalive()))
+    if config.position_book_enabled:
+        background_tasks.append(asyncio.create_task(run_position_reconciler()))
+    if config.subscription_sync_seconds > 0 and os.getenv('INTEGRATION_TEST_MODE') != 'true':
+        background_tasks.append(asyncio.create_task(run_subscription_sync()))
+    if latency_tracker.enabled and config.latency_report_seconds > 0:
+        background_tasks.append(asyncio.create_task(run_latency_reporter()))
+    
     # Create a shutdown monitor task
-    shutdown_task = asyncio.create_task(monitor_shutdown_simple(crypto_task, trading_task))
+    shutdown_task = asyncio.create_task(monitor_shutdown_simple(crypto_task, trading_task, background_tasks))
     
     try:
         # Run all tasks concurrently
-        await asyncio.gather(crypto_task, trading_task, shutdown_task, return_exceptions=True)
+        await asyncio.gather(crypto_task, trading_task, shutdown_task, *background_tasks, return_exceptions=True)
     except asyncio.CancelledError:
         logger.info("Stream tasks cancelled")
     except Exception as e:
         logger.error(f"Error in concurrent stream execution: {e}")
     finally:
         # Ensure all tasks are cancelled
-        for task in [crypto_task, trading_task, shutdown_task]:
+        for task in [crypto_task, trading_task, shutdown_task, *background_tasks]:
             if not task.done():
                 task.cancel()
                 try:
@@ -1993,13 +2585,14 @@ async def run_both_streams(crypto_stream, trading_stream):
         logger.info("All WebSocket tasks have been stopped")
 
 
-async def monitor_shutdown_simple(crypto_task, trading_task):
+async def monitor_shutdown_simple(crypto_task, trading_task, background_tasks=None):
     """
     Monitor for shutdown requests and cancel stream tasks.
     
     Args:
         crypto_task: Crypto stream asyncio task
         trading_task: Trading stream asyncio task
+        background_tasks: Optional list of maintenance tasks to cancel as well
     """
     global shutdown_requested
     
@@ -2018,21 +2611,24 @@ async def monitor_shutdown_simple(crypto_task, trading_task):
         trading_task.cancel()
         logger.info("Cancelled TradingStream task")
     
+    for task in background_tasks or []:
+        if not task.done():
+            task.cancel()
+    
     logger.info("Shutdown monitor completed - all stream tasks cancelled")
 
 
 async def run_crypto_stream_async(crypto_stream):
     """
-    Run crypto stream asynchronously with shutdown monitoring.
+    Run crypto stream connections asynchronously with shutdown monitoring.
     
     Args:
-        crypto_stream: CryptoDataStream instance
+        crypto_stream: ShardedCryptoStream instance
     """
     try:
-        logger.info("Starting CryptoDataStream...")
-        # Run the stream in executor - cancellation will interrupt it
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, crypto_stream.run)
+        logger.info(f"Starting CryptoDataStream ({len(crypto_stream.shards)} connection(s))...")
+        # Each connection runs on its own thread - cancellation will interrupt the wait
+        await crypto_stream.run()
     except asyncio.CancelledError:
         logger.info("CryptoDataStream task cancelled during shutdown")
     except Exception as e:
@@ -1 +1,50 @@
-# Data models package 
\ No newline at end of file
+# Data models package
+
+import dataclasses
+
+# DcaAsset, DcaCycle and CycleEvent are slotted, mutable dataclasses by default:
+# frozen dataclasses cost several times more to construct on the quote path.
+# Treat instances as read-only (they are shared through the state cache) and
+# use dataclasses.replace() for a changed copy. freeze_models() makes them
+# immutable after construction, for tests (see conftest.py) or to track down
+# code that edits a shared instance in place.
+
+_frozen = False
+
+
+def _frozen_setattr(self, name, value):
+    """__setattr__ that only lets __init__ fill fields that are still unset."""
+    if hasattr(self, name):
+        raise dataclasses.FrozenInstanceError(f"cannot assign to field {name!r}")
+    object.__setattr__(self, name, value)
+
+
+def _frozen_delattr(self, name):
+    raise dataclasses.FrozenInstanceError(f"cannot delete field {name!r}")
+
+
+def freeze_models() -> None:
+    """
+    Make DcaAsset, DcaCycle and CycleEvent instances immutable once constructed.
+    
+    Assigning to or deleting a field raises dataclasses.FrozenInstanceError,
+    as on a frozen dataclass; dataclasses.replace() still works. Applies to
+    the whole process, including instances that already exist, and cannot
+    be undone. Call it at startup, before any instances are shared.
+    """
+    global _frozen
+    if _frozen:
+        return
+    from models.asset_config import DcaAsset
+    from models.cycle_data import DcaCycle
+    from models.cycle_events import CycleEvent
+    
+    for cls in (DcaAsset, DcaCycle, CycleEvent):
+        cls.__setattr__ = _frozen_setattr
+        cls.__delattr__ = _frozen_delattr
+    _frozen = True
+
+
+def models_frozen() -> bool:
+    """True once freeze_models() has been called."""
+    return _frozen
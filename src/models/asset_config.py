@@ -4,10 +4,11 @@ Handles the dca_assets table data and operations.
 """
 
 import logging
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, fields, replace
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Sequence
 from mysql.connector import Error
 
 import sys
@@ -17,8 +18,27 @@ from utils.db_utils import execute_query
 
 logger = logging.getLogger(__name__)
 
+# In-process asset configuration cache, keyed by asset symbol.
+# Disabled by default so caretaker scripts always read fresh rows; main_app
+# enables it at startup to keep asset lookups off the database on every quote.
+# A cached value of None records a symbol with no dca_assets row.
+_asset_cache: Dict[str, Optional['DcaAsset']] = {}
+_asset_cache_generation: Dict[str, int] = {}
+_asset_cache_lock = threading.Lock()
+_asset_cache_enabled = False
+# Callbacks notified with an asset symbol (None = every asset) after its
+# cached configuration changes, e.g. to drop derived per-symbol state.
+_asset_cache_listeners: List[Callable[[Optional[str]], None]] = []
 
-@dataclass
+
+def _decimal(value) -> Optional[Decimal]:
+    """DECIMAL column value as a Decimal; mysql-connector already returns one."""
+    if value is None or value.__class__ is Decimal:
+        return value
+    return Decimal(str(value))
+
+
+@dataclass(slots=True)
 class DcaAsset:
     """
     Represents a DCA asset configuration from the dca_assets table.
@@ -51,28 +71,195 @@ class DcaAsset:
             DcaAsset: New instance with data from the dictionary
         """
         return cls(
-            id=data['id'],
-            asset_symbol=data['asset_symbol'],
-            is_enabled=bool(data['is_enabled']),
-            base_order_amount=Decimal(str(data['base_order_amount'])),
-            safety_order_amount=Decimal(str(data['safety_order_amount'])),
-            max_safety_orders=data['max_safety_orders'],
-            safety_order_deviation=Decimal(str(data['safety_order_deviation'])),
-            take_profit_percent=Decimal(str(data['take_profit_percent'])),
-            ttp_enabled=bool(data['ttp_enabled']),
-            ttp_deviation_percent=Decimal(str(data['ttp_deviation_percent'])) if data['ttp_deviation_percent'] is not None else None,
-            cooldown_period=data['cooldown_period'],
-            buy_order_price_deviation_percent=Decimal(str(data['buy_order_price_deviation_percent'])),
-            last_sell_price=Decimal(str(data['last_sell_price'])) if data['last_sell_price'] is not None else None,
-            created_at=data['created_at'],
-            updated_at=data['updated_at']
+            data['id'],
+            data['asset_symbol'],
+            bool(data['is_enabled']),
+            _decimal(data['base_order_amount']),
+            _decimal(data['safety_order_amount']),
+            data['max_safety_orders'],
+            _decimal(data['safety_order_deviation']),
+            _decimal(data['take_profit_percent']),
+            bool(data['ttp_enabled']),
+            _decimal(data['ttp_deviation_percent']),
+            data['cooldown_period'],
+            _decimal(data['buy_order_price_deviation_percent']),
+            _decimal(data['last_sell_price']),
+            data['created_at'],
+            data['updated_at'],
+        )
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> 'DcaAsset':
+        """
+        Create a DcaAsset instance from a tuple row.
+        
+        Cheaper than from_dict() for bulk reads: select ASSET_COLUMNS and
+        call execute_query(..., dictionary=False).
+        
+        Args:
+            row: Values in ASSET_COLUMNS order
+            
+        Returns:
+            DcaAsset: New instance with data from the row
+        """
+        return cls(
+            row[0], row[1], bool(row[2]), _decimal(row[3]), _decimal(row[4]), row[5], _decimal(row[6]),
+            _decimal(row[7]), bool(row[8]), _decimal(row[9]), row[10], _decimal(row[11]), _decimal(row[12]),
+            row[13], row[14],
         )
 
 
+# dca_assets columns in DcaAsset field order, for queries read with from_row()
+ASSET_COLUMNS = tuple(f.name for f in fields(DcaAsset))
+
+
+def set_asset_cache_enabled(enabled: bool) -> None:
+    """
+    Enable or disable the in-process asset configuration cache.
+    
+    Disabling the cache also clears it.
+    
+    Args:
+        enabled: True to serve get_asset_config() from memory
+    """
+    global _asset_cache_enabled
+    with _asset_cache_lock:
+        _asset_cache_enabled = enabled
+        if not enabled:
+            _asset_cache.clear()
+            _asset_cache_generation.clear()
+    if not enabled:
+        _notify_asset_cache_listeners(None)
+    logger.info(f"Asset config cache {'enabled' if enabled else 'disabled'}")
+
+
+def add_asset_cache_listener(listener: Callable[[Optional[str]], None]) -> None:
+    """
+    Register a callback for changes to cached asset configurations.
+    
+    The callback runs on the thread that made the change, after the cache
+    has been updated, with the affected symbol (None for every asset).
+    
+    Args:
+        listener: Callable taking an asset symbol or None
+    """
+    _asset_cache_listeners.append(listener)
+
+
+def remove_asset_cache_listener(listener: Callable) -> None:
+    """
+    Unregister a callback added with add_asset_cache_listener().
+    
+    Args:
+        listener: The registered callable (ignored if not registered)
+    """
+    if listener in _asset_cache_listeners:
+        _asset_cache_listeners.remove(listener)
+
+
+def _notify_asset_cache_listeners(asset_symbol: Optional[str]) -> None:
+    """Tell registered listeners that a symbol's cached configuration changed."""
+    for listener in list(_asset_cache_listeners):
+        try:
+            listener(asset_symbol)
+        except Exception as e:
+            logger.error(f"Asset cache listener failed for {asset_symbol}: {e}")
+
+
+def invalidate_asset_cache(asset_symbol: Optional[str] = None) -> None:
+    """
+    Drop cached asset configuration so the next lookup reads the database.
+    
+    Args:
+        asset_symbol: Symbol to invalidate, or None to invalidate every asset
+    """
+    with _asset_cache_lock:
+        if asset_symbol is None:
+            for symbol in _asset_cache:
+                _asset_cache_generation[symbol] = _asset_cache_generation.get(symbol, 0) + 1
+            _asset_cache.clear()
+        else:
+            _asset_cache.pop(asset_symbol, None)
+            _asset_cache_generation[asset_symbol] = _asset_cache_generation.get(asset_symbol, 0) + 1
+    _notify_asset_cache_listeners(asset_symbol)
+
+
+def _store_cached_asset(asset_symbol: str, asset: Optional[DcaAsset], generation: int) -> None:
+    """
+    Cache an asset read from the database unless it was written through meanwhile.
+    
+    Args:
+        asset_symbol: Symbol the row was looked up by
+        asset: Asset read from the database (None if no row)
+        generation: Cache generation of the symbol captured before the read
+    """
+    with _asset_cache_lock:
+        if not _asset_cache_enabled or _asset_cache_generation.get(asset_symbol, 0) != generation:
+            return
+        _asset_cache[asset_symbol] = asset
+    _notify_asset_cache_listeners(asset_symbol)
+
+
+def refresh_asset_cache() -> int:
+    """
+    Reload every asset configuration into the cache with a single query.
+    
+    Picks up changes made outside this process (add_asset.py, manual edits).
+    Entries written through by update_asset_config() while the query was
+    running are kept, so a refresh never overwrites newer local state.
+    
+    Returns:
+        int: Number of assets loaded (0 if the cache is disabled)
+        
+    Raises:
+        mysql.connector.Error: If database query fails
+    """
+    if not _asset_cache_enabled:
+        return 0
+    
+    with _asset_cache_lock:
+        generations_before = dict(_asset_cache_generation)
+    
+    query = """
+    SELECT id, asset_symbol, is_enabled, base_order_amount, safety_order_amount,
+           max_safety_orders, safety_order_deviation, take_profit_percent,
+           ttp_enabled, ttp_deviation_percent, cooldown_period, 
+           buy_order_price_deviation_percent, last_sell_price,
+           created_at, updated_at
+    FROM dca_assets
+    """
+    
+    results = execute_query(query, fetch_all=True) or []
+    fresh = {row['asset_symbol']: DcaAsset.from_dict(row) for row in results}
+    
+    changed = []
+    with _asset_cache_lock:
+        for symbol in set(_asset_cache) | set(fresh):
+            if _asset_cache_generation.get(symbol, 0) != generations_before.get(symbol, 0):
+                continue  # Written through during the refresh - keep the newer value
+            asset = fresh.get(symbol)
+            if asset is None:
+                if _asset_cache.pop(symbol, None) is not None:
+                    changed.append(symbol)
+            elif _asset_cache.get(symbol) != asset:
+                if symbol in _asset_cache:
+                    logger.debug(f"Asset config for {symbol} changed externally - cache refreshed")
+                _asset_cache[symbol] = asset
+                changed.append(symbol)
+    
+    for symbol in changed:
+        _notify_asset_cache_listeners(symbol)
+    
+    logger.debug(f"Asset config cache refreshed with {len(fresh)} assets")
+    return len(fresh)
+
+
 def get_asset_config(asset_symbol: str) -> Optional[DcaAsset]:
     """
     Fetches an asset's configuration by its symbol.
     
+    Served from the in-process cache when it is enabled.
+    
     Args:
         asset_symbol: The asset symbol to fetch (e.g., 'BTC/USD')
         
@@ -82,6 +269,11 @@ def get_asset_config(asset_symbol: str) -> Optional[DcaAsset]:
     Raises:
         mysql.connector.Error: If database query fails
     """
+    with _asset_cache_lock:
+        if _asset_cache_enabled and asset_symbol in _asset_cache:
+            return _asset_cache[asset_symbol]
+        generation = _asset_cache_generation.get(asset_symbol, 0)
+    
     try:
         query = """
         SELECT id, asset_symbol, is_enabled, base_order_amount, safety_order_amount,
@@ -97,10 +289,13 @@ def get_asset_config(asset_symbol: str) -> Optional[DcaAsset]:
         
         if result:
             logger.debug(f"Found asset configuration for {asset_symbol}")
-            return DcaAsset.from_dict(result)
+            asset = DcaAsset.from_dict(result)
         else:
             logger.debug(f"No asset configuration found for {asset_symbol}")
-            return None
+            asset = None
+        
+        _store_cached_asset(asset_symbol, asset, generation)
+        return asset
             
     except Error as e:
         logger.error(f"Error fetching asset config for {asset_symbol}: {e}")
@@ -191,6 +386,35 @@ def get_all_enabled_assets() -> List[DcaAsset]:
         raise
 
 
+def get_enabled_asset_symbols() -> List[str]:
+    """
+    Fetches the symbols of all enabled assets, without the rest of the row.
+    
+    Returns:
+        List[str]: Enabled asset symbols, sorted
+        
+    Raises:
+        mysql.connector.Error: If database query fails
+    """
+    try:
+        query = """
+        SELECT asset_symbol
+        FROM dca_assets
+        WHERE is_enabled = TRUE
+        ORDER BY asset_symbol
+        """
+        
+        results = execute_query(query, fetch_all=True) or []
+        return [row['asset_symbol'] for row in results]
+        
+    except Error as e:
+        logger.error(f"Error fetching enabled asset symbols: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error fetching enabled asset symbols: {e}")
+        raise
+
+
 def update_asset_config(asset_id: int, updates: dict) -> bool:
     """
     Updates specified fields of an asset configuration.
@@ -231,6 +455,7 @@ def update_asset_config(asset_id: int, updates: dict) -> bool:
         
         if rows_affected and rows_affected > 0:
             logger.info(f"Updated asset {asset_id} with {len(updates)} fields")
+            _write_through_asset_update(asset_id, updates)
             return True
         else:
             logger.warning(f"No rows affected when updating asset {asset_id}")
@@ -241,4 +466,34 @@ def update_asset_config(asset_id: int, updates: dict) -> bool:
         raise
     except Exception as e:
         logger.error(f"Unexpected error updating asset {asset_id}: {e}")
-        raise 
\ No newline at end of file
+        raise
+
+
+def _write_through_asset_update(asset_id: int, updates: dict) -> None:
+    """
+    Apply a committed update to the cached copy of an asset.
+    
+    Cached objects are never mutated in place; a new instance replaces the
+    old one so readers on other threads always see a consistent snapshot.
+    """
+    if not _asset_cache_enabled:
+        return
+    
+    field_names = {f.name for f in fields(DcaAsset)}
+    changed_symbol = None
+    
+    with _asset_cache_lock:
+        for symbol, cached in list(_asset_cache.items()):
+            if cached is None or cached.id != asset_id:
+                continue
+            _asset_cache_generation[symbol] = _asset_cache_generation.get(symbol, 0) + 1
+            if set(updates) <= field_names and 'asset_symbol' not in updates:
+                _asset_cache[symbol] = replace(cached, **updates)
+            else:
+                # Unknown columns or a symbol rename - let the next lookup reload
+                del _asset_cache[symbol]
+            changed_symbol = symbol
+            break
+    
+    if changed_symbol is not None:
+        _notify_asset_cache_listeners(changed_symbol)
@@ -4,21 +4,50 @@ Handles the dca_cycles table data and operations.
 """
 
 import logging
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, fields, replace
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Sequence
 from mysql.connector import Error
 
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from utils.db_utils import execute_query
+from utils.cycle_journal import record_cycle_event
+from utils.event_sink import record_event
 
 logger = logging.getLogger(__name__)
 
+# In-process cache of the latest cycle per asset, keyed by asset_id.
+# Disabled by default so caretaker scripts always read fresh rows; main_app
+# enables it at startup so quotes that don't trigger anything cost no DB I/O.
+# A cached value of None records an asset with no cycles yet.
+_cycle_cache: Dict[int, Optional['DcaCycle']] = {}
+_cycle_cache_generation: Dict[int, int] = {}
+_cycle_cache_lock = threading.Lock()
+_cycle_cache_enabled = False
+# Callbacks notified with an asset_id (None = every asset) after its cached
+# latest cycle changes, e.g. to drop derived per-symbol state.
+_cycle_cache_listeners: List[Callable[[Optional[int]], None]] = []
+# Trailing peaks held in memory but not yet written to dca_cycles, keyed by
+# cycle_id. Only filled while peak write-behind is enabled (main_app, with the
+# cache on); flush_trailing_peaks() and status changes write them out.
+_pending_peaks: Dict[int, Decimal] = {}
+_pending_peaks_lock = threading.Lock()
+_peak_write_behind_enabled = False
+_peak_stats = {'recorded': 0, 'written': 0}
 
-@dataclass
+
+def _decimal(value) -> Optional[Decimal]:
+    """DECIMAL column value as a Decimal; mysql-connector already returns one."""
+    if value is None or value.__class__ is Decimal:
+        return value
+    return Decimal(str(value))
+
+
+@dataclass(slots=True)
 class DcaCycle:
     """
     Represents a DCA trading cycle from the dca_cycles table.
@@ -51,28 +80,205 @@ class DcaCycle:
             DcaCycle: New instance with data from the dictionary
         """
         return cls(
-            id=data['id'],
-            asset_id=data['asset_id'],
-            status=data['status'],
-            quantity=Decimal(str(data['quantity'])),
-            average_purchase_price=Decimal(str(data['average_purchase_price'])),
-            safety_orders=data['safety_orders'],
-            latest_order_id=data['latest_order_id'],
-            latest_order_created_at=data['latest_order_created_at'],
-            last_order_fill_price=Decimal(str(data['last_order_fill_price'])) if data['last_order_fill_price'] is not None else None,
-            highest_trailing_price=Decimal(str(data['highest_trailing_price'])) if data['highest_trailing_price'] is not None else None,
-            completed_at=data['completed_at'],
-            created_at=data['created_at'],
-            updated_at=data['updated_at'],
-            sell_price=Decimal(str(data['sell_price'])) if data.get('sell_price') is not None else None,
-            asset_symbol=data.get('asset_symbol')  # Include asset_symbol if available
+            data['id'],
+            data['asset_id'],
+            data['status'],
+            _decimal(data['quantity']),
+            _decimal(data['average_purchase_price']),
+            data['safety_orders'],
+            data['latest_order_id'],
+            data['latest_order_created_at'],
+            _decimal(data['last_order_fill_price']),
+            _decimal(data['highest_trailing_price']),
+            data['completed_at'],
+            data['created_at'],
+            data['updated_at'],
+            _decimal(data.get('sell_price')),
+            data.get('asset_symbol'),  # Include asset_symbol if available
+        )
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> 'DcaCycle':
+        """
+        Create a DcaCycle instance from a tuple row.
+        
+        Cheaper than from_dict() for bulk reads: select CYCLE_COLUMNS (plus
+        asset_symbol, optionally) and call execute_query(..., dictionary=False).
+        
+        Args:
+            row: Values in CYCLE_COLUMNS order, optionally followed by asset_symbol
+            
+        Returns:
+            DcaCycle: New instance with data from the row
+        """
+        return cls(
+            row[0], row[1], row[2], _decimal(row[3]), _decimal(row[4]), row[5], row[6], row[7],
+            _decimal(row[8]), _decimal(row[9]), row[10], row[11], row[12], _decimal(row[13]),
+            row[14] if len(row) > 14 else None,
         )
 
 
+# dca_cycles columns in DcaCycle field order, for queries read with from_row()
+CYCLE_COLUMNS = tuple(f.name for f in fields(DcaCycle) if f.name != 'asset_symbol')
+
+
+def set_cycle_cache_enabled(enabled: bool) -> None:
+    """
+    Enable or disable the in-process latest-cycle cache.
+    
+    Disabling the cache also clears it.
+    
+    Args:
+        enabled: True to serve get_latest_cycle() from memory
+    """
+    global _cycle_cache_enabled
+    with _cycle_cache_lock:
+        _cycle_cache_enabled = enabled
+        if not enabled:
+            _cycle_cache.clear()
+            _cycle_cache_generation.clear()
+    if not enabled:
+        _notify_cycle_cache_listeners(None)
+    logger.info(f"Cycle cache {'enabled' if enabled else 'disabled'}")
+
+
+def add_cycle_cache_listener(listener: Callable[[Optional[int]], None]) -> None:
+    """
+    Register a callback for changes to cached latest cycles.
+    
+    The callback runs on the thread that made the change, after the cache
+    has been updated, with the affected asset_id (None for every asset).
+    
+    Args:
+        listener: Callable taking an asset_id or None
+    """
+    _cycle_cache_listeners.append(listener)
+
+
+def remove_cycle_cache_listener(listener: Callable) -> None:
+    """
+    Unregister a callback added with add_cycle_cache_listener().
+    
+    Args:
+        listener: The registered callable (ignored if not registered)
+    """
+    if listener in _cycle_cache_listeners:
+        _cycle_cache_listeners.remove(listener)
+
+
+def _notify_cycle_cache_listeners(asset_id: Optional[int]) -> None:
+    """Tell registered listeners that an asset's cached cycle changed."""
+    for listener in list(_cycle_cache_listeners):
+        try:
+            listener(asset_id)
+        except Exception as e:
+            logger.error(f"Cycle cache listener failed for asset {asset_id}: {e}")
+
+
+def invalidate_cycle_cache(asset_id: Optional[int] = None) -> None:
+    """
+    Drop cached cycles so the next lookup reads the database.
+    
+    Args:
+        asset_id: Asset whose latest cycle to invalidate, or None for all assets
+    """
+    with _cycle_cache_lock:
+        if asset_id is None:
+            for cached_asset_id in _cycle_cache:
+                _cycle_cache_generation[cached_asset_id] = _cycle_cache_generation.get(cached_asset_id, 0) + 1
+            _cycle_cache.clear()
+        else:
+            _cycle_cache.pop(asset_id, None)
+            _cycle_cache_generation[asset_id] = _cycle_cache_generation.get(asset_id, 0) + 1
+    _notify_cycle_cache_listeners(asset_id)
+
+
+def _store_cached_cycle(asset_id: int, cycle: Optional[DcaCycle], generation: Optional[int] = None) -> None:
+    """
+    Put a cycle into the cache as the latest cycle for its asset.
+    
+    Args:
+        asset_id: Asset the cycle belongs to
+        cycle: Latest cycle (None if the asset has no cycles)
+        generation: Generation captured before a database read. When given,
+            the value is only stored if nothing was written through meanwhile.
+            When omitted (local writes), the value always wins.
+    """
+    with _cycle_cache_lock:
+        if not _cycle_cache_enabled:
+            return
+        current_generation = _cycle_cache_generation.get(asset_id, 0)
+        if generation is not None and current_generation != generation:
+            return
+        _cycle_cache[asset_id] = cycle
+        if generation is None:
+            _cycle_cache_generation[asset_id] = current_generation + 1
+    _notify_cycle_cache_listeners(asset_id)
+
+
+def refresh_cycle_cache() -> int:
+    """
+    Reload the latest cycle of every asset into the cache with a single query.
+    
+    Picks up changes made outside this process (cooldown_manager,
+    order_manager, consistency_checker). Entries written through by
+    create_cycle()/update_cycle() while the query was running are kept.
+    
+    Returns:
+        int: Number of cycles loaded (0 if the cache is disabled)
+        
+    Raises:
+        mysql.connector.Error: If database query fails
+    """
+    if not _cycle_cache_enabled:
+        return 0
+    
+    with _cycle_cache_lock:
+        generations_before = dict(_cycle_cache_generation)
+    
+    query = """
+    SELECT c.id, c.asset_id, c.status, c.quantity, c.average_purchase_price,
+           c.safety_orders, c.latest_order_id, c.latest_order_created_at, c.last_order_fill_price,
+           c.highest_trailing_price, c.completed_at, c.created_at, c.updated_at, c.sell_price
+    FROM dca_cycles c
+    INNER JOIN (
+        SELECT asset_id, MAX(id) AS max_id
+        FROM dca_cycles
+        GROUP BY asset_id
+    ) latest ON c.id = latest.max_id
+    """
+    
+    results = execute_query(query, fetch_all=True) or []
+    fresh = {row['asset_id']: _with_pending_peak(DcaCycle.from_dict(row)) for row in results}
+    
+    changed = []
+    with _cycle_cache_lock:
+        for asset_id in set(_cycle_cache) | set(fresh):
+            if _cycle_cache_generation.get(asset_id, 0) != generations_before.get(asset_id, 0):
+                continue  # Written through during the refresh - keep the newer value
+            cycle = fresh.get(asset_id)
+            if cycle is None:
+                if _cycle_cache.pop(asset_id, None) is not None:
+                    changed.append(asset_id)
+            elif _cycle_cache.get(asset_id) != cycle:
+                if asset_id in _cycle_cache:
+                    logger.debug(f"Latest cycle for asset {asset_id} changed externally - cache refreshed")
+                _cycle_cache[asset_id] = cycle
+                changed.append(asset_id)
+    
+    for asset_id in changed:
+        _notify_cycle_cache_listeners(asset_id)
+    
+    logger.debug(f"Cycle cache refreshed with {len(fresh)} cycles")
+    return len(fresh)
+
+
 def get_latest_cycle(asset_id: int) -> Optional[DcaCycle]:
     """
     Fetches the most recent cycle for a given asset_id.
     
+    Served from the in-process cache when it is enabled.
+    
     Args:
         asset_id: The asset ID to fetch the latest cycle for
         
@@ -82,6 +288,11 @@ def get_latest_cycle(asset_id: int) -> Optional[DcaCycle]:
     Raises:
         mysql.connector.Error: If database query fails
     """
+    with _cycle_cache_lock:
+        if _cycle_cache_enabled and asset_id in _cycle_cache:
+            return _cycle_cache[asset_id]
+        generation = _cycle_cache_generation.get(asset_id, 0)
+    
     try:
         query = """
         SELECT id, asset_id, status, quantity, average_purchase_price,
@@ -97,10 +308,13 @@ def get_latest_cycle(asset_id: int) -> Optional[DcaCycle]:
         
         if result:
             logger.debug(f"Found latest cycle for asset {asset_id}: cycle ID {result['id']}")
-            return DcaCycle.from_dict(result)
+            cycle = _with_pending_peak(DcaCycle.from_dict(result))
         else:
             logger.debug(f"No cycles found for asset {asset_id}")
-            return None
+            cycle = None
+        
+        _store_cached_cycle(asset_id, cycle, generation)
+        return cycle
             
     except Error as e:
         logger.error(f"Error fetching latest cycle for asset {asset_id}: {e}")
@@ -110,6 +324,26 @@ def get_latest_cycle(asset_id: int) -> Optional[DcaCycle]:
         raise
 
 
+def find_cached_cycle_by_order(order_id: str) -> Optional[DcaCycle]:
+    """
+    Finds the cached latest cycle that is waiting on an order.
+    
+    Memory only: returns None when the cache is disabled or no cached
+    cycle holds the order, without querying the database.
+    
+    Args:
+        order_id: Alpaca order ID (as stored in latest_order_id)
+        
+    Returns:
+        DcaCycle: Cycle whose latest_order_id is order_id, or None
+    """
+    with _cycle_cache_lock:
+        for cycle in _cycle_cache.values():
+            if cycle is not None and cycle.latest_order_id == order_id:
+                return cycle
+    return None
+
+
 def create_cycle(
     asset_id: int,
     status: str,
@@ -169,6 +403,7 @@ def create_cycle(
         
         if cycle_id:
             logger.info(f"Created new cycle {cycle_id} for asset {asset_id} with status '{status}'")
+            record_event('cycle_created', cycle_id=cycle_id, asset_id=asset_id, status=status)
             
             # Fetch the complete cycle record with timestamps
             fetch_query = """
@@ -182,7 +417,10 @@ def create_cycle(
             result = execute_query(fetch_query, (cycle_id,), fetch_one=True)
             
             if result:
-                return DcaCycle.from_dict(result)
+                new_cycle = DcaCycle.from_dict(result)
+                _store_cached_cycle(asset_id, new_cycle)
+                record_cycle_event(cycle_id, 'created', result)
+                return new_cycle
             else:
                 raise Error(f"Failed to fetch newly created cycle {cycle_id}")
         else:
@@ -196,13 +434,16 @@ def create_cycle(
         raise
 
 
-def update_cycle(cycle_id: int, updates: dict) -> bool:
+def update_cycle(cycle_id: int, updates: dict, event: Optional[str] = None) -> bool:
     """
     Updates specified fields of a cycle.
     
     Args:
         cycle_id: ID of the cycle to update
         updates: Dictionary of column_name: new_value pairs
+        event: Name the change is journaled under in cycle_events (e.g.
+            'order_placed', 'fill', 'ttp_peak'; default: 'status' if the
+            status changes, otherwise 'update')
         
     Returns:
         bool: True if update was successful
@@ -213,6 +454,11 @@ def update_cycle(cycle_id: int, updates: dict) -> bool:
     if not updates:
         logger.warning("No updates provided for cycle update")
         return False
+    
+    # A status change writes out the cycle's buffered trailing peak with it
+    pending_peak = _take_pending_peak(cycle_id, updates) if _pending_peaks else None
+    if pending_peak is not None:
+        updates = {**updates, 'highest_trailing_price': pending_peak}
         
     try:
         # Build the SET clause dynamically
@@ -236,6 +482,10 @@ def update_cycle(cycle_id: int, updates: dict) -> bool:
         
         if rows_affected and rows_affected > 0:
             logger.info(f"Updated cycle {cycle_id} with {len(updates)} fields")
+            _write_through_cycle_update(cycle_id, updates)
+            record_cycle_event(cycle_id, event or ('status' if 'status' in updates else 'update'), updates)
+            if 'status' in updates:
+                record_event('cycle_status', cycle_id=cycle_id, status=updates['status'])
             return True
         else:
             logger.warning(f"No rows affected when updating cycle {cycle_id}")
@@ -243,12 +493,193 @@ def update_cycle(cycle_id: int, updates: dict) -> bool:
             
     except Error as e:
         logger.error(f"Error updating cycle {cycle_id}: {e}")
+        if pending_peak is not None:
+            _restore_pending_peak(cycle_id, pending_peak)
         raise
     except Exception as e:
         logger.error(f"Unexpected error updating cycle {cycle_id}: {e}")
+        if pending_peak is not None:
+            _restore_pending_peak(cycle_id, pending_peak)
         raise
 
 
+def _write_through_cycle_update(cycle_id: int, updates: dict) -> None:
+    """
+    Apply a committed update to the cached copy of a cycle.
+    
+    Cached objects are never mutated in place; a new instance replaces the
+    old one so readers on other threads always see a consistent snapshot.
+    Only the latest cycle of each asset is cached, so updates to older
+    cycles are ignored.
+    """
+    if not _cycle_cache_enabled:
+        return
+    
+    field_names = {f.name for f in fields(DcaCycle)}
+    changed_asset_id = None
+    
+    with _cycle_cache_lock:
+        for asset_id, cached in list(_cycle_cache.items()):
+            if cached is None or cached.id != cycle_id:
+                continue
+            _cycle_cache_generation[asset_id] = _cycle_cache_generation.get(asset_id, 0) + 1
+            if set(updates) <= field_names and 'asset_id' not in updates:
+                _cycle_cache[asset_id] = replace(cached, **updates)
+            else:
+                # Unknown columns or an asset change - let the next lookup reload
+                del _cycle_cache[asset_id]
+            changed_asset_id = asset_id
+            break
+    
+    if changed_asset_id is not None:
+        _notify_cycle_cache_listeners(changed_asset_id)
+
+
+def set_peak_write_behind_enabled(enabled: bool) -> None:
+    """
+    Enable or disable write-behind of trailing peaks.
+    
+    While enabled (and the cycle cache is on), buffer_trailing_peak() keeps
+    new TTP peaks in memory instead of committing one UPDATE per tick.
+    Disabling writes out everything buffered.
+    
+    Args:
+        enabled: True to buffer trailing peaks
+        
+    Raises:
+        mysql.connector.Error: If writing out buffered peaks fails
+    """
+    global _peak_write_behind_enabled
+    _peak_write_behind_enabled = enabled
+    if not enabled:
+        flush_trailing_peaks()
+    logger.info(f"Trailing peak write-behind {'enabled' if enabled else 'disabled'}")
+
+
+def buffer_trailing_peak(cycle_id: int, price: Decimal) -> bool:
+    """
+    Record a new TTP peak in memory, to be written to dca_cycles later.
+    
+    The cached cycle is updated at once, so the next quote's sell decision
+    already uses the new peak. The database gets the highest buffered peak
+    on the next flush_trailing_peaks(), with the cycle's next status change,
+    or at shutdown, whichever comes first.
+    
+    Args:
+        cycle_id: ID of the trailing cycle
+        price: New highest_trailing_price
+        
+    Returns:
+        bool: True if buffered; False if write-behind is off and the caller
+            should write the peak with update_cycle()
+    """
+    if not (_peak_write_behind_enabled and _cycle_cache_enabled):
+        return False
+    
+    with _pending_peaks_lock:
+        current = _pending_peaks.get(cycle_id)
+        if current is None or price > current:
+            _pending_peaks[cycle_id] = price
+        _peak_stats['recorded'] += 1
+    _write_through_cycle_update(cycle_id, {'highest_trailing_price': price})
+    return True
+
+
+def flush_trailing_peaks() -> int:
+    """
+    Write buffered trailing peaks to dca_cycles.
+    
+    The UPDATE only ever raises highest_trailing_price, so a flush racing
+    with a status change that already wrote a higher peak cannot lower it.
+    Peaks that fail to write stay buffered for the next flush.
+    
+    Returns:
+        int: Number of cycles whose peak was written
+        
+    Raises:
+        mysql.connector.Error: If a write fails (after the remaining peaks were tried)
+    """
+    with _pending_peaks_lock:
+        pending = dict(_pending_peaks)
+        _pending_peaks.clear()
+    
+    query = """
+    UPDATE dca_cycles
+    SET highest_trailing_price = %s
+    WHERE id = %s AND (highest_trailing_price IS NULL OR highest_trailing_price < %s)
+    """
+    
+    written = 0
+    failure = None
+    for cycle_id, peak in pending.items():
+        try:
+            rows_affected = execute_query(query, (peak, cycle_id, peak), commit=True)
+        except Error as e:
+            logger.error(f"Error writing trailing peak for cycle {cycle_id}: {e}")
+            _restore_pending_peak(cycle_id, peak)
+            failure = e
+            continue
+        if rows_affected:
+            written += 1
+            record_cycle_event(cycle_id, 'ttp_peak', {'highest_trailing_price': peak})
+    
+    with _pending_peaks_lock:
+        _peak_stats['written'] += written
+    if written:
+        logger.debug(f"Wrote trailing peaks for {written} cycles")
+    if failure is not None:
+        raise failure
+    return written
+
+
+def get_trailing_peak_stats() -> Dict[str, int]:
+    """
+    Get trailing peak write-behind counters.
+    
+    Returns:
+        Dictionary with recorded (peaks buffered), written (peaks committed
+        by flushes) and pending (cycles with an unwritten peak)
+    """
+    with _pending_peaks_lock:
+        return dict(_peak_stats, pending=len(_pending_peaks))
+
+
+def _take_pending_peak(cycle_id: int, updates: dict) -> Optional[Decimal]:
+    """
+    Remove a cycle's buffered peak if this update should carry it.
+    
+    A status change carries it; an update that sets highest_trailing_price
+    itself replaces it.
+    """
+    if 'highest_trailing_price' in updates:
+        with _pending_peaks_lock:
+            _pending_peaks.pop(cycle_id, None)
+        return None
+    if 'status' not in updates:
+        return None
+    with _pending_peaks_lock:
+        return _pending_peaks.pop(cycle_id, None)
+
+
+def _restore_pending_peak(cycle_id: int, peak: Decimal) -> None:
+    """Put back a peak whose write failed, unless a higher one was buffered meanwhile."""
+    with _pending_peaks_lock:
+        current = _pending_peaks.get(cycle_id)
+        if current is None or peak > current:
+            _pending_peaks[cycle_id] = peak
+
+
+def _with_pending_peak(cycle: DcaCycle) -> DcaCycle:
+    """A cycle read from the database, with its buffered peak if that is higher."""
+    if not _pending_peaks:
+        return cycle
+    with _pending_peaks_lock:
+        peak = _pending_peaks.get(cycle.id)
+    if peak is None or (cycle.highest_trailing_price is not None and cycle.highest_trailing_price >= peak):
+        return cycle
+    return replace(cycle, highest_trailing_price=peak)
+
+
 def get_cycle_by_id(cycle_id: int) -> Optional[DcaCycle]:
     """
     Fetches a specific cycle by its ID.
@@ -299,6 +730,7 @@ def get_all_cycles() -> list[DcaCycle]:
         mysql.connector.Error: If database query fails
     """
     try:
+        # Columns in DcaCycle field order for from_row()
         query = """
         SELECT c.id, c.asset_id, c.status, c.quantity, c.average_purchase_price,
                c.safety_orders, c.latest_order_id, c.latest_order_created_at, c.last_order_fill_price,
@@ -309,10 +741,10 @@ def get_all_cycles() -> list[DcaCycle]:
         ORDER BY c.id DESC
         """
         
-        results = execute_query(query, fetch_all=True)
+        results = execute_query(query, fetch_all=True, dictionary=False)
         
         if results:
-            cycles = [DcaCycle.from_dict(row) for row in results]
+            cycles = [DcaCycle.from_row(row) for row in results]
             logger.debug(f"Found {len(cycles)} cycles")
             return cycles
         else:
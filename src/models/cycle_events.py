@@ -0,0 +1,269 @@
+"""
+Cycle event journal model for the DCA trading bot.
+Reads the append-only cycle_events table written by utils.cycle_journal:
+a cycle's history in order, and its state rebuilt from the latest
+snapshot plus the events after it.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from mysql.connector import Error
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from models.cycle_data import CYCLE_COLUMNS, DcaCycle
+from utils.cycle_journal import SNAPSHOT_EVENTS, get_cycle_journal, record_cycle_event
+from utils.db_utils import execute_query
+from utils.db_types import stored_value
+
+logger = logging.getLogger(__name__)
+
+# DcaCycle fields journaled as ISO strings
+_DATETIME_FIELDS = tuple(f.name for f in fields(DcaCycle) if f.type in (datetime, Optional[datetime]))
+# Fields a rebuilt cycle is not expected to match exactly
+_UNCOMPARED_FIELDS = ('updated_at', 'asset_symbol')
+
+
+def _json_column(value) -> Dict[str, Any]:
+    """JSON column value as a dict (connectors return str, bytes or None)."""
+    if not value:
+        return {}
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode('utf-8')
+    return json.loads(value)
+
+
+@dataclass(slots=True)
+class CycleEvent:
+    """
+    Represents one row of the cycle_events table.
+    """
+    id: int
+    cycle_id: int
+    event_type: str
+    event_time: datetime
+    changes: Dict[str, Any]
+    details: Dict[str, Any]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CycleEvent':
+        """
+        Create a CycleEvent instance from a database row dictionary.
+        
+        Args:
+            data: Dictionary containing database row data
+        
+        Returns:
+            CycleEvent: New instance with the JSON columns decoded
+        """
+        return cls(
+            data['id'],
+            data['cycle_id'],
+            data['event_type'],
+            data['event_time'],
+            _json_column(data['changes']),
+            _json_column(data['details']),
+        )
+
+
+def get_cycle_events(cycle_id: int, after_id: int = 0) -> List[CycleEvent]:
+    """
+    Fetches a cycle's journaled events in the order they happened.
+    
+    Args:
+        cycle_id: The cycle to fetch events for
+        after_id: Only return events with a higher id (for paging or tailing)
+    
+    Returns:
+        List[CycleEvent]: Events ordered by id (empty list if none)
+    
+    Raises:
+        mysql.connector.Error: If database query fails
+    """
+    try:
+        query = """
+        SELECT id, cycle_id, event_type, event_time, changes, details
+        FROM cycle_events
+        WHERE cycle_id = %s AND id > %s
+        ORDER BY id
+        """
+        
+        results = execute_query(query, (cycle_id, after_id), fetch_all=True) or []
+        return [CycleEvent.from_dict(row) for row in results]
+    
+    except Error as e:
+        logger.error(f"Error fetching events for cycle {cycle_id}: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error fetching events for cycle {cycle_id}: {e}")
+        raise
+
+
+def get_replay_events(cycle_id: int) -> List[CycleEvent]:
+    """
+    Fetches a cycle's latest snapshot and the events journaled after it.
+    
+    Reads only the tail of the cycle's history, however long it is.
+    
+    Args:
+        cycle_id: The cycle to fetch events for
+    
+    Returns:
+        List[CycleEvent]: Snapshot event first, then later events by id
+            (every event if the cycle has no snapshot)
+    
+    Raises:
+        mysql.connector.Error: If database query fails
+    """
+    try:
+        query = """
+        SELECT id, cycle_id, event_type, event_time, changes, details
+        FROM cycle_events
+        WHERE cycle_id = %s
+          AND id >= (
+              SELECT COALESCE(MAX(id), 0)
+              FROM cycle_events
+              WHERE cycle_id = %s AND event_type IN ('created', 'snapshot')
+          )
+        ORDER BY id
+        """
+        
+        results = execute_query(query, (cycle_id, cycle_id), fetch_all=True) or []
+        return [CycleEvent.from_dict(row) for row in results]
+    
+    except Error as e:
+        logger.error(f"Error fetching replay events for cycle {cycle_id}: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error fetching replay events for cycle {cycle_id}: {e}")
+        raise
+
+
+def apply_cycle_events(events: Sequence[CycleEvent]) -> Optional[DcaCycle]:
+    """
+    Replays events into a cycle's state.
+    
+    A snapshot event replaces the state with the row it holds; every other
+    event applies its changes on top. Events before the first snapshot
+    cannot be applied and are skipped. updated_at is taken from the last
+    event that changed anything, so it can differ from the table's own
+    timestamp by the time the write took.
+    
+    Events hold the values update_cycle() was given; they are rounded as
+    the dca_cycles columns round them (DECIMAL scale, whole-second
+    TIMESTAMPs) so the result compares equal to the table row.
+    
+    Args:
+        events: One cycle's events in id order
+    
+    Returns:
+        DcaCycle: The rebuilt cycle, or None if no snapshot was found
+    """
+    state: Optional[Dict[str, Any]] = None
+    for event in events:
+        if event.event_type in SNAPSHOT_EVENTS:
+            state = dict(event.changes)
+        elif state is not None and event.changes:
+            state.update(event.changes)
+            state['updated_at'] = event.event_time
+    
+    if state is None:
+        return None
+    
+    for name in _DATETIME_FIELDS:
+        value = state.get(name)
+        if isinstance(value, str):
+            state[name] = datetime.fromisoformat(value)
+    state = {name: stored_value(name, value) for name, value in state.items()}
+    state['id'] = events[-1].cycle_id
+    return DcaCycle.from_dict(state)
+
+
+def rebuild_cycle(cycle_id: int) -> Optional[DcaCycle]:
+    """
+    Rebuilds a cycle's current state from the journal alone.
+    
+    Args:
+        cycle_id: The cycle to rebuild
+    
+    Returns:
+        DcaCycle: The rebuilt cycle, or None if the journal has no snapshot of it
+    
+    Raises:
+        mysql.connector.Error: If database query fails
+    """
+    events = get_replay_events(cycle_id)
+    cycle = apply_cycle_events(events)
+    if cycle is None:
+        logger.warning(f"No journaled snapshot for cycle {cycle_id}, cannot rebuild it")
+    else:
+        logger.debug(f"Rebuilt cycle {cycle_id} from {len(events)} journaled events")
+    return cycle
+
+
+def cycle_differences(rebuilt: DcaCycle, current: DcaCycle) -> List[str]:
+    """
+    Lists the fields on which a rebuilt cycle disagrees with the table.
+    
+    Args:
+        rebuilt: Cycle from rebuild_cycle()
+        current: The same cycle read from dca_cycles
+    
+    Returns:
+        List[str]: 'field: journal=<value> table=<value>' per differing field
+    """
+    differences = []
+    for f in fields(DcaCycle):
+        if f.name in _UNCOMPARED_FIELDS:
+            continue
+        journaled, stored = getattr(rebuilt, f.name), getattr(current, f.name)
+        if journaled != stored:
+            differences.append(f"{f.name}: journal={journaled} table={stored}")
+    return differences
+
+
+def checkpoint_cycles() -> int:
+    """
+    Journals a snapshot of the latest cycle of every asset.
+    
+    Called at startup so rebuilding an active cycle replays only the events
+    after the restart, and so cycles that began before the journal was
+    enabled can be rebuilt at all. Does nothing while the journal is stopped.
+    
+    Returns:
+        int: Number of snapshots journaled
+    
+    Raises:
+        mysql.connector.Error: If database query fails
+    """
+    if get_cycle_journal() is None:
+        return 0
+    
+    try:
+        query = f"""
+        SELECT {', '.join(f'c.{name}' for name in CYCLE_COLUMNS)}
+        FROM dca_cycles c
+        INNER JOIN (
+            SELECT asset_id, MAX(id) AS max_id
+            FROM dca_cycles
+            GROUP BY asset_id
+        ) latest ON c.id = latest.max_id
+        """
+        
+        results = execute_query(query, fetch_all=True) or []
+        for row in results:
+            record_cycle_event(row['id'], 'snapshot', row)
+        
+        logger.info(f"Journaled snapshots of {len(results)} latest cycles")
+        return len(results)
+    
+    except Error as e:
+        logger.error(f"Error journaling cycle snapshots: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error journaling cycle snapshots: {e}")
+        raise
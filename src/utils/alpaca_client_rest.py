@@ -7,12 +7,29 @@ This module provides functions to interact with Alpaca's REST API for:
 - Order placement, retrieval, and cancellation
 
 Uses the alpaca-py SDK and loads credentials from environment variables.
+
+Long-running processes can enable client reuse, so every call shares one
+TradingClient / CryptoHistoricalDataClient per credential set and its
+keep-alive HTTP session, instead of paying a TLS handshake per request.
+
+Processes can also install a request scheduler: a token bucket that keeps
+REST calls under the account rate limit, serves sells before buys before
+cancels before reads, and lets concurrent identical reads share one request.
 """
 
 import os
+import heapq
+import itertools
 import logging
-from typing import Optional
+import threading
+import time
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 from dotenv import load_dotenv
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import LimitOrderRequest, MarketOrderRequest
@@ -23,16 +40,397 @@ from alpaca.trading.models import TradeAccount, Order
 from alpaca.trading.models import Position
 from alpaca.common.exceptions import APIError
 
+from utils.latency import latency_tracker
+
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Default number of pooled HTTPS connections per client session. Should cover
+# the worker threads that can place orders or query Alpaca at the same time.
+DEFAULT_HTTP_POOL_MAXSIZE = 10
+
+# Process-wide client registry, keyed by (client kind, api key, secret, paper).
+# Disabled by default so one-shot scripts and tests get a fresh client per
+# call; main_app enables it at startup.
+_client_registry: Dict[Tuple, Any] = {}
+_client_registry_lock = threading.Lock()
+_client_reuse_enabled = False
+_http_pool_maxsize = DEFAULT_HTTP_POOL_MAXSIZE
+
+
+def set_client_reuse_enabled(enabled: bool, http_pool_maxsize: int = DEFAULT_HTTP_POOL_MAXSIZE) -> None:
+    """
+    Enable or disable sharing Alpaca REST clients across calls.
+    
+    Disabling the registry also closes and forgets every shared client.
+    
+    Args:
+        enabled: True to reuse one client (and HTTP session) per credential set
+        http_pool_maxsize: Maximum pooled HTTPS connections per client session
+    """
+    global _client_reuse_enabled, _http_pool_maxsize
+    
+    with _client_registry_lock:
+        _client_reuse_enabled = enabled
+        _http_pool_maxsize = max(1, http_pool_maxsize)
+        clients = list(_client_registry.values()) if not enabled else []
+        if not enabled:
+            _client_registry.clear()
+    
+    for client in clients:
+        _close_client_session(client)
+    
+    logger.info(f"Alpaca client reuse {'enabled' if enabled else 'disabled'}")
+
+
+def _tune_client_session(client: Any) -> None:
+    """
+    Size the client's HTTPS connection pool and retry failed connects.
+    
+    Only connection establishment is retried - a request that reached
+    Alpaca (e.g. an order submission) is never re-sent by the adapter.
+    alpaca-py's own 429 retries (sleeps on the calling thread, outside the
+    token bucket) are turned off, so the 429 reaches the request scheduler,
+    which counts it, backs off and retries.
+    
+    Args:
+        client: alpaca-py REST client owning a requests Session
+    """
+    session = getattr(client, '_session', None)
+    if not isinstance(session, Session):
+        return
+    
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=_http_pool_maxsize,
+        max_retries=Retry(total=2, connect=2, read=0, redirect=0, status=0, other=0)
+    )
+    session.mount('https://', adapter)
+    if hasattr(client, '_retry'):
+        client._retry = 0
+
+
+def _close_client_session(client: Any) -> None:
+    """Close a client's HTTP session, releasing its pooled connections."""
+    session = getattr(client, '_session', None)
+    if isinstance(session, Session):
+        try:
+            session.close()
+        except Exception as e:
+            logger.debug(f"Error closing Alpaca client session: {e}")
+
+
+def _get_shared_client(key: Tuple, factory: Callable[[], Any]) -> Any:
+    """
+    Return the registered client for key, creating it on first use.
+    
+    Args:
+        key: Registry key identifying the client kind and credentials
+        factory: Callable that builds a new client
+        
+    Returns:
+        Shared client, or a new unshared client if reuse is disabled
+    """
+    if not _client_reuse_enabled:
+        return factory()
+    
+    with _client_registry_lock:
+        client = _client_registry.get(key)
+        if client is None:
+            client = factory()
+            _tune_client_session(client)
+            _client_registry[key] = client
+        return client
+
+
+class RequestPriority(IntEnum):
+    """Scheduling priority of an Alpaca REST request (lower is served first)."""
+    SELL = 0
+    BUY = 1
+    CANCEL = 2
+    READ = 3
+
+
+class AlpacaRequestScheduler:
+    """
+    Token-bucket rate limiter with priority queueing and read coalescing.
+    
+    Callers run on many threads and block in execute() until a token is
+    available and no higher-priority request is waiting; the request itself
+    runs on the caller's thread. Concurrent calls with the same coalesce_key
+    share a single in-flight request and its result.
+    
+    A request answered with 429 empties the bucket for every caller for
+    rate_limit_backoff_seconds and is then re-queued, up to
+    rate_limit_retries times. Alpaca rejects a rate-limited request before
+    acting on it, so re-sending an order is safe.
+    """
+    
+    def __init__(self, requests_per_minute: int = 180, burst: int = 10,
+                 rate_limit_retries: int = 3, rate_limit_backoff_seconds: float = 3.0):
+        """
+        Initialize the scheduler with a full bucket.
+        
+        Args:
+            requests_per_minute: Sustained request rate for this process
+            burst: Bucket capacity (requests that may be sent back to back)
+            rate_limit_retries: Times a request answered with 429 is re-queued
+            rate_limit_backoff_seconds: Pause for all requests after a 429
+        """
+        if requests_per_minute < 1:
+            raise ValueError("requests_per_minute must be at least 1")
+        
+        self.requests_per_minute = requests_per_minute
+        self.burst = max(1, burst)
+        self.rate_limit_retries = max(0, rate_limit_retries)
+        self.rate_limit_backoff_seconds = max(0.0, rate_limit_backoff_seconds)
+        self._rate_per_second = requests_per_minute / 60.0
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        
+        self._condition = threading.Condition()
+        self._waiters: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        
+        self._inflight: Dict[Hashable, Future] = {}
+        self._inflight_lock = threading.Lock()
+        
+        self._stats = {
+            priority.name.lower(): {
+                'requests': 0, 'coalesced': 0, 'waits': 0,
+                'wait_seconds_total': 0.0, 'wait_seconds_max': 0.0, 'rate_limited': 0
+            }
+            for priority in RequestPriority
+        }
+    
+    def execute(
+        self,
+        priority: RequestPriority,
+        func: Callable[..., Any],
+        *args: Any,
+        coalesce_key: Optional[Hashable] = None,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Run a REST call once the rate limit and queue priority allow.
+        
+        Args:
+            priority: RequestPriority of the call
+            func: Client method to call
+            *args: Positional arguments for func
+            coalesce_key: Key identifying an idempotent read; concurrent calls
+                with the same key share one request
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            Whatever func returns
+            
+        Raises:
+            Exception: Whatever func raises (shared by coalesced callers)
+        """
+        if coalesce_key is None:
+            return self._run(priority, func, args, kwargs)
+        
+        with self._inflight_lock:
+            future = self._inflight.get(coalesce_key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[coalesce_key] = future
+        
+        if not leader:
+            with self._condition:
+                self._stats[priority.name.lower()]['coalesced'] += 1
+            return future.result()
+        
+        try:
+            result = self._run(priority, func, args, kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(coalesce_key, None)
+    
+    def _run(self, priority: RequestPriority, func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        """Wait for a token, then call func and record the outcome; re-queue on 429."""
+        for attempt in range(self.rate_limit_retries + 1):
+            wait_seconds = self._acquire_token(priority)
+            
+            with self._condition:
+                stats = self._stats[priority.name.lower()]
+                stats['requests'] += 1
+                stats['wait_seconds_total'] += wait_seconds
+                stats['wait_seconds_max'] = max(stats['wait_seconds_max'], wait_seconds)
+                if wait_seconds > 0.001:
+                    stats['waits'] += 1
+            
+            try:
+                return func(*args, **kwargs)
+            except APIError as e:
+                if getattr(e, 'status_code', None) != 429:
+                    raise
+                with self._condition:
+                    self._stats[priority.name.lower()]['rate_limited'] += 1
+                    self._back_off()
+                if attempt == self.rate_limit_retries:
+                    logger.error(f"Alpaca rate limit hit {attempt + 1} times, giving up ({priority.name} request)")
+                    raise
+                logger.warning(f"Alpaca rate limit hit despite scheduling ({priority.name} request), "
+                               f"retrying in {self.rate_limit_backoff_seconds:g}s")
+    
+    def _back_off(self) -> None:
+        """Empty the bucket so the next token is rate_limit_backoff_seconds away. Caller holds the lock."""
+        self._refill(time.monotonic())
+        self._tokens = min(self._tokens, 1 - self.rate_limit_backoff_seconds * self._rate_per_second)
+        self._condition.notify_all()
+    
+    def _refill(self, now: float) -> None:
+        """Add tokens for the time elapsed since the last refill. Caller holds the lock."""
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(float(self.burst), self._tokens + elapsed * self._rate_per_second)
+            self._last_refill = now
+    
+    def _acquire_token(self, priority: RequestPriority) -> float:
+        """
+        Block until this request is at the head of the queue and a token is free.
+        
+        Args:
+            priority: RequestPriority of the request
+            
+        Returns:
+            Seconds spent waiting
+        """
+        start = time.monotonic()
+        ticket = (int(priority), next(self._sequence))
+        
+        with self._condition:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    self._refill(time.monotonic())
+                    at_head = self._waiters[0] == ticket
+                    if at_head and self._tokens >= 1:
+                        heapq.heappop(self._waiters)
+                        self._tokens -= 1
+                        break
+                    # Only the head waits on the clock; the rest wait to be promoted
+                    timeout = (1 - self._tokens) / self._rate_per_second if at_head else None
+                    self._condition.wait(timeout)
+            except BaseException:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                raise
+            finally:
+                # Let the next request in line start its own timed wait
+                self._condition.notify_all()
+        
+        return time.monotonic() - start
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get per-priority request, coalescing and queue-wait counters.
+        
+        Returns:
+            Dictionary keyed by priority name plus 'queued' and 'tokens'
+        """
+        with self._condition:
+            self._refill(time.monotonic())
+            stats: Dict[str, Any] = {name: dict(counts) for name, counts in self._stats.items()}
+            stats['queued'] = len(self._waiters)
+            stats['tokens'] = self._tokens
+        for name in RequestPriority:
+            counts = stats[name.name.lower()]
+            counts['wait_seconds_avg'] = counts['wait_seconds_total'] / counts['requests'] if counts['requests'] else 0.0
+        return stats
+    
+    def log_summary(self) -> None:
+        """Log request and queue-wait counters per priority."""
+        stats = self.get_stats()
+        for priority in RequestPriority:
+            counts = stats[priority.name.lower()]
+            if not counts['requests'] and not counts['coalesced']:
+                continue
+            logger.info(f"Alpaca {priority.name} requests: sent={counts['requests']}, coalesced={counts['coalesced']}, "
+                        f"avg_wait={counts['wait_seconds_avg'] * 1000:.1f}ms, "
+                        f"max_wait={counts['wait_seconds_max'] * 1000:.1f}ms, rate_limited={counts['rate_limited']}")
+
+
+_request_scheduler: Optional[AlpacaRequestScheduler] = None
+
+
+def configure_request_scheduler(requests_per_minute: int = 180, burst: int = 10) -> AlpacaRequestScheduler:
+    """
+    Route this process's Alpaca REST calls through a shared request scheduler.
+    
+    The budget is per process: a bucket can send requests_per_minute + burst
+    in any minute, and those amounts for main_app and every caretaker that
+    may run at the same time must add up to less than the account limit
+    (200/minute).
+    
+    Args:
+        requests_per_minute: Sustained request rate for this process
+        burst: Requests that may be sent back to back
+        
+    Returns:
+        AlpacaRequestScheduler: The installed scheduler
+    """
+    global _request_scheduler
+    _request_scheduler = AlpacaRequestScheduler(requests_per_minute=requests_per_minute, burst=burst)
+    logger.info(f"Alpaca request scheduler enabled ({requests_per_minute}/min, burst {burst})")
+    return _request_scheduler
+
+
+def disable_request_scheduler() -> None:
+    """Send Alpaca REST calls directly again."""
+    global _request_scheduler
+    _request_scheduler = None
+
+
+def get_request_scheduler() -> Optional[AlpacaRequestScheduler]:
+    """Return the installed request scheduler, or None if calls go out directly."""
+    return _request_scheduler
+
+
+def scheduled_request(
+    priority: RequestPriority,
+    func: Callable[..., Any],
+    *args: Any,
+    coalesce_key: Optional[Hashable] = None,
+    **kwargs: Any
+) -> Any:
+    """
+    Call an Alpaca client method through the request scheduler, if installed.
+    
+    Args:
+        priority: RequestPriority of the call
+        func: Client method to call
+        *args: Positional arguments for func
+        coalesce_key: Key for sharing identical concurrent reads (reads only)
+        **kwargs: Keyword arguments for func
+        
+    Returns:
+        Whatever func returns
+    """
+    with latency_tracker.timer(f"rest_{priority.name.lower()}"):
+        scheduler = _request_scheduler
+        if scheduler is None:
+            return func(*args, **kwargs)
+        return scheduler.execute(priority, func, *args, coalesce_key=coalesce_key, **kwargs)
+
 
 def get_trading_client() -> TradingClient:
     """
     Initialize and return an Alpaca TradingClient using credentials from .env
     
+    When client reuse is enabled, the same client is returned on every call.
+    
     Returns:
         TradingClient: Initialized Alpaca trading client
         
@@ -49,15 +447,67 @@ def get_trading_client() -> TradingClient:
     # Determine if this is paper trading
     paper = 'paper-api' in base_url
     
-    logger.info(f"Initializing Alpaca TradingClient (paper={paper})")
+    def create_client() -> TradingClient:
+        logger.info(f"Initializing Alpaca TradingClient (paper={paper})")
+        return TradingClient(
+            api_key=api_key,
+            secret_key=api_secret,
+            paper=paper
+        )
+    
+    return _get_shared_client(('trading', api_key, api_secret, paper), create_client)
+
+
+def get_crypto_data_client(
+    api_key: Optional[str] = None,
+    secret_key: Optional[str] = None
+) -> CryptoHistoricalDataClient:
+    """
+    Return a CryptoHistoricalDataClient, shared when client reuse is enabled.
     
-    return TradingClient(
-        api_key=api_key,
-        secret_key=api_secret,
-        paper=paper
+    Args:
+        api_key: Optional API key (if not provided, fetched from environment)
+        secret_key: Optional secret key (if not provided, fetched from environment)
+        
+    Returns:
+        CryptoHistoricalDataClient: Market data client
+    """
+    if api_key is None:
+        api_key = os.getenv('APCA_API_KEY_ID')
+    if secret_key is None:
+        secret_key = os.getenv('APCA_API_SECRET_KEY')
+    
+    # CryptoHistoricalDataClient doesn't use paper parameter
+    # It automatically determines the correct endpoint based on API keys
+    return _get_shared_client(
+        ('crypto_data', api_key, secret_key, None),
+        lambda: CryptoHistoricalDataClient(api_key=api_key, secret_key=secret_key)
     )
 
 
+def keep_alive_clients() -> int:
+    """
+    Send a lightweight request on each shared TradingClient.
+    
+    Keeps the pooled HTTPS connection from idling out, so the next order
+    submission reuses an established TLS session.
+    
+    Returns:
+        int: Number of clients successfully pinged
+    """
+    with _client_registry_lock:
+        clients = [client for key, client in _client_registry.items() if key[0] == 'trading']
+    
+    pinged = 0
+    for client in clients:
+        try:
+            scheduled_request(RequestPriority.READ, client.get_clock, coalesce_key=('clock', id(client)))
+            pinged += 1
+        except Exception as e:
+            logger.debug(f"Alpaca keep-alive request failed: {e}")
+    return pinged
+
+
 def get_account_info(client: TradingClient) -> Optional[TradeAccount]:
     """
     Fetch account information from Alpaca
@@ -69,7 +519,7 @@ def get_account_info(client: TradingClient) -> Optional[TradeAccount]:
         TradeAccount object or None if error occurs
     """
     try:
-        account = client.get_account()
+        account = scheduled_request(RequestPriority.READ, client.get_account, coalesce_key=('account', id(client)))
         logger.info(f"Account retrieved: {account.account_number}")
         return account
     except APIError as e:
@@ -148,20 +598,13 @@ def get_latest_crypto_price(
     """
     try:
         # Use provided keys or fall back to environment variables
-        if api_key is None:
-            api_key = os.getenv('APCA_API_KEY_ID')
-        if secret_key is None:
-            secret_key = os.getenv('APCA_API_SECRET_KEY')
-        
-        # CryptoHistoricalDataClient doesn't use paper parameter
-        # It automatically determines the correct endpoint based on API keys
-        crypto_client = CryptoHistoricalDataClient(
-            api_key=api_key,
-            secret_key=secret_key
-        )
+        crypto_client = get_crypto_data_client(api_key, secret_key)
         
         request = CryptoLatestTradeRequest(symbol_or_symbols=symbol)
-        latest_trade = crypto_client.get_crypto_latest_trade(request)
+        latest_trade = scheduled_request(
+            RequestPriority.READ, crypto_client.get_crypto_latest_trade, request,
+            coalesce_key=('latest_trade', id(crypto_client), symbol)
+        )
         
         if symbol in latest_trade:
             price = float(latest_trade[symbol].price)
@@ -201,20 +644,13 @@ def get_latest_crypto_quote(
     """
     try:
         # Use provided keys or fall back to environment variables
-        if api_key is None:
-            api_key = os.getenv('APCA_API_KEY_ID')
-        if secret_key is None:
-            secret_key = os.getenv('APCA_API_SECRET_KEY')
-        
-        # CryptoHistoricalDataClient doesn't use paper parameter
-        # It automatically determines the correct endpoint based on API keys
-        crypto_client = CryptoHistoricalDataClient(
-            api_key=api_key,
-            secret_key=secret_key
-        )
+        crypto_client = get_crypto_data_client(api_key, secret_key)
         
         request = CryptoLatestQuoteRequest(symbol_or_symbols=symbol)
-        latest_quote = crypto_client.get_crypto_latest_quote(request)
+        latest_quote = scheduled_request(
+            RequestPriority.READ, crypto_client.get_crypto_latest_quote, request,
+            coalesce_key=('latest_quote', id(crypto_client), symbol)
+        )
         
         if symbol in latest_quote:
             quote = latest_quote[symbol]
@@ -297,7 +733,7 @@ def place_limit_buy_order(
             limit_price=limit_price
         )
         
-        order = client.submit_order(order_request)
+        order = scheduled_request(RequestPriority.BUY, client.submit_order, order_request)
         logger.info(f"Limit BUY order placed: {order.id} for {qty} {symbol} @ ${limit_price}")
         return order
         
@@ -361,7 +797,7 @@ def place_market_sell_order(
             time_in_force=tif_enum
         )
         
-        order = client.submit_order(order_request)
+        order = scheduled_request(RequestPriority.SELL, client.submit_order, order_request)
         logger.info(f"Market SELL order placed: {order.id} for {qty} {symbol}")
         return order
         
@@ -388,7 +824,7 @@ def get_open_orders(client: TradingClient) -> list[Order]:
         List of Order objects (empty list if error or no orders)
     """
     try:
-        orders = client.get_orders()
+        orders = scheduled_request(RequestPriority.READ, client.get_orders, coalesce_key=('open_orders', id(client)))
         logger.info(f"Retrieved {len(orders)} open orders")
         return orders
     except APIError as e:
@@ -411,7 +847,8 @@ def get_order(client: TradingClient, order_id: str) -> Optional[Order]:
         Order object if found, None if error or not found
     """
     try:
-        order = client.get_order_by_id(order_id)
+        order = scheduled_request(RequestPriority.READ, client.get_order_by_id, order_id,
+                                  coalesce_key=('order', id(client), str(order_id)))
         logger.debug(f"Retrieved order {order_id}: {order.status}")
         return order
     except APIError as e:
@@ -434,7 +871,7 @@ def cancel_order(client: TradingClient, order_id: str) -> bool:
         True if cancellation successful/acknowledged, False if error
     """
     try:
-        client.cancel_order_by_id(order_id)
+        scheduled_request(RequestPriority.CANCEL, client.cancel_order_by_id, order_id)
         logger.info(f"Order {order_id} cancellation requested")
         return True
     except APIError as e:
@@ -456,7 +893,8 @@ def get_positions(client: TradingClient) -> list[Position]:
         List of Position objects (empty list if error or no positions)
     """
     try:
-        positions = client.get_all_positions()
+        positions = scheduled_request(RequestPriority.READ, client.get_all_positions,
+                                      coalesce_key=('positions', id(client)))
         logger.info(f"Retrieved {len(positions)} positions")
         return positions
     except APIError as e:
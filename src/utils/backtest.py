@@ -0,0 +1,569 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - Backtesting Engine
+
+Replays historical quotes (or bars) for one asset through the same base,
+safety, take-profit and TTP rules the live bot applies, against a simulated
+broker, so DcaAsset settings can be evaluated before they are enabled:
+
+    prices = load_price_csv('data/BTCUSD_1m.csv', spread_percent=0.05)
+    result = run_backtest(asset_config, prices)
+    print(result.summary()['total_realized_pl'])
+
+Most quotes cross no trigger price, so instead of evaluating every quote the
+engine uses the trigger index's levels for the current cycle state and
+finds the next quote that crosses one with a NumPy scan. Only that quote is
+evaluated, with dca_rules.decide_quote_action - the function main_app's
+quote checks act on; while TTP is trailing, peaks and the sell trigger are
+found with a running maximum.
+
+Features:
+- Trigger levels and decisions shared with main_app (compute_trigger_levels,
+  decide_quote_action)
+- Vectorized crossing scans; months of minute data per asset in well under a second
+- Simulated broker: limit buys fill at the ask, market sells at the bid,
+  optional fee percentage
+- Cooldown between cycles (cooldown_period seconds after each sell)
+- Per-cycle P/L computed like analyze_pl.py (quantity * (sell - average))
+- CSV loader for bid/ask quotes, single prices or OHLC bars
+- Loader for quote_recorder files and directories
+"""
+
+import csv
+import dataclasses
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from models.asset_config import DcaAsset
+from utils.quote_recorder import COMPRESSED_SUFFIX, RAW_SUFFIX, load_quote_file, load_recorded_quotes
+from utils.dca_rules import decide_quote_action, safety_trigger_price
+from utils.trigger_index import TRIGGER_TOLERANCE, compute_trigger_levels
+
+logger = logging.getLogger(__name__)
+
+# Quotes scanned per NumPy pass; grows while nothing is found
+SCAN_CHUNK_MIN = 1024
+SCAN_CHUNK_MAX = 1 << 16
+
+
+@dataclass
+class PriceSeries:
+    """Bid/ask quotes for one asset, in time order (timestamps in epoch seconds)."""
+    timestamps: np.ndarray
+    bid: np.ndarray
+    ask: np.ndarray
+
+    def __post_init__(self):
+        self.timestamps = np.ascontiguousarray(self.timestamps, dtype=np.float64)
+        self.bid = np.ascontiguousarray(self.bid, dtype=np.float64)
+        self.ask = np.ascontiguousarray(self.ask, dtype=np.float64)
+        if not (len(self.timestamps) == len(self.bid) == len(self.ask)):
+            raise ValueError("timestamps, bid and ask must have the same length")
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_prices(cls, timestamps, prices, spread_percent: float = 0.0) -> 'PriceSeries':
+        """
+        Build quotes from single prices (e.g. trades or bar closes).
+
+        Args:
+            timestamps: Epoch seconds
+            prices: Prices
+            spread_percent: Full bid/ask spread to assume around each price
+
+        Returns:
+            PriceSeries with bid/ask spread_percent / 2 below/above each price
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        half_spread = spread_percent / 200.0
+        return cls(timestamps, prices * (1 - half_spread), prices * (1 + half_spread))
+
+    @classmethod
+    def from_bars(cls, timestamps, open_, high, low, close, spread_percent: float = 0.0,
+                  bar_seconds: Optional[float] = None) -> 'PriceSeries':
+        """
+        Build quotes from OHLC bars, four per bar.
+
+        Each bar becomes open -> low -> high -> close for an up bar and
+        open -> high -> low -> close for a down bar, so intrabar safety and
+        take-profit crossings are seen in a plausible order.
+
+        Args:
+            timestamps: Bar start times in epoch seconds
+            open_, high, low, close: Bar prices
+            spread_percent: Full bid/ask spread to assume around each price
+            bar_seconds: Bar length (default: median spacing of timestamps, or 60)
+
+        Returns:
+            PriceSeries with 4 quotes per bar
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        open_, high, low, close = (np.asarray(a, dtype=np.float64) for a in (open_, high, low, close))
+        if bar_seconds is None:
+            bar_seconds = float(np.median(np.diff(timestamps))) if len(timestamps) > 1 else 60.0
+
+        up = close >= open_
+        path = np.empty((len(timestamps), 4))
+        path[:, 0] = open_
+        path[:, 1] = np.where(up, low, high)
+        path[:, 2] = np.where(up, high, low)
+        path[:, 3] = close
+        times = timestamps[:, None] + np.arange(4) * (bar_seconds / 4.0)
+        return cls.from_prices(times.ravel(), path.ravel(), spread_percent)
+
+
+def _parse_timestamp(value: str) -> float:
+    """Epoch seconds from a number or an ISO 8601 string (naive times are UTC)."""
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value.strip())
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+
+def load_price_csv(path: Union[str, Path], spread_percent: float = 0.0) -> PriceSeries:
+    """
+    Load quotes or bars from a CSV file with a header row.
+
+    Recognized layouts (column names are case-insensitive):
+    - timestamp, bid, ask: quotes, used as-is
+    - timestamp, open, high, low, close: bars, expanded with from_bars()
+    - timestamp, price (or close): single prices, expanded with from_prices()
+
+    Args:
+        path: CSV file
+        spread_percent: Spread to assume when the file has no bid/ask
+
+    Returns:
+        PriceSeries sorted by time
+
+    Raises:
+        ValueError: If the columns are not recognized
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = [name.strip().lower() for name in next(reader, [])]
+        rows = [row for row in reader if row]
+
+    if not rows:
+        raise ValueError(f"{path}: no price rows")
+
+    columns = {name: index for index, name in enumerate(header)}
+    time_column = next((columns[name] for name in ('timestamp', 'time', 't') if name in columns), None)
+    if time_column is None:
+        raise ValueError(f"{path}: no timestamp column in {header}")
+
+    timestamps = np.array([_parse_timestamp(row[time_column]) for row in rows], dtype=np.float64)
+    order = np.argsort(timestamps, kind='stable')
+
+    def column(name: str) -> np.ndarray:
+        return np.array([row[columns[name]] for row in rows], dtype=np.float64)[order]
+
+    timestamps = timestamps[order]
+    if 'bid' in columns and 'ask' in columns:
+        return PriceSeries(timestamps, column('bid'), column('ask'))
+    if all(name in columns for name in ('open', 'high', 'low', 'close')):
+        return PriceSeries.from_bars(timestamps, column('open'), column('high'), column('low'),
+                                     column('close'), spread_percent)
+    for name in ('price', 'close'):
+        if name in columns:
+            return PriceSeries.from_prices(timestamps, column(name), spread_percent)
+    raise ValueError(f"{path}: expected bid/ask, open/high/low/close or price columns, got {header}")
+
+
+def load_price_file(path: Union[str, Path], spread_percent: float = 0.0, symbol: Optional[str] = None) -> PriceSeries:
+    """
+    Load prices from a CSV file or from quotes written by the quote recorder.
+
+    Args:
+        path: CSV file, recorded .quotes/.quotes.gz file, or the recorder
+            directory (all recorded days for symbol)
+        spread_percent: Spread to assume when a CSV file has no bid/ask
+        symbol: Symbol to load when path is the recorder directory
+
+    Returns:
+        PriceSeries sorted by time
+
+    Raises:
+        ValueError: If nothing could be loaded
+    """
+    path = Path(path)
+    if path.is_dir():
+        if symbol is None:
+            raise ValueError(f"{path}: a symbol is required to load a recorder directory")
+        quotes = load_recorded_quotes(path, symbol)
+    elif path.name.endswith((RAW_SUFFIX, COMPRESSED_SUFFIX)):
+        quotes = load_quote_file(path)
+        quotes = quotes[np.argsort(quotes['timestamp'], kind='stable')]
+    else:
+        return load_price_csv(path, spread_percent)
+
+    if len(quotes) == 0:
+        raise ValueError(f"{path}: no recorded quotes{f' for {symbol}' if symbol else ''}")
+    return PriceSeries(quotes['timestamp'], quotes['bid'], quotes['ask'])
+
+
+def default_asset_config(symbol: str, **overrides: Any) -> DcaAsset:
+    """
+    DcaAsset with the dca_assets column defaults, for backtests without a database.
+
+    Args:
+        symbol: Asset symbol (e.g. 'BTC/USD')
+        **overrides: DcaAsset fields to change (e.g. take_profit_percent=Decimal('1.5'))
+
+    Returns:
+        DcaAsset
+    """
+    now = datetime.now(timezone.utc)
+    asset = DcaAsset(
+        id=0, asset_symbol=symbol, is_enabled=True,
+        base_order_amount=Decimal('10'), safety_order_amount=Decimal('20'),
+        max_safety_orders=15, safety_order_deviation=Decimal('0.9'),
+        take_profit_percent=Decimal('2'), ttp_enabled=True, ttp_deviation_percent=Decimal('1'),
+        cooldown_period=120, buy_order_price_deviation_percent=Decimal('1'),
+        last_sell_price=None, created_at=now, updated_at=now
+    )
+    return dataclasses.replace(asset, **overrides) if overrides else asset
+
+
+@dataclass
+class _SimCycle:
+    """The DcaCycle fields the decision rules read, plus bookkeeping for the result."""
+    status: str = 'watching'
+    quantity: Decimal = Decimal('0')
+    average_purchase_price: Decimal = Decimal('0')
+    safety_orders: int = 0
+    last_order_fill_price: Optional[Decimal] = None
+    highest_trailing_price: Optional[Decimal] = None
+    opened_at: Optional[float] = None
+    fees: Decimal = Decimal('0')
+
+
+@dataclass
+class BacktestCycle:
+    """One simulated cycle, from base order fill to sell (or still open)."""
+    number: int
+    opened_at: float
+    closed_at: Optional[float]
+    quantity: Decimal
+    average_purchase_price: Decimal
+    safety_orders: int
+    sell_price: Optional[Decimal]
+    exit_reason: Optional[str]  # 'take_profit', 'ttp' or None while open
+    fees: Decimal = Decimal('0')
+
+    @property
+    def invested(self) -> Decimal:
+        """Cost basis (quantity * average purchase price), as in analyze_pl.py."""
+        return self.quantity * self.average_purchase_price
+
+    @property
+    def realized_pl(self) -> Decimal:
+        """quantity * (sell_price - average_purchase_price) less fees; 0 while open."""
+        if self.sell_price is None:
+            return Decimal('0')
+        return self.quantity * (self.sell_price - self.average_purchase_price) - self.fees
+
+    @property
+    def pl_percent(self) -> Decimal:
+        """Realized P/L as a percentage of the cost basis."""
+        invested = self.invested
+        return self.realized_pl / invested * 100 if invested > 0 else Decimal('0')
+
+
+@dataclass
+class BacktestResult:
+    """Completed cycles, the open cycle (if any) and run counters."""
+    symbol: str
+    cycles: List[BacktestCycle]
+    open_cycle: Optional[BacktestCycle]
+    last_bid: Optional[float]
+    quotes: int
+    actions: Dict[str, int] = field(default_factory=dict)
+    elapsed_seconds: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Totals comparable to analyze_pl.py's completed-cycle analysis.
+
+        Returns:
+            Dictionary with total_cycles, total_invested, avg_invested_per_cycle,
+            total_realized_pl, roi_percent, total_fees, safety_orders,
+            open_quantity and open_unrealized_pl
+        """
+        total_invested = sum((c.invested for c in self.cycles), Decimal('0'))
+        total_realized_pl = sum((c.realized_pl for c in self.cycles), Decimal('0'))
+        total_cycles = len(self.cycles)
+
+        open_unrealized_pl = Decimal('0')
+        if self.open_cycle is not None and self.last_bid is not None:
+            open_unrealized_pl = self.open_cycle.quantity * (Decimal(str(self.last_bid)) - self.open_cycle.average_purchase_price)
+
+        return {
+            'total_cycles': total_cycles,
+            'total_invested': total_invested,
+            'avg_invested_per_cycle': total_invested / total_cycles if total_cycles else Decimal('0'),
+            'total_realized_pl': total_realized_pl,
+            'roi_percent': total_realized_pl / total_invested * 100 if total_invested > 0 else Decimal('0'),
+            'total_fees': sum((c.fees for c in self.cycles), Decimal('0')),
+            'safety_orders': sum(c.safety_orders for c in self.cycles),
+            'open_quantity': self.open_cycle.quantity if self.open_cycle else Decimal('0'),
+            'open_unrealized_pl': open_unrealized_pl,
+        }
+
+
+class DcaBacktester:
+    """
+    Simulates one asset's DCA cycles over a PriceSeries.
+
+    Orders fill on the quote that triggers them: base and safety limit buys
+    at the ask (the live limit price), take-profit and TTP market sells at
+    the bid. Broker-side checks that only matter live (existing positions,
+    minimum order size, the order cooldown guard) are not simulated.
+    """
+
+    def __init__(self, asset_config: DcaAsset, prices: PriceSeries, fee_percent: Decimal = Decimal('0')):
+        """
+        Initialize the backtester.
+
+        Args:
+            asset_config: Settings to test
+            prices: Quotes to replay
+            fee_percent: Fee charged on each fill's notional, in percent
+        """
+        self.asset_config = asset_config
+        self.prices = prices
+        self.fee_rate = Decimal(str(fee_percent)) / Decimal('100')
+
+    def run(self, vectorized: bool = True) -> BacktestResult:
+        """
+        Replay every quote.
+
+        Args:
+            vectorized: Scan for trigger crossings with NumPy (False evaluates
+                every quote, which is slower but useful as a reference)
+
+        Returns:
+            BacktestResult
+        """
+        started = time.perf_counter()
+        self._cycle = _SimCycle()
+        self._cycles: List[BacktestCycle] = []
+        self._actions: Dict[str, int] = {}
+        self._cooldown_until = -np.inf
+
+        if vectorized:
+            self._run_vectorized()
+        else:
+            self._run_per_quote()
+
+        cycle = self._cycle
+        open_cycle = None
+        if cycle.quantity > 0:
+            open_cycle = self._to_result(cycle, None, None, None)
+        return BacktestResult(
+            symbol=self.asset_config.asset_symbol,
+            cycles=self._cycles,
+            open_cycle=open_cycle,
+            last_bid=float(self.prices.bid[-1]) if len(self.prices) else None,
+            quotes=len(self.prices),
+            actions=dict(self._actions),
+            elapsed_seconds=time.perf_counter() - started,
+        )
+
+    def _run_per_quote(self) -> None:
+        """Evaluate every quote, exactly as the live handler would."""
+        timestamps, bid, ask = self.prices.timestamps, self.prices.bid, self.prices.ask
+        for index in range(len(self.prices)):
+            if self._cycle.status == 'cooldown':
+                if timestamps[index] < self._cooldown_until:
+                    continue
+                self._cycle.status = 'watching'
+            action = decide_quote_action(self.asset_config, self._cycle, float(bid[index]), float(ask[index]))
+            if action:
+                self._apply(action, index)
+
+    def _run_vectorized(self) -> None:
+        """Jump from one trigger crossing to the next."""
+        asset = self.asset_config
+        count = len(self.prices)
+        index = 0
+        while index < count:
+            cycle = self._cycle
+            if cycle.status == 'cooldown':
+                index = max(index, int(np.searchsorted(self.prices.timestamps, self._cooldown_until, side='left')))
+                cycle.status = 'watching'
+                continue
+            if cycle.status == 'trailing' and asset.ttp_enabled:
+                index = self._scan_trailing(index)
+                continue
+
+            crossing = self._next_crossing(compute_trigger_levels(asset, cycle), index)
+            if crossing is None:
+                break
+            action = decide_quote_action(asset, cycle, float(self.prices.bid[crossing]), float(self.prices.ask[crossing]))
+            if action:
+                self._apply(action, crossing)
+            index = crossing + 1
+
+    def _next_crossing(self, levels, start: int) -> Optional[int]:
+        """First quote at or after start that crosses a trigger level, or None."""
+        count = len(self.prices)
+        if levels.always:
+            return start if start < count else None
+
+        chunk = SCAN_CHUNK_MIN
+        while start < count:
+            end = min(count, start + chunk)
+            bid = self.prices.bid[start:end]
+            ask = self.prices.ask[start:end]
+            hits = np.flatnonzero((ask <= levels.ask_at_or_below)
+                                  | (bid >= levels.bid_at_or_above)
+                                  | (bid < levels.bid_below))
+            if hits.size:
+                return start + int(hits[0])
+            start = end
+            chunk = min(chunk * 2, SCAN_CHUNK_MAX)
+        return None
+
+    def _scan_trailing(self, start: int) -> int:
+        """
+        Follow a trailing take-profit from start until it sells.
+
+        The peak a quote is judged against is the running maximum of the
+        earlier bids (and the stored peak); the first quote whose bid drops
+        below peak * (1 - ttp_deviation) is confirmed with the Decimal rule.
+
+        Returns:
+            Index to continue from (len(prices) if the TTP never sells)
+        """
+        asset, cycle = self.asset_config, self._cycle
+        count = len(self.prices)
+        if asset.ttp_deviation_percent is None:
+            # The live bot logs an error and never sells
+            return count
+
+        sell_factor = (1 - float(asset.ttp_deviation_percent) / 100.0) * (1 + TRIGGER_TOLERANCE)
+        # A quote at the safety trigger blocks the take-profit check entirely
+        safety_price = safety_trigger_price(asset, cycle)
+        safety_level = float(safety_price) if safety_price is not None else -np.inf
+
+        peak_decimal = cycle.highest_trailing_price or Decimal('0')
+        peak_float = float(peak_decimal)
+        peak = peak_float
+
+        def peak_as_decimal(value: float) -> Decimal:
+            return peak_decimal if value == peak_float else Decimal(str(value))
+
+        chunk = SCAN_CHUNK_MIN
+        while start < count:
+            end = min(count, start + chunk)
+            bid = self.prices.bid[start:end]
+            active = self.prices.ask[start:end] > safety_level
+            running = np.maximum(np.maximum.accumulate(np.where(active, bid, -np.inf)), peak)
+            prior = np.empty_like(running)
+            prior[0] = peak
+            prior[1:] = running[:-1]
+
+            for hit in np.flatnonzero(active & (bid < prior * sell_factor)):
+                index = start + int(hit)
+                cycle.highest_trailing_price = peak_as_decimal(float(prior[hit]))
+                action = decide_quote_action(asset, cycle, float(bid[hit]), float(self.prices.ask[index]))
+                if action == 'ttp_sell':
+                    self._count('ttp_peak', int(np.count_nonzero(active[:hit] & (bid[:hit] > prior[:hit]))))
+                    self._apply(action, index)
+                    return index + 1
+
+            self._count('ttp_peak', int(np.count_nonzero(active & (bid > prior))))
+            peak = float(running[-1])
+            start = end
+            chunk = min(chunk * 2, SCAN_CHUNK_MAX)
+
+        cycle.highest_trailing_price = peak_as_decimal(peak)
+        return count
+
+    def _count(self, action: str, amount: int = 1) -> None:
+        """Add to an action counter."""
+        if amount:
+            self._actions[action] = self._actions.get(action, 0) + amount
+
+    def _apply(self, action: str, index: int) -> None:
+        """Apply a decision at a quote: fill an order or move the TTP state."""
+        asset, cycle = self.asset_config, self._cycle
+        bid_price = float(self.prices.bid[index])
+        ask_price = float(self.prices.ask[index])
+        self._count(action)
+
+        if action in ('base', 'safety'):
+            amount = asset.base_order_amount if action == 'base' else asset.safety_order_amount
+            # Same float sizing as the live order, filled at the limit (ask) price
+            filled_qty = Decimal(str(float(amount) / ask_price))
+            fill_price = Decimal(str(ask_price))
+            new_quantity = cycle.quantity + filled_qty
+            cycle.average_purchase_price = (
+                cycle.quantity * cycle.average_purchase_price + filled_qty * fill_price
+            ) / new_quantity
+            cycle.quantity = new_quantity
+            cycle.last_order_fill_price = fill_price
+            cycle.fees += filled_qty * fill_price * self.fee_rate
+            if action == 'base':
+                cycle.opened_at = float(self.prices.timestamps[index])
+            else:
+                cycle.safety_orders += 1
+
+        elif action in ('ttp_activate', 'ttp_peak'):
+            cycle.status = 'trailing'
+            cycle.highest_trailing_price = Decimal(str(bid_price))
+
+        elif action in ('take_profit', 'ttp_sell'):
+            sell_price = Decimal(str(bid_price))
+            cycle.fees += cycle.quantity * sell_price * self.fee_rate
+            closed_at = float(self.prices.timestamps[index])
+            exit_reason = 'ttp' if action == 'ttp_sell' else 'take_profit'
+            self._cycles.append(self._to_result(cycle, closed_at, sell_price, exit_reason))
+            self._cycle = _SimCycle(status='cooldown')
+            self._cooldown_until = closed_at + asset.cooldown_period
+
+    def _to_result(self, cycle: _SimCycle, closed_at: Optional[float], sell_price: Optional[Decimal],
+                   exit_reason: Optional[str]) -> BacktestCycle:
+        """Freeze a simulated cycle into a result row."""
+        return BacktestCycle(
+            number=len(self._cycles) + 1,
+            opened_at=cycle.opened_at,
+            closed_at=closed_at,
+            quantity=cycle.quantity,
+            average_purchase_price=cycle.average_purchase_price,
+            safety_orders=cycle.safety_orders,
+            sell_price=sell_price,
+            exit_reason=exit_reason,
+            fees=cycle.fees,
+        )
+
+
+def run_backtest(asset_config: DcaAsset, prices: PriceSeries, fee_percent: Decimal = Decimal('0')) -> BacktestResult:
+    """
+    Backtest one asset's settings over a price series.
+
+    Args:
+        asset_config: Settings to test
+        prices: Quotes to replay
+        fee_percent: Fee charged on each fill's notional, in percent
+
+    Returns:
+        BacktestResult
+    """
+    result = DcaBacktester(asset_config, prices, fee_percent).run()
+    logger.debug(f"Backtest {asset_config.asset_symbol}: {result.quotes} quotes, "
+                 f"{len(result.cycles)} cycles in {result.elapsed_seconds:.3f}s")
+    return result
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - Microbenchmarks
+
+Small timing framework for the trading hot paths, with a results history
+so a release can be compared against the previous one on the same machine.
+
+Cases are generator functions registered on a BenchmarkSuite. Code before
+the yield is setup, the yielded callable is what gets timed, and code after
+the yield is teardown:
+
+    suite = BenchmarkSuite()
+
+    @suite.case('formatting.format_price', group='formatting')
+    def bench_format_price():
+        yield lambda: format_price(Decimal('43210.5'))
+
+A case that changes state can yield (func, before); before() runs ahead of
+every timed call and is not counted, so each call starts from the same state.
+
+Features:
+- Self-calibrating loop counts; best, median and spread per call over several rounds
+- Results appended to a JSON-lines history file with commit and machine details
+- Comparison against the latest run from the same machine (or a labelled run)
+"""
+
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Target = Union[Callable[[], Any], Tuple[Callable[[], Any], Callable[[], Any]]]
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing of one benchmark case, per call."""
+    name: str
+    group: str
+    loops: int
+    rounds: int
+    best_ns: float
+    median_ns: float
+    mean_ns: float
+    stdev_ns: float
+
+    @property
+    def ops_per_second(self) -> float:
+        return 1e9 / self.best_ns if self.best_ns else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class BenchmarkComparison:
+    """One case's best time against the baseline run."""
+    name: str
+    baseline_ns: Optional[float]
+    current_ns: float
+    threshold_percent: float
+
+    @property
+    def change_percent(self) -> Optional[float]:
+        if not self.baseline_ns:
+            return None
+        return (self.current_ns - self.baseline_ns) / self.baseline_ns * 100
+
+    @property
+    def regressed(self) -> bool:
+        change = self.change_percent
+        return change is not None and change > self.threshold_percent
+
+
+@dataclass
+class _Case:
+    name: str
+    group: str
+    factory: Callable[[], Iterator[Target]]
+    description: str
+
+
+class BenchmarkSuite:
+    """Registry and runner for benchmark cases."""
+
+    def __init__(self):
+        self._cases: Dict[str, _Case] = {}
+
+    def case(self, name: str, group: str = 'default') -> Callable:
+        """
+        Register a generator function as a benchmark case.
+
+        Args:
+            name: Unique case name, dotted by area (e.g. 'models.DcaCycle.from_dict')
+            group: Group for filtering and reports
+
+        Returns:
+            Decorator
+        """
+        def register(factory: Callable[[], Iterator[Target]]) -> Callable[[], Iterator[Target]]:
+            if name in self._cases:
+                raise ValueError(f"Benchmark {name} is already registered")
+            description = (factory.__doc__ or '').strip().splitlines()
+            self._cases[name] = _Case(name, group, factory, description[0] if description else '')
+            return factory
+        return register
+
+    def names(self, patterns: Sequence[str] = ()) -> List[str]:
+        """
+        Case names in registration order.
+
+        Args:
+            patterns: Keep cases whose name or group contains any of these
+
+        Returns:
+            Case names
+        """
+        return [name for name, case in self._cases.items()
+                if not patterns or any(p in name or p == case.group for p in patterns)]
+
+    def describe(self, name: str) -> str:
+        """First docstring line of a case."""
+        return self._cases[name].description
+
+    def run(self, names: Optional[Sequence[str]] = None, min_time: float = 0.2, rounds: int = 5,
+            progress: Optional[Callable[[BenchmarkResult], None]] = None) -> List[BenchmarkResult]:
+        """
+        Run cases and time them.
+
+        Args:
+            names: Cases to run (default: all)
+            min_time: Target seconds per round
+            rounds: Timed rounds per case
+            progress: Called with each result as it completes
+
+        Returns:
+            BenchmarkResult list in run order
+        """
+        results = []
+        for name in names if names is not None else self.names():
+            case = self._cases[name]
+            generator = case.factory()
+            target = next(generator)
+            try:
+                func, before = target if isinstance(target, tuple) else (target, None)
+                loops, per_call = measure(func, before, min_time=min_time, rounds=rounds)
+            finally:
+                generator.close()
+            result = BenchmarkResult(
+                name=name, group=case.group, loops=loops, rounds=rounds,
+                best_ns=min(per_call), median_ns=statistics.median(per_call),
+                mean_ns=statistics.fmean(per_call),
+                stdev_ns=statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+            )
+            results.append(result)
+            if progress:
+                progress(result)
+        return results
+
+
+def measure(func: Callable[[], Any], before: Optional[Callable[[], Any]] = None,
+            min_time: float = 0.2, rounds: int = 5) -> Tuple[int, List[float]]:
+    """
+    Time a callable over several rounds.
+
+    The loop count grows (1, 2, 5, 10, 20, ...) until one round takes at
+    least min_time; that calibration doubles as warm-up.
+
+    Args:
+        func: Callable to time
+        before: Untimed callable run before every call
+        min_time: Target seconds per round
+        rounds: Timed rounds
+
+    Returns:
+        (loops per round, mean nanoseconds per call for each round)
+    """
+    if before is None:
+        def timed_round(loops: int) -> int:
+            started = time.perf_counter_ns()
+            for _ in range(loops):
+                func()
+            return time.perf_counter_ns() - started
+    else:
+        def timed_round(loops: int) -> int:
+            elapsed = 0
+            for _ in range(loops):
+                before()
+                started = time.perf_counter_ns()
+                func()
+                elapsed += time.perf_counter_ns() - started
+            return elapsed
+
+    def loop_counts() -> Iterator[int]:
+        scale = 1
+        while True:
+            for multiplier in (1, 2, 5):
+                yield scale * multiplier
+            scale *= 10
+
+    for loops in loop_counts():
+        if timed_round(loops) >= min_time * 1e9:
+            break
+
+    return loops, [timed_round(loops) / loops for _ in range(rounds)]
+
+
+def environment_info() -> Dict[str, Any]:
+    """
+    Describe the machine and interpreter results were measured on.
+
+    Returns:
+        Dictionary with host, platform, processor, CPU count and Python version
+    """
+    return {
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'implementation': sys.implementation.name,
+    }
+
+
+def _machine_key(environment: Dict[str, Any]) -> Tuple:
+    return tuple(environment.get(key) for key in ('host', 'platform', 'processor', 'python', 'implementation'))
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                timeout=5, cwd=Path(__file__).parent)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def save_run(path: Union[str, Path], results: Sequence[BenchmarkResult], label: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Append a run to the history file.
+
+    Args:
+        path: JSON-lines history file (created if missing)
+        results: Results of the run
+        label: Release or branch name to find the run by later
+
+    Returns:
+        The stored run record
+    """
+    run = {
+        'ts': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'label': label,
+        'commit': _git_commit(),
+        'environment': environment_info(),
+        'results': {result.name: result.to_dict() for result in results},
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run, sort_keys=True) + '\n')
+    return run
+
+
+def load_history(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """
+    Read stored runs, oldest first.
+
+    Args:
+        path: JSON-lines history file
+
+    Returns:
+        Run records; an empty list if the file does not exist
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+    runs = []
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                runs.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping unreadable benchmark history line {number} in {path}")
+    return runs
+
+
+def find_baseline(history: Sequence[Dict[str, Any]], label: Optional[str] = None,
+                  environment: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Pick the run to compare against.
+
+    Args:
+        history: Runs from load_history()
+        label: Use the latest run with this label (any machine)
+        environment: Otherwise, the latest run from this machine (default: this one)
+
+    Returns:
+        Run record, or None
+    """
+    if label is not None:
+        matches = [run for run in history if run.get('label') == label]
+    else:
+        key = _machine_key(environment or environment_info())
+        matches = [run for run in history if _machine_key(run.get('environment', {})) == key]
+    return matches[-1] if matches else None
+
+
+def compare(results: Sequence[BenchmarkResult], baseline: Optional[Dict[str, Any]],
+            threshold_percent: float = 10.0) -> List[BenchmarkComparison]:
+    """
+    Compare best times with a baseline run.
+
+    Best-of-rounds is used because it is the least sensitive to other load
+    on the machine.
+
+    Args:
+        results: Current results
+        baseline: Run record from find_baseline(), or None
+        threshold_percent: Slowdown beyond which a case counts as regressed
+
+    Returns:
+        BenchmarkComparison per result (baseline_ns None for new cases)
+    """
+    stored = (baseline or {}).get('results', {})
+    return [BenchmarkComparison(result.name, stored.get(result.name, {}).get('best_ns'),
+                                result.best_ns, threshold_percent)
+            for result in results]
+
+
+def format_duration(nanoseconds: Optional[float]) -> str:
+    """Format a per-call time with a readable unit."""
+    if nanoseconds is None:
+        return '-'
+    for unit, scale in (('s', 1e9), ('ms', 1e6), ('µs', 1e3)):
+        if nanoseconds >= scale:
+            return f"{nanoseconds / scale:.2f}{unit}"
+    return f"{nanoseconds:.0f}ns"
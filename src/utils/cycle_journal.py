@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - Cycle Event Journal
+
+dca_cycles holds only the current state of each cycle; update_cycle()
+overwrites it in place. The journal appends every change to the
+cycle_events table as well, so what happened in a cycle can be read back
+in order and the cycle's state rebuilt from a snapshot plus the events
+after it (see models/cycle_events.py).
+
+Each row carries the event type, the columns the event set ('changes') and
+optional context that is not cycle state ('details', e.g. the filled
+quantity of a partial fill):
+
+    created       full row as inserted (a snapshot)
+    snapshot      full row, written at startup as a replay checkpoint
+    order_placed  status, latest_order_id, latest_order_created_at
+    partial_fill  no changes; order id, filled quantity and price in details
+    fill          quantity, average price, safety order count, ...
+    cancel        order cleared, position synced from Alpaca
+    ttp_activate  status 'trailing' and the first peak
+    ttp_peak      highest_trailing_price (the highest per flush when buffered)
+    complete      status 'complete', completed_at, sell_price
+    reset         dust position written off to zero quantity
+    status/update changes made outside the order flow (scripts)
+
+Features:
+- record_cycle_event() only appends a tuple to a buffer; a writer thread
+  encodes the events and inserts each batch with one multi-row INSERT
+- A failed batch stays buffered and is retried on the next flush, in order
+- Bounded buffer: events are dropped and counted if the database is down
+  for long enough to fill it
+- No-op until start_cycle_journal() is called; main_app and every script
+  that writes dca_cycles start it when CYCLE_JOURNAL_ENABLED=true
+"""
+
+import collections
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.db_utils import execute_query
+
+logger = logging.getLogger(__name__)
+
+# Events whose changes hold a complete dca_cycles row
+SNAPSHOT_EVENTS = ('created', 'snapshot')
+
+_INSERT_PREFIX = "INSERT INTO cycle_events (cycle_id, event_type, event_time, changes, details) VALUES "
+_ROW_PLACEHOLDERS = "(%s, %s, %s, %s, %s)"
+
+
+def _utc(value: datetime) -> datetime:
+    """Naive UTC datetime, as stored in (and read back from) the timestamp columns."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _json_value(value: Any) -> Any:
+    """json.dumps default: Decimals as exact strings, datetimes as naive UTC ISO strings."""
+    if isinstance(value, datetime):
+        return _utc(value).isoformat()
+    return str(value)
+
+
+def encode_values(values: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Encode a changes or details dict for a JSON column.
+
+    Args:
+        values: Column or detail values (None or empty gives None)
+
+    Returns:
+        Compact JSON text, or None
+    """
+    if not values:
+        return None
+    return json.dumps(values, separators=(',', ':'), default=_json_value)
+
+
+class CycleJournal:
+    """
+    Buffers cycle events in memory and inserts them into cycle_events from a
+    background thread.
+
+    Events are inserted in the order they were recorded, so ordering by
+    cycle_events.id gives each cycle's history.
+    """
+
+    def __init__(self, flush_seconds: float = 1.0, batch_size: int = 500, max_pending: int = 100_000):
+        """
+        Start the writer thread.
+
+        Args:
+            flush_seconds: Seconds between inserts of the buffered events
+            batch_size: Rows per INSERT statement
+            max_pending: Buffered events before new ones are dropped
+        """
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending: collections.deque = collections.deque()
+        self._retry: List[Tuple] = []
+        self._stats = {'recorded': 0, 'written': 0, 'batches': 0, 'dropped': 0, 'errors': 0}
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+
+        self._thread = threading.Thread(target=self._run, name='cycle-journal', daemon=True)
+        self._thread.start()
+
+    def record(self, cycle_id: int, event_type: str, changes: Optional[Dict[str, Any]] = None,
+               details: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Buffer one event. Encoding and I/O happen on the writer thread.
+
+        Args:
+            cycle_id: Cycle the event belongs to
+            event_type: Event name (see the module docstring)
+            changes: dca_cycles columns the event set, with their new values
+            details: Context that is not cycle state
+        """
+        if len(self._pending) + len(self._retry) >= self.max_pending:
+            self._stats['dropped'] += 1
+            return
+        # Copies, so a caller reusing its dict cannot change a buffered event
+        self._pending.append((time.time(), cycle_id, event_type,
+                              dict(changes) if changes else None, dict(details) if details else None))
+        self._stats['recorded'] += 1
+
+    def flush(self) -> None:
+        """
+        Insert everything buffered so far (also called by the writer thread).
+
+        Raises:
+            mysql.connector.Error: If an insert fails; the failed rows and
+                everything after them stay buffered for the next flush
+        """
+        with self._write_lock:
+            count = len(self._pending)
+            popleft = self._pending.popleft
+            rows = self._retry + [self._encode(*popleft()) for _ in range(count)]
+            self._retry = []
+            rows = [row for row in rows if row is not None]
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                try:
+                    self._insert(batch)
+                except Exception:
+                    self._retry = rows[start:]
+                    raise
+                self._stats['written'] += len(batch)
+                self._stats['batches'] += 1
+
+    def close(self, timeout_seconds: float = 10.0) -> None:
+        """Insert buffered events and stop the writer."""
+        self._stop.set()
+        self._thread.join(timeout_seconds)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get journal counters.
+
+        Returns:
+            Dictionary with recorded, written, batches, dropped, errors and pending
+        """
+        stats = dict(self._stats)
+        stats['pending'] = len(self._pending) + len(self._retry)
+        return stats
+
+    def _run(self) -> None:
+        """Writer loop: flush periodically, then once more on close."""
+        while not self._stop.wait(self.flush_seconds):
+            self._safe_flush()
+        self._safe_flush()
+        unwritten = len(self._pending) + len(self._retry)
+        if unwritten:
+            self._stats['dropped'] += unwritten
+            logger.error(f"Cycle journal stopped with {unwritten} events not written")
+
+    def _safe_flush(self) -> None:
+        """Flush, counting and logging errors instead of stopping the writer."""
+        try:
+            self.flush()
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"Cycle journal write failed ({len(self._retry)} events kept for retry): {e}")
+
+    def _encode(self, recorded_at: float, cycle_id: int, event_type: str,
+                changes: Optional[Dict[str, Any]], details: Optional[Dict[str, Any]]) -> Optional[Tuple]:
+        """Convert a buffered event to INSERT parameters (None if it cannot be encoded)."""
+        try:
+            event_time = datetime.fromtimestamp(recorded_at, timezone.utc).replace(tzinfo=None)
+            return (cycle_id, event_type, event_time, encode_values(changes), encode_values(details))
+        except (TypeError, ValueError) as e:
+            self._stats['errors'] += 1
+            logger.warning(f"Cycle journal could not encode {event_type} for cycle {cycle_id}: {e}")
+            return None
+
+    @staticmethod
+    def _insert(rows: List[Tuple]) -> None:
+        """Insert rows with one multi-row INSERT."""
+        query = _INSERT_PREFIX + ', '.join([_ROW_PLACEHOLDERS] * len(rows))
+        execute_query(query, [value for row in rows for value in row], commit=True)
+
+
+# Process-wide journal, started by main_app and the scripts that write cycles (None makes record_cycle_event a no-op)
+_cycle_journal: Optional[CycleJournal] = None
+
+
+def start_cycle_journal(flush_seconds: float = 1.0, batch_size: int = 500) -> CycleJournal:
+    """
+    Start journaling cycle events.
+
+    Args:
+        flush_seconds: Seconds between inserts of the buffered events
+        batch_size: Rows per INSERT statement
+
+    Returns:
+        The active journal
+    """
+    global _cycle_journal
+    stop_cycle_journal()
+    _cycle_journal = CycleJournal(flush_seconds=flush_seconds, batch_size=batch_size)
+    logger.info(f"Journaling cycle events to cycle_events every {flush_seconds}s")
+    return _cycle_journal
+
+
+def stop_cycle_journal() -> None:
+    """Insert buffered events and stop journaling."""
+    global _cycle_journal
+    journal = _cycle_journal
+    if journal is None:
+        return
+    _cycle_journal = None
+    journal.close()
+    stats = journal.get_stats()
+    logger.info(f"Cycle journal: written={stats['written']:,}, batches={stats['batches']:,}, "
+                f"dropped={stats['dropped']}, errors={stats['errors']}")
+
+
+def record_cycle_event(cycle_id: int, event_type: str, changes: Optional[Dict[str, Any]] = None,
+                       details: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Journal a cycle event if the journal is running.
+
+    Args:
+        cycle_id: Cycle the event belongs to
+        event_type: Event name (see the module docstring)
+        changes: dca_cycles columns the event set, with their new values
+        details: Context that is not cycle state
+    """
+    journal = _cycle_journal
+    if journal is not None:
+        journal.record(cycle_id, event_type, changes, details)
+
+
+def get_cycle_journal() -> Optional[CycleJournal]:
+    """Get the active journal, or None if cycle events are not being journaled."""
+    return _cycle_journal
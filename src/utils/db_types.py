@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - Column Value Types
+
+How dca_assets and dca_cycles values round-trip through the database:
+DECIMAL columns come back quantized to their scale, TIMESTAMPs to whole
+UTC seconds. Shared by the replay harness's SQLite stand-in, which stores
+values the way MySQL would, and the cycle journal, which rebuilds cycle
+state that must compare equal to the table's.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any
+
+# Column scales from the README DDL; MySQL rounds DECIMAL values to these on write
+DECIMAL_SCALES = {
+    'base_order_amount': 10, 'safety_order_amount': 10, 'safety_order_deviation': 4,
+    'take_profit_percent': 4, 'ttp_deviation_percent': 4, 'last_sell_price': 10,
+    'buy_order_price_deviation_percent': 4,
+    'quantity': 15, 'average_purchase_price': 10, 'last_order_fill_price': 10,
+    'highest_trailing_price': 10, 'sell_price': 10,
+}
+TIMESTAMP_COLUMNS = frozenset({'created_at', 'updated_at', 'completed_at', 'latest_order_created_at'})
+
+
+def format_timestamp(value: datetime) -> str:
+    """Store a datetime like a MySQL TIMESTAMP: UTC, rounded to whole seconds."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    value = (value + timedelta(microseconds=500000)).replace(microsecond=0)
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def to_sql(value: Any) -> Any:
+    """Convert a query parameter to a value SQLite stores without loss."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, datetime):
+        return format_timestamp(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def from_sql(column: str, value: Any) -> Any:
+    """Convert a stored value to what mysql-connector would return for the column."""
+    if value is None:
+        return None
+    scale = DECIMAL_SCALES.get(column)
+    if scale is not None:
+        return Decimal(str(value)).quantize(Decimal(1).scaleb(-scale), rounding=ROUND_HALF_UP)
+    if column in TIMESTAMP_COLUMNS:
+        return datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+    return value
+
+
+def stored_value(column: str, value: Any) -> Any:
+    """
+    A value as the dca_assets/dca_cycles column would store and return it:
+    DECIMAL columns quantized to their scale, TIMESTAMPs to whole seconds.
+    """
+    return from_sql(column, to_sql(value))
@@ -1,20 +1,30 @@
 """
 Database utility functions for the DCA trading bot.
-Handles MySQL/MariaDB connections and query execution.
+Handles MySQL/MariaDB connections, connection pooling and query execution.
 """
 
 import os
+import time
 import logging
+import threading
+from collections import deque
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errors
 from dotenv import load_dotenv
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+from utils.latency import latency_tracker
+from utils.metrics import metrics_registry
 
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+_db_queries = metrics_registry.counter('dca_db_queries_total', 'Database queries executed', ('kind',))
+_db_query_errors = metrics_registry.counter('dca_db_query_errors_total', 'Database queries that raised', ('kind',))
+_db_query_seconds = metrics_registry.counter('dca_db_query_seconds_total', 'Time spent in database queries', ('kind',))
+
 
 def get_db_connection() -> mysql.connector.MySQLConnection:
     """
@@ -69,12 +79,363 @@ def get_db_connection() -> mysql.connector.MySQLConnection:
         raise
 
 
+# MySQL client error codes that mean the server connection itself is gone
+# (2006: server has gone away, 2013: lost connection during query)
+CONNECTION_LOST_ERRNOS = (2006, 2013)
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of database connections used by execute_query().
+    
+    Connections are created lazily up to pool_size and handed out LIFO, so a
+    lightly loaded process keeps reusing its warmest connection. Pooled
+    connections run in autocommit mode: execute_query() issues one statement
+    per call, and autocommit keeps a long-lived connection from holding a
+    REPEATABLE READ snapshot that would hide other processes' writes.
+    """
+    
+    def __init__(
+        self,
+        pool_size: int = 5,
+        max_lifetime_seconds: float = 3600,
+        pre_ping_idle_seconds: float = 30,
+        checkout_timeout_seconds: float = 10
+    ):
+        """
+        Initialize the pool. No connections are opened until first use.
+        
+        Args:
+            pool_size: Maximum number of open connections
+            max_lifetime_seconds: Close and replace connections older than this
+            pre_ping_idle_seconds: Ping a connection before reuse if it has been
+                idle at least this long (0 pings on every checkout)
+            checkout_timeout_seconds: Maximum time to wait for a free connection
+        """
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        
+        self.pool_size = pool_size
+        self.max_lifetime_seconds = max_lifetime_seconds
+        self.pre_ping_idle_seconds = pre_ping_idle_seconds
+        self.checkout_timeout_seconds = checkout_timeout_seconds
+        
+        self._condition = threading.Condition()
+        self._idle: Deque[Tuple[Any, float, float]] = deque()  # (connection, created_at, last_used)
+        self._created_at: Dict[int, float] = {}
+        self._open_count = 0
+        self._closed = False
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+            'timeouts': 0,
+            'created': 0,
+            'expired': 0,
+            'ping_failures': 0,
+            'discarded': 0
+        }
+    
+    def acquire(self):
+        """
+        Check out a healthy connection, opening a new one if needed.
+        
+        Returns:
+            mysql.connector.connection.MySQLConnection: Connection for exclusive use
+            
+        Raises:
+            mysql.connector.errors.PoolError: If no connection frees up within
+                checkout_timeout_seconds, or the pool has been closed
+            mysql.connector.Error: If a new connection cannot be established
+        """
+        start = time.monotonic()
+        waited = False
+        
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise errors.PoolError("Connection pool is closed")
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._open_count < self.pool_size:
+                    # Reserve a slot; the connection is opened outside the lock
+                    self._open_count += 1
+                    entry = None
+                    break
+                
+                remaining = self.checkout_timeout_seconds - (time.monotonic() - start)
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise errors.PoolError(
+                        f"Timed out after {self.checkout_timeout_seconds}s waiting for a database connection "
+                        f"(pool size {self.pool_size})"
+                    )
+                waited = True
+                self._condition.wait(remaining)
+        
+        wait_seconds = time.monotonic() - start
+        
+        try:
+            connection = self._validate(entry) if entry is not None else None
+            if connection is None:
+                connection = self._open()
+        except Exception:
+            # Give the reserved slot back so waiters can open their own connection
+            with self._condition:
+                self._open_count -= 1
+                self._condition.notify()
+            raise
+        
+        with self._condition:
+            self._stats['checkouts'] += 1
+            if waited:
+                self._stats['waits'] += 1
+            self._stats['wait_seconds_total'] += wait_seconds
+            self._stats['wait_seconds_max'] = max(self._stats['wait_seconds_max'], wait_seconds)
+        
+        return connection
+    
+    def release(self, connection, discard: bool = False) -> None:
+        """
+        Return a connection to the pool.
+        
+        Args:
+            connection: Connection previously returned by acquire()
+            discard: Close the connection instead of reusing it (e.g. after an error)
+        """
+        now = time.monotonic()
+        created_at = self._created_at.get(id(connection), now)
+        
+        reusable = not discard and not self._closed
+        if reusable:
+            try:
+                reusable = connection.is_connected()
+            except Exception:
+                reusable = False
+        
+        if reusable:
+            with self._condition:
+                self._idle.append((connection, created_at, now))
+                self._condition.notify()
+            return
+        
+        self._close_connection(connection)
+        with self._condition:
+            self._open_count -= 1
+            if discard:
+                self._stats['discarded'] += 1
+            self._condition.notify()
+    
+    def close(self) -> None:
+        """Close all idle connections and refuse further checkouts."""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open_count -= len(idle)
+            self._condition.notify_all()
+        
+        for connection, _, _ in idle:
+            self._close_connection(connection)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool checkout and health counters.
+        
+        Returns:
+            Dictionary of counters plus current open/idle connection counts
+        """
+        with self._condition:
+            stats = dict(self._stats)
+            stats['pool_size'] = self.pool_size
+            stats['open'] = self._open_count
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._open_count - len(self._idle)
+        checkouts = stats['checkouts']
+        stats['wait_seconds_avg'] = stats['wait_seconds_total'] / checkouts if checkouts else 0.0
+        return stats
+    
+    def _open(self):
+        """Open a new pooled connection."""
+        connection = get_db_connection()
+        connection.autocommit = True
+        self._created_at[id(connection)] = time.monotonic()
+        with self._condition:
+            self._stats['created'] += 1
+        return connection
+    
+    def _validate(self, entry: Tuple[Any, float, float]):
+        """
+        Check an idle connection before handing it out.
+        
+        Args:
+            entry: (connection, created_at, last_used) tuple from the idle stack
+            
+        Returns:
+            The connection if it is still usable, otherwise None (after closing it)
+        """
+        connection, created_at, last_used = entry
+        now = time.monotonic()
+        
+        if self.max_lifetime_seconds and now - created_at >= self.max_lifetime_seconds:
+            logger.debug("Recycling database connection that reached its max lifetime")
+            self._close_connection(connection)
+            with self._condition:
+                self._stats['expired'] += 1
+            return None
+        
+        if now - last_used >= self.pre_ping_idle_seconds:
+            try:
+                connection.ping(reconnect=False)
+            except Exception as e:
+                logger.debug(f"Pooled database connection failed pre-ping: {e}")
+                self._close_connection(connection)
+                with self._condition:
+                    self._stats['ping_failures'] += 1
+                return None
+        
+        return connection
+    
+    def _close_connection(self, connection) -> None:
+        """Close a connection, ignoring errors from an already-dead socket."""
+        self._created_at.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception as e:
+            logger.debug(f"Error closing database connection: {e}")
+
+
+_connection_pool: Optional[ConnectionPool] = None
+_connection_pool_lock = threading.Lock()
+
+
+def init_connection_pool(
+    pool_size: int = 5,
+    max_lifetime_seconds: float = 3600,
+    pre_ping_idle_seconds: float = 30,
+    checkout_timeout_seconds: float = 10
+) -> ConnectionPool:
+    """
+    Route execute_query() through a connection pool for this process.
+    
+    Replaces (and closes) any pool that was already installed.
+    
+    Args:
+        pool_size: Maximum number of open connections
+        max_lifetime_seconds: Close and replace connections older than this
+        pre_ping_idle_seconds: Ping connections idle at least this long before reuse
+        checkout_timeout_seconds: Maximum time to wait for a free connection
+        
+    Returns:
+        ConnectionPool: The installed pool
+    """
+    global _connection_pool
+    
+    pool = ConnectionPool(
+        pool_size=pool_size,
+        max_lifetime_seconds=max_lifetime_seconds,
+        pre_ping_idle_seconds=pre_ping_idle_seconds,
+        checkout_timeout_seconds=checkout_timeout_seconds
+    )
+    with _connection_pool_lock:
+        old_pool, _connection_pool = _connection_pool, pool
+    if old_pool:
+        old_pool.close()
+    
+    logger.info(f"Database connection pool enabled (size {pool_size}, max lifetime {max_lifetime_seconds}s)")
+    return pool
+
+
+def init_connection_pool_from_config(config) -> Optional[ConnectionPool]:
+    """
+    Install a connection pool using the DB_POOL_* settings, if pooling is enabled.
+    
+    Args:
+        config: Config instance providing the db_pool_* properties
+        
+    Returns:
+        ConnectionPool if pooling was enabled, otherwise None
+    """
+    if not config.db_pool_enabled:
+        logger.info("Database connection pool disabled, connecting per query")
+        return None
+    
+    return init_connection_pool(
+        pool_size=config.db_pool_size,
+        max_lifetime_seconds=config.db_pool_max_lifetime_seconds,
+        pre_ping_idle_seconds=config.db_pool_pre_ping_seconds,
+        checkout_timeout_seconds=config.db_pool_timeout_seconds
+    )
+
+
+def swap_connection_pool(pool: Optional[Any]) -> Optional[Any]:
+    """
+    Install an already-built pool without closing the current one.
+    
+    Used by the replay harness to route execute_query() to a local database
+    stand-in and to put the original pool back afterwards.
+    
+    Args:
+        pool: Object with acquire(), release(connection, discard) and get_stats(),
+            or None to connect per query
+        
+    Returns:
+        The pool that was installed before
+    """
+    global _connection_pool
+    
+    with _connection_pool_lock:
+        old_pool, _connection_pool = _connection_pool, pool
+    return old_pool
+
+
+def close_connection_pool() -> None:
+    """Close the connection pool; execute_query() goes back to one connection per call."""
+    global _connection_pool
+    
+    with _connection_pool_lock:
+        pool, _connection_pool = _connection_pool, None
+    if pool:
+        pool.close()
+
+
+def get_pool_stats() -> Optional[Dict[str, Any]]:
+    """
+    Get counters for the active connection pool.
+    
+    Returns:
+        Pool statistics dictionary, or None if pooling is not enabled
+    """
+    pool = _connection_pool
+    return pool.get_stats() if pool else None
+
+
+def log_pool_stats() -> None:
+    """Log a one-line summary of connection pool usage, if pooling is enabled."""
+    stats = get_pool_stats()
+    if not stats:
+        return
+    logger.info(f"DB pool: checkouts={stats['checkouts']}, waits={stats['waits']}, "
+                f"avg_wait={stats['wait_seconds_avg'] * 1000:.2f}ms, max_wait={stats['wait_seconds_max'] * 1000:.2f}ms, "
+                f"timeouts={stats['timeouts']}, created={stats['created']}, expired={stats['expired']}, "
+                f"ping_failures={stats['ping_failures']}, discarded={stats['discarded']}, "
+                f"open={stats['open']}/{stats['pool_size']}")
+
+
+def _is_connection_lost(error: Exception) -> bool:
+    """True if a database error means the connection itself is unusable."""
+    return isinstance(error, errors.InterfaceError) or getattr(error, 'errno', None) in CONNECTION_LOST_ERRNOS
+
+
 def execute_query(
     query: str,
     params: Optional[Union[Tuple, Dict, List]] = None,
     fetch_one: bool = False,
     fetch_all: bool = False,
-    commit: bool = False
+    commit: bool = False,
+    dictionary: bool = True
 ) -> Optional[Union[Dict, List[Dict], Any]]:
     """
     Executes a SQL query with optional parameters and various return modes.
@@ -85,6 +446,8 @@ def execute_query(
         fetch_one: If True, returns a single row as a dictionary
         fetch_all: If True, returns all rows as a list of dictionaries
         commit: If True, commits the transaction (for INSERT, UPDATE, DELETE)
+        dictionary: If False, rows are tuples in SELECT column order
+            (cheaper for bulk reads, see DcaCycle.from_row)
         
     Returns:
         - If fetch_one=True: Single row as dict or None
@@ -95,12 +458,53 @@ def execute_query(
     Raises:
         mysql.connector.Error: If query execution fails
     """
+    kind = 'write' if commit else 'read'
+    start = time.perf_counter()
+    try:
+        pool = _connection_pool
+        if pool is None:
+            return _execute_query_once(None, query, params, fetch_one, fetch_all, commit, dictionary)
+        
+        try:
+            return _execute_query_once(pool, query, params, fetch_one, fetch_all, commit, dictionary)
+        except Error as e:
+            # A read on a connection that died while idle is safe to retry once on a
+            # fresh connection; writes are not retried since they may have applied
+            if commit or not _is_connection_lost(e):
+                raise
+            logger.warning(f"Database connection lost ({e}), retrying read on a new connection")
+            return _execute_query_once(pool, query, params, fetch_one, fetch_all, commit, dictionary)
+    except Exception:
+        _db_query_errors.inc(kind)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        latency_tracker.record(f"db_{kind}", elapsed)
+        _db_queries.inc(kind)
+        _db_query_seconds.inc(kind, amount=elapsed)
+
+
+def _execute_query_once(
+    pool: Optional[ConnectionPool],
+    query: str,
+    params: Optional[Union[Tuple, Dict, List]],
+    fetch_one: bool,
+    fetch_all: bool,
+    commit: bool,
+    dictionary: bool = True
+) -> Optional[Union[Dict, List[Dict], Any]]:
+    """
+    Run a single query on a pooled connection, or a dedicated one if pool is None.
+    
+    See execute_query() for arguments and return values.
+    """
     connection = None
     cursor = None
+    failed = False
     
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor(dictionary=True)
+        connection = pool.acquire() if pool else get_db_connection()
+        cursor = connection.cursor(dictionary=dictionary)
         
         # Execute the query with parameters
         cursor.execute(query, params)
@@ -130,24 +534,42 @@ def execute_query(
             return None
             
     except Error as e:
-        if connection:
-            connection.rollback()
+        failed = True
+        _rollback_quietly(connection)
         logger.error(f"Database query error: {e}")
         logger.error(f"Query: {query}")
         logger.error(f"Params: {params}")
         raise
         
     except Exception as e:
-        if connection:
-            connection.rollback()
+        failed = True
+        _rollback_quietly(connection)
         logger.error(f"Unexpected error during query execution: {e}")
         raise
         
     finally:
         if cursor:
-            cursor.close()
-        if connection and connection.is_connected():
-            connection.close()
+            try:
+                cursor.close()
+            except Exception as e:
+                failed = True
+                logger.debug(f"Error closing cursor: {e}")
+        if connection:
+            if pool:
+                # Never hand a connection back in an unknown state after an error
+                pool.release(connection, discard=failed)
+            elif connection.is_connected():
+                connection.close()
+
+
+def _rollback_quietly(connection) -> None:
+    """Roll back after a failed query without masking the original error."""
+    if not connection:
+        return
+    try:
+        connection.rollback()
+    except Exception as e:
+        logger.debug(f"Rollback failed: {e}")
 
 
 def check_connection() -> bool:
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - DCA Decision Rules
+
+The base order, safety order, take-profit and trailing take-profit (TTP)
+rules, as pure functions of an asset's settings, its latest cycle and a
+quote. main_app's quote checks act on decide_quote_action(), the trigger
+index derives its levels from the same trigger prices, and the backtester
+replays history through the same function, so the live bot and its
+simulations decide alike.
+
+Arithmetic is Decimal, like the dca_assets/dca_cycles columns. Checks that
+need the broker or the clock (existing Alpaca positions, position size, the
+recent-order guard) are left to the caller.
+
+Features:
+- Safety, take-profit and TTP sell trigger prices
+- One decision per quote: base, safety, take_profit, ttp_activate, ttp_peak,
+  ttp_sell or nothing
+- Accepts DcaAsset/DcaCycle or any object with the same fields
+"""
+
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+
+# Actions returned by decide_quote_action()
+BASE = 'base'
+SAFETY = 'safety'
+TAKE_PROFIT = 'take_profit'
+TTP_ACTIVATE = 'ttp_activate'
+TTP_PEAK = 'ttp_peak'
+TTP_SELL = 'ttp_sell'
+
+# Actions handled by main_app's take-profit check
+TAKE_PROFIT_ACTIONS = (TAKE_PROFIT, TTP_ACTIVATE, TTP_PEAK, TTP_SELL)
+
+
+def safety_trigger_price(asset_config, cycle) -> Optional[Decimal]:
+    """
+    Ask price at or below which the cycle's next safety order triggers.
+
+    Args:
+        asset_config: DcaAsset for the symbol
+        cycle: Latest DcaCycle for the asset
+
+    Returns:
+        last_order_fill_price * (1 - safety_order_deviation/100), or None if
+        there is no fill to measure from or max_safety_orders is reached
+    """
+    if cycle.last_order_fill_price is None or cycle.safety_orders >= asset_config.max_safety_orders:
+        return None
+    safety_deviation_decimal = asset_config.safety_order_deviation / Decimal('100')
+    return cycle.last_order_fill_price * (Decimal('1') - safety_deviation_decimal)
+
+
+def take_profit_trigger_price(asset_config, cycle) -> Optional[Decimal]:
+    """
+    Bid price at or above which the cycle takes profit (or activates TTP).
+
+    Args:
+        asset_config: DcaAsset for the symbol
+        cycle: Latest DcaCycle for the asset
+
+    Returns:
+        average_purchase_price * (1 + take_profit_percent/100), or None if the
+        average purchase price is missing or not positive
+    """
+    average_price = cycle.average_purchase_price
+    if average_price is None or average_price <= Decimal('0'):
+        return None
+    take_profit_percent_decimal = asset_config.take_profit_percent / Decimal('100')
+    return average_price * (Decimal('1') + take_profit_percent_decimal)
+
+
+def ttp_sell_trigger_price(asset_config, peak: Decimal) -> Optional[Decimal]:
+    """
+    Bid price below which a trailing take-profit sells.
+
+    Args:
+        asset_config: DcaAsset for the symbol
+        peak: Highest bid since TTP activated
+
+    Returns:
+        peak * (1 - ttp_deviation_percent/100), or None if
+        ttp_deviation_percent is not set
+    """
+    if asset_config.ttp_deviation_percent is None:
+        return None
+    ttp_deviation_decimal = asset_config.ttp_deviation_percent / Decimal('100')
+    return peak * (Decimal('1') - ttp_deviation_decimal)
+
+
+def _to_decimal(price) -> Optional[Decimal]:
+    """Quote price as a finite Decimal, or None if it is missing or not a number."""
+    try:
+        value = Decimal(str(price))
+    except (InvalidOperation, ValueError, TypeError):
+        return None
+    return value if value.is_finite() else None
+
+
+def decide_quote_action(asset_config, cycle, bid_price, ask_price) -> Optional[str]:
+    """
+    Decide what a quote triggers for an asset's latest cycle.
+
+    - watching, no position: base order
+    - watching, position: safety order if the ask is at the safety trigger,
+      otherwise take-profit (TTP off) or TTP activation (TTP on) once the
+      bid reaches the take-profit trigger
+    - trailing: a bid above the peak is a new peak; a bid below the TTP
+      sell trigger sells
+    - any other status: waiting on an order or cooldown - nothing
+
+    A quote at the safety trigger never takes profit, even while trailing
+    or when the safety order itself cannot be placed.
+
+    Args:
+        asset_config: DcaAsset for the symbol
+        cycle: Latest DcaCycle for the asset
+        bid_price: Quote bid price (float)
+        ask_price: Quote ask price (float)
+
+    Returns:
+        BASE, SAFETY, TAKE_PROFIT, TTP_ACTIVATE, TTP_PEAK, TTP_SELL, or None
+        if the quote triggers nothing
+    """
+    prices_valid = bool(ask_price) and ask_price > 0 and bool(bid_price) and bid_price > 0
+
+    if cycle.status == 'watching' and cycle.quantity == Decimal('0'):
+        if prices_valid and asset_config.base_order_amount > 0:
+            return BASE
+        return None
+
+    if cycle.status not in ('watching', 'trailing') or cycle.quantity <= Decimal('0'):
+        return None
+
+    safety_price = safety_trigger_price(asset_config, cycle)
+    if safety_price is not None:
+        ask_price_decimal = _to_decimal(ask_price)
+        if ask_price_decimal is None:
+            return None
+        if ask_price_decimal <= safety_price:
+            if cycle.status == 'watching' and prices_valid and asset_config.safety_order_amount > 0:
+                return SAFETY
+            return None
+
+    take_profit_price = take_profit_trigger_price(asset_config, cycle)
+    bid_price_decimal = _to_decimal(bid_price)
+    if take_profit_price is None or bid_price_decimal is None:
+        return None
+
+    if not asset_config.ttp_enabled:
+        if bid_price_decimal >= take_profit_price and bid_price_decimal > Decimal('0'):
+            return TAKE_PROFIT
+        return None
+
+    if cycle.status == 'watching':
+        return TTP_ACTIVATE if bid_price_decimal >= take_profit_price else None
+
+    current_peak = cycle.highest_trailing_price or Decimal('0')
+    if bid_price_decimal > current_peak:
+        return TTP_PEAK
+    sell_price = ttp_sell_trigger_price(asset_config, current_peak)
+    if sell_price is not None and bid_price_decimal < sell_price and bid_price_decimal > Decimal('0'):
+        return TTP_SELL
+    return None
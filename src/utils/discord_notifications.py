@@ -13,10 +13,15 @@ Features:
 - User mentions for critical events
 - Rate limiting and error handling
 - Integration with existing notification framework
+- Optional background dispatcher that batches embeds off the trading path
 """
 
 import logging
+import queue
+import threading
 import time
+from collections import deque
+from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
 from discord_webhook import DiscordWebhook, DiscordEmbed
@@ -25,6 +30,7 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from config import get_config
+from utils.latency import timed
 
 config = get_config()
 logger = logging.getLogger(__name__)
@@ -59,24 +65,416 @@ class DiscordRateLimiter:
 # Global rate limiter instance
 _discord_rate_limiter = DiscordRateLimiter()
 
+# Discord webhook message limits
+DISCORD_MAX_EMBEDS_PER_MESSAGE = 10
+DISCORD_MAX_EMBED_CHARS = 6000
+DISCORD_MAX_CONTENT_CHARS = 2000
+DISCORD_MENTION_RESERVE_CHARS = 32  # Room for the '<@user_id>' prefix added at send time
+
+
+def _embed_length(embed: DiscordEmbed) -> int:
+    """Count the characters Discord applies to its 6000-character embed limit."""
+    length = len(embed.title or '') + len(embed.description or '')
+    for embed_field in embed.fields or []:
+        length += len(embed_field.get('name') or '') + len(embed_field.get('value') or '')
+    if embed.footer:
+        length += len(embed.footer.get('text') or '')
+    if embed.author:
+        length += len(embed.author.get('name') or '')
+    return length
+
+
+@dataclass
+class _QueuedNotification:
+    """A notification waiting in the dispatcher queue."""
+    content: Optional[str]
+    embeds: List[DiscordEmbed]
+    mention_user: bool
+    bypass_rate_limit: bool
+    embed_chars: int = 0
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class DiscordDispatcher:
+    """
+    Background sender for Discord webhook notifications.
+
+    Callers enqueue a notification and return immediately; a single worker
+    thread combines queued notifications into webhook calls of up to 10
+    embeds, waits out Discord's rate-limit headers and retries transient
+    failures with exponential backoff. The queue is bounded: when it is full
+    new notifications are dropped and counted rather than blocking the caller.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 100,
+        batch_window_seconds: float = 1.0,
+        max_retries: int = 3,
+        retry_backoff_seconds: float = 1.0,
+        request_timeout_seconds: float = 10.0
+    ):
+        """
+        Initialize a stopped dispatcher.
+
+        Args:
+            queue_size: Maximum notifications waiting to be sent
+            batch_window_seconds: How long to collect further notifications
+                into a webhook call after the first one arrives
+            max_retries: Retries for a batch after a 429, 5xx or network error
+            retry_backoff_seconds: Initial backoff, doubled on each retry
+            request_timeout_seconds: HTTP timeout for each webhook call
+        """
+        self.batch_window_seconds = batch_window_seconds
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.request_timeout_seconds = request_timeout_seconds
+        self._queue: "queue.Queue[_QueuedNotification]" = queue.Queue(maxsize=max(1, queue_size))
+        self._pending: deque = deque()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._blocked_until = 0.0  # monotonic time until which Discord asked us to wait
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'queued': 0, 'dropped': 0, 'sent': 0, 'failed': 0,
+            'webhook_calls': 0, 'retries': 0, 'rate_limited': 0
+        }
+
+    @property
+    def is_running(self) -> bool:
+        """True while the worker thread is accepting notifications."""
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    def start(self) -> None:
+        """Start the worker thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='discord-dispatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_seconds: float = 10.0) -> int:
+        """
+        Stop accepting notifications and flush the queue.
+
+        Args:
+            timeout_seconds: Maximum time to wait for queued notifications to be sent
+
+        Returns:
+            Number of notifications still unsent when the timeout expired
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout_seconds)
+        unsent = self._queue.qsize() + len(self._pending)
+        if unsent:
+            logger.warning(f"Discord dispatcher stopped with {unsent} notifications unsent")
+        return unsent
+
+    def submit(
+        self,
+        content: Optional[str] = None,
+        embeds: Optional[List[DiscordEmbed]] = None,
+        mention_user: bool = False,
+        bypass_rate_limit: bool = False
+    ) -> bool:
+        """
+        Queue a notification without waiting for Discord.
+
+        Args:
+            content: Plain text content
+            embeds: Discord embeds
+            mention_user: Whether to mention the configured user
+            bypass_rate_limit: Skip the local rate limiter for critical messages
+
+        Returns:
+            True if queued, False if the dispatcher is stopped or the queue is full
+        """
+        if self._stop_event.is_set():
+            return False
+
+        embeds = list(embeds or [])
+        notification = _QueuedNotification(
+            content=content,
+            embeds=embeds,
+            mention_user=mention_user,
+            bypass_rate_limit=bypass_rate_limit,
+            embed_chars=sum(_embed_length(embed) for embed in embeds)
+        )
+        try:
+            self._queue.put_nowait(notification)
+        except queue.Full:
+            self._count('dropped')
+            logger.warning("Discord notification queue full, dropping notification")
+            return False
+        self._count('queued')
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get dispatcher counters.
+
+        Returns:
+            Dictionary with queued, dropped, sent, failed, webhook_calls,
+            retries, rate_limited and queue_depth
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queue_depth'] = self._queue.qsize() + len(self._pending)
+        return stats
+
+    def log_summary(self) -> None:
+        """Log dispatcher counters."""
+        stats = self.get_stats()
+        logger.info(f"Discord dispatcher: sent={stats['sent']} in {stats['webhook_calls']} webhook calls, "
+                    f"dropped={stats['dropped']}, failed={stats['failed']}, retries={stats['retries']}, "
+                    f"rate_limited={stats['rate_limited']}")
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        """Increment a counter."""
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _run(self) -> None:
+        """Worker loop: collect a batch, wait for a send slot, send it."""
+        while True:
+            if not self._pending:
+                try:
+                    self._pending.append(self._queue.get(timeout=0.5))
+                except queue.Empty:
+                    if self._stop_event.is_set():
+                        return
+                    continue
+                self._collect(self.batch_window_seconds)
+
+            self._wait_for_send_slot()
+            self._collect(0)
+            batch = self._take_batch()
+            try:
+                self._send_batch(batch)
+            except Exception as e:
+                self._count('failed', len(batch))
+                logger.error(f"Error sending Discord notification batch: {e}")
+
+    def _collect(self, window_seconds: float) -> None:
+        """Move queued notifications into the pending list, waiting up to window_seconds for more."""
+        deadline = time.monotonic() + window_seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0 or self._stop_event.is_set():
+                    self._pending.append(self._queue.get_nowait())
+                else:
+                    self._pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                return
+
+    def _wait_for_send_slot(self, batch: Optional[List[_QueuedNotification]] = None) -> None:
+        """
+        Sleep until Discord's rate limit has reset and the local limiter allows a call.
+
+        Args:
+            batch: In-flight batch being retried (default: the pending notifications);
+                critical notifications in it skip the local limiter
+        """
+        items = self._pending if batch is None else batch
+        while True:
+            delay = self._blocked_until - time.monotonic()
+            if delay <= 0:
+                if (self._stop_event.is_set()
+                        or any(item.bypass_rate_limit for item in items)
+                        or _discord_rate_limiter.can_send_message()):
+                    return
+                # Over the local per-minute budget: hold the batch and let more queue up
+                delay = 1.0
+            time.sleep(min(delay, 1.0))
+
+    def _take_batch(self) -> List[_QueuedNotification]:
+        """Pop the oldest pending notifications that fit in one webhook message."""
+        batch = [self._pending.popleft()]
+        embed_count = len(batch[0].embeds)
+        embed_chars = batch[0].embed_chars
+        content_chars = len(batch[0].content or '')
+        while self._pending:
+            candidate = self._pending[0]
+            if (embed_count + len(candidate.embeds) > DISCORD_MAX_EMBEDS_PER_MESSAGE
+                    or embed_chars + candidate.embed_chars > DISCORD_MAX_EMBED_CHARS
+                    or content_chars + len(candidate.content or '') + 1 > DISCORD_MAX_CONTENT_CHARS - DISCORD_MENTION_RESERVE_CHARS):
+                break
+            batch.append(self._pending.popleft())
+            embed_count += len(candidate.embeds)
+            embed_chars += candidate.embed_chars
+            content_chars += len(candidate.content or '') + 1
+        return batch
+
+    def _build_webhook(self, batch: List[_QueuedNotification]) -> DiscordWebhook:
+        """Combine a batch into one webhook message."""
+        webhook = DiscordWebhook(url=config.discord_webhook_url, timeout=self.request_timeout_seconds)
+
+        contents = [item.content for item in batch if item.content]
+        if any(item.mention_user for item in batch) and config.discord_user_id:
+            contents.insert(0, f"<@{config.discord_user_id}>")
+        if contents:
+            webhook.set_content('\n'.join(contents))
+
+        for item in batch:
+            for embed in item.embeds:
+                webhook.add_embed(embed)
+        return webhook
+
+    def _send_batch(self, batch: List[_QueuedNotification]) -> None:
+        """Send a batch, retrying rate limits and transient failures."""
+        webhook = self._build_webhook(batch)
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count('retries')
+            try:
+                response = webhook.api_post_request()
+            except Exception as e:
+                logger.warning(f"Discord webhook request failed (attempt {attempt + 1}): {e}")
+                self._backoff(attempt)
+                continue
+
+            self._update_rate_limit(response)
+            self._count('webhook_calls')
+
+            if response.status_code in (200, 204):
+                if not all(item.bypass_rate_limit for item in batch):
+                    _discord_rate_limiter.record_message_sent()
+                self._count('sent', len(batch))
+                logger.debug(f"Discord webhook sent {len(batch)} notifications")
+                return
+
+            if response.status_code == 429:
+                self._count('rate_limited')
+                retry_after = self._retry_after(response)
+                logger.warning(f"Discord rate limited, retrying in {retry_after:.2f}s")
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+                self._wait_for_send_slot(batch)
+                continue
+
+            if response.status_code >= 500:
+                logger.warning(f"Discord webhook returned {response.status_code} (attempt {attempt + 1})")
+                self._backoff(attempt)
+                continue
+
+            # Other 4xx responses will not succeed on retry
+            logger.error(f"Discord webhook failed with status {response.status_code}: {response.text}")
+            break
+
+        self._count('failed', len(batch))
+        logger.error(f"Dropping {len(batch)} Discord notifications after {attempt + 1} attempts")
+
+    def _backoff(self, attempt: int) -> None:
+        """Sleep before the next attempt unless this was the last one."""
+        if attempt < self.max_retries:
+            time.sleep(self.retry_backoff_seconds * (2 ** attempt))
+
+    def _update_rate_limit(self, response) -> None:
+        """Defer the next call if Discord reports the bucket is exhausted."""
+        headers = getattr(response, 'headers', None) or {}
+        if headers.get('X-RateLimit-Remaining') == '0':
+            try:
+                reset_after = float(headers.get('X-RateLimit-Reset-After', 0))
+            except (TypeError, ValueError):
+                return
+            self._blocked_until = max(self._blocked_until, time.monotonic() + reset_after)
+
+    @staticmethod
+    def _retry_after(response) -> float:
+        """Read the wait time from a 429 response (header, then JSON body)."""
+        headers = getattr(response, 'headers', None) or {}
+        try:
+            return float(headers['Retry-After'])
+        except (KeyError, TypeError, ValueError):
+            pass
+        try:
+            return float(response.json()['retry_after'])
+        except Exception:
+            return 1.0
+
+
+# Background dispatcher, started by main_app (None sends synchronously)
+_discord_dispatcher: Optional[DiscordDispatcher] = None
+
+
+def start_discord_dispatcher(
+    queue_size: int = 100,
+    batch_window_seconds: float = 1.0,
+    max_retries: int = 3
+) -> DiscordDispatcher:
+    """
+    Send Discord notifications from a background thread.
 
+    Until this is called (and after stop_discord_dispatcher), notifications are
+    sent synchronously on the caller's thread, which suits one-shot scripts.
+
+    Args:
+        queue_size: Maximum notifications waiting to be sent
+        batch_window_seconds: How long to collect notifications into one webhook call
+        max_retries: Retries per webhook call
+
+    Returns:
+        The running dispatcher
+    """
+    global _discord_dispatcher
+    stop_discord_dispatcher()
+    dispatcher = DiscordDispatcher(
+        queue_size=queue_size,
+        batch_window_seconds=batch_window_seconds,
+        max_retries=max_retries
+    )
+    dispatcher.start()
+    _discord_dispatcher = dispatcher
+    logger.info(f"Discord dispatcher started (queue {queue_size}, batch window {batch_window_seconds}s)")
+    return dispatcher
+
+
+def stop_discord_dispatcher(timeout_seconds: float = 10.0) -> None:
+    """
+    Flush queued notifications and return to synchronous sending.
+
+    Args:
+        timeout_seconds: Maximum time to wait for the queue to drain
+    """
+    global _discord_dispatcher
+    dispatcher = _discord_dispatcher
+    if dispatcher is None:
+        return
+    _discord_dispatcher = None
+    dispatcher.stop(timeout_seconds)
+    dispatcher.log_summary()
+
+
+def get_discord_dispatcher() -> Optional[DiscordDispatcher]:
+    """Get the running dispatcher, or None if notifications are sent synchronously."""
+    return _discord_dispatcher
+
+
+@timed('notification')
 def send_discord_notification(
     content: Optional[str] = None,
     embeds: Optional[List[DiscordEmbed]] = None,
     mention_user: bool = False,
-    bypass_rate_limit: bool = False
+    bypass_rate_limit: bool = False,
+    blocking: bool = False
 ) -> bool:
     """
     Send a Discord notification via webhook.
     
+    When the background dispatcher is running the notification is queued
+    and this returns without waiting for Discord.
+    
     Args:
         content: Plain text content (optional if embeds provided)
         embeds: List of Discord embeds for rich formatting
         mention_user: Whether to mention the configured user
         bypass_rate_limit: Skip rate limiting for critical messages
+        blocking: Send on the caller's thread even if the dispatcher is running
     
     Returns:
-        True if notification was sent successfully, False otherwise
+        True if notification was sent (or queued) successfully, False otherwise
     """
     try:
         # Check if Discord notifications are configured
@@ -84,6 +482,10 @@ def send_discord_notification(
             logger.debug("Discord notifications not configured, skipping notification")
             return False
         
+        dispatcher = _discord_dispatcher
+        if dispatcher is not None and not blocking:
+            return dispatcher.submit(content, embeds, mention_user, bypass_rate_limit)
+        
         # Check rate limiting (unless bypassed for critical alerts)
         if not bypass_rate_limit and not _discord_rate_limiter.can_send_message():
             logger.warning("Discord rate limit exceeded, skipping notification")
@@ -490,7 +892,8 @@ def verify_discord_configuration() -> bool:
             content="🧪 **Discord Configuration Test**",
             embeds=[embed],
             mention_user=bool(config.discord_user_id),
-            bypass_rate_limit=True
+            bypass_rate_limit=True,
+            blocking=True
         )
         
         if success:
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - Lifecycle Event Sink
+
+Order and cycle lifecycle events are written to the human log as emoji-rich
+free text. This module writes the same events as compact JSON lines to a
+separate file, one object per line, so reporting tools can tail or load
+them without parsing the human log:
+
+    {"ts":1760600000.123,"seq":42,"event":"order_fill","symbol":"BTC/USD","side":"buy",...}
+
+Features:
+- record_event() only builds a dict and enqueues it; a writer thread does
+  the JSON encoding and file I/O in batches
+- Size-based rotation of the event file, independent of the log rotation
+- Bounded queue: events are dropped and counted if the writer falls behind;
+  write and rotation errors are counted per batch and the writer keeps going
+- Decimal, datetime and UUID values serialized as strings
+- No-op until configure_event_sink() is called (scripts and tests)
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class EventSink:
+    """
+    Background JSON-lines writer with its own size-based rotation.
+
+    Rotated files are named like log files: events.jsonl.1 is the most
+    recent, events.jsonl.<backup_count> the oldest.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = 50 * 1024 * 1024, backup_count: int = 10,
+                 max_pending: int = 100_000):
+        """
+        Open the event file and start the writer thread.
+
+        Args:
+            path: Event file path
+            max_bytes: Rotate once the file reaches this size (0 disables rotation)
+            backup_count: Rotated files to keep
+            max_pending: Queued events before new ones are dropped
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.max_pending = max_pending
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending)
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+        self._stats = {'recorded': 0, 'written': 0, 'dropped': 0, 'errors': 0, 'rotations': 0}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._open()
+
+        self._thread = threading.Thread(target=self._run, name='event-sink', daemon=True)
+        self._thread.start()
+
+    def record(self, event_type: str, symbol: Optional[str] = None, **fields: Any) -> None:
+        """
+        Queue one event.
+
+        Args:
+            event_type: Event name (e.g. 'order_placed', 'order_fill', 'cycle_status')
+            symbol: Trading pair symbol, if the event belongs to one
+            **fields: Event details
+        """
+        with self._seq_lock:
+            self._seq += 1
+            seq = self._seq
+            self._stats['recorded'] += 1
+        event = {'ts': time.time(), 'seq': seq, 'event': event_type, 'symbol': symbol}
+        event.update(fields)
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._stats['dropped'] += 1
+
+    def close(self, timeout_seconds: float = 5.0) -> None:
+        """Write out queued events and close the file."""
+        try:
+            self._queue.put(_STOP, timeout=timeout_seconds)
+        except queue.Full:
+            logger.error(f"Event sink queue still full after {timeout_seconds}s; closing without a final write")
+            return
+        self._thread.join(timeout_seconds)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get writer counters.
+
+        Returns:
+            Dictionary with recorded, written, dropped, errors and rotations
+        """
+        return dict(self._stats)
+
+    def _run(self) -> None:
+        """Writer loop: encode and write everything queued, one flush per batch."""
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = any(event is _STOP for event in batch)
+            self._write_batch([event for event in batch if event is not _STOP])
+        try:
+            self._file.close()
+        except OSError as e:
+            logger.error(f"Event sink could not close {self.path}: {e}")
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Write and flush a batch, counting and logging errors instead of stopping the writer."""
+        try:
+            for event in batch:
+                self._write(event)
+            self._file.flush()
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"Event sink write failed ({len(batch)} events in the batch): {e}")
+
+    def _write(self, event: Dict[str, Any]) -> None:
+        """Encode and append one event, rotating first if the file is full."""
+        try:
+            line = json.dumps(event, separators=(',', ':'), default=str) + '\n'
+        except (TypeError, ValueError) as e:
+            self._stats['errors'] += 1
+            logger.warning(f"Event sink could not encode {event.get('event')}: {e}")
+            return
+
+        if self._file.closed:
+            # A failed rotation left no file open; retry before every write
+            self._open()
+        if self.max_bytes > 0 and self._size > 0 and self._size + len(line) > self.max_bytes:
+            self._rotate()
+
+        self._file.write(line)
+        self._size += len(line)  # json.dumps escapes non-ASCII, so characters == bytes
+        self._stats['written'] += 1
+
+    def _rotate(self) -> None:
+        """Shift events.jsonl -> events.jsonl.1 -> ... and start a new file."""
+        self._file.close()
+        try:
+            if self.backup_count > 0:
+                for index in range(self.backup_count - 1, 0, -1):
+                    source = Path(f"{self.path}.{index}")
+                    if source.exists():
+                        os.replace(source, f"{self.path}.{index + 1}")
+                os.replace(self.path, f"{self.path}.1")
+            else:
+                self.path.unlink()
+            self._stats['rotations'] += 1
+        except OSError as e:
+            self._stats['errors'] += 1
+            logger.error(f"Event sink rotation failed: {e}")
+        self._open()
+
+    def _open(self) -> None:
+        """Open the event file for appending and take its current size."""
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._size = self._file.tell()
+
+
+# Process-wide sink, configured by main_app (None makes record_event a no-op)
+_event_sink: Optional[EventSink] = None
+
+
+def configure_event_sink(path: Union[str, Path], max_bytes: int = 50 * 1024 * 1024, backup_count: int = 10) -> EventSink:
+    """
+    Start writing lifecycle events to a JSON-lines file.
+
+    Args:
+        path: Event file path
+        max_bytes: Rotate once the file reaches this size
+        backup_count: Rotated files to keep
+
+    Returns:
+        The active sink
+    """
+    global _event_sink
+    close_event_sink()
+    _event_sink = EventSink(path, max_bytes=max_bytes, backup_count=backup_count)
+    logger.info(f"Lifecycle events written to {path}")
+    return _event_sink
+
+
+def close_event_sink() -> None:
+    """Write out queued events and stop recording."""
+    global _event_sink
+    sink = _event_sink
+    if sink is None:
+        return
+    _event_sink = None
+    sink.close()
+    stats = sink.get_stats()
+    logger.info(f"Event sink: written={stats['written']}, dropped={stats['dropped']}, "
+                f"rotations={stats['rotations']}, errors={stats['errors']}")
+
+
+def record_event(event_type: str, symbol: Optional[str] = None, **fields: Any) -> None:
+    """
+    Record a lifecycle event if a sink is configured.
+
+    Args:
+        event_type: Event name (e.g. 'order_placed', 'order_fill', 'cycle_status')
+        symbol: Trading pair symbol, if the event belongs to one
+        **fields: Event details
+    """
+    sink = _event_sink
+    if sink is not None:
+        sink.record(event_type, symbol, **fields)
+
+
+def get_event_sink() -> Optional[EventSink]:
+    """Get the active sink, or None if events are not being recorded."""
+    return _event_sink
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - Latency Histograms
+
+Records how long each stage of the quote -> decision -> order -> fill path
+takes, per stage and per symbol, in log-linear (HDR-style) histograms:
+
+- queue_wait: quote accepted by the mailbox -> handler start
+- executor_wait: handler start -> evaluate_quote running on a worker thread
+- state_read: duplicate guard, asset config and latest cycle for a quote
+- db_read / db_write: individual database queries
+- rest_sell / rest_buy / rest_cancel / rest_read: Alpaca REST calls, including rate-limit waits
+- notification: Discord and email sends (or hand-offs to their dispatchers)
+- quote_to_order: quote accepted -> order placement returned
+- order_to_fill: order placement returned -> fill event received
+
+Features:
+- Fixed memory per histogram, 3-6% value precision from 1us to hours
+- Symbol attribution through a context variable, so DB and REST timings made
+  while handling a quote are charged to that quote's symbol
+- Snapshot API (count, mean, p50/p90/p99, max) and periodic log summaries
+- No-op until enabled, so scripts and tests pay nothing
+"""
+
+import contextvars
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Values below 2**SUB_BUCKET_BITS microseconds get exact buckets; above that each
+# power of two is split into SUB_BUCKET_HALF linear buckets, each 1/32 to 1/16
+# of its values wide (3-6% precision)
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT // 2
+
+# Symbol the current quote/trade update belongs to (copied into worker threads by asyncio.to_thread)
+current_symbol: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('latency_symbol', default=None)
+
+# perf_counter() value when the mailbox accepted the quote being evaluated
+quote_received_at: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('latency_quote_received_at', default=None)
+
+# perf_counter() value when the quote handler handed the quote to a worker thread
+dispatched_at: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('latency_dispatched_at', default=None)
+
+
+def _bucket_index(value_us: int) -> int:
+    """Map a value in microseconds to its bucket."""
+    if value_us < SUB_BUCKET_COUNT:
+        return max(value_us, 0)
+    shift = value_us.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKET_COUNT + (shift - 1) * SUB_BUCKET_HALF + ((value_us >> shift) - SUB_BUCKET_HALF)
+
+
+def _bucket_upper_bound(index: int) -> int:
+    """Highest value in microseconds that maps to a bucket."""
+    if index < SUB_BUCKET_COUNT:
+        return index
+    offset = index - SUB_BUCKET_COUNT
+    shift = offset // SUB_BUCKET_HALF + 1
+    sub_bucket = offset % SUB_BUCKET_HALF + SUB_BUCKET_HALF
+    return ((sub_bucket + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of durations.
+
+    Not thread-safe on its own; LatencyTracker serializes access.
+    """
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    def record(self, seconds: float) -> None:
+        """
+        Add one duration.
+
+        Args:
+            seconds: Duration in seconds
+        """
+        value_us = int(seconds * 1_000_000)
+        index = _bucket_index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total_us += value_us
+        if self.min_us is None or value_us < self.min_us:
+            self.min_us = value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        """Add another histogram's counts to this one."""
+        for index, bucket_count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + bucket_count
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None and (self.min_us is None or other.min_us < self.min_us):
+            self.min_us = other.min_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Value at a percentile, in milliseconds.
+
+        Reports the upper bound of the bucket holding the percentile, capped at
+        the largest recorded value.
+
+        Args:
+            percent: Percentile between 0 and 100
+
+        Returns:
+            Duration in milliseconds (0.0 if empty)
+        """
+        if self.count == 0:
+            return 0.0
+        target = max(1, int(round(self.count * percent / 100.0)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(_bucket_upper_bound(index), self.max_us) / 1000.0
+        return self.max_us / 1000.0
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the histogram.
+
+        Returns:
+            Dictionary with count, mean_ms, min_ms, p50_ms, p90_ms, p99_ms and max_ms
+        """
+        return {
+            'count': self.count,
+            'mean_ms': (self.total_us / self.count / 1000.0) if self.count else 0.0,
+            'min_ms': (self.min_us or 0) / 1000.0,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max_us / 1000.0,
+        }
+
+
+class LatencyTracker:
+    """
+    Per-stage, per-symbol latency histograms.
+
+    record() is called from the event loop and worker threads; a single lock
+    guards the histogram map. Durations recorded without a symbol (and with
+    no symbol in the current context) are kept under '-'.
+    """
+
+    # Forget order submit times not matched by a fill within this many seconds
+    ORDER_MARK_TTL_SECONDS = 24 * 3600
+
+    def __init__(self):
+        """Initialize a disabled tracker."""
+        self.enabled = False
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._order_marks: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+
+    def set_enabled(self, enabled: bool) -> None:
+        """
+        Enable or disable recording. Disabling also clears recorded data.
+
+        Args:
+            enabled: True to record durations
+        """
+        self.enabled = enabled
+        if not enabled:
+            self.reset()
+
+    def reset(self) -> None:
+        """Clear all histograms and pending order marks."""
+        with self._lock:
+            self._histograms.clear()
+            self._order_marks.clear()
+            self._started_at = time.time()
+
+    def record(self, stage: str, seconds: float, symbol: Optional[str] = None) -> None:
+        """
+        Record one duration.
+
+        Args:
+            stage: Stage name (e.g. 'db_read')
+            seconds: Duration in seconds
+            symbol: Symbol to charge; defaults to the symbol in the current context
+        """
+        if not self.enabled:
+            return
+        key = (stage, symbol or current_symbol.get() or '-')
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.record(seconds)
+
+    @contextmanager
+    def _timed(self, stage: str, symbol: Optional[str]) -> Iterator[None]:
+        """Record the duration of a with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, symbol)
+
+    def timer(self, stage: str, symbol: Optional[str] = None):
+        """
+        Context manager timing a block (a shared no-op when disabled).
+
+        Args:
+            stage: Stage name
+            symbol: Symbol to charge; defaults to the symbol in the current context
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self._timed(stage, symbol)
+
+    def record_since_quote(self, stage: str = 'quote_to_order', symbol: Optional[str] = None) -> None:
+        """
+        Record the time since the mailbox accepted the quote being handled.
+
+        Args:
+            stage: Stage name
+            symbol: Symbol to charge; defaults to the symbol in the current context
+        """
+        received_at = quote_received_at.get()
+        if self.enabled and received_at is not None:
+            self.record(stage, time.perf_counter() - received_at, symbol)
+
+    def mark_dispatched(self) -> None:
+        """Note the time a quote is handed to a worker thread, for executor_wait."""
+        if self.enabled:
+            dispatched_at.set(time.perf_counter())
+
+    def record_since_dispatch(self, stage: str = 'executor_wait', symbol: Optional[str] = None) -> None:
+        """
+        Record the time since mark_dispatched() in the calling context.
+
+        Args:
+            stage: Stage name
+            symbol: Symbol to charge; defaults to the symbol in the current context
+        """
+        started_at = dispatched_at.get()
+        if self.enabled and started_at is not None:
+            self.record(stage, time.perf_counter() - started_at, symbol)
+
+    def mark_order_submitted(self, order_id: str, symbol: str) -> None:
+        """
+        Remember when an order was placed, for order_to_fill.
+
+        Args:
+            order_id: Alpaca order ID
+            symbol: Order symbol
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            if len(self._order_marks) > 1000:
+                cutoff = now - self.ORDER_MARK_TTL_SECONDS
+                self._order_marks = {k: v for k, v in self._order_marks.items() if v[0] >= cutoff}
+            self._order_marks[str(order_id)] = (now, symbol)
+
+    def record_order_filled(self, order_id: str) -> None:
+        """
+        Record order_to_fill for an order placed by this process.
+
+        Args:
+            order_id: Alpaca order ID of the filled order
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            mark = self._order_marks.pop(str(order_id), None)
+        if mark is not None:
+            self.record('order_to_fill', time.perf_counter() - mark[0], mark[1])
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Summaries of every stage.
+
+        Returns:
+            {stage: {'all': summary, 'symbols': {symbol: summary}}} where each
+            summary has count, mean_ms, min_ms, p50_ms, p90_ms, p99_ms and max_ms
+        """
+        with self._lock:
+            by_stage: Dict[str, Dict[str, LatencyHistogram]] = {}
+            for (stage, symbol), histogram in self._histograms.items():
+                by_stage.setdefault(stage, {})[symbol] = histogram
+
+            result: Dict[str, Dict[str, Any]] = {}
+            for stage, histograms in by_stage.items():
+                combined = LatencyHistogram()
+                for histogram in histograms.values():
+                    combined.merge(histogram)
+                result[stage] = {
+                    'all': combined.summary(),
+                    'symbols': {symbol: histogram.summary() for symbol, histogram in histograms.items()},
+                }
+        return result
+
+    def log_summary(self, reset: bool = False) -> None:
+        """
+        Log one line per stage, with per-symbol lines at DEBUG.
+
+        Args:
+            reset: Clear the histograms afterwards, so each summary covers one interval
+        """
+        snapshot = self.snapshot()
+        if not snapshot:
+            logger.info("Latency: no samples recorded")
+        else:
+            window = time.time() - self._started_at
+            logger.info(f"⏱️ Latency over the last {window:.0f}s (ms):")
+            for stage in sorted(snapshot):
+                s = snapshot[stage]['all']
+                logger.info(f"   {stage}: n={s['count']} mean={s['mean_ms']:.1f} p50={s['p50_ms']:.1f} "
+                            f"p90={s['p90_ms']:.1f} p99={s['p99_ms']:.1f} max={s['max_ms']:.1f}")
+                for symbol, s in sorted(snapshot[stage]['symbols'].items()):
+                    logger.debug(f"      {symbol}: n={s['count']} p50={s['p50_ms']:.1f} "
+                                 f"p99={s['p99_ms']:.1f} max={s['max_ms']:.1f}")
+        if reset:
+            with self._lock:
+                self._histograms.clear()
+                self._started_at = time.time()
+
+
+# Process-wide tracker, enabled by main_app
+latency_tracker = LatencyTracker()
+
+
+def timed(stage: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorator recording each call's duration under a stage.
+
+    Args:
+        stage: Stage name
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not latency_tracker.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                latency_tracker.record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
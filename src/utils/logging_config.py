@@ -13,21 +13,26 @@ Features:
 - Console and file output
 - Proper log levels and filtering
 - Performance-conscious logging
+- Optional queued mode that writes log files from a listener thread
 """
 
+import atexit
 import logging
 import logging.handlers
+import queue
 import sys
 import gzip
 import shutil
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from config import get_config
+from utils.event_sink import record_event
 
 config = get_config()
 
@@ -140,6 +145,90 @@ class AssetContextAdapter(logging.LoggerAdapter):
         return msg, kwargs
 
 
+# Asset adapters are stateless, so one per (logger, symbol) is shared by all callers
+_asset_logger_cache: Dict[Tuple[str, str], AssetContextAdapter] = {}
+
+# Queued logging state: the listener and the handlers it took over from the logger
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+_queued_logger: Optional[logging.Logger] = None
+_queued_handlers: List[logging.Handler] = []
+_queue_lock = threading.Lock()
+_atexit_registered = False
+
+
+def enable_queued_logging(logger: Optional[logging.Logger] = None) -> bool:
+    """
+    Move a logger's handlers onto a background listener thread.
+    
+    The logger's handlers are replaced by a single QueueHandler, so a log call
+    only formats the message and appends it to an in-memory queue. A
+    QueueListener thread runs the original handlers (file writes, rotation,
+    gzip) and keeps each handler's level. Call stop_queued_logging() to flush
+    the queue and restore the handlers; it is also registered with atexit.
+    
+    Args:
+        logger: Logger whose handlers to move (defaults to the root logger)
+    
+    Returns:
+        True if queued logging was enabled, False if it was already enabled
+        or the logger has no handlers
+    """
+    global _queue_listener, _queued_logger, _queued_handlers, _atexit_registered
+    
+    logger = logger or logging.getLogger()
+    with _queue_lock:
+        if _queue_listener is not None:
+            return False
+        
+        handlers = list(logger.handlers)
+        if not handlers:
+            return False
+        
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        
+        for handler in handlers:
+            logger.removeHandler(handler)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        listener.start()
+        
+        _queue_listener = listener
+        _queued_logger = logger
+        _queued_handlers = handlers
+        
+        if not _atexit_registered:
+            atexit.register(stop_queued_logging)
+            _atexit_registered = True
+    
+    logging.getLogger(__name__).info(f"Queued logging enabled for {len(handlers)} handlers")
+    return True
+
+
+def stop_queued_logging() -> None:
+    """Write out queued records, stop the listener thread and restore the original handlers."""
+    global _queue_listener, _queued_logger, _queued_handlers
+    
+    with _queue_lock:
+        listener, logger, handlers = _queue_listener, _queued_logger, _queued_handlers
+        if listener is None:
+            return
+        _queue_listener, _queued_logger, _queued_handlers = None, None, []
+        
+        for handler in list(logger.handlers):
+            if isinstance(handler, logging.handlers.QueueHandler):
+                logger.removeHandler(handler)
+        for handler in handlers:
+            logger.addHandler(handler)
+        
+        # Drains everything enqueued before the handlers were restored
+        listener.stop()
+
+
+def is_queued_logging_enabled() -> bool:
+    """True while log records are written by the listener thread."""
+    return _queue_listener is not None
+
+
 def setup_logging(
     app_name: str = "dca_bot",
     console_level: Optional[str] = None,
@@ -245,6 +334,9 @@ def get_asset_logger(asset_symbol: str, base_logger: Optional[logging.Logger] =
     
     This is the recommended way to log asset-related operations for lifecycle tracking.
     
+    Adapters are cached per (logger, symbol), so hot paths can call this for
+    every quote. Passing base_logger also skips the caller-frame lookup.
+    
     Args:
         asset_symbol: The trading pair symbol (e.g., 'BTC/USD')
         base_logger: Base logger to adapt (defaults to module logger)
@@ -259,12 +351,20 @@ def get_asset_logger(asset_symbol: str, base_logger: Optional[logging.Logger] =
     """
     if base_logger is None:
         # Use the caller's module logger
-        import inspect
-        frame = inspect.currentframe().f_back
-        module_name = frame.f_globals.get('__name__', 'unknown')
+        module_name = sys._getframe(1).f_globals.get('__name__', 'unknown')
         base_logger = logging.getLogger(module_name)
     
-    return AssetContextAdapter(base_logger, asset_symbol)
+    return _cached_asset_logger(base_logger, asset_symbol)
+
+
+def _cached_asset_logger(base_logger: logging.Logger, asset_symbol: str) -> AssetContextAdapter:
+    """Get or create the shared adapter for a logger and symbol."""
+    key = (base_logger.name, asset_symbol)
+    adapter = _asset_logger_cache.get(key)
+    if adapter is None or adapter.logger is not base_logger:
+        adapter = AssetContextAdapter(base_logger, asset_symbol)
+        _asset_logger_cache[key] = adapter
+    return adapter
 
 
 def log_asset_lifecycle_event(
@@ -278,7 +378,8 @@ def log_asset_lifecycle_event(
     Log a structured asset lifecycle event.
     
     This function provides a standardized way to log important asset lifecycle events
-    with consistent formatting for easy analysis.
+    with consistent formatting for easy analysis. The event is also written to
+    the JSON-lines event sink when one is configured.
     
     Args:
         asset_symbol: The trading pair symbol (e.g., 'BTC/USD')
@@ -296,19 +397,18 @@ def log_asset_lifecycle_event(
     """
     if logger is None:
         # Use the caller's module logger
-        import inspect
-        frame = inspect.currentframe().f_back
-        module_name = frame.f_globals.get('__name__', 'unknown')
+        module_name = sys._getframe(1).f_globals.get('__name__', 'unknown')
         logger = logging.getLogger(module_name)
     
-    # Create asset logger adapter
-    asset_logger = AssetContextAdapter(logger, asset_symbol)
+    asset_logger = _cached_asset_logger(logger, asset_symbol)
     
     # Format the details for logging
     details_str = " | ".join(f"{k}={v}" for k, v in details.items())
     message = f"LIFECYCLE_EVENT:{event_type} | {details_str}"
     
     asset_logger.log(level, message)
+    # One field, so detail keys cannot collide with the symbol or the envelope (ts, seq, event)
+    record_event(event_type.lower(), asset_symbol, details=details)
 
 
 # Convenience functions for the new consolidated logging approach
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - Metrics Endpoint
+
+Exposes main_app's counters and gauges over HTTP in the Prometheus text
+format, so the process can be scraped (or curl'd) instead of inferring its
+health from log greps:
+
+    curl -s http://127.0.0.1:9108/metrics
+
+Features:
+- Counters and gauges with label values, updated with a dict lookup under
+  a lock (cheap enough for the quote and DB paths)
+- Collectors that read existing get_stats() counters only when scraped
+- Event loop lag probe per stream loop
+- Standard library HTTP server on a daemon thread (no extra dependency)
+- /metrics and /health endpoints, bound to localhost by default
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@dataclass
+class MetricFamily:
+    """One metric name with its type, help text and labelled samples."""
+    name: str
+    kind: str  # 'counter', 'gauge' or 'summary'
+    help: str
+    samples: List[Tuple[Dict[str, str], float]] = field(default_factory=list)
+
+    def add(self, value: float, **labels: Any) -> 'MetricFamily':
+        """Append a sample and return self, for chaining."""
+        self.samples.append(({k: str(v) for k, v in labels.items()}, value))
+        return self
+
+
+class _Metric:
+    """Base for metrics whose values are updated by the application."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        """
+        Initialize the metric.
+
+        Args:
+            name: Metric name (e.g. 'dca_orders_placed_total')
+            help: One-line description
+            labelnames: Label names, matched positionally by label values
+        """
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, *label_values: str) -> float:
+        """Current value for a label combination (0.0 if never set)."""
+        return self._values.get(label_values, 0.0)
+
+    def clear(self) -> None:
+        """Forget every label combination."""
+        with self._lock:
+            self._values.clear()
+
+    def collect(self) -> MetricFamily:
+        """Snapshot the metric for rendering."""
+        family = MetricFamily(self.name, self.kind, self.help)
+        with self._lock:
+            items = list(self._values.items())
+        for label_values, value in items:
+            family.samples.append((dict(zip(self.labelnames, label_values)), value))
+        return family
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    kind = 'counter'
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """
+        Increase the counter.
+
+        Args:
+            *label_values: One value per label name
+            amount: Amount to add
+        """
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = 'gauge'
+
+    def set(self, value: float, *label_values: str) -> None:
+        """Set the gauge to a value."""
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """Increase the gauge."""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        """Decrease the gauge."""
+        self.inc(*label_values, amount=-amount)
+
+
+class MetricsRegistry:
+    """
+    Metrics and scrape-time collectors rendered together.
+
+    counter() and gauge() return the existing metric when called again with
+    the same name, so modules can declare their metrics at import time.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help: str, labelnames: Tuple[str, ...]) -> Any:
+        """Return the named metric, creating it if needed."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        """
+        Add a function called on every scrape.
+
+        Args:
+            collector: Returns MetricFamily objects built from current state
+        """
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def unregister_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        """Remove a collector added with register_collector()."""
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def collect(self) -> List[MetricFamily]:
+        """
+        Gather every metric and collector output.
+
+        A failing collector is logged and skipped so one broken source does
+        not take down the whole scrape.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        families = [metric.collect() for metric in metrics]
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        return families
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {_escape_help(family.help)}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for labels, value in family.samples:
+                lines.append(f"{family.name}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_help(text: str) -> str:
+    """Escape a HELP line."""
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Format a label set as {name="value",...}."""
+    if not labels:
+        return ''
+    parts = []
+    for name, value in labels.items():
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{escaped}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value."""
+    if not isinstance(value, float):
+        return str(int(value))
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class EventLoopLagProbe:
+    """
+    Measures how late asyncio.sleep() wakes up on each event loop.
+
+    The streams run their own event loops on executor threads, so the probe
+    is started lazily from a handler running on the loop to be measured.
+    """
+
+    def __init__(self, interval_seconds: float = 1.0):
+        """
+        Initialize a disabled probe.
+
+        Args:
+            interval_seconds: Sleep between measurements
+        """
+        self.interval_seconds = interval_seconds
+        self.enabled = False
+        self._tasks: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Task]] = {}
+        self._lag: Dict[str, float] = {}
+        self._max_lag: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def ensure_started(self, loop_name: str) -> None:
+        """
+        Start measuring the running loop under a name, if not already.
+
+        Args:
+            loop_name: Label for the loop (e.g. 'crypto_stream')
+        """
+        if not self.enabled:
+            return
+        loop = asyncio.get_running_loop()
+        running = self._tasks.get(loop_name)
+        if running is not None and running[0] is loop and not running[1].done():
+            return
+        self._tasks[loop_name] = (loop, loop.create_task(self._probe(loop_name)))
+
+    async def _probe(self, loop_name: str) -> None:
+        """Sleep repeatedly and record the overshoot."""
+        interval = self.interval_seconds
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag = max(0.0, time.perf_counter() - start - interval)
+            with self._lock:
+                self._lag[loop_name] = lag
+                self._max_lag[loop_name] = max(self._max_lag.get(loop_name, 0.0), lag)
+
+    def collect(self) -> List[MetricFamily]:
+        """Latest and maximum lag per loop."""
+        with self._lock:
+            lag = dict(self._lag)
+            max_lag = dict(self._max_lag)
+        latest = MetricFamily('dca_event_loop_lag_seconds', 'gauge', 'Latest event loop wake-up delay')
+        worst = MetricFamily('dca_event_loop_lag_max_seconds', 'gauge', 'Largest event loop wake-up delay since start')
+        for name in sorted(lag):
+            latest.add(lag[name], loop=name)
+            worst.add(max_lag[name], loop=name)
+        return [latest, worst]
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serves /metrics and /health."""
+
+    registry: MetricsRegistry
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        path = self.path.split('?', 1)[0]
+        if path == '/metrics':
+            self._send(200, self.registry.render(), CONTENT_TYPE)
+        elif path == '/health':
+            self._send(200, 'ok\n', 'text/plain; charset=utf-8')
+        else:
+            self._send(404, 'not found\n', 'text/plain; charset=utf-8')
+
+    def _send(self, status: int, body: str, content_type: str) -> None:
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Keep scrapes out of the application log."""
+        logger.debug(f"Metrics request from {self.address_string()}: {format % args}")
+
+
+class MetricsServer:
+    """HTTP server for a registry, running on a daemon thread."""
+
+    def __init__(self, registry: MetricsRegistry, host: str = '127.0.0.1', port: int = 9108):
+        """
+        Bind the server socket.
+
+        Args:
+            registry: Registry to render on /metrics
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+
+        Raises:
+            OSError: If the address cannot be bound
+        """
+        handler = type('MetricsRequestHandler', (_MetricsRequestHandler,), {'registry': registry})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Bound (host, port)."""
+        return self._server.server_address[:2]
+
+    def start(self) -> None:
+        """Start serving on a daemon thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join(5.0)
+            self._thread = None
+        self._server.server_close()
+
+
+# Process-wide registry and lag probe; metric objects are declared by the modules that update them
+metrics_registry = MetricsRegistry()
+loop_lag_probe = EventLoopLagProbe()
+
+_metrics_server: Optional[MetricsServer] = None
+
+
+def start_metrics_server(host: str = '127.0.0.1', port: int = 9108) -> MetricsServer:
+    """
+    Serve metrics_registry over HTTP and start the event loop lag probe.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind
+
+    Returns:
+        The running server
+
+    Raises:
+        OSError: If the address cannot be bound
+    """
+    global _metrics_server
+    stop_metrics_server()
+    server = MetricsServer(metrics_registry, host, port)
+    server.start()
+    _metrics_server = server
+    loop_lag_probe.enabled = True
+    metrics_registry.register_collector(loop_lag_probe.collect)
+    logger.info(f"Metrics served on http://{server.address[0]}:{server.address[1]}/metrics")
+    return server
+
+
+def stop_metrics_server() -> None:
+    """Stop the HTTP server, if running."""
+    global _metrics_server
+    server, _metrics_server = _metrics_server, None
+    if server is not None:
+        loop_lag_probe.enabled = False
+        server.stop()
+
+
+def get_metrics_server() -> Optional[MetricsServer]:
+    """Get the running server, or None if metrics are not served."""
+    return _metrics_server
@@ -13,14 +13,17 @@ Features:
 - Configuration validation
 - Rate limiting to prevent spam
 - HTML and plain text support
+- Optional background sender with a reused SMTP session and alert digests
 """
 
 import smtplib
 import email.message
 import email.utils
 import logging
+import queue
+import threading
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta, timezone
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -30,6 +33,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from config import get_config
 from utils.formatting import format_price, format_quantity
+from utils.latency import timed
 
 config = get_config()
 logger = logging.getLogger(__name__)
@@ -72,25 +76,86 @@ class EmailRateLimiter:
 _rate_limiter = EmailRateLimiter()
 
 
+# Priorities delivered immediately by the dispatcher; lower ones are digested
+IMMEDIATE_EMAIL_PRIORITIES = ('high', 'critical')
+
+# Maximum alerts held for one digest; older ones are summarized as a count
+MAX_DIGEST_ENTRIES = 200
+
+
+def _build_email_message(
+    subject: str,
+    body: str,
+    html_body: Optional[str] = None,
+    priority: str = "normal"
+) -> email.message.Message:
+    """
+    Build an alert email with the bot's subject prefix and metadata headers.
+    
+    Args:
+        subject: Email subject line
+        body: Plain text email body
+        html_body: Optional HTML email body
+        priority: Email priority ('low', 'normal', 'high', 'critical')
+    
+    Returns:
+        Message ready for SMTP.send_message()
+    """
+    # Prepare subject with priority indicator
+    priority_prefix = {
+        'low': '',
+        'normal': '',
+        'high': '[HIGH] ',
+        'critical': '[CRITICAL] '
+    }.get(priority.lower(), '')
+    
+    full_subject = f"{priority_prefix}[DCA Bot] {subject}"
+    
+    # Create message
+    if html_body:
+        msg = MIMEMultipart('alternative')
+        msg.attach(MIMEText(body, 'plain'))
+        msg.attach(MIMEText(html_body, 'html'))
+    else:
+        msg = MIMEText(body, 'plain')
+    
+    msg['Subject'] = full_subject
+    msg['From'] = config.alert_email_from
+    msg['To'] = config.alert_email_to
+    msg['Date'] = email.utils.formatdate(localtime=True)
+    
+    # Add metadata
+    msg['X-DCA-Bot-Priority'] = priority
+    msg['X-DCA-Bot-Timestamp'] = datetime.now(timezone.utc).isoformat()
+    
+    return msg
+
+
+@timed('notification')
 def send_email_alert(
     subject: str,
     body: str,
     html_body: Optional[str] = None,
     priority: str = "normal",
-    bypass_rate_limit: bool = False
+    bypass_rate_limit: bool = False,
+    blocking: bool = False
 ) -> bool:
     """
     Send an email alert using SMTP configuration.
     
+    When the background dispatcher is running the alert is queued (or added
+    to the next digest) and this returns without touching SMTP.
+    
     Args:
         subject: Email subject line
         body: Plain text email body
         html_body: Optional HTML email body
         priority: Email priority ('low', 'normal', 'high', 'critical')
         bypass_rate_limit: If True, bypass rate limiting (use for critical alerts)
+        blocking: Send on the caller's thread even if the dispatcher is running
     
     Returns:
-        True if email was sent successfully, False otherwise
+        True if email was sent (or queued) successfully, False otherwise
     
     Example:
         >>> success = send_email_alert(
@@ -105,37 +170,16 @@ def send_email_alert(
             logger.debug("Email alerts not configured, skipping notification")
             return False
         
+        dispatcher = _email_dispatcher
+        if dispatcher is not None and not blocking:
+            return dispatcher.submit(subject, body, html_body, priority, bypass_rate_limit)
+        
         # Check rate limiting (unless bypassed for critical alerts)
         if not bypass_rate_limit and not _rate_limiter.can_send_email():
             logger.warning("Email rate limit exceeded, skipping notification")
             return False
         
-        # Prepare subject with priority indicator
-        priority_prefix = {
-            'low': '',
-            'normal': '',
-            'high': '[HIGH] ',
-            'critical': '[CRITICAL] '
-        }.get(priority.lower(), '')
-        
-        full_subject = f"{priority_prefix}[DCA Bot] {subject}"
-        
-        # Create message
-        if html_body:
-            msg = MIMEMultipart('alternative')
-            msg.attach(MIMEText(body, 'plain'))
-            msg.attach(MIMEText(html_body, 'html'))
-        else:
-            msg = MIMEText(body, 'plain')
-        
-        msg['Subject'] = full_subject
-        msg['From'] = config.alert_email_from
-        msg['To'] = config.alert_email_to
-        msg['Date'] = email.utils.formatdate(localtime=True)
-        
-        # Add metadata
-        msg['X-DCA-Bot-Priority'] = priority
-        msg['X-DCA-Bot-Timestamp'] = datetime.now(timezone.utc).isoformat()
+        msg = _build_email_message(subject, body, html_body, priority)
         
         # Send email
         with smtplib.SMTP(config.smtp_server, config.smtp_port) as server:
@@ -167,6 +211,361 @@ def send_email_alert(
         return False
 
 
+class EmailDispatcher:
+    """
+    Background email sender with one long-lived SMTP session.
+    
+    High and critical alerts are queued and sent as soon as the worker
+    thread picks them up. Low and normal alerts are collected and sent as a
+    single digest email every digest interval, so an incident that fires
+    dozens of alerts costs a handful of emails. The authenticated SMTP
+    session is kept open between sends, reconnected once if the server
+    dropped it, and closed after it has been idle for a while.
+    """
+    
+    def __init__(
+        self,
+        queue_size: int = 100,
+        digest_interval_seconds: float = 300.0,
+        smtp_timeout_seconds: float = 30.0,
+        session_idle_seconds: float = 120.0
+    ):
+        """
+        Initialize a stopped dispatcher.
+        
+        Args:
+            queue_size: Maximum immediate alerts waiting to be sent
+            digest_interval_seconds: Seconds between digest emails (0 sends every alert immediately)
+            smtp_timeout_seconds: Socket timeout for SMTP operations
+            session_idle_seconds: Close the SMTP session after this long without a send
+        """
+        self.digest_interval_seconds = digest_interval_seconds
+        self.smtp_timeout_seconds = smtp_timeout_seconds
+        self.session_idle_seconds = session_idle_seconds
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._digest: List[Dict[str, Any]] = []
+        self._digest_omitted = 0
+        self._digest_lock = threading.Lock()
+        self._next_digest_at = time.monotonic() + digest_interval_seconds
+        self._session: Optional[smtplib.SMTP] = None
+        self._session_used_at = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'queued': 0, 'digested': 0, 'dropped': 0, 'sent': 0, 'digests_sent': 0,
+            'failed': 0, 'rate_limited': 0, 'smtp_connects': 0
+        }
+    
+    def start(self) -> None:
+        """Start the worker thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='email-dispatcher', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout_seconds: float = 30.0) -> int:
+        """
+        Stop accepting alerts, send queued alerts and the pending digest, and close SMTP.
+        
+        Args:
+            timeout_seconds: Maximum time to wait for the worker to finish
+        
+        Returns:
+            Number of alerts still unsent when the timeout expired
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout_seconds)
+        with self._digest_lock:
+            unsent = self._queue.qsize() + len(self._digest)
+        if unsent:
+            logger.warning(f"Email dispatcher stopped with {unsent} alerts unsent")
+        return unsent
+    
+    def submit(
+        self,
+        subject: str,
+        body: str,
+        html_body: Optional[str] = None,
+        priority: str = "normal",
+        bypass_rate_limit: bool = False
+    ) -> bool:
+        """
+        Queue an alert without waiting for SMTP.
+        
+        Args:
+            subject: Email subject line
+            body: Plain text email body
+            html_body: Optional HTML email body
+            priority: Email priority; high and critical are sent immediately
+            bypass_rate_limit: Skip the hourly rate limit (critical alerts)
+        
+        Returns:
+            True if queued, False if the dispatcher is stopped or the queue is full
+        """
+        if self._stop_event.is_set():
+            return False
+        
+        alert = {
+            'subject': subject,
+            'body': body,
+            'html_body': html_body,
+            'priority': priority,
+            'bypass_rate_limit': bypass_rate_limit,
+            'created_at': datetime.now(timezone.utc)
+        }
+        
+        if self.digest_interval_seconds > 0 and priority.lower() not in IMMEDIATE_EMAIL_PRIORITIES:
+            with self._digest_lock:
+                self._digest.append(alert)
+                if len(self._digest) > MAX_DIGEST_ENTRIES:
+                    self._digest.pop(0)
+                    self._digest_omitted += 1
+            self._count('digested')
+            return True
+        
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            self._count('dropped')
+            logger.warning(f"Email alert queue full, dropping alert: {subject}")
+            return False
+        self._count('queued')
+        return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get dispatcher counters.
+        
+        Returns:
+            Dictionary with queued, digested, dropped, sent, digests_sent, failed,
+            rate_limited, smtp_connects, queue_depth and digest_pending
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queue_depth'] = self._queue.qsize()
+        with self._digest_lock:
+            stats['digest_pending'] = len(self._digest)
+        return stats
+    
+    def log_summary(self) -> None:
+        """Log dispatcher counters."""
+        stats = self.get_stats()
+        logger.info(f"Email dispatcher: sent={stats['sent']} (digests={stats['digests_sent']}), "
+                    f"digested={stats['digested']}, dropped={stats['dropped']}, failed={stats['failed']}, "
+                    f"rate_limited={stats['rate_limited']}, smtp_connects={stats['smtp_connects']}")
+    
+    def _count(self, key: str, amount: int = 1) -> None:
+        """Increment a counter."""
+        with self._stats_lock:
+            self._stats[key] += amount
+    
+    def _run(self) -> None:
+        """Worker loop: send immediate alerts, flush digests on schedule, expire idle sessions."""
+        try:
+            while True:
+                stopping = self._stop_event.is_set()
+                try:
+                    alert = self._queue.get(timeout=0 if stopping else 0.5)
+                except queue.Empty:
+                    alert = None
+                
+                if alert is not None:
+                    self._deliver(alert)
+                elif stopping:
+                    self._flush_digest()
+                    return
+                
+                if time.monotonic() >= self._next_digest_at:
+                    self._flush_digest()
+                    self._next_digest_at = time.monotonic() + self.digest_interval_seconds
+                
+                if self._session is not None and time.monotonic() - self._session_used_at > self.session_idle_seconds:
+                    self._close_session()
+        finally:
+            self._close_session()
+    
+    def _flush_digest(self) -> None:
+        """Send pending low-priority alerts as one digest email (held for the next one if rate limited)."""
+        with self._digest_lock:
+            alerts, self._digest = self._digest, []
+            omitted, self._digest_omitted = self._digest_omitted, 0
+        if not alerts:
+            return
+        
+        single = len(alerts) == 1 and not omitted
+        if single:
+            digest = alerts[0]
+        else:
+            body_lines = [
+                "DCA Trading Bot Alert Digest",
+                "",
+                f"{len(alerts) + omitted} alerts since the last digest",
+                ""
+            ]
+            if omitted:
+                body_lines.extend([f"({omitted} earlier alerts omitted)", ""])
+            for alert in alerts:
+                body_lines.extend([
+                    "=" * 60,
+                    f"{alert['created_at'].strftime('%Y-%m-%d %H:%M:%S UTC')} - {alert['subject']}",
+                    "=" * 60,
+                    alert['body'].strip(),
+                    ""
+                ])
+            
+            digest = {
+                'subject': f"Digest - {len(alerts) + omitted} alerts",
+                'body': "\n".join(body_lines),
+                'html_body': None,
+                'priority': 'normal',
+                'bypass_rate_limit': False
+            }
+        
+        if not digest['bypass_rate_limit'] and not _rate_limiter.can_send_email():
+            self._count('rate_limited')
+            logger.warning(f"Email rate limit exceeded, holding {len(alerts) + omitted} alerts for the next digest")
+            self._restore_digest(alerts, omitted)
+            return
+        
+        if self._deliver(digest) and not single:
+            self._count('digests_sent')
+    
+    def _restore_digest(self, alerts: List[Dict[str, Any]], omitted: int) -> None:
+        """Put unsent digest alerts back ahead of any that arrived meanwhile, keeping the size cap."""
+        with self._digest_lock:
+            self._digest = alerts + self._digest
+            self._digest_omitted += omitted
+            excess = len(self._digest) - MAX_DIGEST_ENTRIES
+            if excess > 0:
+                del self._digest[:excess]
+                self._digest_omitted += excess
+    
+    def _deliver(self, alert: Dict[str, Any]) -> bool:
+        """Send one alert over the shared session, applying the hourly rate limit."""
+        if not alert['bypass_rate_limit'] and not _rate_limiter.can_send_email():
+            self._count('rate_limited')
+            logger.warning(f"Email rate limit exceeded, skipping notification: {alert['subject']}")
+            return False
+        
+        try:
+            msg = _build_email_message(alert['subject'], alert['body'], alert['html_body'], alert['priority'])
+            self._send_message(msg)
+        except smtplib.SMTPAuthenticationError as e:
+            logger.error(f"SMTP authentication failed: {e}")
+        except smtplib.SMTPRecipientsRefused as e:
+            logger.error(f"SMTP recipients refused: {e}")
+        except smtplib.SMTPException as e:
+            logger.error(f"SMTP error sending email alert: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error sending email alert: {e}")
+        else:
+            if not alert['bypass_rate_limit']:
+                _rate_limiter.record_email_sent()
+            self._count('sent')
+            logger.info(f"Email alert sent successfully: {alert['subject']}")
+            return True
+        
+        self._close_session()
+        self._count('failed')
+        return False
+    
+    def _send_message(self, msg: email.message.Message) -> None:
+        """Send over the open session, reconnecting once if the server dropped it."""
+        for attempt in range(2):
+            reused = self._session is not None
+            server = self._session if reused else self._connect()
+            try:
+                server.send_message(msg)
+                self._session_used_at = time.monotonic()
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError):
+                self._close_session()
+                if not reused or attempt:
+                    raise
+                logger.debug("SMTP session dropped, reconnecting")
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open and authenticate a new SMTP session."""
+        server = smtplib.SMTP(config.smtp_server, config.smtp_port, timeout=self.smtp_timeout_seconds)
+        try:
+            server.starttls()
+            server.login(config.smtp_username, config.smtp_password)
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+            raise
+        self._session = server
+        self._session_used_at = time.monotonic()
+        self._count('smtp_connects')
+        return server
+    
+    def _close_session(self) -> None:
+        """Close the SMTP session if one is open."""
+        server, self._session = self._session, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+
+# Background dispatcher, started by main_app (None sends synchronously)
+_email_dispatcher: Optional[EmailDispatcher] = None
+
+
+def start_email_dispatcher(queue_size: int = 100, digest_interval_seconds: float = 300.0) -> EmailDispatcher:
+    """
+    Send email alerts from a background thread.
+    
+    Until this is called (and after stop_email_dispatcher), alerts are sent
+    synchronously on the caller's thread, which suits one-shot scripts.
+    
+    Args:
+        queue_size: Maximum immediate alerts waiting to be sent
+        digest_interval_seconds: Seconds between digests of low and normal alerts (0 disables digests)
+    
+    Returns:
+        The running dispatcher
+    """
+    global _email_dispatcher
+    stop_email_dispatcher()
+    dispatcher = EmailDispatcher(queue_size=queue_size, digest_interval_seconds=digest_interval_seconds)
+    dispatcher.start()
+    _email_dispatcher = dispatcher
+    logger.info(f"Email dispatcher started (queue {queue_size}, digest every {digest_interval_seconds}s)")
+    return dispatcher
+
+
+def stop_email_dispatcher(timeout_seconds: float = 30.0) -> None:
+    """
+    Send queued alerts and the pending digest, then return to synchronous sending.
+    
+    Args:
+        timeout_seconds: Maximum time to wait for the queue to drain
+    """
+    global _email_dispatcher
+    dispatcher = _email_dispatcher
+    if dispatcher is None:
+        return
+    _email_dispatcher = None
+    dispatcher.stop(timeout_seconds)
+    dispatcher.log_summary()
+
+
+def get_email_dispatcher() -> Optional[EmailDispatcher]:
+    """Get the running dispatcher, or None if alerts are sent synchronously."""
+    return _email_dispatcher
+
+
 def send_trading_alert(
     asset_symbol: str,
     event_type: str,
@@ -337,7 +736,7 @@ Timestamp: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}
 If you received this email, your email configuration is working correctly.
 """
     
-    success = send_email_alert(subject, body, priority="low", bypass_rate_limit=True)
+    success = send_email_alert(subject, body, priority="low", bypass_rate_limit=True, blocking=True)
     
     if success:
         logger.info("Test email sent successfully")
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - Local Position Book
+
+Looking up one symbol's Alpaca position used to mean fetching every position
+in the account over REST. This module keeps an in-process copy of the
+account's crypto positions keyed by symbol:
+
+- Seeded from a full REST snapshot at startup
+- Updated from TradingStream fill and partial_fill events
+- Reconciled against REST on a slow timer, logging any drift
+
+Features:
+- Dictionary lookups for position checks on the order/fill paths
+- Uses the stream's position_qty (post-fee) when Alpaca provides it
+- Weighted average entry price on buys, matching the cycle fallback math
+  (an estimate: fill handlers read avg_entry_price over REST for the cycle)
+- Reconciliation never overwrites a fill applied while the snapshot was in flight
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_symbol(symbol: str) -> str:
+    """Convert a pair symbol to Alpaca's position format (BTC/USD -> BTCUSD)."""
+    return symbol.replace('/', '')
+
+
+def _to_decimal(value: Any) -> Optional[Decimal]:
+    """Parse a numeric value from Alpaca, returning None if missing or invalid."""
+    if value is None:
+        return None
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError, TypeError):
+        return None
+
+
+@dataclass(frozen=True)
+class BookPosition:
+    """
+    Position held in the book.
+
+    Exposes the same symbol/qty/avg_entry_price attributes the callers read
+    from alpaca-py Position objects.
+    """
+    symbol: str
+    qty: Decimal
+    avg_entry_price: Decimal
+    source: str  # 'rest' or 'stream'
+
+
+class PositionBook:
+    """
+    Thread-safe, in-process view of the account's positions.
+
+    Fill events arrive on the TradingStream event loop, lookups run on
+    worker threads and reconciliation runs in a background task, so every
+    access goes through a lock. Stored positions are immutable.
+    """
+
+    def __init__(self):
+        """Initialize an empty book. Lookups are not served until it is seeded."""
+        self._positions: Dict[str, BookPosition] = {}
+        self._generation: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._ready = False
+        self._last_reconciled_at: Optional[float] = None
+        self._stats = {'lookups': 0, 'fills_applied': 0, 'reconciles': 0, 'drift_corrections': 0}
+
+    @property
+    def is_ready(self) -> bool:
+        """True once the book has been seeded from a REST snapshot."""
+        return self._ready
+
+    def reset(self) -> None:
+        """Clear the book and stop serving lookups until it is seeded again."""
+        with self._lock:
+            self._positions.clear()
+            self._generation.clear()
+            self._ready = False
+
+    def get(self, symbol: str) -> Optional[BookPosition]:
+        """
+        Look up a non-zero position.
+
+        Args:
+            symbol: Symbol in either format ('BTC/USD' or 'BTCUSD')
+
+        Returns:
+            BookPosition, or None if the account holds none of the asset
+        """
+        with self._lock:
+            self._stats['lookups'] += 1
+            return self._positions.get(normalize_symbol(symbol))
+
+    def all_positions(self) -> List[BookPosition]:
+        """Return every non-zero position in the book."""
+        with self._lock:
+            return list(self._positions.values())
+
+    def generations(self) -> Dict[str, int]:
+        """Per-symbol generations, captured before fetching a REST snapshot for reconcile()."""
+        with self._lock:
+            return dict(self._generation)
+
+    def apply_fill(
+        self,
+        symbol: str,
+        side: str,
+        fill_qty: Any,
+        fill_price: Any,
+        position_qty: Any = None
+    ) -> Optional[BookPosition]:
+        """
+        Apply one execution from a TradingStream fill or partial_fill event.
+
+        Args:
+            symbol: Order symbol (e.g., 'BTC/USD')
+            side: 'buy' or 'sell'
+            fill_qty: Quantity of this execution
+            fill_price: Price of this execution
+            position_qty: Position quantity after the execution, if Alpaca sent it
+
+        Returns:
+            The updated position (None if the position is now flat or the
+            event could not be applied)
+        """
+        key = normalize_symbol(symbol)
+        qty = _to_decimal(fill_qty)
+        price = _to_decimal(fill_price)
+        reported_qty = _to_decimal(position_qty)
+        side = str(side).lower()
+
+        if qty is None or qty <= 0 or price is None or price <= 0 or side not in ('buy', 'sell'):
+            logger.warning(f"Position book: ignoring unusable fill for {symbol} "
+                           f"(side={side}, qty={fill_qty}, price={fill_price}) - marking for REST refresh")
+            with self._lock:
+                # Drop the entry so the next lookup falls back to REST until reconcile
+                self._positions.pop(key, None)
+                self._generation[key] = self._generation.get(key, 0) + 1
+                self._ready = False
+            return None
+
+        with self._lock:
+            current = self._positions.get(key)
+            current_qty = current.qty if current else Decimal('0')
+            current_avg = current.avg_entry_price if current else Decimal('0')
+
+            if side == 'buy':
+                new_qty = reported_qty if reported_qty is not None else current_qty + qty
+                if current_qty > 0:
+                    # Weighted average: ((old_qty * old_price) + (new_qty * new_price)) / total_qty
+                    new_avg = (current_avg * current_qty + price * qty) / (current_qty + qty)
+                else:
+                    new_avg = price
+            else:
+                new_qty = reported_qty if reported_qty is not None else current_qty - qty
+                new_avg = current_avg
+
+            self._generation[key] = self._generation.get(key, 0) + 1
+            self._stats['fills_applied'] += 1
+
+            if new_qty <= 0:
+                self._positions.pop(key, None)
+                position = None
+            else:
+                position = BookPosition(symbol=key, qty=new_qty, avg_entry_price=new_avg, source='stream')
+                self._positions[key] = position
+
+        logger.debug(f"Position book: {side} fill {qty} @ {price} for {key} -> "
+                     f"{position.qty if position else 0} @ {position.avg_entry_price if position else '-'}")
+        return position
+
+    def reconcile(self, rest_positions: Iterable[Any], generations: Optional[Dict[str, int]] = None) -> List[str]:
+        """
+        Replace the book with a REST snapshot, logging positions that drifted.
+
+        Also used to seed the book at startup.
+
+        Args:
+            rest_positions: alpaca-py Position objects from get_all_positions()
+            generations: Result of generations() captured before the REST call.
+                Symbols with fills applied since then keep their stream value.
+
+        Returns:
+            Symbols whose book quantity differed from Alpaca and were corrected
+        """
+        fresh: Dict[str, BookPosition] = {}
+        for rest_position in rest_positions:
+            qty = _to_decimal(rest_position.qty)
+            avg_price = _to_decimal(rest_position.avg_entry_price)
+            if qty is None or qty == 0:
+                continue
+            key = normalize_symbol(rest_position.symbol)
+            fresh[key] = BookPosition(symbol=key, qty=qty, avg_entry_price=avg_price or Decimal('0'), source='rest')
+
+        drifted = []
+        with self._lock:
+            was_ready = self._ready
+            for key in set(self._positions) | set(fresh):
+                if generations is not None and self._generation.get(key, 0) != generations.get(key, 0):
+                    continue  # A fill landed during the REST call - the stream value is newer
+                current = self._positions.get(key)
+                rest = fresh.get(key)
+                current_qty = current.qty if current else Decimal('0')
+                rest_qty = rest.qty if rest else Decimal('0')
+                if was_ready and current_qty != rest_qty:
+                    drifted.append(key)
+                if rest is None:
+                    self._positions.pop(key, None)
+                else:
+                    self._positions[key] = rest
+
+            self._ready = True
+            self._last_reconciled_at = time.time()
+            self._stats['reconciles'] += 1
+            self._stats['drift_corrections'] += len(drifted)
+
+        for key in drifted:
+            logger.warning(f"Position book drift corrected for {key} from Alpaca REST snapshot")
+        return drifted
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get book counters.
+
+        Returns:
+            Dictionary with lookups, fills_applied, reconciles, drift_corrections,
+            positions, ready and last_reconciled_at
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['positions'] = len(self._positions)
+            stats['ready'] = self._ready
+            stats['last_reconciled_at'] = self._last_reconciled_at
+        return stats
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - Quote Conflation Mailbox
+
+CryptoDataStream awaits each quote handler before reading the next message,
+so during volatile markets quotes back up behind slow DB/REST work and
+decisions get made on stale prices. This module keeps one slot per symbol:
+a newer quote replaces any quote still waiting to be processed, and quotes
+whose bid/ask did not change are skipped.
+
+Features:
+- Latest-wins conflation per symbol (bounded latency at any feed rate)
+- One in-flight evaluation per symbol; symbols are processed concurrently
+- Unchanged bid/ask skip with a re-check interval
+- Per-symbol counters for received, processed, coalesced and skipped quotes
+- Queue-wait latency and the quote's arrival time exposed to the handler
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from utils.latency import latency_tracker, current_symbol, quote_received_at
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteMailbox:
+    """
+    Per-symbol, latest-wins mailbox in front of a quote handler.
+
+    submit() is registered with the stream instead of the handler. It returns
+    immediately, so the stream keeps reading; a drain task per symbol feeds
+    the handler with the newest pending quote each time the previous
+    evaluation finishes.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[None]],
+        skip_unchanged: bool = True,
+        unchanged_recheck_seconds: float = 1.0
+    ):
+        """
+        Initialize the mailbox.
+
+        Args:
+            handler: Coroutine function that evaluates a single quote
+            skip_unchanged: Skip quotes whose bid/ask match the last accepted quote
+            unchanged_recheck_seconds: Accept an unchanged quote anyway once this
+                many seconds have passed, so state changes (fills, cooldown
+                expiry) are still acted on in a flat market
+        """
+        self.handler = handler
+        self.skip_unchanged = skip_unchanged
+        self.unchanged_recheck_seconds = unchanged_recheck_seconds
+
+        self._pending: Dict[str, Tuple[Any, float]] = {}  # symbol -> (quote, perf_counter at accept)
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._last_accepted: Dict[str, Tuple[Any, Any, float]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _symbol_stats(self, symbol: str) -> Dict[str, int]:
+        """Return the counter dictionary for a symbol, creating it if needed."""
+        stats = self._stats.get(symbol)
+        if stats is None:
+            stats = {'received': 0, 'processed': 0, 'coalesced': 0, 'skipped_unchanged': 0, 'errors': 0}
+            self._stats[symbol] = stats
+        return stats
+
+    async def submit(self, quote) -> None:
+        """
+        Accept a quote from the stream without waiting for it to be processed.
+
+        Args:
+            quote: Quote object from Alpaca containing bid/ask data
+        """
+        symbol = quote.symbol
+        stats = self._symbol_stats(symbol)
+        stats['received'] += 1
+
+        now = time.monotonic()
+        if self.skip_unchanged:
+            last = self._last_accepted.get(symbol)
+            if (last is not None
+                    and last[0] == quote.bid_price
+                    and last[1] == quote.ask_price
+                    and now - last[2] < self.unchanged_recheck_seconds):
+                stats['skipped_unchanged'] += 1
+                return
+        self._last_accepted[symbol] = (quote.bid_price, quote.ask_price, now)
+
+        if symbol in self._pending:
+            # An older quote was still waiting - drop it in favor of this one
+            stats['coalesced'] += 1
+        self._pending[symbol] = (quote, time.perf_counter())
+
+        worker = self._workers.get(symbol)
+        if worker is None or worker.done():
+            self._workers[symbol] = asyncio.create_task(self._drain(symbol))
+
+    async def _drain(self, symbol: str) -> None:
+        """
+        Process the newest pending quote for a symbol until none are left.
+
+        Args:
+            symbol: Symbol whose mailbox to drain
+        """
+        stats = self._symbol_stats(symbol)
+        try:
+            current_symbol.set(symbol)
+            while symbol in self._pending:
+                quote, received_at = self._pending.pop(symbol)
+                latency_tracker.record('queue_wait', time.perf_counter() - received_at, symbol)
+                quote_received_at.set(received_at)
+                try:
+                    await self.handler(quote)
+                except Exception as e:
+                    stats['errors'] += 1
+                    logger.error(f"Error processing quote for {symbol}: {e}")
+                stats['processed'] += 1
+        finally:
+            if self._workers.get(symbol) is asyncio.current_task():
+                del self._workers[symbol]
+
+    def pending_count(self) -> int:
+        """Number of symbols with a quote waiting to be processed."""
+        return len(self._pending)
+
+    def get_stats(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get quote counters.
+
+        Args:
+            symbol: Symbol to report, or None for every symbol plus totals
+
+        Returns:
+            Counter dictionary for the symbol, or {'symbols': {...}, 'totals': {...}}
+        """
+        if symbol is not None:
+            return dict(self._symbol_stats(symbol))
+
+        symbols = {sym: dict(counts) for sym, counts in list(self._stats.items())}
+        totals: Dict[str, int] = {}
+        for counts in symbols.values():
+            for key, value in counts.items():
+                totals[key] = totals.get(key, 0) + value
+        return {'symbols': symbols, 'totals': totals}
+
+    def log_summary(self) -> None:
+        """Log total and per-symbol quote counters."""
+        stats = self.get_stats()
+        totals = stats['totals']
+        if not totals:
+            logger.info("Quote mailbox: no quotes received")
+            return
+
+        logger.info(f"Quote mailbox: received={totals['received']}, processed={totals['processed']}, "
+                    f"coalesced={totals['coalesced']}, skipped_unchanged={totals['skipped_unchanged']}, "
+                    f"errors={totals['errors']}")
+        for symbol, counts in sorted(stats['symbols'].items()):
+            logger.debug(f"   {symbol}: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
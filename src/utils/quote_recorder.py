@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - Quote Recorder
+
+Keeps the quotes main_app receives as a tick history for backtests,
+replays and incident analysis. Quotes are written to one file per UTC day
+and symbol:
+
+    data/quotes/2025-06-01/BTC-USD.quotes      (the current day)
+    data/quotes/2025-05-31/BTC-USD.quotes.gz   (finished days, if compressed)
+
+Each file is a headerless array of fixed-size little-endian records
+(QUOTE_DTYPE: timestamp, bid, ask, bid_size, ask_size as float64), so an
+uncompressed file can be opened directly with np.memmap and a day of
+quotes costs 40 bytes per tick.
+
+Features:
+- record_quote() only appends a tuple to a buffer; a writer thread converts
+  and writes the buffered quotes every few seconds
+- Daily rotation, with finished days gzip-compressed by the writer thread
+- Retention limit that deletes the oldest day directories
+- Bounded buffer: quotes are dropped and counted if the writer falls behind
+- No-op until start_quote_recorder() is called (scripts and tests)
+"""
+
+import collections
+import gzip
+import logging
+import shutil
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUOTE_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('bid_size', '<f8'),
+    ('ask_size', '<f8'),
+])
+
+RAW_SUFFIX = '.quotes'
+COMPRESSED_SUFFIX = '.quotes.gz'
+SECONDS_PER_DAY = 86400
+
+
+def symbol_file_name(symbol: str) -> str:
+    """File name stem for a symbol ('BTC/USD' -> 'BTC-USD')."""
+    return symbol.replace('/', '-')
+
+
+def _day_name(day_number: int) -> str:
+    """Directory name for a UTC day number (days since the epoch)."""
+    return (date(1970, 1, 1) + timedelta(days=day_number)).isoformat()
+
+
+def _to_epoch(value: Any) -> float:
+    """Epoch seconds from a datetime (naive means UTC) or a number."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(value)
+
+
+class QuoteRecorder:
+    """
+    Buffers quotes in memory and writes them to per-day, per-symbol files
+    from a background thread.
+
+    A quote that arrives after its day has been rotated (a few milliseconds
+    late across midnight) is written to the current day's file; loaders sort
+    by timestamp, so this only moves it between files.
+    """
+
+    def __init__(self, directory: Union[str, Path], flush_seconds: float = 5.0, compress: bool = True,
+                 retention_days: int = 0, max_pending: int = 1_000_000):
+        """
+        Create the directory and start the writer thread.
+
+        Args:
+            directory: Root directory for the day directories
+            flush_seconds: Seconds between writes of the buffered quotes
+            compress: Gzip each day's files once the day is finished
+            retention_days: Days to keep, including the current one (0 keeps all)
+            max_pending: Buffered quotes before new ones are dropped
+        """
+        self.directory = Path(directory)
+        self.flush_seconds = flush_seconds
+        self.compress = compress
+        self.retention_days = retention_days
+        self.max_pending = max_pending
+        self._pending: collections.deque = collections.deque()
+        self._files: Dict[str, Any] = {}
+        self._day: Optional[int] = None
+        self._stats = {'recorded': 0, 'written': 0, 'dropped': 0, 'rejected': 0, 'bytes_written': 0,
+                       'rotations': 0, 'errors': 0}
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='quote-recorder', daemon=True)
+        self._thread.start()
+
+    def record(self, symbol: str, timestamp: Any, bid: float, ask: float,
+               bid_size: float = 0.0, ask_size: float = 0.0) -> None:
+        """
+        Buffer one quote. Conversion and I/O happen on the writer thread.
+
+        Args:
+            symbol: Trading pair symbol
+            timestamp: Quote time as a datetime or epoch seconds
+            bid: Bid price
+            ask: Ask price
+            bid_size: Bid size
+            ask_size: Ask size
+        """
+        if len(self._pending) >= self.max_pending:
+            self._stats['dropped'] += 1
+            return
+        self._pending.append((symbol, timestamp, bid, ask, bid_size, ask_size))
+        self._stats['recorded'] += 1
+
+    def flush(self) -> None:
+        """Write everything buffered so far (also called by the writer thread)."""
+        with self._write_lock:
+            count = len(self._pending)
+            if count == 0:
+                return
+            popleft = self._pending.popleft
+            self._write_rows([popleft() for _ in range(count)])
+
+    def close(self, timeout_seconds: float = 10.0) -> None:
+        """Write out buffered quotes, stop the writer and close the files."""
+        self._stop.set()
+        self._thread.join(timeout_seconds)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get recorder counters.
+
+        Returns:
+            Dictionary with recorded, written, dropped, rejected (quotes
+            that could not be converted), bytes_written, rotations, errors
+            and pending
+        """
+        stats = dict(self._stats)
+        stats['pending'] = len(self._pending)
+        return stats
+
+    def _run(self) -> None:
+        """Writer loop: finish old days left by a previous run, then flush periodically."""
+        try:
+            with self._write_lock:
+                self._finish_days_before(int(time.time() // SECONDS_PER_DAY))
+        except Exception as e:
+            logger.error(f"Quote recorder could not finish previous days: {e}")
+        while not self._stop.wait(self.flush_seconds):
+            self._safe_flush()
+        self._safe_flush()
+        self._close_files()
+
+    def _safe_flush(self) -> None:
+        """Flush, counting and logging errors instead of stopping the writer."""
+        try:
+            self.flush()
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"Quote recorder write failed: {e}")
+
+    def _write_rows(self, rows: List[Tuple]) -> None:
+        """Group rows by symbol and append each group as one array, rotating at day changes."""
+        groups: Dict[str, List[Tuple[float, float, float, float, float]]] = {}
+        for row in rows:
+            record = self._convert(row)
+            if record is None:
+                continue
+            day = int(record[0] // SECONDS_PER_DAY)
+            if self._day is None or day > self._day:
+                self._write_groups(groups)
+                groups = {}
+                self._rotate(day)
+            groups.setdefault(row[0], []).append(record)
+        self._write_groups(groups)
+
+    def _convert(self, row: Tuple) -> Optional[Tuple[float, float, float, float, float]]:
+        """Convert a buffered quote to a QUOTE_DTYPE record (None if a value is not a number)."""
+        symbol, timestamp, bid, ask, bid_size, ask_size = row
+        try:
+            return (_to_epoch(timestamp), float(bid), float(ask), float(bid_size or 0.0), float(ask_size or 0.0))
+        except (TypeError, ValueError, OverflowError) as e:
+            self._stats['rejected'] += 1
+            logger.warning(f"Quote recorder skipped a {symbol} quote with bid={bid!r} ask={ask!r}: {e}")
+            return None
+
+    def _write_groups(self, groups: Dict[str, List[Tuple[float, float, float, float, float]]]) -> None:
+        """Append each symbol's records to its file for the current day."""
+        for symbol, records in groups.items():
+            data = np.array(records, dtype=QUOTE_DTYPE)
+            handle = self._file_for(self._day, symbol)
+            handle.write(data.tobytes())
+            handle.flush()
+            self._stats['written'] += len(records)
+            self._stats['bytes_written'] += data.nbytes
+
+    def _file_for(self, day: int, symbol: str):
+        """Open (in append mode) the raw file for a symbol on the current day."""
+        handle = self._files.get(symbol)
+        if handle is None:
+            path = self.directory / _day_name(day) / (symbol_file_name(symbol) + RAW_SUFFIX)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _drop_partial_record(path)
+            handle = open(path, 'ab')
+            self._files[symbol] = handle
+        return handle
+
+    def _rotate(self, day: int) -> None:
+        """Switch to a new day: close the open files, compress finished days, apply retention."""
+        previous = self._day
+        self._close_files()
+        self._day = day
+        if previous is not None:
+            self._stats['rotations'] += 1
+            self._finish_days_before(day)
+
+    def _close_files(self) -> None:
+        """Close the open day's files."""
+        for handle in self._files.values():
+            try:
+                handle.close()
+            except OSError as e:
+                logger.warning(f"Quote recorder could not close {handle.name}: {e}")
+        self._files.clear()
+
+    def _finish_days_before(self, day: int) -> None:
+        """Compress raw files of days before `day` and delete days beyond the retention limit."""
+        if self._day is not None:
+            day = min(day, self._day)  # never touch the day being written
+        today = _day_name(day)
+        days = sorted(path for path in self.directory.iterdir()
+                      if path.is_dir() and _is_day_name(path.name) and path.name < today)
+
+        if self.compress:
+            for day_dir in days:
+                for raw in day_dir.glob('*' + RAW_SUFFIX):
+                    _compress_file(raw)
+
+        # The current day counts towards the retention limit
+        if self.retention_days > 0:
+            for day_dir in days[:max(len(days) - self.retention_days + 1, 0)]:
+                shutil.rmtree(day_dir, ignore_errors=True)
+                logger.info(f"Quote recorder removed {day_dir.name} (retention {self.retention_days} days)")
+
+
+def _is_day_name(name: str) -> bool:
+    """True for YYYY-MM-DD directory names."""
+    try:
+        date.fromisoformat(name)
+        return True
+    except ValueError:
+        return False
+
+
+def _drop_partial_record(raw: Path) -> None:
+    """
+    Truncate a raw file to whole records.
+
+    A crash mid-write leaves a partial record at the end; appending after it
+    would shift every later record, so it is cut off before the file is
+    reopened or compressed.
+    """
+    try:
+        size = raw.stat().st_size
+    except FileNotFoundError:
+        return
+    extra = size % QUOTE_DTYPE.itemsize
+    if extra:
+        with open(raw, 'r+b') as f:
+            f.truncate(size - extra)
+        logger.warning(f"Quote recorder dropped {extra} bytes of a partial record at the end of {raw}")
+
+
+def _compress_file(raw: Path) -> None:
+    """Gzip a raw quote file, appending to an existing .gz from an earlier run."""
+    target = raw.with_name(raw.name[:-len(RAW_SUFFIX)] + COMPRESSED_SUFFIX)
+    _drop_partial_record(raw)
+    with open(raw, 'rb') as source, gzip.open(target, 'ab') as destination:
+        shutil.copyfileobj(source, destination)
+    raw.unlink()
+
+
+def load_quote_file(path: Union[str, Path]) -> np.ndarray:
+    """
+    Load one recorded quote file.
+
+    Raw files are memory-mapped (read-only); a partial record at the end,
+    left by a crash mid-write, is ignored.
+
+    Args:
+        path: .quotes or .quotes.gz file
+
+    Returns:
+        Structured array with QUOTE_DTYPE fields
+    """
+    path = Path(path)
+    if path.name.endswith(COMPRESSED_SUFFIX):
+        with gzip.open(path, 'rb') as f:
+            data = f.read()
+        count = len(data) // QUOTE_DTYPE.itemsize
+        return np.frombuffer(data, dtype=QUOTE_DTYPE, count=count)
+
+    count = path.stat().st_size // QUOTE_DTYPE.itemsize
+    if count == 0:
+        return np.empty(0, dtype=QUOTE_DTYPE)
+    return np.memmap(path, dtype=QUOTE_DTYPE, mode='r', shape=(count,))
+
+
+def recorded_files(directory: Union[str, Path], symbol: str, start: Optional[date] = None,
+                   end: Optional[date] = None) -> List[Path]:
+    """
+    List a symbol's recorded files in day order.
+
+    Args:
+        directory: Recorder root directory
+        symbol: Trading pair symbol
+        start: First UTC day to include
+        end: Last UTC day to include
+
+    Returns:
+        Paths of .quotes and .quotes.gz files
+    """
+    stem = symbol_file_name(symbol)
+    files = []
+    for day_dir in sorted(Path(directory).iterdir()):
+        if not day_dir.is_dir() or not _is_day_name(day_dir.name):
+            continue
+        day = date.fromisoformat(day_dir.name)
+        if (start and day < start) or (end and day > end):
+            continue
+        for suffix in (COMPRESSED_SUFFIX, RAW_SUFFIX):
+            path = day_dir / (stem + suffix)
+            if path.exists():
+                files.append(path)
+    return files
+
+
+def load_recorded_quotes(directory: Union[str, Path], symbol: str, start: Optional[date] = None,
+                         end: Optional[date] = None) -> np.ndarray:
+    """
+    Load a symbol's recorded quotes across days, sorted by timestamp.
+
+    Args:
+        directory: Recorder root directory
+        symbol: Trading pair symbol
+        start: First UTC day to include
+        end: Last UTC day to include
+
+    Returns:
+        Structured array with QUOTE_DTYPE fields
+    """
+    parts: Iterable[np.ndarray] = [load_quote_file(path) for path in recorded_files(directory, symbol, start, end)]
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return np.empty(0, dtype=QUOTE_DTYPE)
+    quotes = np.concatenate(parts)
+    return quotes[np.argsort(quotes['timestamp'], kind='stable')]
+
+
+# Process-wide recorder, started by main_app (None makes record_quote a no-op)
+_quote_recorder: Optional[QuoteRecorder] = None
+
+
+def start_quote_recorder(directory: Union[str, Path], flush_seconds: float = 5.0, compress: bool = True,
+                         retention_days: int = 0) -> QuoteRecorder:
+    """
+    Start recording quotes.
+
+    Args:
+        directory: Root directory for the day directories
+        flush_seconds: Seconds between writes of the buffered quotes
+        compress: Gzip each day's files once the day is finished
+        retention_days: Days to keep, including the current one (0 keeps all)
+
+    Returns:
+        The active recorder
+    """
+    global _quote_recorder
+    stop_quote_recorder()
+    _quote_recorder = QuoteRecorder(directory, flush_seconds=flush_seconds, compress=compress,
+                                    retention_days=retention_days)
+    logger.info(f"Recording quotes to {directory}")
+    return _quote_recorder
+
+
+def stop_quote_recorder() -> None:
+    """Write out buffered quotes and stop recording."""
+    global _quote_recorder
+    recorder = _quote_recorder
+    if recorder is None:
+        return
+    _quote_recorder = None
+    recorder.close()
+    stats = recorder.get_stats()
+    logger.info(f"Quote recorder: written={stats['written']:,}, dropped={stats['dropped']:,}, "
+                f"rejected={stats['rejected']:,}, bytes={stats['bytes_written']:,}, errors={stats['errors']}")
+
+
+def record_quote(symbol: str, timestamp: Any, bid: float, ask: float,
+                 bid_size: float = 0.0, ask_size: float = 0.0) -> None:
+    """
+    Record a quote if the recorder is running.
+
+    Args:
+        symbol: Trading pair symbol
+        timestamp: Quote time as a datetime or epoch seconds
+        bid: Bid price
+        ask: Ask price
+        bid_size: Bid size
+        ask_size: Ask size
+    """
+    recorder = _quote_recorder
+    if recorder is not None:
+        recorder.record(symbol, timestamp, bid, ask, bid_size, ask_size)
+
+
+def get_quote_recorder() -> Optional[QuoteRecorder]:
+    """Get the active recorder, or None if quotes are not being recorded."""
+    return _quote_recorder
@@ -0,0 +1,1009 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - Replay Harness
+
+Feeds recorded quotes and trade updates through main_app's on_crypto_quote
+and on_trade_update handlers as fast as they run. The handlers trade
+against a simulated Alpaca account and an in-memory SQLite stand-in for the
+MySQL tables, so a day of market data replays in seconds and the bot does
+exactly what its code would have done:
+
+    harness = ReplayHarness([default_asset_config('BTC/USD')])
+    report = harness.run(load_replay_quotes('data/quotes', ['BTC/USD']))
+    print(report.summary())
+
+Everything main_app takes the time from (the duplicate-order guard, order
+and cycle timestamps, cooldowns) follows the replayed timestamps, and order
+IDs are sequential, so the same input always produces the same orders and
+cycles; ReplayReport.fingerprint() makes that easy to assert in tests.
+
+Features:
+- Real handlers, models and SQL: execute_query() is routed to SQLite
+- Simulated broker: limit buys fill once the ask reaches the limit, market
+  sells fill at the bid, fills delivered as TradingStream updates
+- Recorded trade updates (the lifecycle event file) replayed instead, for
+  reproducing incidents: each recorded order is matched to the replay's
+  order placed in the same position for its symbol and side
+- Cooldown expiry (cooldown_manager.py) and state cache refresh run on
+  replay-time schedules
+- Notifications suppressed and counted; decisions/sec, DB queries per
+  quote, orders, fills and logged errors reported
+"""
+
+import asyncio
+import hashlib
+import heapq
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from decimal import ROUND_DOWN, Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from alpaca.common.exceptions import APIError
+
+from models.asset_config import (
+    DcaAsset, remove_asset_cache_listener, set_asset_cache_enabled
+)
+from models.cycle_data import (
+    DcaCycle, remove_cycle_cache_listener, set_cycle_cache_enabled, update_cycle
+)
+from utils.db_types import format_timestamp, from_sql, to_sql
+from utils.db_utils import swap_connection_pool
+
+logger = logging.getLogger(__name__)
+
+# Crypto quantity precision accepted by Alpaca
+QTY_PRECISION = Decimal('0.000000001')
+
+ASSET_COLUMNS = (
+    'asset_symbol', 'is_enabled', 'base_order_amount', 'safety_order_amount', 'max_safety_orders',
+    'safety_order_deviation', 'take_profit_percent', 'ttp_enabled', 'ttp_deviation_percent',
+    'last_sell_price', 'buy_order_price_deviation_percent', 'cooldown_period',
+)
+CYCLE_COLUMNS = (
+    'asset_id', 'status', 'quantity', 'average_purchase_price', 'safety_orders', 'latest_order_id',
+    'latest_order_created_at', 'last_order_fill_price', 'highest_trailing_price', 'completed_at', 'sell_price',
+)
+
+# SQLite version of the dca_assets and dca_cycles DDL. Decimals are stored as
+# text so no precision is lost; timestamps follow the replay clock.
+SCHEMA = """
+CREATE TABLE dca_assets (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  asset_symbol TEXT NOT NULL UNIQUE,
+  is_enabled INTEGER NOT NULL DEFAULT 1,
+  base_order_amount TEXT NOT NULL DEFAULT '10',
+  safety_order_amount TEXT NOT NULL DEFAULT '20',
+  max_safety_orders INTEGER NOT NULL DEFAULT 15,
+  safety_order_deviation TEXT NOT NULL DEFAULT '0.9',
+  take_profit_percent TEXT NOT NULL DEFAULT '2',
+  ttp_enabled INTEGER NOT NULL DEFAULT 1,
+  ttp_deviation_percent TEXT DEFAULT '1',
+  last_sell_price TEXT DEFAULT NULL,
+  buy_order_price_deviation_percent TEXT NOT NULL DEFAULT '1',
+  cooldown_period INTEGER NOT NULL DEFAULT 120,
+  created_at TEXT,
+  updated_at TEXT
+);
+CREATE TABLE dca_cycles (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  asset_id INTEGER NOT NULL,
+  status TEXT NOT NULL,
+  quantity TEXT NOT NULL DEFAULT '0',
+  average_purchase_price TEXT NOT NULL DEFAULT '0',
+  safety_orders INTEGER NOT NULL DEFAULT 0,
+  latest_order_id TEXT DEFAULT NULL,
+  latest_order_created_at TEXT DEFAULT NULL,
+  last_order_fill_price TEXT DEFAULT NULL,
+  highest_trailing_price TEXT DEFAULT NULL,
+  completed_at TEXT DEFAULT NULL,
+  sell_price TEXT DEFAULT NULL,
+  created_at TEXT,
+  updated_at TEXT
+);
+CREATE INDEX dca_cycles_asset_id ON dca_cycles (asset_id);
+CREATE INDEX dca_cycles_latest_order_id ON dca_cycles (latest_order_id);
+"""
+
+# DEFAULT current_timestamp() and ON UPDATE current_timestamp(), on the replay clock
+TIMESTAMP_TRIGGERS = """
+CREATE TRIGGER {table}_created AFTER INSERT ON {table} BEGIN
+  UPDATE {table} SET created_at = COALESCE(NEW.created_at, replay_now()),
+                     updated_at = COALESCE(NEW.updated_at, replay_now()) WHERE id = NEW.id;
+END;
+CREATE TRIGGER {table}_updated AFTER UPDATE ON {table} WHEN NEW.updated_at IS OLD.updated_at BEGIN
+  UPDATE {table} SET updated_at = replay_now() WHERE id = NEW.id;
+END;
+"""
+
+
+class ReplayClock:
+    """
+    Replay time, and a datetime subclass whose now() reads it.
+
+    main_app's module-level datetime is swapped for ReplayClock.datetime
+    during a replay; naive now() returns UTC, like the database stores it.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        clock = self
+
+        class ReplayDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                value = datetime.fromtimestamp(clock.now, timezone.utc)
+                return value.astimezone(tz) if tz is not None else value.replace(tzinfo=None)
+
+            @classmethod
+            def utcnow(cls):
+                return datetime.fromtimestamp(clock.now, timezone.utc).replace(tzinfo=None)
+
+        self.datetime = ReplayDatetime
+
+    def timestamp(self) -> str:
+        """Current replay time in the stored TIMESTAMP format."""
+        return format_timestamp(datetime.fromtimestamp(self.now, timezone.utc))
+
+
+class _ReplayCursor:
+    """mysql-connector style cursor (dictionary or tuple rows) over a SQLite cursor."""
+
+    def __init__(self, database: 'ReplayDatabase', dictionary: bool = True):
+        self._database = database
+        self._dictionary = dictionary
+        self._cursor = database.connection.cursor()
+        self.lastrowid = 0
+        self.rowcount = -1
+
+    def execute(self, query: str, params: Optional[Sequence[Any]] = None) -> None:
+        self._database.queries += 1
+        statement = self._database.translate(query)
+        self._cursor.execute(statement, [to_sql(value) for value in params or ()])
+        self.rowcount = self._cursor.rowcount
+        self.lastrowid = self._cursor.lastrowid if statement.lstrip()[:6].upper() == 'INSERT' else 0
+
+    def fetchone(self) -> Optional[Union[Dict[str, Any], tuple]]:
+        row = self._cursor.fetchone()
+        return self._convert(row) if row is not None else None
+
+    def fetchall(self) -> List[Union[Dict[str, Any], tuple]]:
+        return [self._convert(row) for row in self._cursor.fetchall()]
+
+    def close(self) -> None:
+        self._cursor.close()
+
+    def _convert(self, row: Sequence[Any]) -> Union[Dict[str, Any], tuple]:
+        names = [column[0] for column in self._cursor.description]
+        if self._dictionary:
+            return {name: from_sql(name, value) for name, value in zip(names, row)}
+        return tuple(from_sql(name, value) for name, value in zip(names, row))
+
+
+class _ReplayConnection:
+    """The parts of a MySQLConnection that _execute_query_once uses."""
+
+    def __init__(self, database: 'ReplayDatabase'):
+        self._database = database
+
+    def cursor(self, dictionary: bool = True) -> _ReplayCursor:
+        return _ReplayCursor(self._database, dictionary)
+
+    def commit(self) -> None:
+        self._database.connection.commit()
+
+    def rollback(self) -> None:
+        self._database.connection.rollback()
+
+    def is_connected(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class ReplayDatabase:
+    """
+    In-memory SQLite stand-in for the dca_assets and dca_cycles tables.
+
+    Installed with db_utils.swap_connection_pool(), it serves execute_query()
+    like the connection pool does: %s placeholders, dictionary rows,
+    Decimal values rounded to the MySQL column scales and naive UTC
+    datetimes. One connection is shared, one query at a time.
+    """
+
+    def __init__(self, clock: ReplayClock):
+        """
+        Create the tables.
+
+        Args:
+            clock: Replay clock for created_at/updated_at defaults
+        """
+        self.clock = clock
+        self.queries = 0
+        self.connection = sqlite3.connect(':memory:', check_same_thread=False)
+        self.connection.create_function('replay_now', 0, clock.timestamp)
+        self.connection.executescript(SCHEMA + ''.join(
+            TIMESTAMP_TRIGGERS.format(table=table) for table in ('dca_assets', 'dca_cycles')))
+        self._lock = threading.Lock()
+        self._connection = _ReplayConnection(self)
+        self._statements: Dict[str, str] = {}
+        self._checkouts = 0
+
+    def translate(self, query: str) -> str:
+        """Rewrite MySQL %s placeholders for SQLite (cached per query text)."""
+        statement = self._statements.get(query)
+        if statement is None:
+            statement = self._statements[query] = query.replace('%s', '?')
+        return statement
+
+    # Pool interface used by db_utils
+
+    def acquire(self) -> _ReplayConnection:
+        self._lock.acquire()
+        self._checkouts += 1
+        return self._connection
+
+    def release(self, connection: _ReplayConnection, discard: bool = False) -> None:
+        self._lock.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        in_use = 1 if self._lock.locked() else 0
+        return {'pool_size': 1, 'open': 1, 'idle': 1 - in_use, 'in_use': in_use,
+                'checkouts': self._checkouts, 'waits': 0, 'wait_seconds_total': 0.0,
+                'wait_seconds_avg': 0.0, 'queries': self.queries}
+
+    # Seeding and inspection (not counted as bot queries)
+
+    def add_asset(self, asset: Union[DcaAsset, Dict[str, Any]]) -> int:
+        """
+        Insert a dca_assets row.
+
+        Args:
+            asset: DcaAsset or dict of dca_assets columns (id optional)
+
+        Returns:
+            The asset id
+        """
+        values = asset if isinstance(asset, dict) else asdict(asset)
+        columns = [name for name in ('id',) + ASSET_COLUMNS if values.get(name) is not None]
+        return self._insert('dca_assets', columns, values)
+
+    def add_cycle(self, values: Dict[str, Any]) -> int:
+        """
+        Insert a dca_cycles row.
+
+        Args:
+            values: dca_cycles columns; asset_id and status are required
+
+        Returns:
+            The cycle id
+        """
+        columns = [name for name in ('id',) + CYCLE_COLUMNS + ('created_at',) if values.get(name) is not None]
+        return self._insert('dca_cycles', columns, values)
+
+    def asset_ids(self) -> Dict[str, int]:
+        """Map of asset_symbol to id."""
+        return dict(self.connection.execute("SELECT asset_symbol, id FROM dca_assets").fetchall())
+
+    def cycles(self) -> List[DcaCycle]:
+        """All cycles, oldest first, with asset_symbol filled in."""
+        cursor = _ReplayCursor(self)
+        cursor._cursor.execute(
+            "SELECT c.*, a.asset_symbol FROM dca_cycles c JOIN dca_assets a ON a.id = c.asset_id ORDER BY c.id")
+        return [DcaCycle.from_dict(row) for row in cursor.fetchall()]
+
+    def expired_cooldowns(self) -> List[int]:
+        """
+        Cooldown cycles whose cooldown_period has passed since the asset's
+        previous cycle completed (the cooldown_manager.py rule).
+
+        Returns:
+            Cycle ids to move to 'watching'
+        """
+        rows = self.connection.execute("""
+            SELECT c.id, a.cooldown_period,
+                   (SELECT MAX(p.completed_at) FROM dca_cycles p
+                    WHERE p.asset_id = c.asset_id AND p.status IN ('complete', 'error')
+                      AND p.completed_at IS NOT NULL AND p.id < c.id) AS completed_at
+            FROM dca_cycles c JOIN dca_assets a ON a.id = c.asset_id
+            WHERE c.status = 'cooldown'
+        """).fetchall()
+        now = datetime.fromtimestamp(self.clock.now, timezone.utc).replace(tzinfo=None)
+        return [cycle_id for cycle_id, cooldown_period, completed_at in rows
+                if completed_at is not None
+                and datetime.strptime(completed_at, '%Y-%m-%d %H:%M:%S') + timedelta(seconds=cooldown_period) <= now]
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def _insert(self, table: str, columns: List[str], values: Dict[str, Any]) -> int:
+        with self._lock:
+            cursor = self.connection.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [to_sql(values[name]) for name in columns])
+            self.connection.commit()
+            return cursor.lastrowid
+
+
+@dataclass
+class ReplayOrder:
+    """Order as the handlers see it (alpaca Order attributes main_app reads)."""
+    id: uuid.UUID
+    symbol: str
+    side: str
+    order_type: str
+    qty: Optional[Decimal]
+    limit_price: Optional[Decimal] = None
+    status: str = 'new'
+    filled_qty: Optional[Decimal] = None
+    filled_avg_price: Optional[Decimal] = None
+    submitted_at: Optional[float] = None
+    filled_at: Optional[float] = None
+
+
+@dataclass
+class ReplayPosition:
+    """Position as returned by TradingClient.get_all_positions()."""
+    symbol: str
+    qty: Decimal
+    avg_entry_price: Decimal
+
+
+@dataclass
+class ReplayQuote:
+    """Quote as the handlers see it (alpaca Quote attributes main_app reads)."""
+    symbol: str
+    epoch: float
+    bid_price: float
+    ask_price: float
+    bid_size: float = 0.0
+    ask_size: float = 0.0
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.epoch, timezone.utc)
+
+
+@dataclass
+class ReplayTradeUpdate:
+    """TradingStream update as the handlers see it."""
+    event: str
+    order: ReplayOrder
+    epoch: float
+    qty: Optional[Decimal] = None
+    price: Optional[Decimal] = None
+    position_qty: Optional[Decimal] = None
+    execution_id: Optional[str] = None
+    # Recorded updates: the order's place among the recording's order_placed
+    # events for its symbol and side (None if it was placed before the recording)
+    placement: Optional[int] = None
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.epoch, timezone.utc)
+
+
+class SimulatedBroker:
+    """
+    Stand-in for the Alpaca TradingClient.
+
+    Orders get sequential UUIDs. Limit buys fill in full at the ask once a
+    quote's ask is at or below the limit; market sells fill in full at the
+    next quote's bid. A sell for more than the position is rejected the way
+    Alpaca rejects it, with an APIError.
+    """
+
+    def __init__(self, clock: ReplayClock, fill_delay_seconds: float = 0.0):
+        """
+        Args:
+            clock: Replay clock for order timestamps
+            fill_delay_seconds: Minimum order age before it can fill
+        """
+        self.clock = clock
+        self.fill_delay_seconds = fill_delay_seconds
+        self.orders: List[ReplayOrder] = []
+        self.positions: Dict[str, ReplayPosition] = {}
+        self._open: Dict[str, List[ReplayOrder]] = {}
+        self._placed: Dict[Tuple[str, str], List[ReplayOrder]] = {}
+        self._updates: List[ReplayTradeUpdate] = []
+
+    def set_position(self, symbol: str, qty: Decimal, avg_entry_price: Decimal) -> None:
+        """Start with an existing position (e.g. a cycle seeded mid-way)."""
+        key = symbol.replace('/', '')
+        self.positions[key] = ReplayPosition(key, Decimal(qty), Decimal(avg_entry_price))
+
+    # TradingClient methods used through utils.alpaca_client_rest
+
+    def submit_order(self, order_data: Any) -> ReplayOrder:
+        side = str(getattr(order_data.side, 'value', order_data.side)).lower()
+        qty = Decimal(str(order_data.qty)).quantize(QTY_PRECISION, rounding=ROUND_DOWN)
+        limit_price = getattr(order_data, 'limit_price', None)
+        if side == 'sell':
+            position = self.positions.get(order_data.symbol.replace('/', ''))
+            available = position.qty if position else Decimal('0')
+            if qty > available:
+                raise APIError(json.dumps({'code': 40310000, 'message':
+                               f'insufficient balance for {order_data.symbol} (requested: {qty}, available: {available})'}))
+
+        order = ReplayOrder(
+            id=uuid.UUID(int=len(self.orders) + 1),
+            symbol=order_data.symbol,
+            side=side,
+            order_type='limit' if limit_price is not None else 'market',
+            qty=qty,
+            limit_price=Decimal(str(limit_price)) if limit_price is not None else None,
+            status='accepted',
+            submitted_at=self.clock.now,
+        )
+        self.orders.append(order)
+        self._open.setdefault(order.symbol, []).append(order)
+        self._placed.setdefault((order.symbol, side), []).append(order)
+        return order
+
+    def get_all_positions(self) -> List[ReplayPosition]:
+        return list(self.positions.values())
+
+    def get_order_by_id(self, order_id: Any) -> ReplayOrder:
+        for order in self.orders:
+            if str(order.id) == str(order_id):
+                return order
+        raise APIError(json.dumps({'code': 40410000, 'message': 'order not found'}))
+
+    def get_orders(self, filter: Any = None) -> List[ReplayOrder]:
+        return [order for orders in self._open.values() for order in orders]
+
+    def cancel_order_by_id(self, order_id: Any) -> None:
+        order = self.get_order_by_id(order_id)
+        if order.status not in ('accepted', 'new', 'partially_filled'):
+            raise APIError(json.dumps({'code': 42210000, 'message': f'order is already {order.status}'}))
+        order.status = 'canceled'
+        self._open[order.symbol].remove(order)
+        self._updates.append(ReplayTradeUpdate('canceled', order, self.clock.now))
+
+    # Matching
+
+    def match(self, quote: ReplayQuote) -> None:
+        """Fill the symbol's open orders that this quote executes."""
+        orders = self._open.get(quote.symbol)
+        if not orders:
+            return
+        for order in list(orders):
+            if self.clock.now - order.submitted_at < self.fill_delay_seconds:
+                continue
+            if order.side == 'buy':
+                ask = Decimal(str(quote.ask_price))
+                if order.limit_price is not None and ask > order.limit_price:
+                    continue
+                self._fill(order, ask)
+            else:
+                self._fill(order, Decimal(str(quote.bid_price)))
+            orders.remove(order)
+
+    def take_updates(self) -> List[ReplayTradeUpdate]:
+        """Trade updates produced since the last call, in order."""
+        updates, self._updates = self._updates, []
+        return updates
+
+    def apply_recorded(self, update: ReplayTradeUpdate) -> Optional[ReplayTradeUpdate]:
+        """
+        Match a recorded trade update to the replay's own order and apply it.
+
+        The recorded order is the n-th placed for its symbol and side, so it
+        maps to the n-th order the replay placed for them. The order's
+        status and fill fields, and the position for executions, are updated
+        as the recording says.
+
+        Args:
+            update: Update from load_trade_updates()
+
+        Returns:
+            The update carrying the replay's order, or None if there is no
+            such order (placed before the recording, or the replay diverged)
+        """
+        recorded = update.order
+        if update.placement is None:
+            return None
+        placed = self._placed.get((recorded.symbol, recorded.side), [])
+        if update.placement >= len(placed):
+            return None
+
+        order = placed[update.placement]
+        order.status = recorded.status
+        if recorded.filled_qty is not None:
+            order.filled_qty = recorded.filled_qty
+        if recorded.filled_avg_price is not None:
+            order.filled_avg_price = recorded.filled_avg_price
+        if order.status not in ('new', 'accepted', 'pending_new', 'partially_filled'):
+            open_orders = self._open.get(order.symbol, [])
+            if order in open_orders:
+                open_orders.remove(order)
+        if update.event in ('fill', 'partial_fill') and update.qty and update.price:
+            order.filled_at = self.clock.now
+            self._move_position(order.symbol, order.side, update.qty, update.price, update.position_qty)
+        return replace(update, order=order, placement=None)
+
+    def _move_position(self, symbol: str, side: str, qty: Decimal, price: Decimal,
+                       position_qty: Optional[Decimal] = None) -> Decimal:
+        """Apply one execution to the position; returns the quantity left."""
+        key = symbol.replace('/', '')
+        position = self.positions.get(key)
+        if position is None:
+            position = self.positions[key] = ReplayPosition(key, Decimal('0'), Decimal('0'))
+        if side == 'buy':
+            cost = position.qty * position.avg_entry_price + qty * price
+            position.qty += qty
+            position.avg_entry_price = cost / position.qty
+        else:
+            position.qty -= qty
+        if position_qty is not None:
+            position.qty = position_qty
+        if position.qty <= 0:
+            del self.positions[key]
+            return Decimal('0')
+        return position.qty
+
+    def _fill(self, order: ReplayOrder, price: Decimal) -> None:
+        remaining = self._move_position(order.symbol, order.side, order.qty, price)
+
+        order.status = 'filled'
+        order.filled_qty = order.qty
+        order.filled_avg_price = price
+        order.filled_at = self.clock.now
+        self._updates.append(ReplayTradeUpdate(
+            'fill', order, self.clock.now, qty=order.qty, price=price,
+            position_qty=remaining, execution_id=f"replay-{order.id.int}",
+        ))
+
+
+def load_replay_quotes(source: Union[str, Path], symbols: Sequence[str],
+                       spread_percent: float = 0.0) -> Iterator[ReplayQuote]:
+    """
+    Read quotes for replay, merged across symbols in time order.
+
+    Args:
+        source: Quote recorder directory, or a CSV/.quotes file for one symbol
+        symbols: Symbols to replay
+        spread_percent: Spread to assume for CSV files without bid/ask
+
+    Yields:
+        ReplayQuote in timestamp order
+    """
+    from utils.backtest import load_price_file
+    from utils.quote_recorder import load_recorded_quotes
+
+    source = Path(source)
+    if not source.is_dir():
+        if len(symbols) != 1:
+            raise ValueError(f"{source}: a single price file replays exactly one symbol")
+        series = load_price_file(source, spread_percent=spread_percent)
+        for epoch, bid, ask in zip(series.timestamps.tolist(), series.bid.tolist(), series.ask.tolist()):
+            yield ReplayQuote(symbols[0], epoch, bid, ask)
+        return
+
+    parts = [(symbol, load_recorded_quotes(source, symbol)) for symbol in symbols]
+    timestamps = np.concatenate([quotes['timestamp'] for _, quotes in parts]) if parts else np.empty(0)
+    owners = np.concatenate([np.full(len(quotes), index) for index, (_, quotes) in enumerate(parts)]) if parts else []
+    rows = np.concatenate([np.arange(len(quotes)) for _, quotes in parts]) if parts else []
+    for position in np.argsort(timestamps, kind='stable'):
+        symbol, quotes = parts[owners[position]]
+        quote = quotes[rows[position]]
+        yield ReplayQuote(symbol, float(quote['timestamp']), float(quote['bid']), float(quote['ask']),
+                          float(quote['bid_size']), float(quote['ask_size']))
+
+
+def load_trade_updates(path: Union[str, Path], symbols: Optional[Sequence[str]] = None) -> List[ReplayTradeUpdate]:
+    """
+    Read TradingStream updates from a lifecycle event file (EVENT_LOG_FILE).
+
+    Each update records where its order_placed event falls among the file's
+    placements for the same symbol and side, which is how the harness maps
+    production order IDs onto the replay's orders.
+
+    Args:
+        path: JSON-lines event file written by utils.event_sink
+        symbols: Only keep updates for these symbols
+
+    Returns:
+        ReplayTradeUpdate list in file order
+    """
+    def decimal_or_none(value: Any) -> Optional[Decimal]:
+        return Decimal(str(value)) if value not in (None, '') else None
+
+    updates = []
+    placements: Dict[str, int] = {}
+    placed_counts: Dict[Tuple[str, str], int] = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            event = json.loads(line)
+            name = event.get('event', '')
+            if symbols and event.get('symbol') not in symbols:
+                continue
+            if name == 'order_placed':
+                key = (event.get('symbol'), str(event.get('side', '')).lower())
+                placements[str(event.get('order_id'))] = placed_counts.get(key, 0)
+                placed_counts[key] = placed_counts.get(key, 0) + 1
+                continue
+            if not name.startswith('order_') or 'order_status' not in event:
+                continue  # Not a TradingStream update
+            order = ReplayOrder(
+                id=event['order_id'], symbol=event['symbol'], side=str(event.get('side', '')).lower(),
+                order_type='unknown', qty=decimal_or_none(event.get('filled_qty')),
+                status=str(event['order_status']).lower(),
+                filled_qty=decimal_or_none(event.get('filled_qty')),
+                filled_avg_price=decimal_or_none(event.get('filled_avg_price')),
+            )
+            updates.append(ReplayTradeUpdate(
+                name[len('order_'):], order, float(event['ts']), qty=decimal_or_none(event.get('qty')),
+                price=decimal_or_none(event.get('price')), position_qty=decimal_or_none(event.get('position_qty')),
+                placement=placements.get(str(event['order_id'])),
+            ))
+    return updates
+
+
+class _ErrorCollector(logging.Handler):
+    """Keeps the first ERROR records logged during a replay."""
+
+    def __init__(self, limit: int = 100):
+        super().__init__(logging.ERROR)
+        self.limit = limit
+        self.count = 0
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.count += 1
+        if len(self.messages) < self.limit:
+            self.messages.append(f"{record.name}: {record.getMessage()}")
+
+
+@dataclass
+class ReplayReport:
+    """What the bot did during a replay, and how fast it ran."""
+    quotes: int = 0
+    evaluations: int = 0
+    trade_updates: Dict[str, int] = field(default_factory=dict)
+    unmatched_trade_updates: int = 0
+    wall_seconds: float = 0.0
+    replay_seconds: float = 0.0
+    quote_db_queries: int = 0
+    update_db_queries: int = 0
+    background_db_queries: int = 0
+    orders: List[ReplayOrder] = field(default_factory=list)
+    cycles: List[DcaCycle] = field(default_factory=list)
+    notifications: Dict[str, int] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+    error_count: int = 0
+
+    @property
+    def quotes_per_second(self) -> float:
+        return self.quotes / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def evaluations_per_second(self) -> float:
+        return self.evaluations / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def speedup(self) -> float:
+        """Replayed time per second of wall time."""
+        return self.replay_seconds / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def db_queries_per_quote(self) -> float:
+        return self.quote_db_queries / self.quotes if self.quotes else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Totals for printing or comparing runs.
+
+        Returns:
+            Dictionary of throughput, DB, order and cycle figures
+        """
+        completed = [c for c in self.cycles if c.status == 'complete' and c.sell_price is not None]
+        orders_by_status: Dict[str, int] = {}
+        for order in self.orders:
+            key = f"{order.side}_{order.status}"
+            orders_by_status[key] = orders_by_status.get(key, 0) + 1
+        return {
+            'quotes': self.quotes,
+            'evaluations': self.evaluations,
+            'quotes_per_second': self.quotes_per_second,
+            'evaluations_per_second': self.evaluations_per_second,
+            'speedup': self.speedup,
+            'db_queries_per_quote': self.db_queries_per_quote,
+            'db_queries': self.quote_db_queries + self.update_db_queries + self.background_db_queries,
+            'trade_updates': dict(self.trade_updates),
+            'unmatched_trade_updates': self.unmatched_trade_updates,
+            'orders': orders_by_status,
+            'completed_cycles': len(completed),
+            'realized_pl': sum((c.quantity * (c.sell_price - c.average_purchase_price) for c in completed), Decimal('0')),
+            'notifications': sum(self.notifications.values()),
+            'errors': self.error_count,
+        }
+
+    def fingerprint(self) -> str:
+        """
+        Hash of the orders and final cycles, equal for runs that behaved identically.
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        for order in self.orders:
+            digest.update(repr((order.symbol, order.side, order.order_type, order.qty, order.limit_price,
+                                order.status, order.filled_avg_price, order.submitted_at)).encode())
+        for cycle in self.cycles:
+            digest.update(repr((cycle.id, cycle.asset_id, cycle.status, cycle.quantity, cycle.average_purchase_price,
+                                cycle.safety_orders, cycle.highest_trailing_price, cycle.sell_price,
+                                cycle.completed_at)).encode())
+        return digest.hexdigest()
+
+
+class ReplayHarness:
+    """
+    Runs main_app's quote and trade-update handlers over recorded data.
+
+    A harness is single-use: it owns its database and broker state.
+    main_app's module state (datetime, client, trigger index, position book,
+    duplicate-order guard, notification functions) is swapped for the run
+    and restored afterwards; the asset and cycle caches are left disabled.
+    """
+
+    NOTIFICATIONS = (
+        'discord_order_placed', 'discord_order_filled', 'discord_cycle_completed', 'discord_system_error',
+        'discord_system_alert', 'alert_order_placed', 'alert_order_filled', 'alert_system_error',
+        'alert_critical_error',
+    )
+
+    def __init__(
+        self,
+        assets: Iterable[Union[DcaAsset, Dict[str, Any]]],
+        cycles: Iterable[Dict[str, Any]] = (),
+        simulate_fills: bool = True,
+        fill_delay_seconds: float = 0.0,
+        state_cache: bool = True,
+        position_book: bool = True,
+        caretaker_interval_seconds: float = 60.0,
+        state_cache_refresh_seconds: float = 5.0,
+        quiet: bool = True,
+    ):
+        """
+        Args:
+            assets: Asset configurations to load into dca_assets
+            cycles: Starting dca_cycles rows (with asset_symbol or asset_id);
+                assets without one get a 'watching' cycle, and cycles holding
+                a quantity get a matching broker position
+            simulate_fills: Fill orders with the simulated broker; turn off
+                when replaying recorded trade updates
+            fill_delay_seconds: Minimum order age before a simulated fill
+            state_cache: Run with the asset/cycle cache and trigger index, as main_app does by default
+            position_book: Track positions from fills, as main_app does by default
+            caretaker_interval_seconds: Replay seconds between cooldown expiry checks
+            state_cache_refresh_seconds: Replay seconds between state cache refreshes
+            quiet: Drop INFO/WARNING logging during the run (errors are still counted)
+        """
+        self.clock = ReplayClock()
+        self.database = ReplayDatabase(self.clock)
+        self.broker = SimulatedBroker(self.clock, fill_delay_seconds)
+        self.simulate_fills = simulate_fills
+        self.state_cache = state_cache
+        self.position_book = position_book
+        self.caretaker_interval_seconds = caretaker_interval_seconds
+        self.state_cache_refresh_seconds = state_cache_refresh_seconds
+        self.quiet = quiet
+        self._assets = list(assets)
+        self._cycles = list(cycles)
+        self._restore: List[Any] = []
+        self._report = ReplayReport()
+        self._main_app = None
+
+    def run(self, quotes: Iterable[ReplayQuote],
+            trade_updates: Iterable[ReplayTradeUpdate] = ()) -> ReplayReport:
+        """
+        Replay quotes and trade updates in timestamp order.
+
+        Args:
+            quotes: ReplayQuote in timestamp order (see load_replay_quotes)
+            trade_updates: Recorded ReplayTradeUpdate in timestamp order
+
+        Returns:
+            ReplayReport
+        """
+        return asyncio.run(self.run_async(quotes, trade_updates))
+
+    async def run_async(self, quotes: Iterable[ReplayQuote],
+                        trade_updates: Iterable[ReplayTradeUpdate] = ()) -> ReplayReport:
+        """Async version of run(), for callers already inside an event loop."""
+        timeline = heapq.merge(quotes, trade_updates, key=lambda event: event.epoch)
+        first = next(timeline, None)
+        if first is None:
+            return self._report
+
+        report = self._report
+        collector = _ErrorCollector()
+        logging.getLogger().addHandler(collector)
+        previous_disable = logging.root.manager.disable
+        if self.quiet:
+            logging.disable(logging.WARNING)
+        started = time.perf_counter()
+        try:
+            with self.session(first.epoch) as main_app:
+                next_caretaker = first.epoch + self.caretaker_interval_seconds
+                next_refresh = first.epoch + self.state_cache_refresh_seconds
+                for event in self._chain(first, timeline):
+                    self.clock.now = max(self.clock.now, event.epoch)
+                    if self.clock.now >= next_caretaker:
+                        self._background(self._expire_cooldowns)
+                        next_caretaker = self.clock.now + self.caretaker_interval_seconds
+                    if self.state_cache and self.clock.now >= next_refresh:
+                        self._background(main_app.refresh_state_cache)
+                        next_refresh = self.clock.now + self.state_cache_refresh_seconds
+
+                    if isinstance(event, ReplayQuote):
+                        queries = self.database.queries
+                        await main_app.on_crypto_quote(event)
+                        report.quotes += 1
+                        report.quote_db_queries += self.database.queries - queries
+                        if self.simulate_fills:
+                            self.broker.match(event)
+                    else:
+                        await self._deliver_recorded(event)
+                    for update in self.broker.take_updates():
+                        await self._deliver(update)
+                report.replay_seconds = self.clock.now - first.epoch
+        finally:
+            report.wall_seconds = time.perf_counter() - started
+            logging.disable(previous_disable)
+            logging.getLogger().removeHandler(collector)
+
+        report.orders = list(self.broker.orders)
+        report.cycles = self.database.cycles()
+        report.errors = collector.messages
+        report.error_count = collector.count
+        return report
+
+    @contextmanager
+    def session(self, start_epoch: float = 0.0) -> Iterator[Any]:
+        """
+        Seed the database and swap main_app's I/O for the replay stand-ins.
+
+        run() uses this around the whole replay; it is public so main_app's
+        functions can also be called directly against the simulated broker
+        and database (benchmarks, tests).
+
+        Args:
+            start_epoch: Replay clock start time
+
+        Yields:
+            The main_app module
+        """
+        import main_app
+
+        self.clock.now = start_epoch
+        self._seed()
+        self._install(main_app)
+        try:
+            yield main_app
+        finally:
+            self._uninstall()
+
+    @staticmethod
+    def _chain(first: Any, rest: Iterator[Any]) -> Iterator[Any]:
+        yield first
+        yield from rest
+
+    async def _deliver(self, update: ReplayTradeUpdate) -> None:
+        """Hand one trade update to main_app and count its DB queries."""
+        queries = self.database.queries
+        await self._main_app.on_trade_update(update)
+        self._report.update_db_queries += self.database.queries - queries
+        self._report.trade_updates[update.event] = self._report.trade_updates.get(update.event, 0) + 1
+
+    async def _deliver_recorded(self, update: ReplayTradeUpdate) -> None:
+        """Deliver a recorded update against the replay's matching order."""
+        matched = self.broker.apply_recorded(update)
+        if matched is None:
+            # Delivered anyway so the handler logs it, but no cycle holds its order ID
+            self._report.unmatched_trade_updates += 1
+            logger.warning(f"Recorded {update.event} for order {update.order.id} ({update.order.symbol}) "
+                           f"has no matching replay order")
+            matched = update
+        await self._deliver(matched)
+
+    def _background(self, task) -> None:
+        """Run a caretaker-style task, keeping its queries out of the per-quote count."""
+        queries = self.database.queries
+        try:
+            task()
+        except Exception as e:
+            logger.error(f"Replay background task {getattr(task, '__name__', task)} failed: {e}")
+        self._report.background_db_queries += self.database.queries - queries
+
+    def _expire_cooldowns(self) -> None:
+        """Move cooldown cycles whose cooldown has passed to 'watching', like cooldown_manager.py."""
+        for cycle_id in self.database.expired_cooldowns():
+            update_cycle(cycle_id, {'status': 'watching'})
+
+    def _seed(self) -> None:
+        """Load assets, starting cycles and matching broker positions."""
+        for asset in self._assets:
+            self.database.add_asset(asset)
+        ids = self.database.asset_ids()
+        symbols = {asset_id: symbol for symbol, asset_id in ids.items()}
+
+        seeded = set()
+        for cycle in self._cycles:
+            values = dict(cycle)
+            if 'asset_id' not in values:
+                values['asset_id'] = ids[values.pop('asset_symbol')]
+            values.pop('asset_symbol', None)
+            self.database.add_cycle(values)
+            seeded.add(values['asset_id'])
+            quantity = Decimal(str(values.get('quantity') or 0))
+            if quantity > 0:
+                self.broker.set_position(symbols[values['asset_id']], quantity,
+                                         Decimal(str(values.get('average_purchase_price') or 0)))
+        for asset_id in sorted(set(symbols) - seeded):
+            self.database.add_cycle({'asset_id': asset_id, 'status': 'watching', 'quantity': Decimal('0'),
+                                     'average_purchase_price': Decimal('0'), 'safety_orders': 0})
+
+    def _install(self, main_app) -> None:
+        """Point main_app and db_utils at the replay clock, broker and database."""
+        from utils.position_book import PositionBook
+        from utils.trigger_index import TriggerIndex
+
+        self._main_app = main_app
+        report = self._report
+        original_evaluate = main_app.evaluate_quote
+
+        def evaluate_quote(quote):
+            report.evaluations += 1
+            return original_evaluate(quote)
+
+        def suppressed(name):
+            def notify(*args, **kwargs):
+                report.notifications[name] = report.notifications.get(name, 0) + 1
+                return True
+            return notify
+
+        replacements = {
+            'datetime': self.clock.datetime,
+            'get_trading_client': lambda: self.broker,
+            'recent_orders': {},
+            'trigger_index': TriggerIndex(),
+            'position_book': PositionBook(),
+            'evaluate_quote': evaluate_quote,
+        }
+        replacements.update({name: suppressed(name) for name in self.NOTIFICATIONS})
+        for name, value in replacements.items():
+            self._restore.append((main_app, name, getattr(main_app, name)))
+            setattr(main_app, name, value)
+        self._restore.append((None, 'pool', swap_connection_pool(self.database)))
+
+        if self.state_cache:
+            main_app.enable_state_cache()
+        if self.position_book:
+            main_app.refresh_position_book()
+
+    def _uninstall(self) -> None:
+        """Put main_app's state back and drop the caches built from replay data."""
+        main_app = self._main_app
+        if main_app is None:
+            return
+        remove_asset_cache_listener(main_app.trigger_index.invalidate)
+        remove_cycle_cache_listener(main_app.trigger_index.invalidate_asset)
+        set_asset_cache_enabled(False)
+        set_cycle_cache_enabled(False)
+        for target, name, value in reversed(self._restore):
+            if target is None:
+                swap_connection_pool(value)
+            else:
+                setattr(target, name, value)
+        self._restore.clear()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - Caretaker Run Lock
+
+Cron starts each caretaker on a fixed schedule whether or not the previous
+run has finished. A run that outlasts its interval (a slow Alpaca API, many
+cycles to check) would otherwise overlap the next one: two processes
+editing the same cycles, each with its own REST token bucket, which breaks
+the per-process budget sum in env.example.
+
+Each caretaker takes an exclusive, non-blocking flock on
+<LOG_DIR>/<name>.lock before it starts; a run that finds the lock held
+exits straight away. The kernel releases the lock when the process exits,
+so a crashed run never leaves a stale lock behind.
+
+Features:
+- One run per caretaker at a time; overlapping cron runs exit cleanly
+- Lock file holds the PID of the run that owns it
+- No lock (and a warning) on platforms without fcntl
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import IO, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class RunLock:
+    """An exclusive lock on a caretaker's lock file, held until released or process exit."""
+
+    def __init__(self, path: Path, handle: Optional[IO[str]]):
+        self.path = path
+        self._handle = handle
+
+    def release(self) -> None:
+        """Release the lock (also released automatically when the process exits)."""
+        handle, self._handle = self._handle, None
+        if handle is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            handle.close()
+
+
+def acquire_run_lock(name: str, directory: Union[str, Path]) -> Optional[RunLock]:
+    """
+    Take the run lock for a caretaker without waiting.
+
+    Args:
+        name: Caretaker name; the lock file is <directory>/<name>.lock
+        directory: Directory for the lock file (created if missing)
+
+    Returns:
+        RunLock, or None if another run holds the lock
+    """
+    path = Path(directory) / f"{name}.lock"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fcntl is None:
+        logger.warning(f"fcntl is not available; {name} runs without a run lock")
+        return RunLock(path, None)
+
+    handle = open(path, 'a+', encoding='utf-8')
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        handle.seek(0)
+        owner = handle.read().strip() or 'unknown'
+        handle.close()
+        logger.warning(f"{name} is already running (pid {owner}); skipping this run")
+        return None
+
+    handle.seek(0)
+    handle.truncate()
+    handle.write(f"{os.getpid()}\n")
+    handle.flush()
+    return RunLock(path, handle)
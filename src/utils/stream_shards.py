@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - Sharded Market Data Stream
+
+A single Alpaca market data WebSocket carries at most 30 symbols. This
+module spreads the enabled symbols over several CryptoDataStream
+connections and feeds every connection into the same quote and trade
+handlers, so the bot still has one decision path no matter how many
+connections it holds.
+
+Features:
+- Deterministic round-robin assignment of symbols to connections
+- One dedicated thread (and event loop) per connection, so shards never
+  occupy the default executor that quote evaluations run on
+- Per-shard counters: quotes, trades, last message age and feed lag
+- Connection state per shard for health checks and metrics
+- Symbols added or removed on the live connections, opening another
+  connection when the existing ones are full
+"""
+
+import asyncio
+import logging
+import math
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Name of the event loop the current quote arrived on, for the loop lag probe
+stream_loop_name: ContextVar[str] = ContextVar('stream_loop_name', default='crypto_stream')
+
+
+def plan_shards(symbols: Sequence[str], symbols_per_connection: int = 30,
+                max_connections: int = 1) -> Tuple[List[List[str]], List[str]]:
+    """
+    Assign symbols to connections.
+
+    Uses as few connections as the per-connection limit allows and deals the
+    symbols out round-robin, so the connections carry similar load and the
+    same symbol list always gives the same assignment.
+
+    Args:
+        symbols: Symbols to subscribe, in priority order (duplicates ignored)
+        symbols_per_connection: Symbol limit of one connection
+        max_connections: Connections that may be opened
+
+    Returns:
+        (symbol list per connection, symbols that did not fit)
+    """
+    if symbols_per_connection < 1 or max_connections < 1:
+        raise ValueError("symbols_per_connection and max_connections must be at least 1")
+
+    unique = list(dict.fromkeys(symbols))
+    capacity = symbols_per_connection * max_connections
+    accepted, dropped = unique[:capacity], unique[capacity:]
+    count = max(1, math.ceil(len(accepted) / symbols_per_connection))
+    return [accepted[index::count] for index in range(count)], dropped
+
+
+class StreamShard:
+    """One market data connection and the counters for the symbols it carries."""
+
+    def __init__(self, index: int, stream: Any, symbols: List[str], loop_name: str):
+        """
+        Initialize a shard.
+
+        Args:
+            index: Shard number, used as its metrics label
+            stream: CryptoDataStream (or compatible) for this shard
+            symbols: Symbols subscribed on this connection
+            loop_name: Name of the shard's event loop for the lag probe
+        """
+        self.index = index
+        self.stream = stream
+        self.symbols = symbols
+        self.loop_name = loop_name
+        self.running = False
+        self.on_quote: Optional[Callable[[Any], Awaitable[None]]] = None
+        self.on_trade: Optional[Callable[[Any], Awaitable[None]]] = None
+        self.quotes = 0
+        self.trades = 0
+        self.last_message_at: Optional[float] = None  # time.time() of the last quote or trade
+        self.lag_seconds: Optional[float] = None  # arrival time minus quote timestamp, last quote
+        self.max_lag_seconds = 0.0
+
+    @property
+    def connected(self) -> bool:
+        """True while the stream holds an authenticated WebSocket."""
+        return self.running and bool(getattr(self.stream, '_running', False))
+
+    def record_quote(self, quote) -> None:
+        """Count a quote and measure how far behind the exchange it arrived."""
+        now = time.time()
+        self.quotes += 1
+        self.last_message_at = now
+        timestamp = getattr(quote, 'timestamp', None)
+        if isinstance(timestamp, datetime):
+            lag = now - timestamp.timestamp()
+            self.lag_seconds = lag
+            if lag > self.max_lag_seconds:
+                self.max_lag_seconds = lag
+
+    def record_trade(self) -> None:
+        """Count a trade message."""
+        self.trades += 1
+        self.last_message_at = time.time()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the shard's counters.
+
+        Returns:
+            Dictionary with symbols, connection state, message counts, last
+            message age and lag (None until the first message)
+        """
+        last = self.last_message_at
+        return {
+            'shard': self.index,
+            'symbols': list(self.symbols),
+            'running': self.running,
+            'connected': self.connected,
+            'quotes': self.quotes,
+            'trades': self.trades,
+            'last_message_age_seconds': None if last is None else max(0.0, time.time() - last),
+            'lag_seconds': self.lag_seconds,
+            'max_lag_seconds': self.max_lag_seconds,
+        }
+
+
+class ShardedCryptoStream:
+    """
+    Several market data connections feeding one set of handlers.
+
+    Each shard runs its stream on its own thread. Every symbol lives on
+    exactly one shard, so per-symbol ordering is preserved and the quote
+    handler (normally QuoteMailbox.submit) sees each symbol from one loop.
+
+    update_symbols() changes the subscriptions of running streams; call it
+    from one thread at a time, and never from a shard's own event loop
+    (Alpaca's subscribe calls block until the shard's loop has sent them).
+    """
+
+    def __init__(
+        self,
+        stream_factory: Callable[[], Any],
+        symbols: Sequence[str],
+        quote_handler: Callable[[Any], Awaitable[None]],
+        trade_handler: Optional[Callable[[Any], Awaitable[None]]] = None,
+        symbols_per_connection: int = 30,
+        max_connections: int = 1
+    ):
+        """
+        Create the connections and subscribe each shard's symbols.
+
+        Args:
+            stream_factory: Called once per shard to create a CryptoDataStream
+            symbols: Symbols to subscribe, in priority order
+            quote_handler: Coroutine function called with every quote
+            trade_handler: Coroutine function called with every trade, if any
+            symbols_per_connection: Symbol limit of one connection
+            max_connections: Connections that may be opened
+        """
+        self.stream_factory = stream_factory
+        self.quote_handler = quote_handler
+        self.trade_handler = trade_handler
+        self.symbols_per_connection = symbols_per_connection
+        self.max_connections = max_connections
+        self.subscription_changes = {'added': 0, 'removed': 0}
+
+        groups, self.dropped_symbols = plan_shards(symbols, symbols_per_connection, max_connections)
+        if self.dropped_symbols:
+            logger.warning(f"{len(symbols)} symbols exceed {max_connections} connection(s) x "
+                           f"{symbols_per_connection} symbols; not subscribed: {', '.join(self.dropped_symbols)}")
+
+        self._stopping = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: List[Future] = []
+        self.shards: List[StreamShard] = []
+        for group in groups:
+            shard = self._add_shard()
+            for symbol in group:
+                self._subscribe(shard, symbol)
+            shard.symbols = list(group)
+
+    @property
+    def symbols(self) -> List[str]:
+        """Every subscribed symbol."""
+        return [symbol for shard in self.shards for symbol in shard.symbols]
+
+    def _add_shard(self) -> StreamShard:
+        """Create a connection with no symbols and its handlers."""
+        index = len(self.shards)
+        loop_name = 'crypto_stream' if self.max_connections == 1 else f'crypto_stream_{index}'
+        shard = StreamShard(index, self.stream_factory(), [], loop_name)
+        shard.on_quote = self._quote_handler(shard, self.quote_handler)
+        if self.trade_handler:
+            shard.on_trade = self._trade_handler(shard, self.trade_handler)
+        self.shards.append(shard)
+        return shard
+
+    @staticmethod
+    def _subscribe(shard: StreamShard, symbol: str) -> None:
+        shard.stream.subscribe_quotes(shard.on_quote, symbol)
+        if shard.on_trade:
+            shard.stream.subscribe_trades(shard.on_trade, symbol)
+
+    @staticmethod
+    def _unsubscribe(shard: StreamShard, symbol: str) -> None:
+        shard.stream.unsubscribe_quotes(symbol)
+        if shard.on_trade:
+            shard.stream.unsubscribe_trades(symbol)
+
+    def _shard_with_room(self) -> Optional[StreamShard]:
+        """The least loaded shard below the symbol limit, opening one if allowed."""
+        open_shards = [shard for shard in self.shards if len(shard.symbols) < self.symbols_per_connection]
+        if open_shards:
+            return min(open_shards, key=lambda shard: len(shard.symbols))
+        if len(self.shards) < self.max_connections:
+            return self._add_shard()
+        return None
+
+    def update_symbols(self, symbols: Sequence[str]) -> Tuple[List[str], List[str]]:
+        """
+        Subscribe and unsubscribe symbols so the streams carry exactly these.
+
+        Removed symbols are unsubscribed first to free room. New symbols go to
+        the least loaded connection below the limit; a new connection is
+        opened (and started, if the streams are running) when all are full.
+        A symbol whose subscribe or unsubscribe fails is left as it was and
+        retried on the next call.
+
+        Args:
+            symbols: Symbols that should be subscribed, in priority order
+
+        Returns:
+            (symbols added, symbols removed)
+        """
+        wanted = list(dict.fromkeys(symbols))
+        wanted_set = set(wanted)
+        added: List[str] = []
+        removed: List[str] = []
+
+        for shard in self.shards:
+            for symbol in [s for s in shard.symbols if s not in wanted_set]:
+                try:
+                    self._unsubscribe(shard, symbol)
+                except Exception as e:
+                    logger.warning(f"Failed to unsubscribe {symbol} on crypto stream shard {shard.index}: {e}")
+                    continue
+                shard.symbols = [s for s in shard.symbols if s != symbol]
+                removed.append(symbol)
+
+        subscribed = set(self.symbols)
+        shard_count = len(self.shards)
+        dropped = []
+        for symbol in wanted:
+            if symbol in subscribed:
+                continue
+            shard = self._shard_with_room()
+            if shard is None:
+                dropped.append(symbol)
+                continue
+            try:
+                self._subscribe(shard, symbol)
+            except Exception as e:
+                logger.warning(f"Failed to subscribe {symbol} on crypto stream shard {shard.index}: {e}")
+                continue
+            shard.symbols = shard.symbols + [symbol]
+            added.append(symbol)
+
+        if dropped and dropped != self.dropped_symbols:
+            logger.warning(f"All {self.max_connections} connection(s) are full; not subscribed: {', '.join(dropped)}")
+        self.dropped_symbols = dropped
+        for shard in self.shards[shard_count:]:
+            self._start_shard(shard)
+
+        self.subscription_changes['added'] += len(added)
+        self.subscription_changes['removed'] += len(removed)
+        return added, removed
+
+    @staticmethod
+    def _quote_handler(shard: StreamShard, handler: Callable[[Any], Awaitable[None]]):
+        async def on_quote(quote):
+            shard.record_quote(quote)
+            stream_loop_name.set(shard.loop_name)
+            await handler(quote)
+        return on_quote
+
+    @staticmethod
+    def _trade_handler(shard: StreamShard, handler: Callable[[Any], Awaitable[None]]):
+        async def on_trade(trade):
+            shard.record_trade()
+            await handler(trade)
+        return on_trade
+
+    def _run_shard(self, shard: StreamShard) -> None:
+        """Run one shard's stream until it stops (thread body)."""
+        shard.running = True
+        try:
+            shard.stream.run()
+        except Exception as e:
+            logger.error(f"Crypto stream shard {shard.index} failed: {e}")
+        finally:
+            shard.running = False
+            if not self._stopping:
+                logger.error(f"Crypto stream shard {shard.index} stopped unexpectedly "
+                             f"({len(shard.symbols)} symbols no longer streaming)")
+
+    def _start_shard(self, shard: StreamShard) -> None:
+        """Start a shard's thread if the streams are running."""
+        if self._executor is not None and not self._stopping:
+            self._futures.append(self._executor.submit(self._run_shard, shard))
+
+    async def run(self) -> None:
+        """Run every shard on its own thread until all of them stop."""
+        self._executor = ThreadPoolExecutor(max_workers=self.max_connections, thread_name_prefix='crypto-stream')
+        try:
+            for shard in self.shards:
+                self._start_shard(shard)
+            # Shards opened by update_symbols() while running are picked up on the next pass
+            while True:
+                running = [future for future in self._futures if not future.done()]
+                if not running:
+                    break
+                await asyncio.wait([asyncio.wrap_future(future) for future in running])
+        finally:
+            # Stopping is signalled through the streams; never block the loop on the threads
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def request_stop(self) -> None:
+        """Ask every stream to stop (safe to call from a signal handler)."""
+        self._stopping = True
+        for shard in self.shards:
+            if hasattr(shard.stream, '_should_run'):
+                shard.stream._should_run = False
+
+    def close(self) -> None:
+        """Stop every stream and close its WebSocket."""
+        self.request_stop()
+        for shard in self.shards:
+            try:
+                shard.stream.stop()
+            except Exception as e:
+                logger.debug(f"Crypto stream shard {shard.index} already stopped: {e}")
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Counters for every shard, in shard order."""
+        return [shard.get_stats() for shard in self.shards]
+
+    def log_summary(self) -> None:
+        """Log message counts and lag per shard."""
+        for stats in self.get_stats():
+            lag = stats['lag_seconds']
+            logger.info(f"Crypto stream shard {stats['shard']}: {len(stats['symbols'])} symbols, "
+                        f"quotes={stats['quotes']}, trades={stats['trades']}, "
+                        f"lag={'n/a' if lag is None else f'{lag:.3f}s'}, max_lag={stats['max_lag_seconds']:.3f}s")
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - Parameter Sweep
+
+Runs the backtester over many combinations of DcaAsset settings for one
+symbol and ranks them, using every core:
+
+    sets = parameter_grid({'take_profit_percent': ['1', '1.5', '2'], 'ttp_enabled': ['true', 'false']})
+    results = run_sweep(asset_config, prices, sets, output_path='logs/sweep_btc.csv')
+    best = rank_results(results, by='pl')[:10]
+
+The price arrays are written once to a memory-mapped .npy file (on /dev/shm
+when available) that every worker maps read-only, so adding workers does not
+copy the data. Parameter sets are sent in chunks and each worker returns one
+compact row per set, which the parent appends to the results file as soon
+as the chunk arrives.
+
+Features:
+- Grid and seeded random search over the sweepable DcaAsset fields
+- Process pool sized to the CPU count; zero-copy price sharing via np.memmap
+- Results streamed to CSV while the sweep runs
+- Ranking by P/L, ROI, maximum capital deployed or cycle duration
+- Scaling check: the same sets timed at increasing worker counts
+"""
+
+import csv
+import itertools
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, replace
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from models.asset_config import DcaAsset
+from utils.backtest import DcaBacktester, PriceSeries
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_bool(value: Any) -> bool:
+    """Parse a boolean setting ('true'/'false', '1'/'0', or a bool)."""
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('true', '1', 'yes', 'on')
+
+
+def _decimal(value: Any) -> Decimal:
+    """Parse a Decimal setting."""
+    return Decimal(str(value))
+
+
+def _nullable(convert: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Wrap a converter for a nullable column: None (or 'none'/'null') stays None."""
+    def parse(value: Any) -> Any:
+        if value is None or (isinstance(value, str) and value.strip().lower() in ('none', 'null')):
+            return None
+        return convert(value)
+    return parse
+
+
+# DcaAsset fields a sweep may vary, with the converter applied to each value
+SWEEP_FIELDS: Dict[str, Callable[[Any], Any]] = {
+    'base_order_amount': _decimal,
+    'safety_order_amount': _decimal,
+    'max_safety_orders': int,
+    'safety_order_deviation': _decimal,
+    'take_profit_percent': _decimal,
+    'ttp_enabled': _parse_bool,
+    'ttp_deviation_percent': _nullable(_decimal),
+    'cooldown_period': int,
+}
+
+RESULT_COLUMNS = ('cycles', 'total_pl', 'roi_percent', 'max_capital', 'avg_cycle_seconds',
+                  'max_cycle_seconds', 'safety_orders', 'open_unrealized_pl')
+
+
+def _convert(space: Mapping[str, Sequence[Any]]) -> Dict[str, List[Any]]:
+    """Validate field names and convert every candidate value."""
+    unknown = set(space) - set(SWEEP_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot sweep {sorted(unknown)}; sweepable fields are {sorted(SWEEP_FIELDS)}")
+    return {name: [SWEEP_FIELDS[name](value) for value in values] for name, values in space.items()}
+
+
+def parameter_grid(space: Mapping[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    Every combination of the candidate values.
+
+    Args:
+        space: Field name -> candidate values (strings or typed values)
+
+    Returns:
+        List of parameter dictionaries
+
+    Raises:
+        ValueError: If a field is not in SWEEP_FIELDS
+    """
+    converted = _convert(space)
+    names = list(converted)
+    return [dict(zip(names, combination)) for combination in itertools.product(*converted.values())]
+
+
+def random_parameters(space: Mapping[str, Sequence[Any]], count: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Distinct random combinations of the candidate values.
+
+    Args:
+        space: Field name -> candidate values
+        count: Number of combinations (capped at the grid size)
+        seed: Random seed for a repeatable sample
+
+    Returns:
+        List of parameter dictionaries
+    """
+    converted = _convert(space)
+    names = list(converted)
+    sizes = [len(values) for values in converted.values()]
+    total = 1
+    for size in sizes:
+        total *= size
+
+    # Sample grid positions, then decode each into one value per field
+    chosen = random.Random(seed).sample(range(total), min(count, total))
+    parameter_sets = []
+    for position in chosen:
+        params = {}
+        for name, size in zip(reversed(names), reversed(sizes)):
+            position, offset = divmod(position, size)
+            params[name] = converted[name][offset]
+        parameter_sets.append({name: params[name] for name in names})
+    return parameter_sets
+
+
+@dataclass
+class SweepResult:
+    """Backtest metrics for one parameter set."""
+    index: int
+    params: Dict[str, Any]
+    cycles: int
+    total_pl: float
+    roi_percent: float
+    max_capital: float
+    avg_cycle_seconds: float
+    max_cycle_seconds: float
+    safety_orders: int
+    open_unrealized_pl: float
+
+
+def _run_one(base_asset: DcaAsset, prices: PriceSeries, index: int, params: Dict[str, Any],
+             fee_percent: Decimal) -> SweepResult:
+    """Backtest one parameter set and reduce the result to sweep metrics."""
+    result = DcaBacktester(replace(base_asset, **params), prices, fee_percent).run()
+    summary = result.summary()
+
+    durations = [c.closed_at - c.opened_at for c in result.cycles]
+    capital = [c.invested for c in result.cycles]
+    if result.open_cycle is not None:
+        capital.append(result.open_cycle.invested)
+
+    return SweepResult(
+        index=index,
+        params=params,
+        cycles=summary['total_cycles'],
+        total_pl=float(summary['total_realized_pl']),
+        roi_percent=float(summary['roi_percent']),
+        max_capital=float(max(capital)) if capital else 0.0,
+        avg_cycle_seconds=sum(durations) / len(durations) if durations else 0.0,
+        max_cycle_seconds=max(durations) if durations else 0.0,
+        safety_orders=summary['safety_orders'],
+        open_unrealized_pl=float(summary['open_unrealized_pl']),
+    )
+
+
+# Per-worker state, set once by _init_worker
+_worker_prices: Optional[PriceSeries] = None
+_worker_asset: Optional[DcaAsset] = None
+_worker_fee: Decimal = Decimal('0')
+
+
+def _init_worker(price_file: str, base_asset: DcaAsset, fee_percent: Decimal) -> None:
+    """Map the shared price file read-only and keep the base settings."""
+    global _worker_prices, _worker_asset, _worker_fee
+    data = np.load(price_file, mmap_mode='r')
+    _worker_prices = PriceSeries(data[0], data[1], data[2])
+    _worker_asset = base_asset
+    _worker_fee = fee_percent
+
+
+def _run_chunk(chunk: List[Tuple[int, Dict[str, Any]]]) -> List[SweepResult]:
+    """Worker entry point: backtest a chunk of parameter sets."""
+    return [_run_one(_worker_asset, _worker_prices, index, params, _worker_fee) for index, params in chunk]
+
+
+def _shared_dir() -> Optional[str]:
+    """tmpfs directory for the shared price file, if the system has one."""
+    return '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
+
+
+class _ResultWriter:
+    """Appends sweep results to a CSV file as they arrive."""
+
+    def __init__(self, path: Union[str, Path], param_names: Sequence[str]):
+        self.param_names = list(param_names)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(['index', *self.param_names, *RESULT_COLUMNS])
+
+    def write(self, results: Iterable[SweepResult]) -> None:
+        for r in results:
+            self._writer.writerow([
+                r.index, *(r.params.get(name) for name in self.param_names),
+                r.cycles, f"{r.total_pl:.6f}", f"{r.roi_percent:.4f}", f"{r.max_capital:.2f}",
+                f"{r.avg_cycle_seconds:.0f}", f"{r.max_cycle_seconds:.0f}", r.safety_orders,
+                f"{r.open_unrealized_pl:.6f}",
+            ])
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def run_sweep(
+    base_asset: DcaAsset,
+    prices: PriceSeries,
+    parameter_sets: Sequence[Dict[str, Any]],
+    output_path: Optional[Union[str, Path]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 16,
+    fee_percent: Decimal = Decimal('0'),
+    progress: Optional[Callable[[int, int], None]] = None
+) -> List[SweepResult]:
+    """
+    Backtest every parameter set, in parallel.
+
+    Args:
+        base_asset: Settings the parameter sets are applied on top of
+        prices: Quotes to replay
+        parameter_sets: Dictionaries of DcaAsset field overrides
+        output_path: CSV file to stream results to (None keeps them in memory only)
+        workers: Worker processes (default: CPU count; 1 runs in this process)
+        chunk_size: Parameter sets per task
+        fee_percent: Fee charged on each fill's notional, in percent
+        progress: Called with (completed, total) after each chunk
+
+    Returns:
+        SweepResult per parameter set, in input order
+    """
+    workers = workers or os.cpu_count() or 1
+    indexed = list(enumerate(parameter_sets))
+    chunks = [indexed[start:start + chunk_size] for start in range(0, len(indexed), chunk_size)]
+    param_names = sorted({name for params in parameter_sets for name in params})
+    writer = _ResultWriter(output_path, param_names) if output_path else None
+    results: List[SweepResult] = []
+    started = time.perf_counter()
+
+    def collect(chunk_results: List[SweepResult]) -> None:
+        results.extend(chunk_results)
+        if writer:
+            writer.write(chunk_results)
+        if progress:
+            progress(len(results), len(indexed))
+
+    try:
+        if workers == 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                collect([_run_one(base_asset, prices, index, params, Decimal(str(fee_percent)))
+                         for index, params in chunk])
+        else:
+            _run_pool(base_asset, prices, chunks, min(workers, len(chunks)), Decimal(str(fee_percent)), collect)
+    finally:
+        if writer:
+            writer.close()
+
+    results.sort(key=lambda r: r.index)
+    logger.info(f"Sweep of {len(results)} parameter sets over {len(prices):,} quotes "
+                f"finished in {time.perf_counter() - started:.1f}s with {workers} worker(s)")
+    return results
+
+
+def _run_pool(base_asset: DcaAsset, prices: PriceSeries, chunks: List[List[Tuple[int, Dict[str, Any]]]],
+              workers: int, fee_percent: Decimal, collect: Callable[[List[SweepResult]], None]) -> None:
+    """Share the prices through a memory-mapped file and fan chunks out to a process pool."""
+    temp_dir = tempfile.mkdtemp(prefix='dca_sweep_', dir=_shared_dir())
+    try:
+        price_file = os.path.join(temp_dir, 'prices.npy')
+        np.save(price_file, np.vstack([prices.timestamps, prices.bid, prices.ask]))
+
+        # fork shares the parent's imports; spawn is the portable fallback
+        method = 'fork' if sys.platform.startswith('linux') else 'spawn'
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method),
+                                 initializer=_init_worker, initargs=(price_file, base_asset, fee_percent)) as pool:
+            # Keep a bounded number of chunks in flight so results stream back steadily
+            pending = set()
+            remaining = iter(chunks)
+            for chunk in itertools.islice(remaining, workers * 2):
+                pending.add(pool.submit(_run_chunk, chunk))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future.result())
+                    next_chunk = next(remaining, None)
+                    if next_chunk is not None:
+                        pending.add(pool.submit(_run_chunk, next_chunk))
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+@dataclass
+class ScalingPoint:
+    """Wall time of one sweep at a given worker count."""
+    workers: int
+    seconds: float
+    speedup: float
+    efficiency: float
+
+
+def measure_scaling(
+    base_asset: DcaAsset,
+    prices: PriceSeries,
+    parameter_sets: Sequence[Dict[str, Any]],
+    max_workers: Optional[int] = None,
+    chunk_size: int = 16,
+    fee_percent: Decimal = Decimal('0')
+) -> List[ScalingPoint]:
+    """
+    Time the same sweep at each worker count to check how it scales with cores.
+
+    Linear scaling shows as speedup close to the worker count (efficiency
+    near 1.0) against the single-worker run.
+
+    Args:
+        base_asset: Settings the parameter sets are applied on top of
+        prices: Quotes to replay
+        parameter_sets: Dictionaries of DcaAsset field overrides
+        max_workers: Largest worker count; times 1, 2, 4, ... and this count (default: CPU count)
+        chunk_size: Parameter sets per task
+        fee_percent: Fee charged on each fill's notional, in percent
+
+    Returns:
+        ScalingPoint per worker count, fewest workers first
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= max_workers:
+        worker_counts.append(worker_counts[-1] * 2)
+    if worker_counts[-1] != max_workers:
+        worker_counts.append(max_workers)
+
+    points: List[ScalingPoint] = []
+    for workers in worker_counts:
+        started = time.perf_counter()
+        run_sweep(base_asset, prices, parameter_sets, workers=workers, chunk_size=chunk_size,
+                  fee_percent=fee_percent)
+        seconds = time.perf_counter() - started
+        baseline = points[0].seconds if points else seconds
+        speedup = baseline / seconds if seconds > 0 else 0.0
+        points.append(ScalingPoint(workers, seconds, speedup, speedup / workers))
+    return points
+
+
+# Sort keys for rank_results: best first
+RANKINGS: Dict[str, Callable[[SweepResult], Tuple]] = {
+    'pl': lambda r: (-r.total_pl, r.max_capital, r.avg_cycle_seconds),
+    'roi': lambda r: (-r.roi_percent, r.max_capital),
+    'capital': lambda r: (r.max_capital, -r.total_pl),
+    'duration': lambda r: (r.avg_cycle_seconds if r.cycles else float('inf'), -r.total_pl),
+}
+
+
+def rank_results(results: Iterable[SweepResult], by: str = 'pl') -> List[SweepResult]:
+    """
+    Sort sweep results best first.
+
+    Args:
+        results: Sweep results
+        by: 'pl' (highest P/L, then least capital), 'roi', 'capital'
+            (least capital deployed) or 'duration' (shortest average cycle)
+
+    Returns:
+        Sorted list
+
+    Raises:
+        ValueError: If the ranking is unknown
+    """
+    if by not in RANKINGS:
+        raise ValueError(f"Unknown ranking {by!r}; choose from {sorted(RANKINGS)}")
+    return sorted(results, key=RANKINGS[by])
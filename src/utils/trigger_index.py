@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+DCA Trading Bot - Trigger Price Index
+
+Most quotes cross no threshold: the cycle is waiting on a fill, the price is
+between the safety and take-profit levels, or a trailing peak is holding.
+This module precomputes, per symbol, the float bid/ask levels at which the
+quote decision could act, so the quote handler can reject a quote with a
+couple of float compares before touching the database, the REST API or a
+worker thread.
+
+Levels are derived from the cached asset config and latest cycle. Any change
+to either (local write-through, periodic refresh, invalidation) drops the
+symbol's entry; the next quote for that symbol takes the full decision path
+and rebuilds it.
+
+Features:
+- Safety, take-profit, TTP activation, TTP peak and TTP sell levels per symbol
+- Conservative float thresholds (never rejects a quote Decimal math would act on)
+- Generation check so levels built from a stale read are never stored
+- Counters for fast rejects, pass-throughs and rebuilds
+"""
+
+import logging
+import math
+import threading
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from utils.dca_rules import safety_trigger_price, take_profit_trigger_price, ttp_sell_trigger_price
+
+logger = logging.getLogger(__name__)
+
+# Relative widening applied to every float threshold. Decimal -> float
+# conversion can move a level by one ulp; widening towards "evaluate" keeps
+# the fast path from rejecting a quote sitting exactly on a trigger price.
+TRIGGER_TOLERANCE = 1e-9
+
+
+@dataclass(frozen=True)
+class TriggerLevels:
+    """
+    Float thresholds at which a quote for a symbol needs a full evaluation.
+
+    A quote is evaluated if its ask is at or below ask_at_or_below, or its
+    bid is at or above bid_at_or_above, or its bid is below bid_below. The
+    defaults never match.
+    """
+    asset_id: int
+    ask_at_or_below: float = -math.inf
+    bid_at_or_above: float = math.inf
+    bid_below: float = -math.inf
+    always: bool = False
+
+    def is_crossed(self, bid_price, ask_price) -> bool:
+        """
+        Check whether a quote reaches any trigger level.
+
+        Args:
+            bid_price: Quote bid price
+            ask_price: Quote ask price
+
+        Returns:
+            True if the quote should take the full decision path
+        """
+        if self.always:
+            return True
+        try:
+            return (ask_price <= self.ask_at_or_below
+                    or bid_price >= self.bid_at_or_above
+                    or bid_price < self.bid_below)
+        except TypeError:
+            # Missing prices - let the full path validate and log them
+            return True
+
+
+def _lower(price: Decimal) -> float:
+    """Float just below a Decimal level (for >= comparisons)."""
+    return float(price) * (1 - TRIGGER_TOLERANCE)
+
+
+def _upper(price: Decimal) -> float:
+    """Float just above a Decimal level (for <= and < comparisons)."""
+    return float(price) * (1 + TRIGGER_TOLERANCE)
+
+
+def compute_trigger_levels(asset_config, cycle) -> TriggerLevels:
+    """
+    Derive the trigger levels for an asset's current cycle.
+
+    Levels follow the rules in dca_rules.decide_quote_action():
+    - watching, no position: base order - always evaluate
+    - watching, position: safety trigger on ask, take-profit/TTP activation on bid
+    - trailing: new TTP peak or TTP sell trigger on bid
+    - any other status: waiting on an order or cooldown - never evaluate
+
+    Args:
+        asset_config: DcaAsset for the symbol
+        cycle: Latest DcaCycle for the asset
+
+    Returns:
+        TriggerLevels for the pair
+    """
+    asset_id = asset_config.id
+
+    if cycle.status not in ('watching', 'trailing'):
+        return TriggerLevels(asset_id=asset_id)
+
+    if cycle.status == 'watching' and cycle.quantity == Decimal('0'):
+        return TriggerLevels(asset_id=asset_id, always=True)
+
+    if cycle.quantity <= Decimal('0'):
+        return TriggerLevels(asset_id=asset_id)
+
+    ask_at_or_below = -math.inf
+    safety_price = safety_trigger_price(asset_config, cycle)
+    if cycle.status == 'watching' and safety_price is not None:
+        ask_at_or_below = _upper(safety_price)
+
+    take_profit_price = take_profit_trigger_price(asset_config, cycle)
+    if take_profit_price is None:
+        # Take-profit can't be calculated; only the safety level applies
+        return TriggerLevels(asset_id=asset_id, ask_at_or_below=ask_at_or_below)
+
+    if cycle.status == 'watching' or not asset_config.ttp_enabled:
+        # Standard take-profit, or TTP activation
+        return TriggerLevels(
+            asset_id=asset_id,
+            ask_at_or_below=ask_at_or_below,
+            bid_at_or_above=_lower(take_profit_price)
+        )
+
+    # Trailing with TTP enabled
+    current_peak = cycle.highest_trailing_price or Decimal('0')
+    sell_price = ttp_sell_trigger_price(asset_config, current_peak)
+    if sell_price is None:
+        # Misconfigured - the full path reports it
+        return TriggerLevels(asset_id=asset_id, always=True)
+
+    return TriggerLevels(
+        asset_id=asset_id,
+        bid_at_or_above=_lower(current_peak),
+        bid_below=_upper(sell_price)
+    )
+
+
+class TriggerIndex:
+    """
+    Per-symbol trigger levels with invalidation on state changes.
+
+    should_evaluate() runs on the event loop for every quote; store() and
+    the invalidate methods run on worker threads. Entries are immutable and
+    replaced under a lock, so readers never see a partial update.
+    """
+
+    def __init__(self):
+        """Initialize an empty, disabled index."""
+        self.enabled = False
+        self._levels: Dict[str, TriggerLevels] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {'fast_rejects': 0, 'evaluated': 0, 'rebuilt': 0, 'invalidated': 0}
+
+    def set_enabled(self, enabled: bool) -> None:
+        """
+        Enable or disable the fast path. Disabling also clears the index.
+
+        Args:
+            enabled: True to serve should_evaluate() from stored levels
+        """
+        with self._lock:
+            self.enabled = enabled
+            if not enabled:
+                self._levels.clear()
+                self._generation += 1
+
+    def should_evaluate(self, symbol: str, bid_price, ask_price) -> bool:
+        """
+        Decide whether a quote needs the full decision path.
+
+        Args:
+            symbol: Quote symbol
+            bid_price: Quote bid price
+            ask_price: Quote ask price
+
+        Returns:
+            False only if stored levels prove the quote crosses no trigger
+        """
+        levels = self._levels.get(symbol) if self.enabled else None
+        if levels is not None and not levels.is_crossed(bid_price, ask_price):
+            self._stats['fast_rejects'] += 1
+            return False
+        self._stats['evaluated'] += 1
+        return True
+
+    def generation(self) -> int:
+        """
+        Current invalidation generation, captured before reading state for store().
+
+        Any invalidation bumps it, so a store() racing with a change to any
+        symbol is dropped; the next quote simply rebuilds the levels.
+        """
+        with self._lock:
+            return self._generation
+
+    def store(self, symbol: str, asset_config, cycle, generation: int) -> None:
+        """
+        Compute and store levels unless the symbol was invalidated meanwhile.
+
+        Args:
+            symbol: Asset symbol
+            asset_config: DcaAsset the levels are computed from
+            cycle: Latest DcaCycle the levels are computed from
+            generation: Value of generation() taken before the state was read
+        """
+        if not self.enabled:
+            return
+
+        levels = compute_trigger_levels(asset_config, cycle)
+        with self._lock:
+            if not self.enabled or self._generation != generation:
+                return
+            self._levels[symbol] = levels
+            self._stats['rebuilt'] += 1
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """
+        Drop stored levels so the next quote takes the full path.
+
+        Args:
+            symbol: Symbol to invalidate, or None for every symbol
+        """
+        with self._lock:
+            symbols = list(self._levels) if symbol is None else [symbol]
+            for sym in symbols:
+                self._levels.pop(sym, None)
+            self._generation += 1
+            self._stats['invalidated'] += len(symbols)
+
+    def invalidate_asset(self, asset_id: Optional[int] = None) -> None:
+        """
+        Drop stored levels for an asset id (e.g. when its latest cycle changes).
+
+        Args:
+            asset_id: Asset to invalidate, or None for every symbol
+        """
+        with self._lock:
+            symbols = [sym for sym, levels in self._levels.items()
+                       if asset_id is None or levels.asset_id == asset_id]
+            for sym in symbols:
+                del self._levels[sym]
+            self._generation += 1
+            self._stats['invalidated'] += len(symbols)
+
+    def get_levels(self, symbol: str) -> Optional[TriggerLevels]:
+        """Stored levels for a symbol, or None if it will take the full path."""
+        return self._levels.get(symbol)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get fast-path counters.
+
+        Returns:
+            Dictionary with fast_rejects, evaluated, rebuilt, invalidated and symbols
+        """
+        stats = dict(self._stats)
+        stats['symbols'] = len(self._levels)
+        return stats
+
+    def log_summary(self) -> None:
+        """Log fast-path counters."""
+        stats = self.get_stats()
+        total = stats['fast_rejects'] + stats['evaluated']
+        reject_pct = (stats['fast_rejects'] / total * 100) if total else 0.0
+        logger.info(f"Trigger index: fast_rejects={stats['fast_rejects']} ({reject_pct:.1f}%), "
+                    f"evaluated={stats['evaluated']}, rebuilt={stats['rebuilt']}, "
+                    f"invalidated={stats['invalidated']}")
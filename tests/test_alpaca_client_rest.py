@@ -5,6 +5,8 @@ Functional tests for Alpaca REST API client utilities
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 import os
+import threading
+import time
 
 # Import the functions we want to test
 from src.utils.alpaca_client_rest import (
@@ -14,9 +16,25 @@ from src.utils.alpaca_client_rest import (
     get_latest_crypto_quote,
     get_api_credentials_from_client,
     place_limit_buy_order,
-    cancel_order
+    cancel_order,
+    get_crypto_data_client,
+    set_client_reuse_enabled,
+    keep_alive_clients,
+    get_positions,
+    AlpacaRequestScheduler,
+    RequestPriority,
+    configure_request_scheduler,
+    disable_request_scheduler
 )
 from alpaca.common.exceptions import APIError
+from requests import HTTPError
+
+
+def rate_limited_response():
+    """A requests response for an Alpaca 429."""
+    response = Mock(status_code=429, text='{"code": 42910000, "message": "rate limit exceeded"}')
+    response.raise_for_status.side_effect = HTTPError(response=response)
+    return response
 
 
 @pytest.mark.unit
@@ -372,4 +390,208 @@ def test_cancel_order_api_error(mock_logger):
     assert result is False
     
     # Verify specific error logging
-    mock_logger.error.assert_called_with("Alpaca API error canceling order test-order-id: Order not found") 
\ No newline at end of file
+    mock_logger.error.assert_called_with("Alpaca API error canceling order test-order-id: Order not found")
+
+
+@pytest.fixture
+def client_reuse():
+    """Enable the shared client registry for a test and clear it afterwards."""
+    set_client_reuse_enabled(True, http_pool_maxsize=4)
+    yield
+    set_client_reuse_enabled(False)
+
+
+@pytest.mark.unit
+@patch.dict(os.environ, {
+    'APCA_API_KEY_ID': 'test_key_id',
+    'APCA_API_SECRET_KEY': 'test_secret_key',
+    'APCA_API_BASE_URL': 'https://paper-api.alpaca.markets'
+})
+@patch('src.utils.alpaca_client_rest.TradingClient')
+def test_get_trading_client_reused_when_enabled(mock_trading_client, client_reuse):
+    """Test that one TradingClient is shared across calls when reuse is enabled"""
+    first = get_trading_client()
+    second = get_trading_client()
+    
+    assert first is second
+    mock_trading_client.assert_called_once()
+
+
+@pytest.mark.unit
+@patch.dict(os.environ, {
+    'APCA_API_KEY_ID': 'test_key_id',
+    'APCA_API_SECRET_KEY': 'test_secret_key'
+})
+@patch('src.utils.alpaca_client_rest.CryptoHistoricalDataClient')
+def test_crypto_data_client_reused_when_enabled(mock_crypto_client_class, client_reuse):
+    """Test that latest price lookups share one data client"""
+    mock_trade = Mock()
+    mock_trade.price = 45000.50
+    mock_crypto_client_class.return_value.get_crypto_latest_trade.return_value = {'BTC/USD': mock_trade}
+    
+    assert get_latest_crypto_price(Mock(), 'BTC/USD') == 45000.50
+    assert get_latest_crypto_price(Mock(), 'BTC/USD') == 45000.50
+    
+    mock_crypto_client_class.assert_called_once_with(api_key='test_key_id', secret_key='test_secret_key')
+    assert get_crypto_data_client() is mock_crypto_client_class.return_value
+
+
+@pytest.mark.unit
+@patch.dict(os.environ, {
+    'APCA_API_KEY_ID': 'test_key_id',
+    'APCA_API_SECRET_KEY': 'test_secret_key',
+    'APCA_API_BASE_URL': 'https://paper-api.alpaca.markets'
+})
+def test_shared_client_session_tuned(client_reuse):
+    """Test that a shared client's HTTPS adapter is sized and keep-alive pinged"""
+    client = get_trading_client()
+    adapter = client._session.get_adapter('https://paper-api.alpaca.markets')
+    
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.read == 0
+    assert client._retry == 0  # 429s are left to the request scheduler
+    
+    with patch.object(client, 'get_clock') as mock_get_clock:
+        assert keep_alive_clients() == 1
+        mock_get_clock.assert_called_once()
+
+
+@pytest.mark.unit
+def test_scheduler_serves_higher_priority_first():
+    """Test that a queued sell is sent before reads queued earlier"""
+    # One token a second: all three requests queue long before the first refill
+    scheduler = AlpacaRequestScheduler(requests_per_minute=60, burst=1)
+    scheduler.execute(RequestPriority.READ, lambda: None)  # Drain the bucket
+    
+    order = []
+    threads = []
+    for priority, name in ((RequestPriority.READ, 'read'), (RequestPriority.CANCEL, 'cancel'),
+                           (RequestPriority.SELL, 'sell')):
+        thread = threading.Thread(target=scheduler.execute, args=(priority, order.append, name))
+        thread.start()
+        threads.append(thread)
+        # Wait until this request has joined the queue before starting the next
+        deadline = time.monotonic() + 5
+        while scheduler.get_stats()['queued'] < len(threads) and time.monotonic() < deadline:
+            time.sleep(0.001)
+        assert scheduler.get_stats()['queued'] == len(threads)
+    
+    for thread in threads:
+        thread.join(timeout=10)
+    
+    # Nothing held a token yet, so the sell overtakes everything queued before it
+    assert order == ['sell', 'cancel', 'read']
+    stats = scheduler.get_stats()
+    assert stats['sell']['requests'] == 1
+    assert stats['read']['waits'] >= 1
+
+
+@pytest.mark.unit
+def test_scheduler_coalesces_identical_reads():
+    """Test that concurrent reads with the same key share one request"""
+    scheduler = AlpacaRequestScheduler(requests_per_minute=600, burst=10)
+    release = threading.Event()
+    calls = []
+    
+    def slow_read():
+        calls.append(1)
+        release.wait(timeout=5)
+        return ['position']
+    
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(
+            scheduler.execute(RequestPriority.READ, slow_read, coalesce_key='positions')))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    
+    assert len(calls) == 1
+    assert results == [['position']] * 3
+    assert scheduler.get_stats()['read']['coalesced'] == 2
+
+
+@pytest.mark.unit
+def test_scheduler_rate_limits_after_burst():
+    """Test that requests beyond the burst wait for tokens"""
+    scheduler = AlpacaRequestScheduler(requests_per_minute=1200, burst=2)  # 20/second
+    
+    start = time.monotonic()
+    for _ in range(4):
+        scheduler.execute(RequestPriority.READ, lambda: None)
+    elapsed = time.monotonic() - start
+    
+    assert elapsed >= 0.08  # Two requests had to wait ~50ms each
+
+
+@pytest.mark.unit
+def test_scheduler_backs_off_and_retries_rate_limited_requests():
+    """Test that a 429 is counted, pauses the bucket and re-queues the request"""
+    scheduler = AlpacaRequestScheduler(requests_per_minute=6000, burst=10, rate_limit_backoff_seconds=0.1)
+    responses = [APIError('rate limited', rate_limited_response().raise_for_status.side_effect), None]
+    
+    def submit():
+        outcome = responses.pop(0)
+        if outcome is not None:
+            raise outcome
+        return 'order'
+    
+    start = time.monotonic()
+    assert scheduler.execute(RequestPriority.BUY, submit) == 'order'
+    
+    assert time.monotonic() - start >= 0.09
+    stats = scheduler.get_stats()['buy']
+    assert (stats['requests'], stats['rate_limited']) == (2, 1)
+
+
+@pytest.mark.unit
+def test_scheduler_gives_up_after_rate_limit_retries():
+    """Test that the 429 is raised once the retries are used up"""
+    scheduler = AlpacaRequestScheduler(requests_per_minute=6000, rate_limit_retries=1, rate_limit_backoff_seconds=0.01)
+    
+    def submit():
+        raise APIError('rate limited', rate_limited_response().raise_for_status.side_effect)
+    
+    with pytest.raises(APIError):
+        scheduler.execute(RequestPriority.SELL, submit)
+    assert scheduler.get_stats()['sell']['rate_limited'] == 2
+
+
+@pytest.mark.unit
+@patch.dict(os.environ, {
+    'APCA_API_KEY_ID': 'test_key_id',
+    'APCA_API_SECRET_KEY': 'test_secret_key',
+    'APCA_API_BASE_URL': 'https://paper-api.alpaca.markets'
+})
+def test_shared_client_429_reaches_scheduler(client_reuse):
+    """Test that alpaca-py does not retry a 429 itself on a shared client"""
+    client = get_trading_client()
+    ok = Mock(status_code=200, text='{"is_open": true}')
+    ok.json.return_value = {'is_open': True}
+    scheduler = AlpacaRequestScheduler(requests_per_minute=6000, rate_limit_backoff_seconds=0.01)
+    
+    with patch.object(client._session, 'request', side_effect=[rate_limited_response(), ok]) as request:
+        assert scheduler.execute(RequestPriority.READ, client.get, '/clock') == {'is_open': True}
+    
+    assert request.call_count == 2
+    assert scheduler.get_stats()['read']['rate_limited'] == 1
+
+
+@pytest.mark.unit
+def test_get_positions_routed_through_scheduler():
+    """Test that client helpers go through the installed scheduler"""
+    scheduler = configure_request_scheduler(requests_per_minute=600, burst=5)
+    try:
+        mock_client = Mock()
+        mock_client.get_all_positions.return_value = []
+        
+        get_positions(mock_client)
+        
+        assert scheduler.get_stats()['read']['requests'] == 1
+    finally:
+        disable_request_scheduler()
@@ -498,4 +498,21 @@ class TestIntegration:
         mock_stop.assert_called_once()
         mock_start.assert_called_once()
         mock_disable_maintenance.assert_called_once()
-        mock_sleep.assert_called_once_with(1) 
\ No newline at end of file
+        mock_sleep.assert_called_once_with(1) 
+    
+    @patch('app_control.os.kill')
+    @patch('app_control.get_app_status')
+    @patch('app_control.logger')
+    def test_cmd_reload_signals_running_app(self, mock_logger, mock_get_status, mock_kill):
+        """Test reload command sends SIGHUP to the running app only."""
+        import signal
+        from app_control import cmd_reload
+        
+        mock_get_status.return_value = (True, 12345, '1h 2m')
+        assert cmd_reload() == 0
+        mock_kill.assert_called_once_with(12345, signal.SIGHUP)
+        
+        mock_kill.reset_mock()
+        mock_get_status.return_value = (False, None, None)
+        assert cmd_reload() == 1
+        mock_kill.assert_not_called()
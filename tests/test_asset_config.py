@@ -10,7 +10,10 @@ from datetime import datetime
 from decimal import Decimal
 from mysql.connector import Error
 
-from models.asset_config import DcaAsset, get_asset_config, get_all_enabled_assets, update_asset_config
+from models.asset_config import (
+    ASSET_COLUMNS, DcaAsset, get_asset_config, get_all_enabled_assets, get_enabled_asset_symbols, update_asset_config,
+    set_asset_cache_enabled, refresh_asset_cache, add_asset_cache_listener
+)
 
 # Configure logging for tests
 logging.basicConfig(level=logging.DEBUG)
@@ -70,6 +73,60 @@ def test_dca_asset_from_dict_null_ttp_deviation(sample_asset_data):
     assert asset.ttp_deviation_percent is None
 
 
+@pytest.mark.unit
+def test_dca_asset_from_row_matches_from_dict(sample_asset_data):
+    """Test that tuple rows decode like dictionary rows, including TINYINT booleans."""
+    data = dict(sample_asset_data, is_enabled=1, ttp_enabled=0)
+    row = tuple(data[column] for column in ASSET_COLUMNS)
+    
+    asset = DcaAsset.from_row(row)
+    
+    assert asset == DcaAsset.from_dict(data)
+    assert asset.is_enabled is True and asset.ttp_enabled is False
+    assert not hasattr(asset, '__dict__')
+
+
+@pytest.mark.unit
+def test_models_frozen_under_test():
+    """Test that models are mutable dataclasses that conftest.py freezes with freeze_models()."""
+    import dataclasses
+    from models import models_frozen
+    from models.cycle_data import DcaCycle
+    
+    assert not DcaAsset.__dataclass_params__.frozen and not DcaCycle.__dataclass_params__.frozen
+    assert models_frozen()
+    cycle = DcaCycle(1, 1, 'watching', 0, 0, 0, None, None, None, None, None, None, None)
+    
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        cycle.status = 'buying'
+    assert dataclasses.replace(cycle, status='buying').status == 'buying'
+
+
+@pytest.mark.unit
+def test_models_mutable_until_freeze_models():
+    """Test the production default (mutable) and freeze_models() in a fresh process."""
+    import os
+    import subprocess
+    import sys
+    
+    code = (
+        "import dataclasses\n"
+        "from models import freeze_models\n"
+        "from models.cycle_data import DcaCycle\n"
+        "cycle = DcaCycle(1, 1, 'watching', 0, 0, 0, None, None, None, None, None, None, None)\n"
+        "cycle.status = 'buying'\n"
+        "freeze_models()\n"
+        "try:\n"
+        "    cycle.status = 'watching'\n"
+        "except dataclasses.FrozenInstanceError:\n"
+        "    print(cycle.status)\n"
+    )
+    src = os.path.join(os.path.dirname(__file__), '..', 'src')
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=src, timeout=60)
+    
+    assert result.stdout.strip() == 'buying', result.stderr
+
+
 @pytest.mark.unit
 @patch('models.asset_config.execute_query')
 def test_get_asset_config_found(mock_execute_query, sample_asset_data):
@@ -137,6 +194,18 @@ def test_get_all_enabled_assets_empty(mock_execute_query):
     assert isinstance(result, list)
 
 
+@pytest.mark.unit
+@patch('models.asset_config.execute_query')
+def test_get_enabled_asset_symbols(mock_execute_query):
+    """Test getting only the symbols of enabled assets."""
+    mock_execute_query.return_value = [{'asset_symbol': 'BTC/USD'}, {'asset_symbol': 'ETH/USD'}]
+    
+    result = get_enabled_asset_symbols()
+    
+    assert result == ['BTC/USD', 'ETH/USD']
+    assert 'is_enabled = TRUE' in mock_execute_query.call_args[0][0]
+
+
 @pytest.mark.unit
 @patch('models.asset_config.execute_query')
 def test_update_asset_config_success(mock_execute_query):
@@ -186,4 +255,87 @@ def test_update_asset_config_error(mock_execute_query):
     updates = {'is_enabled': False}
     
     with pytest.raises(Error):
-        update_asset_config(1, updates) 
\ No newline at end of file
+        update_asset_config(1, updates)
+
+
+@pytest.fixture
+def asset_cache():
+    """Enable the asset config cache for a test and clear it afterwards."""
+    set_asset_cache_enabled(True)
+    yield
+    set_asset_cache_enabled(False)
+
+
+@pytest.mark.unit
+@patch('models.asset_config.execute_query')
+def test_get_asset_config_served_from_cache(mock_execute_query, sample_asset_data, asset_cache):
+    """Test that repeated lookups only query the database once."""
+    mock_execute_query.return_value = sample_asset_data
+    
+    first = get_asset_config('BTC/USD')
+    second = get_asset_config('BTC/USD')
+    
+    assert first is second
+    mock_execute_query.assert_called_once()
+
+
+@pytest.mark.unit
+@patch('models.asset_config.execute_query')
+def test_get_asset_config_caches_missing_asset(mock_execute_query, asset_cache):
+    """Test that unconfigured symbols are not looked up on every quote."""
+    mock_execute_query.return_value = None
+    
+    assert get_asset_config('FAKE/USD') is None
+    assert get_asset_config('FAKE/USD') is None
+    
+    mock_execute_query.assert_called_once()
+
+
+@pytest.mark.unit
+@patch('models.asset_config.execute_query')
+def test_update_asset_config_writes_through_cache(mock_execute_query, sample_asset_data, asset_cache):
+    """Test that a successful update is visible without another read."""
+    mock_execute_query.return_value = sample_asset_data
+    get_asset_config('BTC/USD')
+    
+    mock_execute_query.return_value = 1  # 1 row affected
+    assert update_asset_config(1, {'last_sell_price': Decimal('51000.00')})
+    
+    mock_execute_query.reset_mock()
+    cached = get_asset_config('BTC/USD')
+    
+    assert cached.last_sell_price == Decimal('51000.00')
+    mock_execute_query.assert_not_called()
+
+
+@pytest.mark.unit
+@patch('models.asset_config.execute_query')
+def test_refresh_asset_cache_picks_up_external_changes(mock_execute_query, sample_asset_data, asset_cache):
+    """Test that a refresh replaces assets changed by other processes."""
+    mock_execute_query.return_value = sample_asset_data
+    get_asset_config('BTC/USD')
+    
+    changed = sample_asset_data.copy()
+    changed['is_enabled'] = False
+    mock_execute_query.return_value = [changed]
+    
+    assert refresh_asset_cache() == 1
+    assert get_asset_config('BTC/USD').is_enabled is False
+
+
+@pytest.mark.unit
+@patch('models.asset_config._asset_cache_listeners', [])
+@patch('models.asset_config.execute_query')
+def test_asset_cache_listeners_notified_on_update(mock_execute_query, sample_asset_data, asset_cache):
+    """Test that listeners hear about write-through updates by symbol."""
+    changed = []
+    add_asset_cache_listener(changed.append)
+    
+    mock_execute_query.return_value = sample_asset_data
+    get_asset_config('BTC/USD')
+    changed.clear()
+    
+    mock_execute_query.return_value = 1
+    update_asset_config(1, {'last_sell_price': Decimal('51000.00')})
+    
+    assert changed == ['BTC/USD']
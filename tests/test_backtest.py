@@ -0,0 +1,119 @@
+"""
+Tests for the vectorized backtesting engine.
+"""
+
+import numpy as np
+import pytest
+from decimal import Decimal
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.backtest import DcaBacktester, PriceSeries, default_asset_config, load_price_csv, run_backtest
+
+
+def quotes(prices, spacing=60.0):
+    """PriceSeries with bid == ask == price, one quote per spacing seconds."""
+    prices = np.asarray(prices, dtype=float)
+    return PriceSeries(np.arange(len(prices)) * spacing, prices, prices)
+
+
+class TestBacktester:
+    """Test simulated cycles and P/L"""
+
+    @pytest.mark.unit
+    def test_cycle_with_safety_order_and_take_profit(self):
+        """Test base at 100, safety at 99, take-profit at 2% above the average"""
+        asset = default_asset_config('BTC/USD', ttp_enabled=False, safety_order_deviation=Decimal('1'),
+                                     base_order_amount=Decimal('100'), safety_order_amount=Decimal('99'))
+        result = run_backtest(asset, quotes([100, 99.5, 99, 100, 100.9, 101, 101.5]))
+
+        assert len(result.cycles) == 1
+        cycle = result.cycles[0]
+        assert cycle.safety_orders == 1
+        assert cycle.quantity == Decimal('2')
+        assert cycle.average_purchase_price == Decimal('99.5')
+        assert cycle.sell_price == Decimal('101.5')
+        assert cycle.exit_reason == 'take_profit'
+        assert cycle.realized_pl == Decimal('4.0')
+        summary = result.summary()
+        assert summary['total_invested'] == Decimal('199.0')
+        assert summary['roi_percent'] == pytest.approx(Decimal('4.0') / Decimal('199.0') * 100)
+
+    @pytest.mark.unit
+    def test_ttp_sells_after_drop_from_peak(self):
+        """Test that TTP follows the peak and sells on the deviation from it"""
+        asset = default_asset_config('BTC/USD', ttp_deviation_percent=Decimal('1'), cooldown_period=0,
+                                     base_order_amount=Decimal('100'))
+        result = run_backtest(asset, quotes([100, 102, 104, 106, 105.5, 104.9, 104.0]))
+
+        assert [c.sell_price for c in result.cycles] == [Decimal('104.9')]
+        assert result.cycles[0].exit_reason == 'ttp'
+        assert result.actions['ttp_peak'] == 2
+        # Cooldown of 0: the next quote starts a new cycle
+        assert result.open_cycle.average_purchase_price == Decimal('104.0')
+
+    @pytest.mark.unit
+    def test_cooldown_delays_next_base_order(self):
+        """Test that no base order is placed until cooldown_period has passed"""
+        asset = default_asset_config('BTC/USD', ttp_enabled=False, cooldown_period=180)
+        result = run_backtest(asset, quotes([100, 103, 90, 80, 70, 60]))
+
+        assert len(result.cycles) == 1
+        # Sold at t=60; quotes at t=120 and t=180 fall inside the cooldown window
+        assert result.open_cycle.opened_at == 240.0
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('ttp_enabled', [True, False])
+    def test_vectorized_matches_per_quote(self, ttp_enabled):
+        """Test that jumping between crossings gives the same cycles as evaluating every quote"""
+        rng = np.random.default_rng(7)
+        minutes = np.arange(20000)
+        prices = 100 * (1 + 0.05 * np.sin(minutes / 100)) * np.exp(np.cumsum(rng.normal(0, 0.0006, len(minutes))))
+        series = PriceSeries.from_prices(minutes * 60.0, prices, spread_percent=0.1)
+        asset = default_asset_config('ETH/USD', ttp_enabled=ttp_enabled, cooldown_period=600)
+
+        fast = DcaBacktester(asset, series).run()
+        slow = DcaBacktester(asset, series).run(vectorized=False)
+
+        assert len(fast.cycles) > 5
+        assert fast.cycles == slow.cycles
+        assert fast.open_cycle == slow.open_cycle
+        assert fast.actions == slow.actions
+
+
+class TestPriceLoading:
+    """Test CSV loading and bar expansion"""
+
+    @pytest.mark.unit
+    def test_bars_expand_to_four_quotes(self):
+        """Test that up bars visit the low first and down bars the high first"""
+        series = PriceSeries.from_bars([0, 60], [10, 10], [12, 12], [9, 9], [11, 9.5])
+
+        assert list(series.bid) == [10, 9, 12, 11, 10, 12, 9, 9.5]
+        assert list(series.timestamps[:4]) == [0, 15, 30, 45]
+
+    @pytest.mark.unit
+    def test_load_quote_csv(self, tmp_path):
+        """Test loading bid/ask quotes with ISO timestamps, sorted by time"""
+        path = tmp_path / 'quotes.csv'
+        path.write_text("Timestamp,Bid,Ask\n"
+                        "2025-01-01T00:01:00Z,101,101.1\n"
+                        "2025-01-01T00:00:00,100,100.1\n")
+
+        series = load_price_csv(path)
+
+        assert list(series.bid) == [100, 101]
+        assert series.timestamps[1] - series.timestamps[0] == 60
+
+    @pytest.mark.unit
+    def test_load_price_csv_with_spread(self, tmp_path):
+        """Test that single prices get the assumed spread"""
+        path = tmp_path / 'prices.csv'
+        path.write_text("timestamp,price\n0,100\n60,200\n")
+
+        series = load_price_csv(path, spread_percent=1.0)
+
+        assert series.bid[0] == pytest.approx(99.5)
+        assert series.ask[1] == pytest.approx(201.0)
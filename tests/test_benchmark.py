@@ -0,0 +1,106 @@
+"""
+Tests for the microbenchmark framework and the hot-path benchmark cases.
+"""
+
+import logging
+import pytest
+from pathlib import Path
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from utils.benchmark import (
+    BenchmarkResult, BenchmarkSuite, compare, find_baseline, load_history, measure, save_run
+)
+
+
+def make_result(name, best_ns):
+    """Create a BenchmarkResult with the given best time."""
+    return BenchmarkResult(name=name, group='test', loops=1, rounds=1, best_ns=best_ns,
+                           median_ns=best_ns, mean_ns=best_ns, stdev_ns=0.0)
+
+
+class TestMeasure:
+    """Test timing and the case registry"""
+
+    @pytest.mark.unit
+    def test_before_runs_untimed_for_every_call(self):
+        """Test that before() runs ahead of each timed call"""
+        calls = []
+
+        loops, per_call = measure(lambda: calls.append('call'), before=lambda: calls.append('before'),
+                                  min_time=0.001, rounds=3)
+
+        assert loops >= 1 and len(per_call) == 3
+        assert calls[:4] == ['before', 'call', 'before', 'call']
+        assert calls.count('before') == calls.count('call')
+
+    @pytest.mark.unit
+    def test_suite_setup_and_teardown(self):
+        """Test that case generators are set up, timed and closed"""
+        suite = BenchmarkSuite()
+        events = []
+
+        @suite.case('demo.sum', group='demo')
+        def bench_sum():
+            """Sum a small list"""
+            events.append('setup')
+            values = list(range(10))
+            yield lambda: sum(values)
+            events.append('teardown')
+
+        @suite.case('other.noop')
+        def bench_noop():
+            yield lambda: None
+
+        results = suite.run(suite.names(['demo']), min_time=0.001, rounds=2)
+
+        assert [r.name for r in results] == ['demo.sum']
+        assert results[0].best_ns > 0 and results[0].best_ns <= results[0].median_ns
+        assert events == ['setup']  # closed generators skip code after the yield
+        assert suite.describe('demo.sum') == 'Sum a small list'
+        with pytest.raises(ValueError):
+            suite.case('demo.sum')(bench_sum)
+
+
+class TestHistory:
+    """Test stored runs, baselines and regression flags"""
+
+    @pytest.mark.unit
+    def test_compare_with_latest_run_from_this_machine(self, tmp_path):
+        """Test that the latest same-machine run is the baseline and slowdowns are flagged"""
+        path = tmp_path / 'history.jsonl'
+        save_run(path, [make_result('a', 100.0), make_result('b', 100.0)], label='v1')
+        save_run(path, [make_result('a', 200.0), make_result('b', 100.0)])
+        with open(path, 'a') as f:
+            f.write('{"ts": "x", "environment": {"host": "elsewhere"}, "results": {}}\n')
+
+        history = load_history(path)
+        latest = find_baseline(history)
+        comparisons = compare([make_result('a', 210.0), make_result('b', 150.0), make_result('c', 1.0)],
+                              latest, threshold_percent=10)
+
+        assert len(history) == 3
+        assert latest['label'] is None and latest['results']['a']['best_ns'] == 200.0
+        assert [c.regressed for c in comparisons] == [False, True, False]
+        assert comparisons[2].change_percent is None
+        assert find_baseline(history, label='v1')['results']['a']['best_ns'] == 100.0
+        assert load_history(tmp_path / 'missing.jsonl') == []
+
+
+class TestHotPathCases:
+    """Test that every hot-path case runs cleanly against the stubbed I/O"""
+
+    @pytest.mark.unit
+    def test_all_cases_run_without_errors(self, caplog):
+        """Test each case once and check main_app logged no errors"""
+        import benchmark
+
+        with caplog.at_level(logging.ERROR):
+            results = benchmark.suite.run(min_time=0, rounds=1)
+
+        assert len(results) == len(benchmark.suite.names())
+        assert {r.group for r in results} == {'models', 'formatting', 'main_app', 'db'}
+        assert [record.getMessage() for record in caplog.records if record.levelno >= logging.ERROR] == []
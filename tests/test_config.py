@@ -11,7 +11,8 @@ import sys
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from config import Config, ConfigurationError, get_config
+import config as config_module
+from config import Config, ConfigurationError, get_config, get_settings, reload_settings
 
 
 class TestConfig(unittest.TestCase):
@@ -267,5 +268,80 @@ class TestConfig(unittest.TestCase):
             self.assertIsNone(email_config)
 
 
+class TestConfigSnapshot(unittest.TestCase):
+    """Test cases for the frozen settings snapshot and reload."""
+    
+    def setUp(self):
+        """Isolate the environment, the current snapshot and the .env bookkeeping."""
+        self.patches = [
+            patch.dict(os.environ),
+            patch('config._settings', config_module._settings),
+            patch('config._dotenv_keys', set()),
+            patch('config.logger'),
+        ]
+        for p in self.patches:
+            p.start()
+    
+    def tearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+    
+    def write_env(self, text):
+        """Write a temporary .env file and return its path."""
+        import tempfile
+        handle = tempfile.NamedTemporaryFile('w', suffix='.env', delete=False)
+        handle.write(text)
+        handle.close()
+        self.addCleanup(os.unlink, handle.name)
+        return handle.name
+    
+    def test_snapshot_is_typed_and_frozen(self):
+        """Test that a snapshot holds resolved values and cannot be changed."""
+        from dataclasses import FrozenInstanceError
+        
+        os.environ['ORDER_COOLDOWN_SECONDS'] = '12'
+        snapshot = get_config().snapshot()
+        
+        self.assertEqual(snapshot.order_cooldown_seconds, 12)
+        self.assertIsInstance(snapshot.testing_mode, bool)
+        with self.assertRaises(FrozenInstanceError):
+            snapshot.order_cooldown_seconds = 1
+        
+        # Later environment changes do not leak into an existing snapshot
+        os.environ['ORDER_COOLDOWN_SECONDS'] = '30'
+        self.assertEqual(snapshot.order_cooldown_seconds, 12)
+    
+    @patch('config._PROCESS_ENV_KEYS', frozenset({'TESTING_MODE'}))
+    def test_reload_swaps_snapshot(self):
+        """Test that reload applies .env changes, keeps process variables and drops removed keys."""
+        os.environ['TESTING_MODE'] = 'false'
+        old = get_settings()
+        
+        new = reload_settings(self.write_env('ORDER_COOLDOWN_SECONDS=42\nTESTING_MODE=true\n'))
+        
+        self.assertIs(get_settings(), new)
+        self.assertEqual(new.order_cooldown_seconds, 42)
+        self.assertFalse(new.testing_mode)
+        self.assertIsNot(old, new)
+        
+        reload_settings(self.write_env(''))
+        self.assertNotIn('ORDER_COOLDOWN_SECONDS', os.environ)
+        self.assertEqual(get_settings().order_cooldown_seconds, 5)
+    
+    @patch('config._PROCESS_ENV_KEYS', frozenset())
+    def test_invalid_reload_keeps_current_snapshot(self):
+        """Test that a .env missing a required setting is rejected and rolled back."""
+        os.environ['DB_HOST'] = 'db.example.com'
+        os.environ.pop('ORDER_COOLDOWN_SECONDS', None)
+        current = get_settings()
+        
+        with self.assertRaises(ConfigurationError):
+            reload_settings(self.write_env('DB_HOST=\nORDER_COOLDOWN_SECONDS=99\n'))
+        
+        self.assertIs(get_settings(), current)
+        self.assertEqual(os.environ['DB_HOST'], 'db.example.com')
+        self.assertNotIn('ORDER_COOLDOWN_SECONDS', os.environ)
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
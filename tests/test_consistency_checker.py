@@ -26,6 +26,7 @@ from consistency_checker import (
     process_stuck_buying_cycle,
     has_alpaca_position,
     get_alpaca_position_by_symbol,
+    fetch_alpaca_positions,
     process_orphaned_watching_cycle,
     process_watching_cycle_with_position_sync,
     get_current_utc_time
@@ -584,7 +585,7 @@ class TestConsistencyChecker(unittest.TestCase):
         
         # Verify sync was performed
         self.assertTrue(result, "Should return True when sync is performed")
-        mock_get_position.assert_called_once_with(mock_client, 'BTC/USD')
+        mock_get_position.assert_called_once_with(mock_client, 'BTC/USD', None)
         mock_update_cycle.assert_called_once()
         
         # Verify update call had correct data
@@ -618,7 +619,7 @@ class TestConsistencyChecker(unittest.TestCase):
         
         # Verify no sync was needed
         self.assertFalse(result, "Should return False when no sync is needed")
-        mock_get_position.assert_called_once_with(mock_client, 'BTC/USD')
+        mock_get_position.assert_called_once_with(mock_client, 'BTC/USD', None)
 
     @patch('consistency_checker.create_cycle')
     @patch('consistency_checker.update_cycle')
@@ -646,7 +647,7 @@ class TestConsistencyChecker(unittest.TestCase):
         
         # Verify orphaned cycle handling
         self.assertTrue(result, "Should return True when orphaned cycle is processed")
-        mock_get_position.assert_called_once_with(mock_client, 'BTC/USD')
+        mock_get_position.assert_called_once_with(mock_client, 'BTC/USD', None)
         
         # Verify old cycle was marked as error
         mock_update_cycle.assert_called_once()
@@ -682,7 +683,25 @@ class TestConsistencyChecker(unittest.TestCase):
         
         # Verify consistent state is recognized
         self.assertFalse(result, "Should return False when state is already consistent")
-        mock_get_position.assert_called_once_with(mock_client, 'BTC/USD')
+        mock_get_position.assert_called_once_with(mock_client, 'BTC/USD', None)
+
+
+    def test_fetch_alpaca_positions_once_per_run(self):
+        """Test that positions are fetched with one request and looked up per cycle without more."""
+        btc = Mock(symbol='BTCUSD', qty='0.01', avg_entry_price='50000.0')
+        eth = Mock(symbol='ETHUSD', qty='0', avg_entry_price='3000.0')
+        mock_client = Mock()
+        mock_client.get_all_positions.return_value = [btc, eth]
+        
+        positions = fetch_alpaca_positions(mock_client)
+        
+        self.assertEqual(positions, {'BTCUSD': btc}, "Zero-quantity positions should be left out")
+        self.assertIs(get_alpaca_position_by_symbol(mock_client, 'BTC/USD', positions), btc)
+        self.assertIsNone(get_alpaca_position_by_symbol(mock_client, 'ETH/USD', positions))
+        mock_client.get_all_positions.assert_called_once_with()
+        
+        mock_client.get_all_positions.side_effect = APIError("service unavailable")
+        self.assertIsNone(fetch_alpaca_positions(mock_client), "A failed fetch should not look like no positions")
 
 
 if __name__ == '__main__':
@@ -10,7 +10,12 @@ from datetime import datetime
 from decimal import Decimal
 from mysql.connector import Error
 
-from models.cycle_data import DcaCycle, get_latest_cycle, create_cycle, update_cycle, get_cycle_by_id
+from models.cycle_data import (
+    CYCLE_COLUMNS, DcaCycle, get_latest_cycle, create_cycle, update_cycle, get_cycle_by_id, get_all_cycles,
+    set_cycle_cache_enabled, refresh_cycle_cache, invalidate_cycle_cache,
+    add_cycle_cache_listener, set_peak_write_behind_enabled, buffer_trailing_peak, flush_trailing_peaks,
+    get_trailing_peak_stats
+)
 
 # Configure logging for tests
 logging.basicConfig(level=logging.DEBUG)
@@ -34,6 +39,43 @@ def test_dca_cycle_from_dict(sample_cycle_data):
     assert cycle.sell_price is None
 
 
+@pytest.mark.unit
+def test_dca_cycle_from_row_matches_from_dict(sample_cycle_data):
+    """Test that tuple rows decode like dictionary rows, with or without asset_symbol."""
+    row = tuple(sample_cycle_data[column] for column in CYCLE_COLUMNS)
+    
+    assert DcaCycle.from_row(row) == DcaCycle.from_dict(sample_cycle_data)
+    assert DcaCycle.from_row(row + ('BTC/USD',)).asset_symbol == 'BTC/USD'
+    assert not hasattr(DcaCycle.from_row(row), '__dict__')
+
+
+@pytest.mark.unit
+def test_dca_cycle_decodes_non_decimal_values(sample_cycle_data):
+    """Test that numeric columns from other drivers still become Decimals."""
+    data = dict(sample_cycle_data, quantity='0.1', average_purchase_price=50000.5, sell_price=51000)
+    
+    cycle = DcaCycle.from_dict(data)
+    
+    assert cycle.quantity == Decimal('0.1') and isinstance(cycle.quantity, Decimal)
+    assert cycle.average_purchase_price == Decimal('50000.5')
+    assert cycle.sell_price == Decimal('51000')
+    # Decimals from mysql-connector are used as-is
+    assert DcaCycle.from_dict(sample_cycle_data).last_order_fill_price is sample_cycle_data['last_order_fill_price']
+
+
+@pytest.mark.unit
+@patch('models.cycle_data.execute_query')
+def test_get_all_cycles_reads_tuple_rows(mock_execute_query, sample_cycle_data):
+    """Test that get_all_cycles() asks for tuple rows and builds cycles from them."""
+    mock_execute_query.return_value = [tuple(sample_cycle_data[column] for column in CYCLE_COLUMNS) + ('BTC/USD',)]
+    
+    cycles = get_all_cycles()
+    
+    assert mock_execute_query.call_args.kwargs['dictionary'] is False
+    assert cycles[0].asset_symbol == 'BTC/USD'
+    assert cycles[0].quantity == Decimal('0.1')
+
+
 @pytest.mark.unit
 def test_dca_cycle_from_dict_with_trailing_status(sample_cycle_data):
     """Test creating DcaCycle with trailing status and highest_trailing_price."""
@@ -286,4 +328,214 @@ def test_get_cycle_by_id_not_found(mock_execute_query):
     result = get_cycle_by_id(999)
     
     assert result is None
-    mock_execute_query.assert_called_once() 
\ No newline at end of file
+    mock_execute_query.assert_called_once()
+
+
+@pytest.fixture
+def cycle_cache():
+    """Enable the latest-cycle cache for a test and clear it afterwards."""
+    set_cycle_cache_enabled(True)
+    yield
+    set_cycle_cache_enabled(False)
+
+
+@pytest.mark.unit
+@patch('models.cycle_data.execute_query')
+def test_get_latest_cycle_uncached_by_default(mock_execute_query, sample_cycle_data):
+    """Test that every lookup hits the database when the cache is disabled."""
+    mock_execute_query.return_value = sample_cycle_data
+    
+    get_latest_cycle(1)
+    get_latest_cycle(1)
+    
+    assert mock_execute_query.call_count == 2
+
+
+@pytest.mark.unit
+@patch('models.cycle_data.execute_query')
+def test_get_latest_cycle_served_from_cache(mock_execute_query, sample_cycle_data, cycle_cache):
+    """Test that repeated lookups only query the database once."""
+    mock_execute_query.return_value = sample_cycle_data
+    
+    first = get_latest_cycle(1)
+    second = get_latest_cycle(1)
+    
+    assert first is second
+    mock_execute_query.assert_called_once()
+
+
+@pytest.mark.unit
+@patch('models.cycle_data.execute_query')
+def test_update_cycle_writes_through_cache(mock_execute_query, sample_cycle_data, cycle_cache):
+    """Test that a successful update is visible without another read."""
+    mock_execute_query.return_value = sample_cycle_data
+    original = get_latest_cycle(1)
+    
+    mock_execute_query.return_value = 1  # 1 row affected
+    assert update_cycle(1, {'status': 'buying', 'latest_order_id': 'order456'})
+    
+    mock_execute_query.reset_mock()
+    cached = get_latest_cycle(1)
+    
+    assert cached.status == 'buying'
+    assert cached.latest_order_id == 'order456'
+    assert original.status == 'watching'  # Previous snapshot is never mutated
+    mock_execute_query.assert_not_called()
+
+
+@pytest.mark.unit
+@patch('models.cycle_data.execute_query')
+def test_create_cycle_replaces_cached_latest_cycle(mock_execute_query, sample_cycle_data, cycle_cache):
+    """Test that a newly created cycle becomes the cached latest cycle."""
+    mock_execute_query.return_value = sample_cycle_data
+    get_latest_cycle(1)
+    
+    new_cycle_data = sample_cycle_data.copy()
+    new_cycle_data['id'] = 2
+    new_cycle_data['status'] = 'cooldown'
+    mock_execute_query.side_effect = [2, new_cycle_data]
+    create_cycle(asset_id=1, status='cooldown')
+    
+    mock_execute_query.reset_mock()
+    mock_execute_query.side_effect = None
+    cached = get_latest_cycle(1)
+    
+    assert cached.id == 2
+    assert cached.status == 'cooldown'
+    mock_execute_query.assert_not_called()
+
+
+@pytest.mark.unit
+@patch('models.cycle_data.execute_query')
+def test_refresh_cycle_cache_picks_up_external_changes(mock_execute_query, sample_cycle_data, cycle_cache):
+    """Test that a refresh replaces cycles changed by other processes."""
+    mock_execute_query.return_value = sample_cycle_data
+    get_latest_cycle(1)
+    
+    changed = sample_cycle_data.copy()
+    changed['status'] = 'cooldown'
+    mock_execute_query.return_value = [changed]
+    
+    assert refresh_cycle_cache() == 1
+    assert get_latest_cycle(1).status == 'cooldown'
+
+
+@pytest.mark.unit
+@patch('models.cycle_data.execute_query')
+def test_invalidate_cycle_cache_forces_reload(mock_execute_query, sample_cycle_data, cycle_cache):
+    """Test that invalidation makes the next lookup read the database."""
+    mock_execute_query.return_value = sample_cycle_data
+    get_latest_cycle(1)
+    
+    invalidate_cycle_cache(1)
+    get_latest_cycle(1)
+    
+    assert mock_execute_query.call_count == 2
+
+
+@pytest.mark.unit
+@patch('models.cycle_data._cycle_cache_listeners', [])
+@patch('models.cycle_data.execute_query')
+def test_cycle_cache_listeners_notified_on_change(mock_execute_query, sample_cycle_data, cycle_cache):
+    """Test that listeners hear about write-through updates and refresh changes."""
+    changed = []
+    add_cycle_cache_listener(changed.append)
+    
+    mock_execute_query.return_value = sample_cycle_data
+    get_latest_cycle(1)
+    changed.clear()
+    
+    mock_execute_query.return_value = 1
+    update_cycle(1, {'status': 'buying'})
+    assert changed == [1]
+    
+    # Refresh returning the same row as the cache reports no change
+    mock_execute_query.return_value = [dict(sample_cycle_data, status='buying')]
+    refresh_cycle_cache()
+    assert changed == [1]
+    
+    mock_execute_query.return_value = [dict(sample_cycle_data, status='watching')]
+    refresh_cycle_cache()
+    assert changed == [1, 1]
+
+
+@pytest.fixture
+def peak_write_behind(cycle_cache):
+    """Enable trailing peak write-behind on top of the cycle cache."""
+    set_peak_write_behind_enabled(True)
+    yield
+    with patch('models.cycle_data.execute_query'):
+        set_peak_write_behind_enabled(False)
+
+
+@pytest.mark.unit
+@patch('models.cycle_data.execute_query')
+def test_buffer_trailing_peak_off_by_default(mock_execute_query, cycle_cache):
+    """Test that callers write peaks themselves unless write-behind is enabled."""
+    assert not buffer_trailing_peak(1, Decimal('51000'))
+    mock_execute_query.assert_not_called()
+
+
+@pytest.mark.unit
+@patch('models.cycle_data.execute_query')
+def test_trailing_peaks_coalesced_into_one_write(mock_execute_query, sample_cycle_data, peak_write_behind):
+    """Test that a rally's peaks update the cache at once and reach the DB as one monotonic UPDATE."""
+    mock_execute_query.return_value = dict(sample_cycle_data, status='trailing')
+    get_latest_cycle(1)
+    mock_execute_query.reset_mock()
+    before = get_trailing_peak_stats()
+    
+    for price in ('51000', '51200', '51100', '51500'):
+        assert buffer_trailing_peak(1, Decimal(price))
+    
+    mock_execute_query.assert_not_called()
+    assert get_latest_cycle(1).highest_trailing_price == Decimal('51500')
+    
+    mock_execute_query.return_value = 1
+    assert flush_trailing_peaks() == 1
+    
+    query, params = mock_execute_query.call_args[0]
+    assert 'highest_trailing_price < %s' in query
+    assert params == (Decimal('51500'), 1, Decimal('51500'))
+    after = get_trailing_peak_stats()
+    assert (after['recorded'] - before['recorded'], after['written'] - before['written']) == (4, 1)
+    assert after['pending'] == 0
+    assert flush_trailing_peaks() == 0
+
+
+@pytest.mark.unit
+@patch('models.cycle_data.execute_query')
+def test_status_change_carries_buffered_peak(mock_execute_query, sample_cycle_data, peak_write_behind):
+    """Test that the peak goes out with the next status change and survives a cache reload."""
+    mock_execute_query.return_value = dict(sample_cycle_data, status='trailing', highest_trailing_price=Decimal('50500'))
+    get_latest_cycle(1)
+    buffer_trailing_peak(1, Decimal('52000'))
+    
+    # A reload from the database (older peak) keeps the buffered one
+    invalidate_cycle_cache(1)
+    assert get_latest_cycle(1).highest_trailing_price == Decimal('52000')
+    
+    mock_execute_query.return_value = 1
+    assert update_cycle(1, {'status': 'selling', 'latest_order_id': 'sell1'})
+    
+    query, params = mock_execute_query.call_args[0]
+    assert 'highest_trailing_price = %s' in query and Decimal('52000') in params
+    assert get_trailing_peak_stats()['pending'] == 0
+
+
+@pytest.mark.unit
+@patch('models.cycle_data.execute_query')
+def test_failed_peak_flush_kept_for_retry(mock_execute_query, sample_cycle_data, peak_write_behind):
+    """Test that a peak whose write fails is retried on the next flush."""
+    mock_execute_query.return_value = dict(sample_cycle_data, status='trailing')
+    get_latest_cycle(1)
+    buffer_trailing_peak(1, Decimal('51000'))
+    
+    mock_execute_query.side_effect = Error("Lost connection")
+    with pytest.raises(Error):
+        flush_trailing_peaks()
+    assert get_trailing_peak_stats()['pending'] == 1
+    
+    mock_execute_query.side_effect = None
+    mock_execute_query.return_value = 1
+    assert flush_trailing_peaks() == 1
@@ -0,0 +1,295 @@
+"""
+Tests for the cycle event journal: batched writes, the update_cycle hooks
+and rebuilding a cycle from a snapshot plus later events.
+"""
+
+import asyncio
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import Mock, patch
+from mysql.connector import Error
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import main_app
+from models.cycle_data import (
+    DcaCycle, create_cycle, find_cached_cycle_by_order, get_latest_cycle, set_cycle_cache_enabled, update_cycle
+)
+from models.cycle_events import (
+    CycleEvent, apply_cycle_events, checkpoint_cycles, cycle_differences, rebuild_cycle
+)
+from utils.cycle_journal import (
+    CycleJournal, encode_values, get_cycle_journal, record_cycle_event, start_cycle_journal, stop_cycle_journal
+)
+
+CREATED_AT = datetime(2025, 6, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def journal():
+    """Journal whose writer only flushes when asked (or on close)."""
+    journal = CycleJournal(flush_seconds=3600)
+    yield journal
+    with patch('utils.cycle_journal.execute_query'):
+        journal.close()
+
+
+@pytest.fixture
+def running_journal():
+    """Process-wide journal for code that calls record_cycle_event()."""
+    with patch('utils.cycle_journal.execute_query'):
+        journal = start_cycle_journal(flush_seconds=3600)
+        yield journal
+        stop_cycle_journal()
+
+
+def cycle_row(**overrides):
+    """A dca_cycles row as returned by the database."""
+    row = {
+        'id': 7, 'asset_id': 1, 'status': 'watching', 'quantity': Decimal('0'),
+        'average_purchase_price': Decimal('0'), 'safety_orders': 0, 'latest_order_id': None,
+        'latest_order_created_at': None, 'last_order_fill_price': None, 'highest_trailing_price': None,
+        'completed_at': None, 'created_at': CREATED_AT, 'updated_at': CREATED_AT, 'sell_price': None,
+    }
+    row.update(overrides)
+    return row
+
+
+def stored_event(event_id, event_type, changes=None, details=None, seconds=0):
+    """A cycle_events row as returned by the database, JSON columns as text."""
+    return {
+        'id': event_id, 'cycle_id': 7, 'event_type': event_type,
+        'event_time': CREATED_AT + timedelta(seconds=seconds),
+        'changes': encode_values(changes), 'details': encode_values(details),
+    }
+
+
+class TestCycleJournal:
+    """Test buffering and batched inserts"""
+
+    @pytest.mark.unit
+    @patch('utils.cycle_journal.execute_query')
+    def test_flush_inserts_one_multi_row_statement(self, mock_execute_query, journal):
+        """Test that buffered events go out as one INSERT with exact values"""
+        placed_at = datetime(2025, 6, 1, 14, 0, 0, tzinfo=timezone(timedelta(hours=2)))
+        journal.record(7, 'order_placed', {'status': 'buying', 'latest_order_created_at': placed_at})
+        journal.record(7, 'fill', {'quantity': Decimal('0.100000000000001')})
+        journal.record(8, 'partial_fill', details={'order_id': 'abc', 'qty': '0.5'})
+
+        journal.flush()
+
+        mock_execute_query.assert_called_once()
+        query, params = mock_execute_query.call_args[0]
+        assert query.count('(%s, %s, %s, %s, %s)') == 3
+        assert mock_execute_query.call_args[1] == {'commit': True}
+        assert params[0:2] == [7, 'order_placed'] and isinstance(params[2], datetime)
+        assert json.loads(params[3]) == {'status': 'buying', 'latest_order_created_at': '2025-06-01T12:00:00'}
+        assert json.loads(params[8]) == {'quantity': '0.100000000000001'}
+        assert params[13] is None and json.loads(params[14]) == {'order_id': 'abc', 'qty': '0.5'}
+        assert journal.get_stats()['written'] == 3 and journal.get_stats()['pending'] == 0
+
+    @pytest.mark.unit
+    @patch('utils.cycle_journal.execute_query')
+    def test_failed_batch_retried_in_order(self, mock_execute_query, journal):
+        """Test that a failed insert keeps its rows ahead of newer events"""
+        journal.batch_size = 2
+        for index in range(3):
+            journal.record(index, 'update', {'safety_orders': index})
+        mock_execute_query.side_effect = [None, Error('server gone away')]
+
+        with pytest.raises(Error):
+            journal.flush()
+        assert journal.get_stats()['written'] == 2 and journal.get_stats()['pending'] == 1
+
+        mock_execute_query.side_effect = None
+        journal.record(3, 'update', {'safety_orders': 3})
+        journal.flush()
+
+        _, params = mock_execute_query.call_args[0]
+        assert [params[0], params[5]] == [2, 3]
+        assert journal.get_stats()['written'] == 4
+
+    @pytest.mark.unit
+    def test_full_buffer_drops_events(self, journal):
+        """Test the bound on buffered events"""
+        journal.max_pending = 2
+        for index in range(3):
+            journal.record(index, 'update', {'safety_orders': index})
+
+        assert journal.get_stats()['pending'] == 2 and journal.get_stats()['dropped'] == 1
+
+    @pytest.mark.unit
+    @patch('utils.cycle_journal.execute_query')
+    def test_record_is_noop_without_journal(self, mock_execute_query):
+        """Test that scripts and tests journal nothing unless started"""
+        assert get_cycle_journal() is None
+        record_cycle_event(7, 'update', {'status': 'watching'})
+        mock_execute_query.assert_not_called()
+
+
+class TestCycleDataHooks:
+    """Test that cycle writes are journaled"""
+
+    @pytest.mark.unit
+    @patch('models.cycle_data.execute_query')
+    def test_update_cycle_journals_changes(self, mock_execute_query, running_journal):
+        """Test explicit and default event names for updates"""
+        mock_execute_query.return_value = 1
+
+        update_cycle(7, {'highest_trailing_price': Decimal('101.5')}, event='ttp_peak')
+        update_cycle(7, {'status': 'watching'})
+        update_cycle(7, {'sell_price': Decimal('1')})
+
+        events = list(running_journal._pending)
+        assert [(event[1], event[2]) for event in events] == [(7, 'ttp_peak'), (7, 'status'), (7, 'update')]
+        assert events[0][3] == {'highest_trailing_price': Decimal('101.5')}
+
+    @pytest.mark.unit
+    @patch('models.cycle_data.execute_query')
+    def test_failed_update_not_journaled(self, mock_execute_query, running_journal):
+        """Test that an update touching no rows leaves no event"""
+        mock_execute_query.return_value = 0
+
+        assert not update_cycle(7, {'status': 'watching'})
+        assert running_journal.get_stats()['recorded'] == 0
+
+    @pytest.mark.unit
+    @patch('models.cycle_data.execute_query')
+    def test_create_cycle_journals_full_row(self, mock_execute_query, running_journal):
+        """Test that a new cycle starts its history with a snapshot"""
+        mock_execute_query.side_effect = [7, cycle_row(status='cooldown')]
+
+        create_cycle(asset_id=1, status='cooldown')
+
+        (_, cycle_id, event_type, changes, _), = running_journal._pending
+        assert (cycle_id, event_type) == (7, 'created')
+        assert changes['status'] == 'cooldown' and changes['created_at'] == CREATED_AT
+
+    @pytest.mark.unit
+    @patch('models.cycle_data.execute_query')
+    def test_find_cached_cycle_by_order(self, mock_execute_query):
+        """Test the memory-only lookup used for partial fills"""
+        mock_execute_query.return_value = cycle_row(status='buying', latest_order_id='order-1')
+        assert find_cached_cycle_by_order('order-1') is None
+
+        set_cycle_cache_enabled(True)
+        try:
+            get_latest_cycle(1)
+            assert find_cached_cycle_by_order('order-1').id == 7
+            assert find_cached_cycle_by_order('order-2') is None
+        finally:
+            set_cycle_cache_enabled(False)
+
+    @pytest.mark.unit
+    @patch('main_app.find_cached_cycle_by_order')
+    def test_partial_fill_journaled_with_details(self, mock_find, running_journal):
+        """Test that partial fills, which change no cycle columns, are journaled"""
+        mock_find.return_value = DcaCycle.from_dict(cycle_row(status='buying', latest_order_id='order-1'))
+        order = Mock(id='order-1', symbol='BTC/USD', side='buy', status='partially_filled',
+                     qty='1.0', filled_qty='0.4', filled_avg_price='100.5', limit_price='101')
+        trade_update = Mock(event='partial_fill', order=order, execution_id='exec-1', qty='0.4', price='100.5')
+
+        asyncio.run(main_app.on_trade_update(trade_update))
+
+        (_, cycle_id, event_type, changes, details), = running_journal._pending
+        assert (cycle_id, event_type, changes) == (7, 'partial_fill', None)
+        assert details['order_id'] == 'order-1' and details['filled_qty'] == '0.4'
+
+
+class TestReplay:
+    """Test rebuilding cycle state from the journal"""
+
+    @pytest.mark.unit
+    def test_snapshot_plus_events_rebuilds_cycle(self):
+        """Test a full lifecycle round-tripped through the JSON columns"""
+        placed_at = datetime(2025, 6, 1, 12, 1, 0)
+        rows = [
+            stored_event(1, 'created', cycle_row()),
+            stored_event(2, 'order_placed', {'status': 'buying', 'latest_order_id': 'o1',
+                                             'latest_order_created_at': placed_at}, seconds=60),
+            stored_event(3, 'partial_fill', details={'qty': '0.05'}, seconds=61),
+            stored_event(4, 'fill', {'status': 'watching', 'latest_order_id': None, 'quantity': Decimal('0.1'),
+                                     'average_purchase_price': Decimal('100.25')}, seconds=62),
+            stored_event(5, 'ttp_activate', {'status': 'trailing', 'highest_trailing_price': Decimal('103')},
+                         seconds=90),
+        ]
+
+        cycle = apply_cycle_events([CycleEvent.from_dict(row) for row in rows])
+
+        assert cycle == DcaCycle.from_dict(cycle_row(
+            status='trailing', quantity=Decimal('0.1'), average_purchase_price=Decimal('100.25'),
+            latest_order_created_at=placed_at, highest_trailing_price=Decimal('103'),
+            updated_at=CREATED_AT + timedelta(seconds=90)))
+
+    @pytest.mark.unit
+    def test_later_snapshot_replaces_state_and_earlier_events_skipped(self):
+        """Test that replay starts from the latest snapshot"""
+        events = [CycleEvent.from_dict(row) for row in [
+            stored_event(1, 'update', {'safety_orders': 9}),
+            stored_event(2, 'snapshot', cycle_row(safety_orders=2)),
+            stored_event(3, 'update', {'safety_orders': 3}),
+        ]]
+
+        assert apply_cycle_events(events[:1]) is None
+        assert apply_cycle_events(events).safety_orders == 3
+
+    @pytest.mark.unit
+    @patch('models.cycle_events.execute_query')
+    def test_rebuild_reads_only_from_latest_snapshot(self, mock_execute_query):
+        """Test the replay query and a comparison with the table row"""
+        mock_execute_query.return_value = [
+            stored_event(10, 'snapshot', cycle_row(status='watching', quantity=Decimal('0.1'))),
+            stored_event(11, 'ttp_peak', {'highest_trailing_price': Decimal('105')}),
+        ]
+
+        cycle = rebuild_cycle(7)
+
+        query, params = mock_execute_query.call_args[0]
+        assert "event_type IN ('created', 'snapshot')" in query and params == (7, 7)
+        table = DcaCycle.from_dict(cycle_row(quantity=Decimal('0.1'), highest_trailing_price=Decimal('104')))
+        assert cycle_differences(cycle, table) == ['highest_trailing_price: journal=105.0000000000 table=104']
+
+    @pytest.mark.unit
+    def test_rebuilt_values_rounded_like_table_columns(self):
+        """Test that unrounded fill values and microseconds do not show up as differences"""
+        placed_at = datetime(2025, 6, 1, 12, 1, 0, 734512)
+        average = Decimal('19800') / Decimal('199')  # 99.49748743718617964192823426
+        events = [CycleEvent.from_dict(row) for row in [
+            stored_event(1, 'created', cycle_row()),
+            stored_event(2, 'order_placed', {'status': 'buying', 'latest_order_id': 'o1',
+                                             'latest_order_created_at': placed_at}, seconds=60),
+            stored_event(3, 'fill', {'status': 'watching', 'latest_order_id': None,
+                                     'quantity': Decimal('0.1989999999999999991'),
+                                     'average_purchase_price': average,
+                                     'last_order_fill_price': Decimal('99.497487437186')}, seconds=61),
+        ]]
+
+        cycle = apply_cycle_events(events)
+
+        table = DcaCycle.from_dict(cycle_row(
+            status='watching', quantity=Decimal('0.199000000000000'),
+            average_purchase_price=Decimal('99.4974874372'), latest_order_created_at=datetime(2025, 6, 1, 12, 1, 1),
+            last_order_fill_price=Decimal('99.4974874372')))
+        assert cycle.average_purchase_price == Decimal('99.4974874372')
+        assert cycle.latest_order_created_at == datetime(2025, 6, 1, 12, 1, 1)
+        assert cycle_differences(cycle, table) == []
+
+    @pytest.mark.unit
+    @patch('models.cycle_events.execute_query')
+    def test_checkpoint_snapshots_latest_cycles(self, mock_execute_query):
+        """Test startup snapshots, and that nothing is read while the journal is stopped"""
+        mock_execute_query.return_value = [cycle_row(), cycle_row(id=8, asset_id=2)]
+        assert checkpoint_cycles() == 0
+        mock_execute_query.assert_not_called()
+
+        with patch('utils.cycle_journal.execute_query'):
+            journal = start_cycle_journal(flush_seconds=3600)
+            try:
+                assert checkpoint_cycles() == 2
+                assert [(event[1], event[2]) for event in journal._pending] == [(7, 'snapshot'), (8, 'snapshot')]
+            finally:
+                stop_cycle_journal()
@@ -8,7 +8,12 @@ import pytest
 from unittest.mock import patch, MagicMock
 from mysql.connector import Error
 
-from utils.db_utils import get_db_connection, execute_query, check_connection
+from mysql.connector import errors
+
+from utils.db_utils import (
+    get_db_connection, execute_query, check_connection,
+    ConnectionPool, init_connection_pool, close_connection_pool, get_pool_stats
+)
 
 # Configure logging for tests
 logging.basicConfig(level=logging.DEBUG)
@@ -159,4 +164,134 @@ def test_connection_test_failure(mock_get_connection):
     
     result = check_connection()
     
-    assert result == False 
\ No newline at end of file
+    assert result == False
+
+
+def make_pooled_connection(rows=None):
+    """Create a mock connection whose cursor returns the given rows."""
+    connection = MagicMock()
+    connection.is_connected.return_value = True
+    cursor = MagicMock()
+    cursor.fetchall.return_value = rows or []
+    connection.cursor.return_value = cursor
+    return connection
+
+
+@pytest.fixture
+def pool():
+    """Install a connection pool for execute_query and remove it afterwards."""
+    yield init_connection_pool(pool_size=2, pre_ping_idle_seconds=60, checkout_timeout_seconds=0.05)
+    close_connection_pool()
+
+
+@pytest.mark.unit
+@patch('utils.db_utils.get_db_connection')
+def test_pooled_execute_query_reuses_connection(mock_get_connection, pool):
+    """Test that consecutive queries share one pooled connection."""
+    connection = make_pooled_connection(rows=[{'id': 1}])
+    mock_get_connection.return_value = connection
+    
+    assert execute_query("SELECT 1", fetch_all=True) == [{'id': 1}]
+    assert execute_query("SELECT 1", fetch_all=True) == [{'id': 1}]
+    
+    mock_get_connection.assert_called_once()
+    connection.close.assert_not_called()
+    assert connection.autocommit is True
+    
+    stats = get_pool_stats()
+    assert stats['checkouts'] == 2
+    assert stats['created'] == 1
+    assert stats['idle'] == 1
+
+
+@pytest.mark.unit
+@patch('utils.db_utils.get_db_connection')
+def test_pooled_connection_discarded_after_error(mock_get_connection, pool):
+    """Test that a connection is closed rather than reused after a query error."""
+    bad = make_pooled_connection()
+    bad.cursor.return_value.execute.side_effect = Error("Query failed")
+    good = make_pooled_connection(rows=[{'id': 2}])
+    mock_get_connection.side_effect = [bad, good]
+    
+    with pytest.raises(Error):
+        execute_query("SELECT * FROM test", fetch_all=True)
+    bad.rollback.assert_called_once()
+    bad.close.assert_called_once()
+    
+    assert execute_query("SELECT * FROM test", fetch_all=True) == [{'id': 2}]
+    stats = get_pool_stats()
+    assert stats['discarded'] == 1
+    assert stats['open'] == 1
+
+
+@pytest.mark.unit
+@patch('utils.db_utils.get_db_connection')
+def test_pooled_read_retried_when_connection_lost(mock_get_connection, pool):
+    """Test that a read is retried once on a new connection after a lost connection."""
+    dead = make_pooled_connection()
+    dead.cursor.return_value.execute.side_effect = errors.OperationalError(msg="gone away", errno=2006)
+    fresh = make_pooled_connection(rows=[{'id': 3}])
+    mock_get_connection.side_effect = [dead, fresh]
+    
+    assert execute_query("SELECT * FROM test", fetch_all=True) == [{'id': 3}]
+    assert mock_get_connection.call_count == 2
+
+
+@pytest.mark.unit
+@patch('utils.db_utils.get_db_connection')
+def test_pooled_write_not_retried_when_connection_lost(mock_get_connection, pool):
+    """Test that writes are never replayed after a lost connection."""
+    dead = make_pooled_connection()
+    dead.cursor.return_value.execute.side_effect = errors.OperationalError(msg="lost", errno=2013)
+    mock_get_connection.return_value = dead
+    
+    with pytest.raises(Error):
+        execute_query("UPDATE test SET x = 1", commit=True)
+    mock_get_connection.assert_called_once()
+
+
+@pytest.mark.unit
+@patch('utils.db_utils.get_db_connection')
+def test_pool_replaces_connection_failing_pre_ping(mock_get_connection):
+    """Test that an idle connection that fails its ping is replaced."""
+    stale = make_pooled_connection()
+    stale.ping.side_effect = errors.InterfaceError("ping failed")
+    fresh = make_pooled_connection()
+    mock_get_connection.side_effect = [stale, fresh]
+    
+    test_pool = ConnectionPool(pool_size=1, pre_ping_idle_seconds=0)
+    test_pool.release(test_pool.acquire())
+    
+    assert test_pool.acquire() is fresh
+    stale.close.assert_called_once()
+    assert test_pool.get_stats()['ping_failures'] == 1
+
+
+@pytest.mark.unit
+@patch('utils.db_utils.get_db_connection')
+def test_pool_recycles_connection_past_max_lifetime(mock_get_connection):
+    """Test that connections older than max lifetime are closed on checkout."""
+    old = make_pooled_connection()
+    new = make_pooled_connection()
+    mock_get_connection.side_effect = [old, new]
+    
+    test_pool = ConnectionPool(pool_size=1, max_lifetime_seconds=0.001)
+    test_pool.release(test_pool.acquire())
+    
+    with patch('utils.db_utils.time.monotonic', return_value=1e12):
+        assert test_pool.acquire() is new
+    old.close.assert_called_once()
+    assert test_pool.get_stats()['expired'] == 1
+
+
+@pytest.mark.unit
+@patch('utils.db_utils.get_db_connection')
+def test_pool_checkout_times_out_when_exhausted(mock_get_connection):
+    """Test that checkout fails with PoolError once all connections are in use."""
+    mock_get_connection.side_effect = lambda: make_pooled_connection()
+    test_pool = ConnectionPool(pool_size=1, checkout_timeout_seconds=0.01)
+    test_pool.acquire()
+    
+    with pytest.raises(errors.PoolError):
+        test_pool.acquire()
+    assert test_pool.get_stats()['timeouts'] == 1
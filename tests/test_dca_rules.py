@@ -0,0 +1,109 @@
+"""
+Tests for the DCA decision rules shared by main_app, the trigger index and the backtester.
+"""
+
+import functools
+import pytest
+from decimal import Decimal
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.dca_rules import (
+    decide_quote_action, safety_trigger_price, take_profit_trigger_price, ttp_sell_trigger_price
+)
+
+
+@pytest.fixture
+def make_asset(make_asset):
+    """Assets with 1% safety deviation, 2% take-profit and TTP at 1%."""
+    return functools.partial(make_asset, safety_order_deviation=Decimal('1.0'), take_profit_percent=Decimal('2.0'),
+                             ttp_enabled=True, ttp_deviation_percent=Decimal('1.0'))
+
+
+class TestTriggerPrices:
+    """Test the safety, take-profit and TTP sell trigger prices"""
+
+    @pytest.mark.unit
+    def test_trigger_prices(self, make_asset, make_cycle):
+        """Test each trigger price against its formula"""
+        asset = make_asset()
+
+        assert safety_trigger_price(asset, make_cycle()) == Decimal('99')
+        assert take_profit_trigger_price(asset, make_cycle()) == Decimal('102')
+        assert ttp_sell_trigger_price(asset, Decimal('110')) == Decimal('108.9')
+
+    @pytest.mark.unit
+    def test_missing_inputs(self, make_asset, make_cycle):
+        """Test that a trigger without the values it needs is None"""
+        asset = make_asset(ttp_deviation_percent=None)
+
+        assert safety_trigger_price(asset, make_cycle(last_order_fill_price=None)) is None
+        assert safety_trigger_price(asset, make_cycle(safety_orders=3)) is None
+        assert take_profit_trigger_price(asset, make_cycle(average_purchase_price=Decimal('0'))) is None
+        assert ttp_sell_trigger_price(asset, Decimal('110')) is None
+
+
+class TestDecideQuoteAction:
+    """Test the action a quote triggers for each cycle state"""
+
+    @pytest.mark.unit
+    def test_base_and_safety(self, make_asset, make_cycle):
+        """Test base order on an empty cycle and safety order at the deviation"""
+        asset = make_asset()
+        empty = make_cycle(quantity=Decimal('0'), average_purchase_price=Decimal('0'), last_order_fill_price=None)
+
+        assert decide_quote_action(asset, empty, 100.0, 100.0) == 'base'
+        assert decide_quote_action(asset, make_cycle(status='cooldown'), 100.0, 100.0) is None
+        assert decide_quote_action(asset, make_cycle(status='buying'), 90.0, 90.0) is None
+        assert decide_quote_action(asset, make_cycle(), 99.5, 99.5) is None
+        assert decide_quote_action(asset, make_cycle(), 99.0, 99.0) == 'safety'
+        assert decide_quote_action(asset, make_cycle(safety_orders=3), 99.0, 99.0) is None
+
+    @pytest.mark.unit
+    def test_take_profit_and_ttp(self, make_asset, make_cycle):
+        """Test standard take-profit and the TTP activate/peak/sell sequence"""
+        standard = make_asset(ttp_enabled=False)
+        ttp = make_asset()
+
+        assert decide_quote_action(standard, make_cycle(), 101.9, 102.0) is None
+        assert decide_quote_action(standard, make_cycle(), 102.0, 102.1) == 'take_profit'
+        assert decide_quote_action(ttp, make_cycle(), 102.0, 102.1) == 'ttp_activate'
+
+        trailing = make_cycle(status='trailing', highest_trailing_price=Decimal('110'))
+        assert decide_quote_action(ttp, trailing, 110.5, 110.6) == 'ttp_peak'
+        assert decide_quote_action(ttp, trailing, 109.0, 109.1) is None
+        assert decide_quote_action(ttp, trailing, 108.8, 108.9) == 'ttp_sell'
+        assert decide_quote_action(standard, trailing, 102.0, 102.1) == 'take_profit'
+
+    @pytest.mark.unit
+    def test_safety_trigger_blocks_take_profit(self, make_asset, make_cycle):
+        """Test that a quote at the safety trigger never sells, even when no safety order can be placed"""
+        asset = make_asset(ttp_enabled=False, take_profit_percent=Decimal('0'))
+        trailing = make_cycle(status='trailing', highest_trailing_price=Decimal('110'))
+
+        assert decide_quote_action(asset, make_cycle(), 98.0, 98.0) == 'safety'
+        assert decide_quote_action(asset, trailing, 98.0, 98.0) is None
+        assert decide_quote_action(make_asset(safety_order_amount=Decimal('0')), make_cycle(), 98.0, 98.0) is None
+
+    @pytest.mark.unit
+    def test_invalid_quotes(self, make_asset, make_cycle):
+        """Test that missing or non-positive prices trigger nothing"""
+        asset = make_asset(ttp_enabled=False)
+        empty = make_cycle(quantity=Decimal('0'), average_purchase_price=Decimal('0'), last_order_fill_price=None)
+
+        assert decide_quote_action(asset, empty, 0.0, 100.0) is None
+        assert decide_quote_action(asset, empty, 100.0, None) is None
+        assert decide_quote_action(asset, make_cycle(), 47950.0, 0.0) is None
+        assert decide_quote_action(asset, make_cycle(), 103.0, None) is None
+        assert decide_quote_action(asset, make_cycle(), None, 103.0) is None
+
+    @pytest.mark.unit
+    def test_ttp_without_deviation_never_sells(self, make_asset, make_cycle):
+        """Test that a trailing cycle with no TTP deviation only tracks peaks"""
+        asset = make_asset(ttp_deviation_percent=None)
+        trailing = make_cycle(status='trailing', highest_trailing_price=Decimal('110'))
+
+        assert decide_quote_action(asset, trailing, 111.0, 111.1) == 'ttp_peak'
+        assert decide_quote_action(asset, trailing, 100.0, 100.1) is None
@@ -0,0 +1,162 @@
+"""
+Tests for the background Discord notification dispatcher.
+"""
+
+import pytest
+import threading
+from unittest.mock import Mock, patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from discord_webhook import DiscordEmbed, DiscordWebhook
+
+from utils.discord_notifications import DiscordDispatcher, DiscordRateLimiter, send_discord_notification
+
+
+def make_response(status_code=200, headers=None, body=None):
+    """Create a mock webhook HTTP response."""
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.text = ''
+    response.json.return_value = body or {}
+    return response
+
+
+@pytest.fixture
+def webhook_calls():
+    """Patch webhook posting and the shared rate limiter, recording each call's payload."""
+    calls = []
+    responses = []
+
+    def post(webhook):
+        calls.append({'content': webhook.content, 'embeds': list(webhook.embeds)})
+        return responses.pop(0) if responses else make_response(200)
+
+    mock_config = Mock()
+    mock_config.discord_notifications_enabled = True
+    mock_config.discord_webhook_url = 'https://discord.example/webhook'
+    mock_config.discord_user_id = '1234'
+
+    with patch.object(DiscordWebhook, 'api_post_request', autospec=True, side_effect=post), \
+         patch('utils.discord_notifications.config', mock_config), \
+         patch('utils.discord_notifications._discord_rate_limiter', DiscordRateLimiter(1000)), \
+         patch('utils.discord_notifications.time.sleep'):
+        yield calls, responses
+
+
+def make_embed(title='Order'):
+    """Create a small embed."""
+    return DiscordEmbed(title=title, description='BTC/USD')
+
+
+class TestDiscordDispatcher:
+    """Test batching, retries and queue bounds"""
+
+    @pytest.mark.unit
+    def test_notifications_are_batched_up_to_ten_embeds(self, webhook_calls):
+        """Test that queued notifications share webhook calls of at most 10 embeds"""
+        calls, _ = webhook_calls
+        dispatcher = DiscordDispatcher(batch_window_seconds=0)
+        for i in range(12):
+            assert dispatcher.submit(embeds=[make_embed(f"Order {i}")])
+
+        dispatcher.start()
+        assert dispatcher.stop(timeout_seconds=5) == 0
+
+        assert [len(call['embeds']) for call in calls] == [10, 2]
+        stats = dispatcher.get_stats()
+        assert stats['sent'] == 12
+        assert stats['webhook_calls'] == 2
+
+    @pytest.mark.unit
+    def test_mention_added_once_per_batch(self, webhook_calls):
+        """Test that a batch mentions the user once if any notification asked for it"""
+        calls, _ = webhook_calls
+        dispatcher = DiscordDispatcher(batch_window_seconds=0)
+        dispatcher.submit(embeds=[make_embed()])
+        dispatcher.submit(embeds=[make_embed()], mention_user=True)
+
+        dispatcher.start()
+        dispatcher.stop(timeout_seconds=5)
+
+        assert len(calls) == 1
+        assert calls[0]['content'] == '<@1234>'
+
+    @pytest.mark.unit
+    def test_rate_limited_batch_is_retried(self, webhook_calls):
+        """Test that a 429 waits for Retry-After and resends the same batch"""
+        calls, responses = webhook_calls
+        responses.append(make_response(429, headers={'Retry-After': '0.01'}))
+        dispatcher = DiscordDispatcher(batch_window_seconds=0)
+        dispatcher.submit(embeds=[make_embed()])
+
+        dispatcher.start()
+        dispatcher.stop(timeout_seconds=5)
+
+        assert len(calls) == 2
+        stats = dispatcher.get_stats()
+        assert stats['rate_limited'] == 1
+        assert stats['sent'] == 1
+
+    @pytest.mark.unit
+    def test_rate_limited_critical_batch_skips_local_limiter(self, webhook_calls):
+        """Test that a critical batch retried after a 429 is not held by an exhausted local limiter"""
+        calls, responses = webhook_calls
+        responses.append(make_response(429, headers={'Retry-After': '0.01'}))
+        dispatcher = DiscordDispatcher(batch_window_seconds=0)
+        dispatcher.submit(embeds=[make_embed('Critical')], bypass_rate_limit=True)
+
+        with patch('utils.discord_notifications._discord_rate_limiter', DiscordRateLimiter(0)):
+            dispatcher.start()
+            # time.sleep is patched, so poll with an Event; stop() would release a held batch
+            poll = threading.Event()
+            for _ in range(200):
+                if len(calls) == 2:
+                    break
+                poll.wait(0.01)
+            sent_before_stop = len(calls)
+            dispatcher.stop(timeout_seconds=5)
+
+        assert sent_before_stop == 2
+        assert dispatcher.get_stats()['sent'] == 1
+
+    @pytest.mark.unit
+    def test_server_errors_exhaust_retries(self, webhook_calls):
+        """Test that a batch is dropped after max_retries transient failures"""
+        calls, responses = webhook_calls
+        responses.extend(make_response(502) for _ in range(3))
+        dispatcher = DiscordDispatcher(batch_window_seconds=0, max_retries=2)
+        dispatcher.submit(embeds=[make_embed()])
+
+        dispatcher.start()
+        dispatcher.stop(timeout_seconds=5)
+
+        assert len(calls) == 3
+        stats = dispatcher.get_stats()
+        assert stats['failed'] == 1
+        assert stats['retries'] == 2
+
+    @pytest.mark.unit
+    def test_full_queue_drops_without_blocking(self):
+        """Test that submit() returns False instead of waiting when the queue is full"""
+        dispatcher = DiscordDispatcher(queue_size=1)
+
+        assert dispatcher.submit(embeds=[make_embed()])
+        assert not dispatcher.submit(embeds=[make_embed()])
+        assert dispatcher.get_stats()['dropped'] == 1
+
+    @pytest.mark.unit
+    def test_send_notification_queues_when_dispatcher_running(self, webhook_calls):
+        """Test that send_discord_notification hands off to the running dispatcher"""
+        calls, _ = webhook_calls
+        dispatcher = Mock()
+        dispatcher.submit.return_value = True
+
+        with patch('utils.discord_notifications._discord_dispatcher', dispatcher):
+            assert send_discord_notification(embeds=[make_embed()], mention_user=True)
+
+        dispatcher.submit.assert_called_once()
+        assert calls == []
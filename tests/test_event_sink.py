@@ -0,0 +1,143 @@
+"""
+Tests for the JSON-lines lifecycle event sink.
+"""
+
+import json
+import pytest
+import threading
+import time
+from decimal import Decimal
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils import event_sink
+from utils.event_sink import EventSink, configure_event_sink, close_event_sink, record_event
+from utils.logging_config import log_asset_lifecycle_event
+
+
+def read_events(path):
+    """Load every event from a JSON-lines file."""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll until the writer thread has caught up."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out waiting for the event sink writer'
+        time.sleep(0.01)
+
+
+class TestEventSink:
+    """Test event encoding, ordering and rotation"""
+
+    @pytest.mark.unit
+    def test_events_written_as_json_lines(self, tmp_path):
+        """Test that events are written in order with Decimals as strings"""
+        path = tmp_path / 'events.jsonl'
+        sink = EventSink(path)
+        sink.record('order_placed', 'BTC/USD', order_id='abc', qty=Decimal('0.001'))
+        sink.record('cycle_status', cycle_id=7, status='buying')
+        sink.close()
+
+        events = read_events(path)
+        assert [e['event'] for e in events] == ['order_placed', 'cycle_status']
+        assert [e['seq'] for e in events] == [1, 2]
+        assert events[0]['symbol'] == 'BTC/USD'
+        assert events[0]['qty'] == '0.001'
+        assert events[1]['symbol'] is None
+
+    @pytest.mark.unit
+    def test_rotation_keeps_backups(self, tmp_path):
+        """Test that a full file is rotated and old backups are discarded"""
+        path = tmp_path / 'events.jsonl'
+        sink = EventSink(path, max_bytes=200, backup_count=2)
+        for i in range(20):
+            sink.record('order_fill', 'BTC/USD', order_id=f"order-{i}")
+        sink.close()
+
+        assert (tmp_path / 'events.jsonl.1').exists()
+        assert (tmp_path / 'events.jsonl.2').exists()
+        assert not (tmp_path / 'events.jsonl.3').exists()
+        assert os.path.getsize(path) <= 200
+        # The newest event is in the live file
+        assert read_events(path)[-1]['order_id'] == 'order-19'
+        assert sink.get_stats()['rotations'] > 2
+
+    @pytest.mark.unit
+    def test_write_errors_do_not_stop_writer(self, tmp_path, monkeypatch):
+        """Test that a failed reopen after rotation is counted and later events still written"""
+        path = tmp_path / 'events.jsonl'
+        sink = EventSink(path, max_bytes=100)
+        sink.record('order_placed', 'BTC/USD', order_id='first')
+        wait_for(lambda: sink.get_stats()['written'] == 1)
+
+        failures = []
+
+        def open_once_failing(*args, **kwargs):
+            if not failures:
+                failures.append(args[0])
+                raise OSError('disk full')
+            return open(*args, **kwargs)
+
+        monkeypatch.setattr(event_sink, 'open', open_once_failing, raising=False)
+        sink.record('order_fill', 'BTC/USD', order_id='lost-in-rotation')
+        wait_for(lambda: sink.get_stats()['errors'] == 1)
+        sink.record('order_fill', 'BTC/USD', order_id='after')
+        sink.close()
+
+        assert [e['order_id'] for e in read_events(path)] == ['after']
+        assert sink.get_stats()['errors'] == 1
+
+    @pytest.mark.unit
+    def test_full_queue_drops_events(self, tmp_path, monkeypatch):
+        """Test that events are dropped and counted while the writer is behind"""
+        path = tmp_path / 'events.jsonl'
+        sink = EventSink(path, max_pending=2)
+        gate = threading.Event()
+        write = sink._write
+        monkeypatch.setattr(sink, '_write', lambda event: gate.wait(5) and write(event))
+
+        sink.record('order_placed', order_id='1')
+        wait_for(lambda: sink._queue.empty())  # The writer holds the first event
+        for i in range(2, 6):
+            sink.record('order_placed', order_id=str(i))
+        gate.set()
+        sink.close()
+
+        assert [e['order_id'] for e in read_events(path)] == ['1', '2', '3']
+        assert sink.get_stats()['dropped'] == 2
+
+    @pytest.mark.unit
+    def test_record_event_without_sink_is_noop(self, tmp_path):
+        """Test that module-level recording only writes while a sink is configured"""
+        record_event('order_placed', 'BTC/USD')  # No sink configured
+
+        path = tmp_path / 'events.jsonl'
+        configure_event_sink(path)
+        try:
+            record_event('order_placed', 'BTC/USD', order_id='abc')
+        finally:
+            close_event_sink()
+        record_event('order_placed', 'ETH/USD')
+
+        assert event_sink.get_event_sink() is None
+        assert [e['symbol'] for e in read_events(path)] == ['BTC/USD']
+
+    @pytest.mark.unit
+    def test_lifecycle_event_details_kept_in_one_field(self, tmp_path):
+        """Test that detail keys cannot clash with the symbol or the event envelope"""
+        path = tmp_path / 'events.jsonl'
+        configure_event_sink(path)
+        try:
+            log_asset_lifecycle_event('BTC/USD', 'BASE_ORDER',
+                                      {'symbol': 'ETH/USD', 'seq': 99, 'event': 'x', 'qty': Decimal('0.5')})
+        finally:
+            close_event_sink()
+
+        event, = read_events(path)
+        assert (event['event'], event['symbol'], event['seq']) == ('base_order', 'BTC/USD', 1)
+        assert event['details'] == {'symbol': 'ETH/USD', 'seq': 99, 'event': 'x', 'qty': '0.5'}
@@ -0,0 +1,120 @@
+"""
+Tests for per-stage latency histograms.
+"""
+
+import contextvars
+import pytest
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.latency import (
+    LatencyHistogram, LatencyTracker, current_symbol, quote_received_at,
+    _bucket_index, _bucket_upper_bound
+)
+
+
+@pytest.fixture
+def tracker():
+    """An enabled tracker."""
+    tracker = LatencyTracker()
+    tracker.set_enabled(True)
+    return tracker
+
+
+class TestLatencyHistogram:
+    """Test bucket precision and percentiles"""
+
+    @pytest.mark.unit
+    def test_bucket_precision(self):
+        """Test that every value falls in a bucket at most ~6% wider than itself"""
+        for value_us in [0, 1, 31, 32, 33, 100, 1000, 12345, 1_000_000, 3_600_000_000]:
+            upper = _bucket_upper_bound(_bucket_index(value_us))
+            assert upper >= value_us
+            assert upper - value_us <= max(1, value_us * 0.0625)
+
+    @pytest.mark.unit
+    def test_percentiles(self):
+        """Test percentiles of 1..100 ms within bucket precision"""
+        histogram = LatencyHistogram()
+        for ms in range(1, 101):
+            histogram.record(ms / 1000.0)
+
+        summary = histogram.summary()
+        assert summary['count'] == 100
+        assert summary['min_ms'] == 1.0
+        assert summary['max_ms'] == 100.0
+        assert summary['mean_ms'] == pytest.approx(50.5)
+        assert summary['p50_ms'] == pytest.approx(50, rel=0.04)
+        assert summary['p99_ms'] == pytest.approx(99, rel=0.04)
+
+    @pytest.mark.unit
+    def test_merge(self):
+        """Test that merged histograms combine counts and extremes"""
+        a, b = LatencyHistogram(), LatencyHistogram()
+        a.record(0.002)
+        b.record(0.010)
+        a.merge(b)
+
+        assert a.count == 2
+        assert a.summary()['min_ms'] == 2.0
+        assert a.summary()['max_ms'] == 10.0
+
+
+class TestLatencyTracker:
+    """Test stage/symbol attribution and the disabled no-op"""
+
+    @pytest.mark.unit
+    def test_disabled_records_nothing(self):
+        """Test that a disabled tracker ignores every call"""
+        tracker = LatencyTracker()
+        tracker.record('db_read', 0.01, 'BTC/USD')
+        with tracker.timer('db_write'):
+            pass
+        tracker.mark_order_submitted('abc', 'BTC/USD')
+        tracker.record_order_filled('abc')
+
+        assert tracker.snapshot() == {}
+
+    @pytest.mark.unit
+    def test_symbol_from_context(self, tracker):
+        """Test that timings without a symbol are charged to the context symbol"""
+        def handle_quote():
+            current_symbol.set('ETH/USD')
+            with tracker.timer('db_read'):
+                pass
+
+        contextvars.copy_context().run(handle_quote)
+        tracker.record('db_read', 0.001)
+
+        symbols = tracker.snapshot()['db_read']['symbols']
+        assert set(symbols) == {'ETH/USD', '-'}
+        assert tracker.snapshot()['db_read']['all']['count'] == 2
+
+    @pytest.mark.unit
+    def test_quote_to_order_and_order_to_fill(self, tracker):
+        """Test the end-to-end stages measured from the quote and the order"""
+        with patch('utils.latency.time.perf_counter', side_effect=[10.25, 10.25, 12.0]):
+            def place_order():
+                quote_received_at.set(10.0)
+                tracker.record_since_quote('quote_to_order', 'BTC/USD')
+                tracker.mark_order_submitted('order-1', 'BTC/USD')
+
+            contextvars.copy_context().run(place_order)
+            tracker.record_order_filled('order-1')
+            tracker.record_order_filled('unknown-order')
+
+        snapshot = tracker.snapshot()
+        assert snapshot['quote_to_order']['symbols']['BTC/USD']['max_ms'] == 250.0
+        assert snapshot['order_to_fill']['symbols']['BTC/USD']['max_ms'] == 1750.0
+        assert snapshot['order_to_fill']['all']['count'] == 1
+
+    @pytest.mark.unit
+    def test_log_summary_reset(self, tracker):
+        """Test that a resetting summary starts a new interval"""
+        tracker.record('rest_buy', 0.2, 'BTC/USD')
+        tracker.log_summary(reset=True)
+
+        assert tracker.snapshot() == {}
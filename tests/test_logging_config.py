@@ -0,0 +1,106 @@
+"""
+Tests for queued logging and cached asset logger adapters.
+"""
+
+import logging
+import logging.handlers
+import threading
+import pytest
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logging_config import (
+    enable_queued_logging, stop_queued_logging, is_queued_logging_enabled, get_asset_logger
+)
+
+
+class RecordingHandler(logging.Handler):
+    """Handler that records each message and the thread that handled it."""
+
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.messages = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+        self.threads.add(threading.current_thread().name)
+
+
+@pytest.fixture
+def isolated_logger():
+    """A non-propagating logger with one recording handler."""
+    logger = logging.getLogger('tests.queued_logging')
+    logger.handlers.clear()
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    handler = RecordingHandler(level=logging.INFO)
+    logger.addHandler(handler)
+    yield logger, handler
+    stop_queued_logging()
+    logger.handlers.clear()
+
+
+class TestQueuedLogging:
+    """Test the QueueHandler/QueueListener logging mode"""
+
+    @pytest.mark.unit
+    def test_records_written_by_listener_thread(self, isolated_logger):
+        """Test that handlers run off the calling thread and keep their levels"""
+        logger, handler = isolated_logger
+
+        assert enable_queued_logging(logger)
+        assert is_queued_logging_enabled()
+        assert [type(h) for h in logger.handlers] == [logging.handlers.QueueHandler]
+
+        logger.debug("filtered by handler level")
+        logger.info("order %s placed", "abc")
+        stop_queued_logging()
+
+        assert handler.messages == ["order abc placed"]
+        assert threading.current_thread().name not in handler.threads
+
+    @pytest.mark.unit
+    def test_stop_restores_handlers(self, isolated_logger):
+        """Test that stopping puts the original handlers back"""
+        logger, handler = isolated_logger
+
+        handlers = list(logger.handlers)
+        enable_queued_logging(logger)
+        stop_queued_logging()
+
+        assert logger.handlers == handlers
+        assert not is_queued_logging_enabled()
+        logger.info("direct")
+        assert handler.messages == ["direct"]
+
+    @pytest.mark.unit
+    def test_enable_twice_is_noop(self, isolated_logger):
+        """Test that a second enable does not wrap the queue handler again"""
+        logger, _ = isolated_logger
+
+        assert enable_queued_logging(logger)
+        assert not enable_queued_logging(logger)
+        assert len(logger.handlers) == 1
+
+
+class TestAssetLoggerCache:
+    """Test cached AssetContextAdapter instances"""
+
+    @pytest.mark.unit
+    def test_adapter_is_reused(self):
+        """Test that repeated lookups return the same adapter"""
+        logger = logging.getLogger('tests.asset_cache')
+
+        assert get_asset_logger('BTC/USD', logger) is get_asset_logger('BTC/USD', logger)
+        assert get_asset_logger('BTC/USD', logger) is not get_asset_logger('ETH/USD', logger)
+
+    @pytest.mark.unit
+    def test_default_logger_is_callers_module(self):
+        """Test that the adapter wraps the calling module's logger"""
+        adapter = get_asset_logger('BTC/USD')
+
+        assert adapter.logger.name == __name__
+        assert adapter.asset_symbol == 'BTC/USD'
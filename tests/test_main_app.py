@@ -11,6 +11,7 @@ import logging
 import os
 from unittest.mock import patch, MagicMock, PropertyMock, PropertyMock, PropertyMock
 from datetime import datetime
+from decimal import Decimal
 
 # Import the functions we want to test
 import sys
@@ -18,11 +19,15 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from main_app import (
     validate_environment,
+    evaluate_quote,
     on_crypto_quote,
     on_crypto_trade,
     on_crypto_bar,
-    on_trade_update
+    on_trade_update,
+    get_alpaca_position_by_symbol
 )
+import main_app
+from utils.position_book import PositionBook
 
 # Configure logging for tests
 logging.basicConfig(level=logging.DEBUG)
@@ -94,8 +99,8 @@ def test_validate_environment_missing_key():
     'DB_PASSWORD': 'test_pass',
     'DB_NAME': 'test_db'
 })
-@patch('main_app.check_and_place_base_order')
-async def test_on_crypto_quote_handler(mock_check_base_order, caplog):
+@patch('main_app.evaluate_quote')
+async def test_on_crypto_quote_handler(mock_evaluate_quote, caplog):
     """Test cryptocurrency quote handler with mock quote data."""
     # Create a mock quote object
     mock_quote = MagicMock()
@@ -119,8 +124,129 @@ async def test_on_crypto_quote_handler(mock_check_base_order, caplog):
     assert 'Bid: $50000.5 @ 1.5' in log_message
     assert 'Ask: $50001.0 @ 2.0' in log_message
     
-    # Verify that base order check was called
-    mock_check_base_order.assert_called_once_with(mock_quote)
+    # Verify that the fused quote evaluation was called once
+    mock_evaluate_quote.assert_called_once_with(mock_quote)
+
+
+def _make_quote_state(status, quantity, bid_price=50000.0):
+    """Build a mock quote, and an asset and cycle with a position bought at 50000, for evaluate_quote tests."""
+    quote = MagicMock()
+    quote.symbol = 'BTC/USD'
+    quote.bid_price = bid_price
+    quote.ask_price = bid_price + 10.0
+    
+    asset = MagicMock()
+    asset.id = 1
+    asset.is_enabled = True
+    asset.base_order_amount = Decimal('100')
+    asset.safety_order_amount = Decimal('100')
+    asset.max_safety_orders = 3
+    asset.safety_order_deviation = Decimal('2')
+    asset.take_profit_percent = Decimal('1')
+    asset.ttp_enabled = False
+    asset.ttp_deviation_percent = None
+    
+    cycle = MagicMock()
+    cycle.status = status
+    cycle.quantity = Decimal(quantity)
+    cycle.average_purchase_price = Decimal('50000')
+    cycle.last_order_fill_price = Decimal('50000')
+    cycle.safety_orders = 0
+    cycle.highest_trailing_price = None
+    
+    return quote, asset, cycle
+
+
+@pytest.mark.unit
+@patch('main_app.recent_orders', {})
+@patch('main_app.check_and_place_take_profit_order')
+@patch('main_app.check_and_place_safety_order')
+@patch('main_app.check_and_place_base_order')
+@patch('main_app.get_latest_cycle')
+@patch('main_app.get_asset_config')
+def test_evaluate_quote_reads_state_once(mock_get_asset, mock_get_cycle, mock_base,
+                                         mock_safety, mock_take_profit):
+    """Test that one quote takes one snapshot and hands it to the decided check."""
+    quote, asset, cycle = _make_quote_state('watching', '0.5', bid_price=50600.0)
+    mock_get_asset.return_value = asset
+    mock_get_cycle.return_value = cycle
+    
+    evaluate_quote(quote)
+    
+    mock_get_asset.assert_called_once_with('BTC/USD')
+    mock_get_cycle.assert_called_once_with(1)
+    mock_base.assert_not_called()
+    mock_safety.assert_not_called()
+    
+    _, snapshot, action = mock_take_profit.call_args[0]
+    assert snapshot.latest_cycle is cycle
+    assert action == 'take_profit'
+
+
+@pytest.mark.unit
+@patch('main_app.recent_orders', {})
+@patch('main_app.check_and_place_take_profit_order')
+@patch('main_app.check_and_place_safety_order')
+@patch('main_app.check_and_place_base_order')
+@patch('main_app.get_latest_cycle')
+@patch('main_app.get_asset_config')
+def test_evaluate_quote_base_order_for_empty_cycle(mock_get_asset, mock_get_cycle, mock_base,
+                                                   mock_safety, mock_take_profit):
+    """Test that a watching cycle without a position only runs the base order check."""
+    quote, asset, cycle = _make_quote_state('watching', '0')
+    mock_get_asset.return_value = asset
+    mock_get_cycle.return_value = cycle
+    
+    evaluate_quote(quote)
+    
+    mock_base.assert_called_once()
+    mock_safety.assert_not_called()
+    mock_take_profit.assert_not_called()
+
+
+@pytest.mark.unit
+@patch('main_app.recent_orders', {})
+@patch('main_app.check_and_place_take_profit_order')
+@patch('main_app.check_and_place_safety_order')
+@patch('main_app.check_and_place_base_order')
+@patch('main_app.get_latest_cycle')
+@patch('main_app.get_asset_config')
+def test_evaluate_quote_only_runs_decided_check(mock_get_asset, mock_get_cycle, mock_base,
+                                                mock_safety, mock_take_profit):
+    """Test that at most one check runs per quote, and none between the triggers."""
+    quote, asset, cycle = _make_quote_state('watching', '0.5', bid_price=48900.0)
+    mock_get_asset.return_value = asset
+    mock_get_cycle.return_value = cycle
+    
+    evaluate_quote(quote)
+    
+    assert mock_safety.call_args[0][2] == 'safety'
+    mock_take_profit.assert_not_called()
+    
+    quote.bid_price, quote.ask_price = 50100.0, 50110.0
+    evaluate_quote(quote)
+    
+    mock_safety.assert_called_once()
+    mock_take_profit.assert_not_called()
+    mock_base.assert_not_called()
+
+
+@pytest.mark.unit
+@patch('main_app.check_and_place_take_profit_order')
+@patch('main_app.check_and_place_safety_order')
+@patch('main_app.check_and_place_base_order')
+@patch('main_app.get_asset_config')
+def test_evaluate_quote_respects_recent_order_guard(mock_get_asset, mock_base, mock_safety, mock_take_profit):
+    """Test that a recent order short-circuits before any state is read."""
+    quote, _, _ = _make_quote_state('watching', '0')
+    
+    with patch('main_app.recent_orders', {'BTC/USD': {'order_id': 'abc', 'timestamp': datetime.now()}}):
+        evaluate_quote(quote)
+    
+    mock_get_asset.assert_not_called()
+    mock_base.assert_not_called()
+    mock_safety.assert_not_called()
+    mock_take_profit.assert_not_called()
 
 
 @pytest.mark.unit
@@ -319,4 +445,67 @@ async def test_on_trade_update_handler_with_execution(mock_execute_query, caplog
     assert any('Order ID: test_order_456' in msg for msg in log_messages)
     assert any('💰 EXECUTION DETAILS:' in msg for msg in log_messages)
     assert any('Fill Price: $50,000.25' in msg for msg in log_messages)
-    assert any('Fill Quantity: 0.1' in msg for msg in log_messages) 
\ No newline at end of file
+    assert any('Fill Quantity: 0.1' in msg for msg in log_messages)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_fill_updates_position_book_before_lookup():
+    """Test that a fill is applied to the position book and served without REST."""
+    book = PositionBook()
+    rest_position = MagicMock(symbol='BTCUSD', qty='0.5', avg_entry_price='50000')
+    book.reconcile([rest_position])
+    
+    trade_update = MagicMock()
+    trade_update.event = 'fill'
+    trade_update.qty = '0.5'
+    trade_update.price = '40000'
+    trade_update.position_qty = '1.0'
+    trade_update.order.symbol = 'BTC/USD'
+    trade_update.order.side = 'buy'
+    
+    with patch('main_app.position_book', book), \
+         patch('main_app.update_cycle_on_buy_fill') as mock_buy_fill, \
+         patch('main_app.get_positions') as mock_get_positions:
+        await on_trade_update(trade_update)
+        position = get_alpaca_position_by_symbol(MagicMock(), 'BTC/USD')
+    
+    mock_buy_fill.assert_called_once()
+    mock_get_positions.assert_not_called()
+    assert position.qty == Decimal('1.0')
+    assert position.avg_entry_price == Decimal('45000')
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_buy_fill_syncs_cycle_from_rest_not_position_book():
+    """Test that a fee-reduced fill writes Alpaca's avg_entry_price, not the book's estimate."""
+    book = PositionBook()
+    book.reconcile([MagicMock(symbol='BTCUSD', qty='0.5', avg_entry_price='50000')])
+    book.apply_fill('BTC/USD', 'buy', '0.5', '40000', position_qty='0.998')
+    assert book.get('BTC/USD').avg_entry_price == Decimal('45000')  # Pre-fee estimate
+    
+    rest_position = MagicMock(symbol='BTCUSD', qty='0.998', avg_entry_price='45090.180360721')
+    order = MagicMock(id='order-1', symbol='BTC/USD', side='buy', filled_qty='0.5', filled_avg_price='40000')
+    trade_update = MagicMock(event='fill', order=order)
+    cycle_row = {
+        'id': 1, 'asset_id': 1, 'status': 'buying', 'quantity': Decimal('0.5'),
+        'average_purchase_price': Decimal('50000'), 'safety_orders': 0, 'latest_order_id': 'order-1',
+        'latest_order_created_at': datetime.now(), 'last_order_fill_price': Decimal('50000'),
+        'highest_trailing_price': None, 'sell_price': None, 'completed_at': None,
+        'created_at': datetime.now(), 'updated_at': datetime.now()
+    }
+    
+    with patch('main_app.position_book', book), \
+         patch('main_app.get_trading_client', return_value=MagicMock()), \
+         patch('main_app.get_positions', return_value=[rest_position]) as mock_get_positions, \
+         patch('main_app.execute_query', side_effect=[cycle_row, {'asset_symbol': 'BTC/USD'}]), \
+         patch('main_app.update_cycle', return_value=True) as mock_update_cycle, \
+         patch('main_app.discord_order_filled'):
+        await main_app.update_cycle_on_buy_fill(order, trade_update)
+    
+    mock_get_positions.assert_called_once()
+    updates = mock_update_cycle.call_args[0][1]
+    assert updates['quantity'] == Decimal('0.998')
+    assert updates['average_purchase_price'] == Decimal('45090.180360721')
+    assert updates['safety_orders'] == 1
@@ -0,0 +1,111 @@
+"""
+Tests for the Prometheus-format metrics registry and HTTP endpoint.
+"""
+
+import asyncio
+import time
+import urllib.error
+import urllib.request
+import pytest
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.metrics import EventLoopLagProbe, MetricFamily, MetricsRegistry, MetricsServer
+
+
+class TestMetricsRegistry:
+    """Test metric updates and text rendering"""
+
+    @pytest.mark.unit
+    def test_counter_and_gauge_rendering(self):
+        """Test that labelled samples are rendered with HELP and TYPE lines"""
+        registry = MetricsRegistry()
+        orders = registry.counter('dca_orders_placed_total', 'Orders placed', ('symbol', 'order_type'))
+        in_flight = registry.gauge('dca_in_flight', 'Evaluations in flight')
+        orders.inc('BTC/USD', 'base')
+        orders.inc('BTC/USD', 'base')
+        in_flight.inc()
+        in_flight.inc()
+        in_flight.dec()
+
+        text = registry.render()
+        assert '# TYPE dca_orders_placed_total counter' in text
+        assert 'dca_orders_placed_total{symbol="BTC/USD",order_type="base"} 2' in text
+        assert '# TYPE dca_in_flight gauge' in text
+        assert 'dca_in_flight 1' in text
+
+    @pytest.mark.unit
+    def test_same_name_returns_same_metric(self):
+        """Test that re-declaring a metric reuses it and mismatched labels are rejected"""
+        registry = MetricsRegistry()
+        counter = registry.counter('dca_db_queries_total', 'Queries', ('kind',))
+
+        assert registry.counter('dca_db_queries_total', 'Queries', ('kind',)) is counter
+        with pytest.raises(ValueError):
+            registry.gauge('dca_db_queries_total', 'Queries', ('kind',))
+
+    @pytest.mark.unit
+    def test_collectors_and_label_escaping(self):
+        """Test that collector output is rendered and a failing collector is skipped"""
+        registry = MetricsRegistry()
+
+        def quotes():
+            return [MetricFamily('dca_quotes_total', 'counter', 'Quotes').add(3, symbol='a"b', outcome='processed')]
+
+        def broken():
+            raise RuntimeError("boom")
+
+        registry.register_collector(broken)
+        registry.register_collector(quotes)
+
+        text = registry.render()
+        assert 'dca_quotes_total{symbol="a\\"b",outcome="processed"} 3' in text
+        assert text.endswith('\n')
+
+
+class TestMetricsServer:
+    """Test the HTTP endpoint"""
+
+    @pytest.mark.unit
+    def test_serves_metrics_and_health(self):
+        """Test /metrics, /health and unknown paths"""
+        registry = MetricsRegistry()
+        registry.counter('dca_fills_total', 'Fills').inc(amount=2)
+        server = MetricsServer(registry, '127.0.0.1', 0)
+        server.start()
+        try:
+            base = f"http://127.0.0.1:{server.address[1]}"
+            with urllib.request.urlopen(f"{base}/metrics", timeout=5) as response:
+                assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+                assert 'dca_fills_total 2' in response.read().decode()
+            with urllib.request.urlopen(f"{base}/health", timeout=5) as response:
+                assert response.read() == b'ok\n'
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"{base}/other", timeout=5)
+        finally:
+            server.stop()
+
+
+class TestEventLoopLagProbe:
+    """Test event loop lag measurement"""
+
+    @pytest.mark.unit
+    def test_probe_reports_blocked_loop(self):
+        """Test that blocking the loop shows up as lag for that loop"""
+        probe = EventLoopLagProbe(interval_seconds=0.01)
+        probe.enabled = True
+
+        async def run():
+            probe.ensure_started('crypto_stream')
+            probe.ensure_started('crypto_stream')  # Already running
+            await asyncio.sleep(0)
+            time.sleep(0.05)  # Block the loop
+            await asyncio.sleep(0.03)
+
+        asyncio.run(run())
+
+        latest, worst = probe.collect()
+        assert worst.samples[0][0] == {'loop': 'crypto_stream'}
+        assert worst.samples[0][1] >= 0.03
@@ -17,7 +17,7 @@ from utils.notifications import (
     send_email_alert, send_trading_alert, send_system_alert, 
     verify_email_configuration, EmailRateLimiter,
     alert_order_placed, alert_order_filled, alert_cycle_completed,
-    alert_system_error, alert_critical_error
+    alert_system_error, alert_critical_error, EmailDispatcher
 )
 
 
@@ -306,5 +306,107 @@ class TestEmailAlerts(unittest.TestCase):
         self.assertEqual(calls[1][1]['priority'], 'critical')
 
 
+class TestEmailDispatcher(unittest.TestCase):
+    """Test cases for the background email dispatcher."""
+    
+    def setUp(self):
+        """Patch configuration, the rate limiter and SMTP."""
+        config_patcher = patch('utils.notifications.config')
+        self.mock_config = config_patcher.start()
+        self.mock_config.email_alerts_enabled = True
+        self.addCleanup(config_patcher.stop)
+        
+        limiter_patcher = patch('utils.notifications._rate_limiter', EmailRateLimiter(max_emails_per_hour=100))
+        limiter_patcher.start()
+        self.addCleanup(limiter_patcher.stop)
+        
+        smtp_patcher = patch('utils.notifications.smtplib.SMTP')
+        self.mock_smtp = smtp_patcher.start()
+        self.addCleanup(smtp_patcher.stop)
+        self.mock_server = MagicMock()
+        self.mock_smtp.return_value = self.mock_server
+    
+    def sent_subjects(self, server):
+        """Subjects of the messages sent through a mock SMTP session."""
+        return [c[0][0]['Subject'] for c in server.send_message.call_args_list]
+    
+    def test_low_priority_alerts_are_digested(self):
+        """Test that normal alerts are combined into one digest email on flush."""
+        dispatcher = EmailDispatcher(digest_interval_seconds=3600)
+        for i in range(3):
+            self.assertTrue(dispatcher.submit(f"Order {i}", f"Body {i}", priority="normal"))
+        
+        dispatcher.start()
+        self.assertEqual(dispatcher.stop(timeout_seconds=5), 0)
+        
+        self.assertEqual(self.sent_subjects(self.mock_server), ['[DCA Bot] Digest - 3 alerts'])
+        body = self.mock_server.send_message.call_args[0][0].get_payload()
+        self.assertIn('Body 0', body)
+        self.assertIn('Body 2', body)
+        self.assertEqual(dispatcher.get_stats()['digests_sent'], 1)
+    
+    def test_rate_limited_digest_is_held_for_next_interval(self):
+        """Test that a digest blocked by the hourly limit keeps its alerts."""
+        dispatcher = EmailDispatcher(digest_interval_seconds=3600)
+        for i in range(3):
+            dispatcher.submit(f"Order {i}", f"Body {i}", priority="normal")
+        
+        with patch('utils.notifications._rate_limiter', EmailRateLimiter(max_emails_per_hour=0)):
+            dispatcher._flush_digest()
+        self.mock_server.send_message.assert_not_called()
+        self.assertEqual(dispatcher.get_stats()['digest_pending'], 3)
+        
+        dispatcher.submit("Order 3", "Body 3", priority="normal")
+        dispatcher._flush_digest()
+        
+        self.assertEqual(self.sent_subjects(self.mock_server), ['[DCA Bot] Digest - 4 alerts'])
+        body = self.mock_server.send_message.call_args[0][0].get_payload()
+        self.assertLess(body.index('Order 0'), body.index('Order 3'))
+        self.assertEqual(dispatcher.get_stats()['rate_limited'], 1)
+    
+    def test_critical_alerts_share_one_smtp_session(self):
+        """Test that immediate alerts reuse one authenticated session."""
+        dispatcher = EmailDispatcher(digest_interval_seconds=3600)
+        dispatcher.submit("Crash 1", "Body", priority="critical", bypass_rate_limit=True)
+        dispatcher.submit("Crash 2", "Body", priority="critical", bypass_rate_limit=True)
+        
+        dispatcher.start()
+        dispatcher.stop(timeout_seconds=5)
+        
+        self.mock_smtp.assert_called_once()
+        self.mock_server.login.assert_called_once()
+        self.assertEqual(self.mock_server.send_message.call_count, 2)
+        self.mock_server.quit.assert_called_once()
+    
+    def test_dropped_session_is_reconnected(self):
+        """Test that a send on a dropped session reconnects and retries once."""
+        stale_server = MagicMock()
+        stale_server.send_message.side_effect = [None, smtplib.SMTPServerDisconnected("gone")]
+        fresh_server = MagicMock()
+        self.mock_smtp.side_effect = [stale_server, fresh_server]
+        
+        dispatcher = EmailDispatcher(digest_interval_seconds=0)
+        dispatcher.submit("Alert 1", "Body", priority="high")
+        dispatcher.submit("Alert 2", "Body", priority="high")
+        
+        dispatcher.start()
+        dispatcher.stop(timeout_seconds=5)
+        
+        self.assertEqual(self.mock_smtp.call_count, 2)
+        self.assertEqual(self.sent_subjects(fresh_server), ['[HIGH] [DCA Bot] Alert 2'])
+        self.assertEqual(dispatcher.get_stats()['sent'], 2)
+    
+    def test_send_email_alert_queues_when_dispatcher_running(self):
+        """Test that send_email_alert hands off to the running dispatcher."""
+        dispatcher = MagicMock()
+        dispatcher.submit.return_value = True
+        
+        with patch('utils.notifications._email_dispatcher', dispatcher):
+            self.assertTrue(send_email_alert("Subject", "Body", priority="critical"))
+        
+        dispatcher.submit.assert_called_once()
+        self.mock_smtp.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -112,7 +112,7 @@ async def test_buy_order_cancellation_calls_update_cycle_correctly():
             'status': 'watching',
             'latest_order_id': None,
             'latest_order_created_at': None
-        })
+        }, event='cancel')
 
 
 @pytest.mark.asyncio
@@ -272,4 +272,4 @@ async def test_sell_order_cancellation_alpaca_client_failure():
             'status': 'watching',
             'latest_order_id': None,
             'latest_order_created_at': None
-        }) 
\ No newline at end of file
+        }, event='cancel') 
\ No newline at end of file
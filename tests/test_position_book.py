@@ -0,0 +1,96 @@
+"""
+Tests for the stream-fed local position book.
+"""
+
+import pytest
+from decimal import Decimal
+from unittest.mock import Mock
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.position_book import PositionBook
+
+
+def make_rest_position(symbol='BTCUSD', qty='0.5', avg_entry_price='50000'):
+    """Create a mock alpaca-py Position."""
+    position = Mock()
+    position.symbol = symbol
+    position.qty = qty
+    position.avg_entry_price = avg_entry_price
+    return position
+
+
+class TestPositionBook:
+    """Test position book seeding, fills and reconciliation"""
+
+    def setup_method(self):
+        """Create a book seeded with one BTC position"""
+        self.book = PositionBook()
+        self.book.reconcile([make_rest_position()])
+
+    @pytest.mark.unit
+    def test_unseeded_book_is_not_ready(self):
+        """Test that a new book does not serve lookups"""
+        assert not PositionBook().is_ready
+        assert self.book.is_ready
+
+    @pytest.mark.unit
+    def test_lookup_accepts_either_symbol_format(self):
+        """Test that pair and Alpaca symbols resolve to the same position"""
+        assert self.book.get('BTC/USD').qty == Decimal('0.5')
+        assert self.book.get('BTCUSD').avg_entry_price == Decimal('50000')
+        assert self.book.get('ETH/USD') is None
+
+    @pytest.mark.unit
+    def test_buy_fill_updates_quantity_and_average(self):
+        """Test that a buy uses position_qty and a weighted average price"""
+        position = self.book.apply_fill('BTC/USD', 'buy', '0.5', '40000', position_qty='0.998')
+
+        assert position.qty == Decimal('0.998')
+        assert position.avg_entry_price == Decimal('45000')
+        assert position.source == 'stream'
+
+    @pytest.mark.unit
+    def test_buy_fill_without_position_qty(self):
+        """Test that the execution quantity is added when position_qty is missing"""
+        position = self.book.apply_fill('ETH/USD', 'buy', '2', '3000')
+
+        assert position.qty == Decimal('2')
+        assert position.avg_entry_price == Decimal('3000')
+
+    @pytest.mark.unit
+    def test_sell_fill_closes_position(self):
+        """Test that selling the whole position removes it"""
+        assert self.book.apply_fill('BTC/USD', 'sell', '0.5', '51000', position_qty='0') is None
+        assert self.book.get('BTC/USD') is None
+
+    @pytest.mark.unit
+    def test_unusable_fill_falls_back_to_rest(self):
+        """Test that a fill without quantity/price marks the book for a REST refresh"""
+        self.book.apply_fill('BTC/USD', 'buy', None, None)
+
+        assert not self.book.is_ready
+        assert self.book.get('BTC/USD') is None
+
+    @pytest.mark.unit
+    def test_reconcile_corrects_drift(self):
+        """Test that a REST snapshot overrides and reports drifted positions"""
+        self.book.apply_fill('BTC/USD', 'buy', '0.1', '50000')
+
+        drifted = self.book.reconcile([make_rest_position(qty='0.55')])
+
+        assert drifted == ['BTCUSD']
+        assert self.book.get('BTC/USD').qty == Decimal('0.55')
+        assert self.book.get_stats()['drift_corrections'] == 1
+
+    @pytest.mark.unit
+    def test_reconcile_keeps_fill_applied_during_snapshot(self):
+        """Test that a fill newer than the REST snapshot is not overwritten"""
+        generations = self.book.generations()
+        self.book.apply_fill('BTC/USD', 'sell', '0.5', '51000', position_qty='0')
+
+        self.book.reconcile([make_rest_position()], generations)
+
+        assert self.book.get('BTC/USD') is None
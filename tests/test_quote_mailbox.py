@@ -0,0 +1,158 @@
+"""
+Tests for the per-symbol latest-wins quote mailbox.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import Mock
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.quote_mailbox import QuoteMailbox
+
+
+def make_quote(symbol='BTC/USD', bid=50000.0, ask=50010.0):
+    """Create a mock quote object."""
+    quote = Mock()
+    quote.symbol = symbol
+    quote.bid_price = bid
+    quote.ask_price = ask
+    return quote
+
+
+async def wait_for_idle(mailbox):
+    """Let drain tasks run until nothing is pending or in flight."""
+    for _ in range(100):
+        await asyncio.sleep(0)
+        if not mailbox._workers and not mailbox._pending:
+            return
+
+
+class TestQuoteMailbox:
+    """Test quote conflation behavior"""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_quote_is_processed(self):
+        """Test that a single quote reaches the handler"""
+        processed = []
+
+        async def handler(quote):
+            processed.append(quote)
+
+        mailbox = QuoteMailbox(handler)
+        quote = make_quote()
+        await mailbox.submit(quote)
+        await wait_for_idle(mailbox)
+
+        assert processed == [quote]
+        assert mailbox.get_stats('BTC/USD')['processed'] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_only_latest_pending_quote_is_processed(self):
+        """Test that quotes arriving during an evaluation are coalesced"""
+        processed = []
+        release = asyncio.Event()
+
+        async def handler(quote):
+            processed.append(quote.bid_price)
+            await release.wait()
+
+        mailbox = QuoteMailbox(handler)
+        await mailbox.submit(make_quote(bid=1.0))
+        await asyncio.sleep(0)  # First quote is now in flight
+
+        await mailbox.submit(make_quote(bid=2.0))
+        await mailbox.submit(make_quote(bid=3.0))
+        await mailbox.submit(make_quote(bid=4.0))
+
+        release.set()
+        await wait_for_idle(mailbox)
+
+        assert processed == [1.0, 4.0]
+        stats = mailbox.get_stats('BTC/USD')
+        assert stats['received'] == 4
+        assert stats['coalesced'] == 2
+        assert stats['processed'] == 2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_symbols_are_processed_independently(self):
+        """Test that a slow symbol does not hold up other symbols"""
+        processed = []
+        release = asyncio.Event()
+
+        async def handler(quote):
+            if quote.symbol == 'BTC/USD':
+                await release.wait()
+            processed.append(quote.symbol)
+
+        mailbox = QuoteMailbox(handler)
+        await mailbox.submit(make_quote('BTC/USD'))
+        await mailbox.submit(make_quote('ETH/USD'))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert processed == ['ETH/USD']
+
+        release.set()
+        await wait_for_idle(mailbox)
+        assert sorted(processed) == ['BTC/USD', 'ETH/USD']
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_unchanged_quote_is_skipped(self):
+        """Test that repeated bid/ask values are not re-evaluated"""
+        processed = []
+
+        async def handler(quote):
+            processed.append(quote)
+
+        mailbox = QuoteMailbox(handler, unchanged_recheck_seconds=60)
+        await mailbox.submit(make_quote())
+        await wait_for_idle(mailbox)
+        await mailbox.submit(make_quote())
+        await wait_for_idle(mailbox)
+
+        assert len(processed) == 1
+        assert mailbox.get_stats('BTC/USD')['skipped_unchanged'] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_unchanged_quote_rechecked_after_interval(self):
+        """Test that an unchanged quote is evaluated again after the recheck interval"""
+        processed = []
+
+        async def handler(quote):
+            processed.append(quote)
+
+        mailbox = QuoteMailbox(handler, unchanged_recheck_seconds=0)
+        await mailbox.submit(make_quote())
+        await wait_for_idle(mailbox)
+        await mailbox.submit(make_quote())
+        await wait_for_idle(mailbox)
+
+        assert len(processed) == 2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_handler_error_does_not_stop_mailbox(self):
+        """Test that a failing evaluation is counted and later quotes still run"""
+        processed = []
+
+        async def handler(quote):
+            if quote.bid_price == 1.0:
+                raise RuntimeError("boom")
+            processed.append(quote.bid_price)
+
+        mailbox = QuoteMailbox(handler)
+        await mailbox.submit(make_quote(bid=1.0))
+        await wait_for_idle(mailbox)
+        await mailbox.submit(make_quote(bid=2.0))
+        await wait_for_idle(mailbox)
+
+        assert processed == [2.0]
+        assert mailbox.get_stats()['totals']['errors'] == 1
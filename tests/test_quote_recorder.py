@@ -0,0 +1,155 @@
+"""
+Tests for the columnar quote recorder and loading recorded quotes.
+"""
+
+import gzip
+import numpy as np
+import pytest
+from datetime import date, datetime, timezone
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.backtest import load_price_file
+from utils.quote_recorder import (
+    QUOTE_DTYPE, QuoteRecorder, load_quote_file, load_recorded_quotes, recorded_files
+)
+
+DAY = 86400
+# 2025-06-01 00:00:00 UTC
+JUNE_1 = 1748736000.0
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    """Recorder whose writer only flushes when asked (or on close)."""
+    recorder = QuoteRecorder(tmp_path / 'quotes', flush_seconds=3600)
+    yield recorder
+    recorder.close()
+
+
+class TestQuoteRecorder:
+    """Test buffering, file layout and rotation"""
+
+    @pytest.mark.unit
+    def test_writes_memmappable_files_per_symbol(self, recorder):
+        """Test that each symbol gets a raw record file for its UTC day"""
+        recorder.record('BTC/USD', JUNE_1 + 10, 100.0, 100.5, 1.5, 2.0)
+        recorder.record('ETH/USD', datetime(2025, 6, 1, 0, 0, 11, tzinfo=timezone.utc), 50.0, 50.1)
+        recorder.record('BTC/USD', JUNE_1 + 12, 101.0, 101.5, 1.0, 1.0)
+        recorder.flush()
+
+        path = recorder.directory / '2025-06-01' / 'BTC-USD.quotes'
+        assert path.stat().st_size == 2 * QUOTE_DTYPE.itemsize
+        quotes = np.memmap(path, dtype=QUOTE_DTYPE, mode='r')
+        assert list(quotes['bid']) == [100.0, 101.0]
+        assert quotes['bid_size'][0] == 1.5
+        assert load_quote_file(recorder.directory / '2025-06-01' / 'ETH-USD.quotes')['timestamp'][0] == JUNE_1 + 11
+        assert recorder.get_stats()['written'] == 3
+
+    @pytest.mark.unit
+    def test_invalid_quote_skipped_without_losing_others(self, recorder):
+        """Test that a quote with a missing or non-numeric price is counted and the rest still written"""
+        recorder.record('BTC/USD', JUNE_1 + 10, 100.0, 100.5)
+        recorder.record('BTC/USD', JUNE_1 + 11, None, 100.6)
+        recorder.record('ETH/USD', JUNE_1 + 12, 50.0, 'n/a')
+        recorder.record('ETH/USD', JUNE_1 + 13, 50.1, 50.2)
+        recorder.flush()
+
+        assert load_quote_file(recorder.directory / '2025-06-01' / 'BTC-USD.quotes')['bid'].tolist() == [100.0]
+        assert load_quote_file(recorder.directory / '2025-06-01' / 'ETH-USD.quotes')['bid'].tolist() == [50.1]
+        stats = recorder.get_stats()
+        assert (stats['written'], stats['rejected'], stats['errors'], stats['pending']) == (2, 2, 0, 0)
+
+    @pytest.mark.unit
+    def test_rotation_compresses_finished_day(self, recorder):
+        """Test that a new day closes and gzips the previous day's files"""
+        recorder.record('BTC/USD', JUNE_1 + 100, 100.0, 100.5)
+        recorder.flush()
+        recorder.record('BTC/USD', JUNE_1 + DAY + 5, 102.0, 102.5)
+        # Arrives after the rotation: kept, in the current day's file
+        recorder.record('BTC/USD', JUNE_1 + DAY - 1, 101.0, 101.5)
+        recorder.flush()
+
+        assert not (recorder.directory / '2025-06-01' / 'BTC-USD.quotes').exists()
+        assert load_quote_file(recorder.directory / '2025-06-01' / 'BTC-USD.quotes.gz')['bid'].tolist() == [100.0]
+        assert [p.name for p in recorded_files(recorder.directory, 'BTC/USD')] == ['BTC-USD.quotes.gz', 'BTC-USD.quotes']
+
+        quotes = load_recorded_quotes(recorder.directory, 'BTC/USD')
+        assert quotes['bid'].tolist() == [100.0, 101.0, 102.0]
+        assert load_recorded_quotes(recorder.directory, 'BTC/USD', start=date(2025, 6, 2))['bid'].tolist() == [101.0, 102.0]
+        assert recorder.get_stats()['rotations'] == 1
+
+    @pytest.mark.unit
+    def test_retention_and_bounded_buffer(self, tmp_path):
+        """Test that old day directories are removed and overflow is counted"""
+        recorder = QuoteRecorder(tmp_path, flush_seconds=3600, compress=False, retention_days=2, max_pending=2)
+        try:
+            for day in range(4):
+                recorder.record('BTC/USD', JUNE_1 + day * DAY, 100.0 + day, 101.0 + day)
+                recorder.flush()
+            recorder.record('BTC/USD', JUNE_1 + 3 * DAY + 1, 1.0, 1.0)
+            recorder.record('BTC/USD', JUNE_1 + 3 * DAY + 2, 1.0, 1.0)
+            recorder.record('BTC/USD', JUNE_1 + 3 * DAY + 3, 1.0, 1.0)
+        finally:
+            recorder.close()
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['2025-06-03', '2025-06-04']
+        assert recorder.get_stats()['dropped'] == 1
+        assert len(load_recorded_quotes(tmp_path, 'BTC/USD')) == 4
+
+    @pytest.mark.unit
+    def test_partial_record_truncated_before_append_and_compress(self, tmp_path):
+        """Test that a restart after a crash mid-write does not misalign later records"""
+        raw = tmp_path / '2025-06-01' / 'BTC-USD.quotes'
+        raw.parent.mkdir()
+        raw.write_bytes(np.array([(JUNE_1 + 1, 1.0, 2.0, 0.0, 0.0)], dtype=QUOTE_DTYPE).tobytes() + b'\x01' * 13)
+
+        recorder = QuoteRecorder(tmp_path, flush_seconds=3600, compress=False)
+        recorder.record('BTC/USD', JUNE_1 + 2, 200.0, 201.0)
+        recorder.close()
+
+        quotes = load_quote_file(raw)
+        assert quotes['timestamp'].tolist() == [JUNE_1 + 1, JUNE_1 + 2]
+        assert quotes['bid'].tolist() == [1.0, 200.0] and quotes['ask'].tolist() == [2.0, 201.0]
+
+        # Crashed again; the finished day is compressed without the partial record
+        with open(raw, 'ab') as f:
+            f.write(b'\x01' * 13)
+        QuoteRecorder(tmp_path, flush_seconds=3600).close()
+
+        assert not raw.exists()
+        assert load_recorded_quotes(tmp_path, 'BTC/USD')['bid'].tolist() == [1.0, 200.0]
+
+
+class TestLoading:
+    """Test loading recorded quotes for backtests"""
+
+    @pytest.mark.unit
+    def test_partial_record_ignored(self, tmp_path):
+        """Test that a half-written record at the end of a file is skipped"""
+        data = np.array([(JUNE_1, 1.0, 2.0, 0.0, 0.0)], dtype=QUOTE_DTYPE).tobytes()
+        raw = tmp_path / 'BTC-USD.quotes'
+        raw.write_bytes(data + data[:7])
+        with gzip.open(tmp_path / 'ETH-USD.quotes.gz', 'wb') as f:
+            f.write(data * 2)
+
+        assert len(load_quote_file(raw)) == 1
+        assert len(load_quote_file(tmp_path / 'ETH-USD.quotes.gz')) == 2
+
+    @pytest.mark.unit
+    def test_backtest_loads_recorder_directory(self, recorder):
+        """Test that load_price_file turns recorded quotes into a PriceSeries"""
+        recorder.record('BTC/USD', JUNE_1 + 60, 100.0, 100.5)
+        recorder.record('BTC/USD', JUNE_1 + 120, 99.0, 99.5)
+        recorder.flush()
+
+        series = load_price_file(recorder.directory, symbol='BTC/USD')
+
+        assert list(series.bid) == [100.0, 99.0]
+        assert list(series.ask) == [100.5, 99.5]
+        with pytest.raises(ValueError):
+            load_price_file(recorder.directory, symbol='SOL/USD')
+        with pytest.raises(ValueError):
+            load_price_file(recorder.directory)
@@ -0,0 +1,152 @@
+"""
+Tests for the main_app replay harness.
+"""
+
+import numpy as np
+import pytest
+from decimal import Decimal
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import main_app
+from utils import db_utils
+from utils.backtest import _SimCycle, default_asset_config
+from utils.dca_rules import decide_quote_action
+from utils.replay import ReplayHarness, ReplayQuote, load_trade_updates
+
+# 2025-06-01 00:00:00 UTC
+JUNE_1 = 1748736000.0
+
+
+def price_path():
+    """Dip through several safety levels, rally past take-profit, then dip again."""
+    prices = np.concatenate([np.linspace(100, 95, 60), np.linspace(95, 104, 120), np.linspace(104, 100, 60),
+                             np.full(300, 100.0), np.linspace(100, 97, 60)])
+    return [ReplayQuote('BTC/USD', JUNE_1 + i * 10, float(p), float(p) * 1.001) for i, p in enumerate(prices)]
+
+
+def run_replay(**kwargs):
+    """Replay price_path() for BTC/USD with a one-minute cooldown."""
+    harness = ReplayHarness([default_asset_config('BTC/USD', cooldown_period=60)], **kwargs)
+    return harness.run(price_path())
+
+
+class TestReplayHarness:
+    """Test replaying quotes through the live handlers"""
+
+    @pytest.mark.unit
+    def test_full_cycle_on_replay_time(self):
+        """Test base, safety and take-profit fills, then cooldown expiry into a new cycle"""
+        report = run_replay()
+
+        summary = report.summary()
+        assert report.errors == []
+        assert summary['quotes'] == 600
+        assert summary['completed_cycles'] == 1
+        assert summary['realized_pl'] > 0
+        assert summary['orders']['sell_filled'] == 1
+        assert report.trade_updates['fill'] == len(report.orders)
+
+        first, second = report.cycles[:2]
+        assert first.status == 'complete'
+        assert first.safety_orders > 0
+        assert first.sell_price > first.average_purchase_price
+        # Timestamps follow the quotes, not the wall clock
+        assert first.created_at.year == 2025 and first.completed_at.year == 2025
+        assert second.status == 'watching' and second.quantity > 0
+
+    @pytest.mark.unit
+    def test_repeatable(self):
+        """Test that the same input produces the same orders and cycles"""
+        assert run_replay().fingerprint() == run_replay().fingerprint()
+
+    @pytest.mark.unit
+    def test_reports_db_queries_and_restores_state(self):
+        """Test query accounting and that main_app and the pool are put back"""
+        pool = db_utils._connection_pool
+        trading_client = main_app.get_trading_client
+        trigger_index = main_app.trigger_index
+
+        cached = run_replay()
+        uncached = run_replay(state_cache=False)
+
+        assert 0 < cached.db_queries_per_quote < uncached.db_queries_per_quote
+        assert cached.fingerprint() == uncached.fingerprint()
+        assert db_utils._connection_pool is pool
+        assert main_app.get_trading_client is trading_client
+        assert main_app.trigger_index is trigger_index
+
+    @pytest.mark.unit
+    def test_recorded_trade_updates(self, tmp_path):
+        """Test that recorded updates reach the replay's own orders and cycles"""
+        events = tmp_path / 'events.jsonl'
+        events.write_text(
+            '{"ts": %s, "event": "order_placed", "symbol": "BTC/USD", "order_id": "x", "side": "buy"}\n'
+            '{"ts": %s, "event": "order_partial_fill", "symbol": "BTC/USD", "order_id": "x", "side": "buy", '
+            '"order_status": "partially_filled", "qty": "0.2", "price": "200.1", "position_qty": "0.2", '
+            '"filled_qty": "0.2", "filled_avg_price": "200.1"}\n'
+            '{"ts": %s, "event": "order_canceled", "symbol": "BTC/USD", "order_id": "x", "side": "buy", '
+            '"order_status": "canceled", "filled_qty": "0.2", "filled_avg_price": "200.1"}\n'
+            '{"ts": %s, "event": "order_fill", "symbol": "BTC/USD", "order_id": "before-recording", '
+            '"side": "sell", "order_status": "filled"}\n' % (JUNE_1, JUNE_1 + 2, JUNE_1 + 5, JUNE_1 + 6))
+
+        updates = load_trade_updates(events)
+        harness = ReplayHarness([default_asset_config('BTC/USD')], simulate_fills=False)
+        report = harness.run([ReplayQuote('BTC/USD', JUNE_1, 200.0, 200.1)], updates)
+
+        assert [(update.event, update.placement) for update in updates] == [
+            ('partial_fill', 0), ('canceled', 0), ('fill', None)]
+        assert report.trade_updates == {'partial_fill': 1, 'canceled': 1, 'fill': 1}
+        assert report.unmatched_trade_updates == 1
+        assert [(order.status, order.filled_qty) for order in report.orders] == [('canceled', Decimal('0.2'))]
+        cycle = report.cycles[0]
+        assert (cycle.status, cycle.quantity, cycle.latest_order_id) == ('watching', Decimal('0.2'), None)
+        assert cycle.average_purchase_price == Decimal('200.1')
+
+
+POSITION = dict(quantity=Decimal('1'), average_purchase_price=Decimal('100'), last_order_fill_price=Decimal('100'))
+TRAILING = dict(POSITION, status='trailing', highest_trailing_price=Decimal('102'))
+
+# (asset overrides, starting cycle, bid, ask): reaches every action and the no-action cases
+DECISION_MATRIX = [
+    ({}, dict(status='watching', quantity=Decimal('0')), 100.0, 100.1),
+    ({}, dict(POSITION, status='watching'), 99.5, 99.6),
+    ({}, dict(POSITION, status='watching'), 98.9, 99.0),
+    ({}, dict(POSITION, status='watching', safety_orders=15), 98.9, 99.0),
+    ({}, dict(POSITION, status='watching'), 102.0, 102.1),
+    ({'ttp_enabled': False}, dict(POSITION, status='watching'), 102.0, 102.1),
+    ({}, TRAILING, 102.5, 102.6),
+    ({}, TRAILING, 101.5, 101.6),
+    ({}, TRAILING, 100.9, 101.0),
+]
+
+
+def live_action(overrides, cycle, bid, ask):
+    """Run one quote through main_app.evaluate_quote and name the action it took."""
+    harness = ReplayHarness([default_asset_config('BTC/USD', **overrides)], cycles=[dict(cycle, asset_symbol='BTC/USD')])
+    with harness.session(JUNE_1) as app:
+        app.evaluate_quote(ReplayQuote('BTC/USD', JUNE_1, bid, ask))
+    after = harness.database.cycles()[-1]
+    if harness.broker.orders:
+        order = harness.broker.orders[0]
+        if order.side == 'buy':
+            return 'base' if cycle['quantity'] == 0 else 'safety'
+        return 'ttp_sell' if cycle['status'] == 'trailing' else 'take_profit'
+    if cycle['status'] == 'watching' and after.status == 'trailing':
+        return 'ttp_activate'
+    if cycle['status'] == 'trailing' and after.highest_trailing_price != cycle['highest_trailing_price']:
+        return 'ttp_peak'
+    return None
+
+
+class TestDecisionDispatch:
+    """Test that evaluate_quote carries out the action dca_rules decides"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('overrides,cycle,bid,ask', DECISION_MATRIX)
+    def test_evaluate_quote_takes_decided_action(self, overrides, cycle, bid, ask):
+        """Test the order or cycle change evaluate_quote makes for each decision"""
+        asset = default_asset_config('BTC/USD', **overrides)
+        assert live_action(overrides, cycle, bid, ask) == decide_quote_action(asset, _SimCycle(**cycle), bid, ask)
@@ -0,0 +1,28 @@
+"""
+Tests for the caretaker run lock.
+"""
+
+import pytest
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.run_lock import acquire_run_lock
+
+
+class TestRunLock:
+    """Test that only one run of a caretaker holds its lock"""
+
+    @pytest.mark.unit
+    def test_second_run_skipped_until_released(self, tmp_path):
+        """Test that an overlapping run gets no lock and a later run does"""
+        first = acquire_run_lock('order_manager', tmp_path / 'locks')
+
+        assert first is not None
+        assert first.path.read_text().strip() == str(os.getpid())
+        assert acquire_run_lock('order_manager', tmp_path / 'locks') is None
+        assert acquire_run_lock('cooldown_manager', tmp_path / 'locks') is not None
+
+        first.release()
+        assert acquire_run_lock('order_manager', tmp_path / 'locks') is not None
@@ -0,0 +1,137 @@
+"""
+Tests for graceful shutdown: the SIGINT/SIGTERM force-exit timer must not
+cut off the flushes that run once the streams have closed.
+"""
+
+import signal
+import time
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import main_app
+from models.cycle_data import buffer_trailing_peak, get_latest_cycle, set_cycle_cache_enabled, set_peak_write_behind_enabled
+
+
+@pytest.fixture
+def sigterm():
+    """SIGTERM handler with a short stream grace period and os._exit mocked out."""
+    with patch('main_app.signal.signal') as mock_signal:
+        main_app.setup_signal_handlers()
+    handler = {call.args[0]: call.args[1] for call in mock_signal.call_args_list}[signal.SIGTERM]
+
+    with patch.object(main_app, 'SHUTDOWN_GRACE_SECONDS', 0.05), \
+         patch.object(main_app, 'crypto_stream_ref', None), \
+         patch.object(main_app, 'trading_stream_ref', None), \
+         patch('main_app.os._exit') as mock_exit:
+        try:
+            yield lambda: handler(signal.SIGTERM, None), mock_exit
+        finally:
+            main_app.shutdown_requested = False
+            if main_app._force_exit_thread is not None:
+                main_app._force_exit_thread.join(2)
+            main_app._shutdown_deadline = None
+
+
+@pytest.mark.unit
+def test_force_exit_after_grace_without_flush(sigterm):
+    """Test that the timer still forces an exit when the streams never close"""
+    send_sigterm, mock_exit = sigterm
+    send_sigterm()
+    time.sleep(0.3)
+    mock_exit.assert_called_with(0)
+
+
+@pytest.mark.unit
+def test_buffered_peaks_written_after_sigterm(sigterm):
+    """Test that a flush slower than the stream grace period still reaches the database"""
+    send_sigterm, mock_exit = sigterm
+    row = {
+        'id': 7, 'asset_id': 1, 'status': 'trailing', 'quantity': Decimal('0.1'),
+        'average_purchase_price': Decimal('100'), 'safety_orders': 0, 'latest_order_id': None,
+        'latest_order_created_at': None, 'last_order_fill_price': Decimal('100'),
+        'highest_trailing_price': Decimal('101'), 'completed_at': None, 'created_at': datetime(2025, 6, 1),
+        'updated_at': datetime(2025, 6, 1), 'sell_price': None,
+    }
+
+    def slow_update(query, params=None, **kwargs):
+        if query.lstrip().startswith('UPDATE'):
+            time.sleep(0.3)
+            return 1
+        return row
+
+    set_cycle_cache_enabled(True)
+    try:
+        with patch('models.cycle_data.execute_query', side_effect=slow_update) as mock_execute_query:
+            get_latest_cycle(1)
+            set_peak_write_behind_enabled(True)
+            assert buffer_trailing_peak(7, Decimal('103'))
+
+            send_sigterm()
+            main_app.flush_on_shutdown()
+            time.sleep(0.1)
+
+        mock_exit.assert_not_called()
+        query, params = mock_execute_query.call_args[0]
+        assert 'highest_trailing_price' in query and params[:2] == (Decimal('103'), 7)
+    finally:
+        set_cycle_cache_enabled(False)
+
+
+@pytest.mark.unit
+def test_queued_discord_notifications_sent_after_sigterm(sigterm):
+    """Test that the Discord dispatcher drains its queue during a signalled shutdown"""
+    from discord_webhook import DiscordEmbed, DiscordWebhook
+    from utils.discord_notifications import DiscordRateLimiter, start_discord_dispatcher
+
+    send_sigterm, mock_exit = sigterm
+    sent = []
+
+    def slow_post(webhook):
+        time.sleep(0.3)
+        sent.append(len(webhook.embeds))
+        return Mock(status_code=204, headers={})
+
+    mock_config = Mock(discord_webhook_url='https://discord.example/webhook', discord_user_id=None)
+    with patch.object(DiscordWebhook, 'api_post_request', autospec=True, side_effect=slow_post), \
+         patch('utils.discord_notifications.config', mock_config), \
+         patch('utils.discord_notifications._discord_rate_limiter', DiscordRateLimiter(1000)):
+        dispatcher = start_discord_dispatcher(batch_window_seconds=0)
+        for title in ('Order filled', 'Cycle completed'):
+            assert dispatcher.submit(embeds=[DiscordEmbed(title=title)])
+
+        send_sigterm()
+        main_app.flush_on_shutdown()
+
+    mock_exit.assert_not_called()
+    assert sum(sent) == 2
+
+
+@pytest.mark.unit
+def test_pending_email_digest_sent_after_sigterm(sigterm):
+    """Test that the email dispatcher sends its pending digest during a signalled shutdown"""
+    from utils.notifications import EmailRateLimiter, start_email_dispatcher
+
+    send_sigterm, mock_exit = sigterm
+    server = Mock()
+    server.send_message.side_effect = lambda message: time.sleep(0.3)
+
+    with patch('utils.notifications.config') as mock_config, \
+         patch('utils.notifications._rate_limiter', EmailRateLimiter(max_emails_per_hour=100)), \
+         patch('utils.notifications.smtplib.SMTP', return_value=server):
+        mock_config.email_alerts_enabled = True
+        dispatcher = start_email_dispatcher(digest_interval_seconds=3600)
+        for subject in ('Order filled', 'Cycle completed'):
+            assert dispatcher.submit(subject, 'BTC/USD', priority='normal')
+
+        send_sigterm()
+        main_app.flush_on_shutdown()
+
+    mock_exit.assert_not_called()
+    server.send_message.assert_called_once()
+    assert dispatcher.get_stats()['digests_sent'] == 1
@@ -0,0 +1,216 @@
+"""
+Tests for the sharded market data stream.
+"""
+
+import asyncio
+import pytest
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import main_app
+from utils.stream_shards import ShardedCryptoStream, plan_shards, stream_loop_name
+
+
+class FakeStream:
+    """Stand-in for CryptoDataStream that replays queued quotes on its own loop."""
+
+    def __init__(self, block=False):
+        self.block = block
+        self.quote_handlers = {}
+        self.trade_handlers = {}
+        self.quotes = []
+        self._running = False
+        self._should_run = True
+        self.stopped = threading.Event()
+
+    def subscribe_quotes(self, handler, symbol):
+        self.quote_handlers[symbol] = handler
+
+    def subscribe_trades(self, handler, symbol):
+        self.trade_handlers[symbol] = handler
+
+    def unsubscribe_quotes(self, symbol):
+        del self.quote_handlers[symbol]
+
+    def unsubscribe_trades(self, symbol):
+        del self.trade_handlers[symbol]
+
+    def run(self):
+        async def run_forever():
+            self._running = True
+            for quote in self.quotes:
+                await self.quote_handlers[quote.symbol](quote)
+            while self.block and self._should_run:
+                await asyncio.sleep(0.01)
+            self._running = False
+        asyncio.run(run_forever())
+        self.stopped.set()
+
+    def stop(self):
+        self._should_run = False
+
+
+def make_quote(symbol, lag_seconds=0.5):
+    """Create a mock quote stamped lag_seconds in the past."""
+    quote = Mock()
+    quote.symbol = symbol
+    quote.timestamp = datetime.now(timezone.utc) - timedelta(seconds=lag_seconds)
+    return quote
+
+
+SYMBOLS = [f'C{i}/USD' for i in range(70)]
+
+
+class TestPlanShards:
+    """Test assignment of symbols to connections"""
+
+    @pytest.mark.unit
+    def test_round_robin_within_limit(self):
+        """Test that 70 symbols need three connections of at most 30, dealt round-robin"""
+        groups, dropped = plan_shards(SYMBOLS, symbols_per_connection=30, max_connections=5)
+
+        assert dropped == []
+        assert [len(group) for group in groups] == [24, 23, 23]
+        assert groups[0][:2] == ['C0/USD', 'C3/USD']
+        assert sorted(s for group in groups for s in group) == sorted(SYMBOLS)
+
+    @pytest.mark.unit
+    def test_excess_symbols_dropped_and_duplicates_ignored(self):
+        """Test the connection cap and duplicate symbols"""
+        groups, dropped = plan_shards(SYMBOLS[:40] + SYMBOLS[:5], symbols_per_connection=30, max_connections=1)
+
+        assert len(groups) == 1 and groups[0] == SYMBOLS[:30]
+        assert dropped == SYMBOLS[30:40]
+
+    @pytest.mark.unit
+    def test_no_symbols_and_bad_limits(self):
+        """Test an empty list gives one empty shard and invalid limits are rejected"""
+        assert plan_shards([], 30, 2) == ([[]], [])
+        with pytest.raises(ValueError):
+            plan_shards(SYMBOLS, 0, 2)
+
+
+class TestShardedCryptoStream:
+    """Test running several connections into one handler"""
+
+    @pytest.mark.unit
+    def test_all_shards_feed_one_handler(self):
+        """Test that every shard's quotes reach the shared handler with per-shard counters"""
+        received = []
+        loops = {}
+
+        async def handler(quote):
+            received.append(quote.symbol)
+            loops[quote.symbol] = stream_loop_name.get()
+
+        streams = ShardedCryptoStream(FakeStream, SYMBOLS[:4], handler, Mock(),
+                                      symbols_per_connection=2, max_connections=3)
+        for shard in streams.shards:
+            shard.stream.quotes = [make_quote(symbol) for symbol in shard.symbols]
+            assert set(shard.stream.trade_handlers) == set(shard.symbols)
+
+        asyncio.run(streams.run())
+
+        assert sorted(received) == sorted(SYMBOLS[:4])
+        assert loops['C0/USD'] == 'crypto_stream_0' and loops['C1/USD'] == 'crypto_stream_1'
+        stats = streams.get_stats()
+        assert [s['symbols'] for s in stats] == [['C0/USD', 'C2/USD'], ['C1/USD', 'C3/USD']]
+        for shard_stats in stats:
+            assert shard_stats['quotes'] == 2
+            assert 0.4 < shard_stats['lag_seconds'] < 5
+            assert shard_stats['last_message_age_seconds'] < 5
+            assert shard_stats['running'] is False and shard_stats['connected'] is False
+
+    @pytest.mark.unit
+    def test_stop_and_close(self):
+        """Test that request_stop and close reach every stream"""
+        streams = ShardedCryptoStream(FakeStream, SYMBOLS[:3], Mock(), symbols_per_connection=1, max_connections=3)
+
+        streams.close()
+
+        assert len(streams.shards) == 3
+        assert all(shard.stream._should_run is False for shard in streams.shards)
+        assert streams.get_stats()[0]['lag_seconds'] is None
+
+    @pytest.mark.unit
+    def test_update_symbols_fills_least_loaded_then_opens_connection(self):
+        """Test removals, placement of new symbols and the connection cap"""
+        streams = ShardedCryptoStream(FakeStream, SYMBOLS[:3], Mock(), Mock(),
+                                      symbols_per_connection=2, max_connections=3)
+        assert [shard.symbols for shard in streams.shards] == [['C0/USD', 'C2/USD'], ['C1/USD']]
+
+        added, removed = streams.update_symbols(['C1/USD', 'C2/USD'] + SYMBOLS[5:10])
+
+        assert removed == ['C0/USD']
+        assert added == SYMBOLS[5:9]
+        assert streams.dropped_symbols == ['C9/USD']
+        assert [shard.symbols for shard in streams.shards] == [
+            ['C2/USD', 'C5/USD'], ['C1/USD', 'C6/USD'], ['C7/USD', 'C8/USD']]
+        assert set(streams.shards[0].stream.quote_handlers) == {'C2/USD', 'C5/USD'}
+        assert set(streams.shards[2].stream.trade_handlers) == {'C7/USD', 'C8/USD'}
+        assert streams.subscription_changes == {'added': 4, 'removed': 1}
+
+    @pytest.mark.unit
+    def test_failed_unsubscribe_is_retried(self):
+        """Test that a symbol stays subscribed when its unsubscribe fails"""
+        streams = ShardedCryptoStream(FakeStream, SYMBOLS[:2], Mock())
+        streams.shards[0].stream.unsubscribe_quotes = Mock(side_effect=RuntimeError('socket closed'))
+
+        assert streams.update_symbols(['C1/USD']) == ([], [])
+        assert streams.symbols == ['C0/USD', 'C1/USD']
+
+    @pytest.mark.unit
+    def test_connection_opened_while_running(self):
+        """Test that a connection opened by update_symbols starts on its own thread"""
+        async def run_and_update(streams):
+            task = asyncio.create_task(streams.run())
+            await asyncio.sleep(0.05)
+            await asyncio.to_thread(streams.update_symbols, SYMBOLS[:2])
+            await asyncio.sleep(0.05)
+            running = [shard.running for shard in streams.shards]
+            streams.close()
+            await asyncio.wait_for(task, 2)
+            return running
+
+        streams = ShardedCryptoStream(lambda: FakeStream(block=True), SYMBOLS[:1], Mock(),
+                                      symbols_per_connection=1, max_connections=2)
+
+        assert asyncio.run(run_and_update(streams)) == [True, True]
+        assert all(shard.stream.stopped.is_set() for shard in streams.shards)
+
+
+class TestSubscriptionSync:
+    """Test main_app following dca_assets changes on the live streams"""
+
+    @pytest.mark.unit
+    @patch('main_app.refresh_state_cache')
+    @patch('main_app.get_enabled_asset_symbols')
+    def test_sync_subscribes_enabled_and_drops_disabled(self, mock_symbols, mock_refresh):
+        """Test that newly enabled assets are loaded and subscribed and disabled ones removed"""
+        streams = ShardedCryptoStream(FakeStream, ['BTC/USD', 'ETH/USD'], Mock())
+        mock_symbols.return_value = ['BTC/USD', 'SOL/USD']
+
+        with patch('main_app.crypto_stream_ref', streams):
+            main_app.sync_crypto_subscriptions()
+
+        assert streams.symbols == ['BTC/USD', 'SOL/USD']
+        mock_refresh.assert_called_once()
+
+    @pytest.mark.unit
+    @patch('main_app.refresh_state_cache')
+    @patch('main_app.get_enabled_asset_symbols')
+    def test_sync_keeps_subscriptions_without_enabled_assets(self, mock_symbols, mock_refresh):
+        """Test that an empty enabled list does not unsubscribe everything"""
+        streams = ShardedCryptoStream(FakeStream, ['BTC/USD'], Mock())
+        mock_symbols.return_value = []
+
+        with patch('main_app.crypto_stream_ref', streams):
+            main_app.sync_crypto_subscriptions()
+
+        assert streams.symbols == ['BTC/USD']
+        mock_refresh.assert_not_called()
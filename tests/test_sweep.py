@@ -0,0 +1,126 @@
+"""
+Tests for the multi-process parameter sweep.
+"""
+
+import csv
+import numpy as np
+import pytest
+from decimal import Decimal
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.backtest import PriceSeries, default_asset_config
+from utils.sweep import (
+    SweepResult, measure_scaling, parameter_grid, random_parameters, rank_results, run_sweep
+)
+
+
+@pytest.fixture
+def prices():
+    """A few days of oscillating minute prices."""
+    rng = np.random.default_rng(11)
+    minutes = np.arange(5000)
+    values = 100 * (1 + 0.04 * np.sin(minutes / 80)) * np.exp(np.cumsum(rng.normal(0, 0.0005, len(minutes))))
+    return PriceSeries.from_prices(minutes * 60.0, values, spread_percent=0.1)
+
+
+def make_result(index, total_pl, max_capital, avg_cycle_seconds, cycles=1):
+    """Create a SweepResult with the ranked metrics."""
+    return SweepResult(index=index, params={}, cycles=cycles, total_pl=total_pl, roi_percent=0.0,
+                       max_capital=max_capital, avg_cycle_seconds=avg_cycle_seconds,
+                       max_cycle_seconds=avg_cycle_seconds, safety_orders=0, open_unrealized_pl=0.0)
+
+
+class TestParameterSets:
+    """Test grid and random parameter generation"""
+
+    @pytest.mark.unit
+    def test_grid_converts_values(self):
+        """Test that every combination is produced with DcaAsset field types"""
+        sets = parameter_grid({'take_profit_percent': ['1', '2'], 'ttp_enabled': ['true', 'false'],
+                               'max_safety_orders': ['5']})
+
+        assert len(sets) == 4
+        assert sets[0] == {'take_profit_percent': Decimal('1'), 'ttp_enabled': True, 'max_safety_orders': 5}
+
+    @pytest.mark.unit
+    def test_nullable_field_keeps_none(self):
+        """Test that None leaves ttp_deviation_percent unset instead of failing to convert"""
+        sets = parameter_grid({'ttp_deviation_percent': [None, 'none', 'NULL', '0.5']})
+
+        assert [p['ttp_deviation_percent'] for p in sets] == [None, None, None, Decimal('0.5')]
+
+    @pytest.mark.unit
+    def test_random_sample_is_distinct_and_repeatable(self):
+        """Test that a seeded sample has no duplicates and repeats exactly"""
+        space = {'take_profit_percent': ['1', '1.5', '2'], 'cooldown_period': [0, 60, 120, 300]}
+
+        sample = random_parameters(space, 8, seed=3)
+
+        assert sample == random_parameters(space, 8, seed=3)
+        assert len({tuple(sorted(p.items())) for p in sample}) == 8
+        assert len(random_parameters(space, 100, seed=3)) == 12
+
+    @pytest.mark.unit
+    def test_unknown_field_rejected(self):
+        """Test that only DcaAsset settings can be swept"""
+        with pytest.raises(ValueError):
+            parameter_grid({'asset_symbol': ['BTC/USD']})
+
+
+class TestRunSweep:
+    """Test sweep execution, result files and ranking"""
+
+    @pytest.mark.unit
+    def test_pool_matches_single_process(self, prices, tmp_path):
+        """Test that worker processes produce the same results as an in-process run"""
+        asset = default_asset_config('ETH/USD', cooldown_period=300)
+        sets = parameter_grid({'take_profit_percent': ['1', '2'], 'ttp_enabled': ['true', 'false'],
+                               'safety_order_deviation': ['0.5', '1']})
+        output = tmp_path / 'sweep.csv'
+
+        single = run_sweep(asset, prices, sets, workers=1)
+        pooled = run_sweep(asset, prices, sets, output_path=output, workers=2, chunk_size=3)
+
+        assert pooled == single
+        assert any(result.cycles > 0 for result in single)
+        with open(output, newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == len(sets)
+        assert sorted(int(row['index']) for row in rows) == list(range(len(sets)))
+        assert {row['ttp_enabled'] for row in rows} == {'True', 'False'}
+
+    @pytest.mark.unit
+    def test_none_ttp_deviation_runs(self, prices):
+        """Test that a set with TTP deviation unset backtests without error"""
+        asset = default_asset_config('ETH/USD')
+        sets = parameter_grid({'ttp_enabled': ['false'], 'ttp_deviation_percent': ['none']})
+
+        results = run_sweep(asset, prices, sets, workers=1)
+
+        assert results[0].params['ttp_deviation_percent'] is None
+
+    @pytest.mark.unit
+    def test_scaling_points(self, prices):
+        """Test that the scaling check times 1, 2, 4, ... workers against the single-worker run"""
+        sets = parameter_grid({'take_profit_percent': ['1', '2'], 'safety_order_deviation': ['0.5', '1']})
+
+        points = measure_scaling(default_asset_config('ETH/USD'), prices, sets, max_workers=3, chunk_size=1)
+
+        assert [p.workers for p in points] == [1, 2, 3]
+        assert points[0].speedup == pytest.approx(1.0)
+        assert all(p.seconds > 0 and p.efficiency == pytest.approx(p.speedup / p.workers) for p in points)
+
+    @pytest.mark.unit
+    def test_rankings(self):
+        """Test each ranking puts the expected result first"""
+        results = [make_result(0, 10.0, 300.0, 7200), make_result(1, 10.0, 100.0, 3600),
+                   make_result(2, 5.0, 50.0, 600), make_result(3, 0.0, 0.0, 0, cycles=0)]
+
+        assert rank_results(results, by='pl')[0].index == 1
+        assert rank_results(results, by='capital')[0].index == 3
+        assert rank_results(results, by='duration')[0].index == 2
+        with pytest.raises(ValueError):
+            rank_results(results, by='sharpe')
@@ -0,0 +1,131 @@
+"""
+Tests for the precomputed trigger price index.
+"""
+
+import math
+import pytest
+from decimal import Decimal
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.trigger_index import TriggerIndex, compute_trigger_levels
+
+
+class TestComputeTriggerLevels:
+    """Test trigger level derivation from asset config and cycle"""
+
+    @pytest.mark.unit
+    def test_watching_with_position(self, make_asset, make_cycle):
+        """Test that safety and take-profit levels bracket the quiet range"""
+        levels = compute_trigger_levels(make_asset(), make_cycle())
+
+        assert levels.ask_at_or_below == pytest.approx(98.0)
+        assert levels.bid_at_or_above == pytest.approx(101.0)
+        assert not levels.is_crossed(bid_price=100.0, ask_price=100.1)
+        assert levels.is_crossed(bid_price=97.9, ask_price=98.0)
+        assert levels.is_crossed(bid_price=101.0, ask_price=101.1)
+
+    @pytest.mark.unit
+    def test_exact_trigger_price_is_not_rejected(self, make_asset, make_cycle):
+        """Test that float widening keeps quotes on the trigger price"""
+        levels = compute_trigger_levels(make_asset(safety_order_deviation=Decimal('3.3')), make_cycle())
+
+        trigger = float(Decimal('100') * (Decimal('1') - Decimal('0.033')))
+        assert levels.is_crossed(bid_price=trigger, ask_price=trigger)
+
+    @pytest.mark.unit
+    def test_max_safety_orders_disables_safety_level(self, make_asset, make_cycle):
+        """Test that no safety level is set once safety orders are exhausted"""
+        levels = compute_trigger_levels(make_asset(), make_cycle(safety_orders=3))
+
+        assert levels.ask_at_or_below == -math.inf
+        assert not levels.is_crossed(bid_price=50.0, ask_price=50.0)
+
+    @pytest.mark.unit
+    def test_base_order_state_always_evaluated(self, make_asset, make_cycle):
+        """Test that a watching cycle without a position is always evaluated"""
+        levels = compute_trigger_levels(make_asset(), make_cycle(quantity=Decimal('0')))
+
+        assert levels.always
+        assert levels.is_crossed(bid_price=100.0, ask_price=100.0)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('status', ['buying', 'selling', 'cooldown', 'complete', 'error'])
+    def test_waiting_states_never_evaluated(self, status, make_asset, make_cycle):
+        """Test that cycles waiting on an order or cooldown never trigger"""
+        levels = compute_trigger_levels(make_asset(), make_cycle(status=status))
+
+        assert not levels.is_crossed(bid_price=1.0, ask_price=1.0)
+        assert not levels.is_crossed(bid_price=1e9, ask_price=1e9)
+
+    @pytest.mark.unit
+    def test_trailing_levels(self, make_asset, make_cycle):
+        """Test that a trailing cycle triggers on a new peak or the TTP sell level"""
+        asset = make_asset(ttp_enabled=True, ttp_deviation_percent=Decimal('0.5'))
+        cycle = make_cycle(status='trailing', highest_trailing_price=Decimal('110'))
+        levels = compute_trigger_levels(asset, cycle)
+
+        assert not levels.is_crossed(bid_price=109.6, ask_price=109.7)
+        assert levels.is_crossed(bid_price=110.5, ask_price=110.6)  # New peak
+        assert levels.is_crossed(bid_price=109.0, ask_price=109.1)  # Below 109.45 sell trigger
+
+    @pytest.mark.unit
+    def test_missing_prices_are_evaluated(self, make_asset, make_cycle):
+        """Test that quotes without prices are passed to the full path"""
+        levels = compute_trigger_levels(make_asset(), make_cycle())
+
+        assert levels.is_crossed(bid_price=None, ask_price=None)
+
+
+class TestTriggerIndex:
+    """Test trigger index storage and invalidation"""
+
+    def setup_method(self):
+        """Create an enabled index"""
+        self.index = TriggerIndex()
+        self.index.set_enabled(True)
+
+    @pytest.mark.unit
+    def test_unknown_symbol_is_evaluated(self):
+        """Test that symbols without levels take the full path"""
+        assert self.index.should_evaluate('BTC/USD', 100.0, 100.1)
+
+    @pytest.mark.unit
+    def test_quiet_quote_is_rejected(self, make_asset, make_cycle):
+        """Test that stored levels reject a quote that crosses nothing"""
+        self.index.store('BTC/USD', make_asset(), make_cycle(), self.index.generation())
+
+        assert not self.index.should_evaluate('BTC/USD', 100.0, 100.1)
+        assert self.index.should_evaluate('BTC/USD', 97.0, 97.1)
+        stats = self.index.get_stats()
+        assert stats['fast_rejects'] == 1
+        assert stats['evaluated'] == 1
+
+    @pytest.mark.unit
+    def test_invalidate_asset_drops_levels(self, make_asset, make_cycle):
+        """Test that a cycle change for the asset removes its levels"""
+        self.index.store('BTC/USD', make_asset(), make_cycle(), self.index.generation())
+        self.index.invalidate_asset(1)
+
+        assert self.index.get_levels('BTC/USD') is None
+        assert self.index.should_evaluate('BTC/USD', 100.0, 100.1)
+
+    @pytest.mark.unit
+    def test_store_after_invalidation_is_dropped(self, make_asset, make_cycle):
+        """Test that levels computed from state read before a change are not stored"""
+        generation = self.index.generation()
+        self.index.invalidate_asset(1)
+        self.index.store('BTC/USD', make_asset(), make_cycle(), generation)
+
+        assert self.index.get_levels('BTC/USD') is None
+
+    @pytest.mark.unit
+    def test_disabled_index_evaluates_everything(self, make_asset, make_cycle):
+        """Test that a disabled index never rejects quotes"""
+        self.index.store('BTC/USD', make_asset(), make_cycle(), self.index.generation())
+        self.index.set_enabled(False)
+
+        assert self.index.should_evaluate('BTC/USD', 100.0, 100.1)
+        assert self.index.get_levels('BTC/USD') is None
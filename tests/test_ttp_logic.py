@@ -148,6 +148,24 @@ class TestTTPNewPeakUpdate:
         assert updates['highest_trailing_price'] == Decimal('3200.0')
         assert 'status' not in updates  # Status should remain 'trailing'
 
+    @pytest.mark.unit
+    @patch('main_app.get_asset_config')
+    @patch('main_app.get_latest_cycle')
+    @patch('main_app.update_cycle')
+    @patch('main_app.buffer_trailing_peak')
+    @patch('main_app.recent_orders', {})
+    def test_ttp_new_peak_buffered_without_db_write(self, mock_buffer_peak, mock_update_cycle,
+                                                   mock_get_cycle, mock_get_asset):
+        """Test that a new peak is held in memory when peak write-behind is on"""
+        mock_get_asset.return_value = self.mock_asset_config
+        mock_get_cycle.return_value = self.mock_cycle
+        mock_buffer_peak.return_value = True
+        
+        check_and_place_take_profit_order(self.mock_quote)
+        
+        mock_buffer_peak.assert_called_once_with(self.mock_cycle.id, Decimal('3200.0'))
+        mock_update_cycle.assert_not_called()
+
     @pytest.mark.unit
     @patch('main_app.get_asset_config')
     @patch('main_app.get_latest_cycle')